@@ -16,8 +16,16 @@ import shutil
 from typing import Dict
 import tempfile
 import base64
+import os
+import time
 import traceback
 
+from opentelemetry import trace
+
+from vidp_common.idempotency import IdempotencyMiddleware
+from vidp_common.shared_storage import resolve_shared_path
+from vidp_common.tracing import setup_tracing, tracer
+
 app = FastAPI(
     title="YOLO Animal Detection API",
     description="API pour détecter des animaux dans des vidéos avec YOLOv8",
@@ -33,9 +41,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Rejeu des requêtes de détection relancées (en-tête Idempotency-Key)
+app.add_middleware(
+    IdempotencyMiddleware,
+    ttl_seconds=float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "3600"))
+)
+
+# Span serveur par requête, dans la trace de l'application principale (en-tête traceparent)
+setup_tracing(
+    app,
+    os.getenv("TRACING_SERVICE_NAME", "animal-detect"),
+    os.getenv("TRACING_EXPORTER", "none"),
+    os.getenv("TRACING_FILE", "traces/spans.jsonl"),
+    os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+)
+
 # Charger le modèle YOLO
 model = YOLO('yolov8n.pt')
 
+# Stockage partagé avec l'application principale (volume ReadWriteMany) : les chemins
+# relatifs reçus par /detect/local sont résolus depuis ce dossier
+SHARED_STORAGE_ROOT = Path(os.getenv("SHARED_STORAGE_ROOT", "/shared"))
+
 # Classes d'animaux dans COCO dataset (utilisé par YOLOv8)
 ANIMAL_CLASSES = {
     15: 'chat', 16: 'chien', 17: 'cheval', 18: 'mouton', 
@@ -51,6 +78,7 @@ async def root():
         "message": "API de détection d'animaux avec YOLO",
         "endpoints": {
             "/detect": "POST - Télécharger une vidéo pour détection (pas de sauvegarde)",
+            "/detect/local": "POST - Détecter sur une vidéo du stockage partagé (sans upload)",
             "/detect/frame": "POST - Détecter sur une seule image",
             "/animals": "GET - Liste des animaux détectables",
             "/health": "GET - Vérifier l'état de l'API"
@@ -103,9 +131,10 @@ async def detect_video(
     temp_file = None
     try:
         # Créer un fichier temporaire
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
-        shutil.copyfileobj(file.file, temp_file)
-        temp_file.close()
+        with tracer.start_as_current_span("save_upload"):
+            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
+            shutil.copyfileobj(file.file, temp_file)
+            temp_file.close()
         
         # Traiter la vidéo
         results = process_video(temp_file.name, confidence_threshold, frame_step, resize_width)
@@ -131,6 +160,53 @@ async def detect_video(
                 print(f"Erreur lors de la suppression du fichier temporaire: {e}")
 
 
+@app.post("/detect/local")
+async def detect_local_video(
+    video_path: str,
+    confidence_threshold: float = 0.5,
+    save_video: bool = False,
+    frame_step: int = 15,
+    resize_width: int = 640
+):
+    """
+    Détecte les animaux dans une vidéo déjà présente sur le disque (sans upload)
+    
+    Args:
+        video_path: Chemin de la vidéo dans le stockage partagé (relatif à SHARED_STORAGE_ROOT, ou absolu dans ce dossier)
+        confidence_threshold: Seuil de confiance minimum (0-1)
+        save_video: Ignoré - les vidéos ne sont jamais sauvegardées
+        frame_step: Le nombre de frames à sauter entre chaque analyse
+        resize_width: Largeur pour redimensionner les frames avant l'analyse
+    
+    Returns:
+        JSON avec statistiques et détections par frame
+    """
+    path = resolve_shared_path(video_path, SHARED_STORAGE_ROOT)
+    
+    if not path.is_file():
+        raise HTTPException(404, "Vidéo introuvable")
+    
+    if not path.name.endswith(('.mp4', '.avi', '.mov', '.mkv')):
+        raise HTTPException(400, "Format vidéo non supporté. Utilisez .mp4, .avi, .mov ou .mkv")
+    
+    if frame_step < 1:
+        raise HTTPException(400, "frame_step doit être supérieur ou égal à 1")
+    
+    try:
+        # La vidéo est lue en place (aucune copie)
+        results = process_video(str(path), confidence_threshold, frame_step, resize_width)
+        
+        if save_video:
+            results["note"] = "Le paramètre save_video est ignoré - aucune vidéo n'est jamais sauvegardée pour des raisons de confidentialité"
+        
+        return JSONResponse(content=results)
+    
+    except Exception as e:
+        error_details = traceback.format_exc()
+        print(f"Erreur lors du traitement: {error_details}")
+        raise HTTPException(500, f"Erreur lors du traitement: {str(e)}")
+
+
 @app.post("/detect/frame")
 async def detect_frame(file: UploadFile = File(...), confidence_threshold: float = 0.5):
     """
@@ -199,7 +275,18 @@ def process_video(
     resize_width: int = None
 ) -> Dict:
     """Traite la vidéo et extrait les détections"""
-    
+    with tracer.start_as_current_span(
+        "process_video", attributes={"frame_step": frame_step, "resize_width": resize_width or 0}
+    ):
+        return _process_video(video_path, conf_threshold, frame_step, resize_width)
+
+
+def _process_video(
+    video_path: str,
+    conf_threshold: float,
+    frame_step: int,
+    resize_width: int
+) -> Dict:
     cap = cv2.VideoCapture(video_path)
     
     if not cap.isOpened():
@@ -216,11 +303,16 @@ def process_video(
     animals_count = {}
     frame_idx = 0
     processed_frames_count = 0
+    # Temps cumulés de décodage des frames et d'inférence YOLO (un span par frame serait trop coûteux)
+    decode_seconds = 0.0
+    inference_seconds = 0.0
     
     try:
         while frame_idx < total_frames:
+            decode_started = time.monotonic()
             cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
             success, frame = cap.read()
+            decode_seconds += time.monotonic() - decode_started
             
             if not success:
                 break
@@ -235,7 +327,9 @@ def process_video(
                     frame = cv2.resize(frame, (resize_width, new_height))
 
             # Détection simple, car le suivi n'est pas requis
+            inference_started = time.monotonic()
             results = model(frame, conf=conf_threshold)
+            inference_seconds += time.monotonic() - inference_started
             use_tracking = False
             
             frame_data = {
@@ -276,6 +370,10 @@ def process_video(
     
     finally:
         cap.release()
+        span = trace.get_current_span()
+        span.set_attribute("frames_processed", processed_frames_count)
+        span.set_attribute("decode_seconds", round(decode_seconds, 3))
+        span.set_attribute("inference_seconds", round(inference_seconds, 3))
     
     # Résultats finaux
     return {
@@ -19,6 +19,21 @@ class Settings:
     COMPRESSED_DIR = BASE_DIR / "compressed"
     UPLOADS_DIR = BASE_DIR / "uploads"
     
+    # Storage shared with the main app (ReadWriteMany volume): relative paths sent
+    # to /api/compress/local are resolved against this directory and read in place
+    SHARED_STORAGE_ROOT = Path(os.getenv("SHARED_STORAGE_ROOT", "/shared"))
+    
+    # How long (seconds) a successful processing response is kept for replay to
+    # retries carrying the same Idempotency-Key header
+    IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "3600"))
+    
+    # Distributed tracing (OpenTelemetry): span exporter ("none", "file" or "otlp"),
+    # JSON lines file and OTLP/HTTP traces endpoint (e.g. an OpenTelemetry Collector)
+    TRACING_SERVICE_NAME = os.getenv("TRACING_SERVICE_NAME", "downscale")
+    TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none")
+    TRACING_FILE = os.getenv("TRACING_FILE", "traces/spans.jsonl")
+    TRACING_OTLP_ENDPOINT = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+    
     # Video Processing Configuration
     SUPPORTED_RESOLUTIONS = {
         "1080p": 1080,
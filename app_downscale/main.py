@@ -18,6 +18,8 @@ from routes.compression_routes import router as compression_router
 from routes.status_routes import router as status_router
 from routes.test_routes import router as test_router
 from routes.static_routes import router as static_router
+from vidp_common.idempotency import IdempotencyMiddleware
+from vidp_common.tracing import setup_tracing
 
 
 #  Lifespan manager (replaces startup/shutdown events)
@@ -73,6 +75,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Replay of retried compression requests (Idempotency-Key header)
+app.add_middleware(IdempotencyMiddleware, ttl_seconds=Settings.IDEMPOTENCY_TTL_SECONDS)
+
+# Server span per request, continuing the main app's trace (traceparent header)
+setup_tracing(
+    app,
+    Settings.TRACING_SERVICE_NAME,
+    Settings.TRACING_EXPORTER,
+    Settings.TRACING_FILE,
+    Settings.TRACING_OTLP_ENDPOINT
+)
+
 # Mount static directories
 app.mount("/video_storage", StaticFiles(directory=str(Settings.BASE_DIR)), name="video_storage")
 
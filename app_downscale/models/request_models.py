@@ -18,20 +18,11 @@ class VideoCompressionRequest(BaseModel):
 
 class LocalVideoRequest(BaseModel):
     """Request model for local video compression"""
-    local_path: str = Field(..., description="Local file path to compress")
+    local_path: str = Field(..., description="Path of the video in the shared storage (relative to SHARED_STORAGE_ROOT, or absolute inside it)")
     resolution: ResolutionEnum = Field(default=ResolutionEnum.R360P, description="Target resolution")
     crf_value: int = Field(default=28, ge=18, le=30, description="CRF quality parameter")
     custom_filename: Optional[str] = Field(None, description="Custom output filename")
     
-    @field_validator('local_path')
-    def validate_local_path(cls, v):
-        import os
-        if not os.path.exists(v):
-            raise ValueError(f'Local file not found: {v}')
-        if not os.path.isfile(v):
-            raise ValueError(f'Path is not a file: {v}')
-        return v
-    
     @field_validator('crf_value')
     def validate_crf(cls, v):
         if not 18 <= v <= 30:
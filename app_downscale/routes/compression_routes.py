@@ -1,5 +1,6 @@
 from fastapi import APIRouter, BackgroundTasks, UploadFile, File, Form, HTTPException
 from typing import Optional
+from pathlib import Path
 import uuid
 from datetime import datetime
 
@@ -10,6 +11,7 @@ from services.job_manager import JobManager
 from services.video_downscaler import VideoDownscaler
 from utils.file_utils import validate_file_extension
 from config.settings import Settings
+from vidp_common.shared_storage import resolve_shared_path
 
 router = APIRouter(prefix="/api/compress", tags=["compression"])
 
@@ -131,13 +133,8 @@ async def process_local_video(
     """Process local video compression and return result"""
     input_path = None
     try:
-        job_manager.update_job(
-            job_id,
-            JobStatus.PROCESSING,
-            "Copying local video..."
-        )
-        
-        input_path = downscaler.copy_local_video(local_path, job_id)
+        # Videos of the shared storage are read in place (no copy)
+        input_path = downscaler.link_shared_video(local_path, job_id)
         
         job_manager.update_job(
             job_id,
@@ -326,14 +323,18 @@ async def compress_video_local(
     async_mode: bool = True
 ):
     """
-    Compress local video file
+    Compress a video of the shared storage, read in place
     
     Parameters:
     - async_mode: If True, process in background; if False, wait for completion
     """
+    local_path = str(resolve_shared_path(request.local_path, Settings.SHARED_STORAGE_ROOT))
+    if not Path(local_path).is_file():
+        raise HTTPException(status_code=400, detail=f"Local file not found: {request.local_path}")
+    
     job_id = job_manager.create_job(
         source_type=VideoSourceType.LOCAL,
-        local_path=request.local_path,
+        local_path=local_path,
         resolution=request.resolution.value,
         crf_value=request.crf_value,
         async_mode=async_mode
@@ -344,7 +345,7 @@ async def compress_video_local(
         background_tasks.add_task(
             process_local_video,
             job_id,
-            request.local_path,
+            local_path,
             request.resolution.value,
             request.crf_value,
             request.custom_filename
@@ -365,7 +366,7 @@ async def compress_video_local(
                 VideoSourceType.LOCAL,
                 process_local_video_sync,
                 job_id,
-                request.local_path,
+                local_path,
                 request.resolution.value,
                 request.crf_value,
                 request.custom_filename
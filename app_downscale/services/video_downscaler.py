@@ -11,6 +11,9 @@ from moviepy import VideoFileClip
 
 from fastapi import UploadFile, HTTPException
 from config.settings import Settings
+from opentelemetry import trace
+
+from vidp_common.tracing import traced, tracer
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +23,7 @@ class VideoDownscaler:
     def __init__(self):
         self.settings = Settings
     
+    @traced("download_video")
     async def download_video(self, video_url: str, job_id: str) -> Path:
         """Download video from URL to temporary file"""
         temp_file = None
@@ -53,6 +57,7 @@ class VideoDownscaler:
                 Path(temp_file.name).unlink()
             raise HTTPException(status_code=500, detail=f"Download error: {str(e)}")
     
+    @traced("copy_local_video")
     def copy_local_video(self, local_path: str, job_id: str) -> Path:
         """Copy local video to temporary file"""
         temp_file = None
@@ -75,6 +80,20 @@ class VideoDownscaler:
                 Path(temp_file.name).unlink()
             raise HTTPException(status_code=400, detail=f"Failed to copy local video: {str(e)}")
     
+    def link_shared_video(self, local_path: str, job_id: str) -> Path:
+        """Reference a video of the shared storage without copying it"""
+        try:
+            link_path = self.settings.DOWNLOADS_DIR / f"{job_id}{Path(local_path).suffix or '.mp4'}"
+            link_path.symlink_to(Path(local_path).resolve())
+            
+            logger.info(f"Shared video linked (no copy): {local_path}")
+            return link_path
+            
+        except Exception as e:
+            logger.error(f"Failed to link shared video: {str(e)}")
+            raise HTTPException(status_code=400, detail=f"Failed to link shared video: {str(e)}")
+    
+    @traced("save_uploaded_video")
     async def save_uploaded_video(self, file: UploadFile, job_id: str) -> Path:
         """Save uploaded video to temporary file"""
         temp_file = None
@@ -117,6 +136,7 @@ class VideoDownscaler:
         compressed_size = compressed_path.stat().st_size
         return compressed_size / original_size if original_size > 0 else 0
     
+    @traced("compress_video")
     def compress_video(
         self,
         input_path: Path,
@@ -149,8 +169,9 @@ class VideoDownscaler:
         resized_clip = None
         
         try:
-            # Load video
-            clip = VideoFileClip(str(input_path))
+            # Load video (ffmpeg probe)
+            with tracer.start_as_current_span("load_video"):
+                clip = VideoFileClip(str(input_path))
             
             # Get original metadata
             original_metadata = self.get_video_metadata(clip)
@@ -183,18 +204,24 @@ class VideoDownscaler:
             logger.info(f"Compressing {input_path.name} -> {resolution} (CRF={crf_value})")
             
             # Encode with or without audio
-            if clip.audio is not None:
-                write_kwargs.update({
-                    "audio_codec": self.settings.AUDIO_CODEC,
-                    "audio_bitrate": self.settings.AUDIO_BITRATE
-                })
-                resized_clip.write_videofile(str(output_path), **write_kwargs)
-            else:
-                resized_clip.write_videofile(str(output_path), audio=False, **write_kwargs)
+            with tracer.start_as_current_span(
+                "encode", attributes={"resolution": resolution, "crf": crf_value, "codec": self.settings.VIDEO_CODEC}
+            ):
+                if clip.audio is not None:
+                    write_kwargs.update({
+                        "audio_codec": self.settings.AUDIO_CODEC,
+                        "audio_bitrate": self.settings.AUDIO_BITRATE
+                    })
+                    resized_clip.write_videofile(str(output_path), **write_kwargs)
+                else:
+                    resized_clip.write_videofile(str(output_path), audio=False, **write_kwargs)
             
             # Calculate final metrics
             processing_time = time.time() - start_time
             compression_ratio = self.calculate_compression_ratio(input_path, output_path)
+            span = trace.get_current_span()
+            span.set_attribute("video.duration_seconds", original_metadata["duration"])
+            span.set_attribute("compression_ratio", round(compression_ratio, 3))
             
             processing_info.update({
                 "output_file": str(output_path),
@@ -231,7 +258,8 @@ class VideoDownscaler:
     def cleanup_temp_file(self, file_path: Path) -> None:
         """Delete temporary input file after processing"""
         try:
-            if file_path and file_path.exists():
+            # A shared video is only linked: unlinking removes the link, not the video
+            if file_path and (file_path.exists() or file_path.is_symlink()):
                 file_path.unlink()
                 logger.info(f"Temporary file cleaned up: {file_path}")
         except Exception as e:
@@ -18,6 +18,7 @@ from models.enums import DetectionStatus
 from services.background_worker import detector, process_detection_job, process_local_detection_job, process_uploaded_detection_job
 from utils.constants import SUPPORTED_LANGUAGES
 from utils.file_utils import validate_file_extension
+from vidp_common.shared_storage import resolve_shared_path
 from config.settings import Settings
 
 router = APIRouter()
@@ -185,8 +186,13 @@ async def detect_local_video_language(
     background_tasks: BackgroundTasks,
     async_mode: bool = False
 ):
-    """Detect language from local video file"""
-    video_path = Path(request.video_path)
+    """
+    Detect language from local video file
+    
+    video_path points into the storage volume shared with the main app
+    (SHARED_STORAGE_ROOT): the video is read in place, without upload.
+    """
+    video_path = resolve_shared_path(request.video_path, Settings.SHARED_STORAGE_ROOT)
     if not video_path.exists():
         raise HTTPException(status_code=400, detail="Video file not found")
 
@@ -1,5 +1,6 @@
 # app_langscale/config/settings.py
 
+import os
 from pathlib import Path
 
 class Settings:
@@ -17,6 +18,21 @@ class Settings:
     VIDEOS_DIR = BASE_DIR / "videos"  # Temporary videos (auto-cleaned)
     AUDIO_DIR = BASE_DIR / "audio"    # Temporary audio (auto-cleaned)
     
+    # Storage shared with the main app (ReadWriteMany volume): relative video
+    # paths sent to /detect/local are resolved against this directory
+    SHARED_STORAGE_ROOT = Path(os.getenv("SHARED_STORAGE_ROOT", "/shared"))
+    
+    # How long (seconds) a successful processing response is kept for replay to
+    # retries carrying the same Idempotency-Key header
+    IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "3600"))
+    
+    # Distributed tracing (OpenTelemetry): span exporter ("none", "file" or "otlp"),
+    # JSON lines file and OTLP/HTTP traces endpoint (e.g. an OpenTelemetry Collector)
+    TRACING_SERVICE_NAME = os.getenv("TRACING_SERVICE_NAME", "langscale")
+    TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none")
+    TRACING_FILE = os.getenv("TRACING_FILE", "traces/spans.jsonl")
+    TRACING_OTLP_ENDPOINT = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+    
     # Detection settings
     DEFAULT_DURATION = 30  # seconds
     DEFAULT_TEST_ALL_LANGUAGES = True
@@ -7,6 +7,8 @@ from contextlib import asynccontextmanager
 from config.logging_config import setup_logging
 from api.router import api_router
 from config.settings import Settings
+from vidp_common.idempotency import IdempotencyMiddleware
+from vidp_common.tracing import setup_tracing
 import sys
 
 # Ensure UTF-8 encoding (Windows-safe)
@@ -66,6 +68,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Replay of retried detection requests (Idempotency-Key header)
+app.add_middleware(IdempotencyMiddleware, ttl_seconds=Settings.IDEMPOTENCY_TTL_SECONDS)
+
+# Server span per request, continuing the main app's trace (traceparent header)
+setup_tracing(
+    app,
+    Settings.TRACING_SERVICE_NAME,
+    Settings.TRACING_EXPORTER,
+    Settings.TRACING_FILE,
+    Settings.TRACING_OTLP_ENDPOINT
+)
+
 # Include API routes
 app.include_router(api_router, prefix="/api")
 
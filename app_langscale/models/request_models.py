@@ -19,6 +19,6 @@ class LocalVideoDetectionRequest(BaseModel):
     """
     Request model for local video detection
     """
-    video_path: str = Field(..., description="Chemin local vers la vidéo")
+    video_path: str = Field(..., description="Chemin de la vidéo dans le stockage partagé (relatif, ou absolu dans ce dossier)")
     duration: int = Field(default=30, ge=5, le=120)
     test_all_languages: bool = Field(default=True)
\ No newline at end of file
@@ -6,6 +6,7 @@ import speech_recognition as sr
 from pathlib import Path
 from datetime import datetime
 from utils.constants import SUPPORTED_LANGUAGES
+from vidp_common.tracing import traced, tracer
 import logging
 import json
 import tempfile
@@ -40,6 +41,7 @@ class VideoLanguageDetector:
         # Speech recognizer
         self.recognizer = sr.Recognizer()
     
+    @traced("download_video")
     async def download_video(self, video_url: str, job_id: str) -> Path:
         """
         Download video from URL to temporary file
@@ -93,6 +95,7 @@ class VideoLanguageDetector:
                     Path(temp_file.name).unlink()
             raise HTTPException(status_code=500, detail=f"Download error: {str(e)}")
     
+    @traced("ffmpeg.extract_audio")
     def extract_audio(self, video_path: Path, audio_path: Path) -> bool:
         """
         Extract audio from video using FFmpeg
@@ -138,6 +141,7 @@ class VideoLanguageDetector:
             logger.error(f"Error extracting audio: {str(e)}")
             return False
     
+    @traced("detect_language")
     def detect_language_from_audio(
         self,
         audio_path: Path,
@@ -197,7 +201,8 @@ class VideoLanguageDetector:
                 else:
                     # Try automatic detection
                     try:
-                        transcript = self.recognizer.recognize_google(audio_data)
+                        with tracer.start_as_current_span("google_stt", attributes={"language": "auto"}):
+                            transcript = self.recognizer.recognize_google(audio_data)
                         if transcript and len(transcript.strip()) > 5:
                             results.update({
                                 "detected": True,
@@ -246,10 +251,11 @@ class VideoLanguageDetector:
         }
         
         try:
-            transcript = self.recognizer.recognize_google(
-                audio_data,
-                language=language_code
-            )
+            with tracer.start_as_current_span("google_stt", attributes={"language": language_code}):
+                transcript = self.recognizer.recognize_google(
+                    audio_data,
+                    language=language_code
+                )
             
             # Check if we got meaningful text
             if transcript and len(transcript.strip()) > 5:
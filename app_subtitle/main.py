@@ -22,6 +22,8 @@ from utils.logging_config import logger
 from routes.subtitle_routes import router as subtitle_router
 from routes.health_routes import router as health_router
 from services.video_processor import VideoProcessor
+from vidp_common.idempotency import IdempotencyMiddleware
+from vidp_common.tracing import setup_tracing
 import sys
 
 # Ensure UTF-8 encoding (Windows-safe)
@@ -71,6 +73,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Replay of retried subtitle requests (Idempotency-Key header)
+app.add_middleware(IdempotencyMiddleware, ttl_seconds=Settings.IDEMPOTENCY_TTL_SECONDS)
+
+# Server span per request, continuing the main app's trace (traceparent header)
+setup_tracing(
+    app,
+    Settings.TRACING_SERVICE_NAME,
+    Settings.TRACING_EXPORTER,
+    Settings.TRACING_FILE,
+    Settings.TRACING_OTLP_ENDPOINT
+)
+
 # Include routers
 app.include_router(subtitle_router)
 app.include_router(health_router)
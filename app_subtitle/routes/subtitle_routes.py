@@ -11,6 +11,7 @@ from utils.logging_config import logger
 from config.settings import Settings
 from services.video_processor import VideoProcessor
 from utils.file_utils import validate_file_extension, save_uploaded_file, cleanup_file
+from vidp_common.shared_storage import resolve_shared_path
 from utils.language_utils import normalize_language_code
 
 router = APIRouter(prefix="/api", tags=["subtitle"])
@@ -50,13 +51,77 @@ async def generate_subtitles(
     video_filename = f"{timestamp}_{unique_id}_{Path(video.filename).name}"
     video_path = Settings.TEMP_DIR / video_filename
     
+    try:
+        save_uploaded_file(video, video_path)
+        logger.info(f"Video uploaded: {video_path}")
+    except Exception as e:
+        cleanup_file(video_path)
+        logger.error(f"Upload failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return process_subtitle_request(
+        request, background_tasks, video_path, video.filename, unique_id,
+        model_name, language, output_format
+    )
+
+
+@router.post("/generate-subtitles/local")
+async def generate_subtitles_local(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    video_path: str = Form(..., description="Video path in the shared storage (relative, or absolute inside it)"),
+    model_name: str = Form(Settings.DEFAULT_MODEL),
+    language: Optional[str] = Form(None),
+    output_format: str = Form("json", description="Format: 'video' (burned) or 'json' (text only)")
+):
+    """
+    Generate subtitles for a video already on disk (no upload).
+    
+    The path points into the storage volume shared with the main app
+    (SHARED_STORAGE_ROOT); paths outside it are rejected. The video is read in place through a link in the
+    temp directory, which is cleaned up like an uploaded file.
+    """
+    try:
+        language = normalize_language_code(language)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    source_path = resolve_shared_path(video_path, Settings.SHARED_STORAGE_ROOT)
+    if not source_path.is_file():
+        raise HTTPException(status_code=404, detail="Video file not found")
+    if not validate_file_extension(source_path.name, Settings.ALLOWED_EXTENSIONS):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported file format. Allowed: {', '.join(sorted(Settings.ALLOWED_EXTENSIONS))}"
+        )
+    
+    unique_id = str(uuid.uuid4())[:8]
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    link_path = Settings.TEMP_DIR / f"{timestamp}_{unique_id}_{source_path.name}"
+    link_path.symlink_to(source_path)
+    logger.info(f"Shared video linked (no upload): {source_path}")
+    
+    return process_subtitle_request(
+        request, background_tasks, link_path, source_path.name, unique_id,
+        model_name, language, output_format
+    )
+
+
+def process_subtitle_request(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    video_path: Path,
+    original_filename: str,
+    unique_id: str,
+    model_name: str,
+    language: Optional[str],
+    output_format: str
+):
+    """Run subtitle generation on a temp video file and build the response."""
     # Ensure Output Directory exists
     os.makedirs(Settings.OUTPUT_DIR, exist_ok=True)
     
     try:
-        save_uploaded_file(video, video_path)
-        logger.info(f"Video uploaded: {video_path}")
-        
         # 3. Determine if we need to burn subtitles
         should_burn = (output_format == "video")
         
@@ -90,7 +155,7 @@ async def generate_subtitles(
             
             return JSONResponse(content={
                 "status": "success",
-                "filename": video.filename,
+                "filename": original_filename,
                 "srt_url": download_url,  # <--- Aggregator uses this URL
                 "full_text": full_text
             })
@@ -105,7 +170,7 @@ async def generate_subtitles(
             return FileResponse(
                 path=output_path,
                 media_type="video/mp4",
-                filename=f"subtitled_{Path(video.filename).name}",
+                filename=f"subtitled_{Path(original_filename).name}",
                 headers={"X-Subtitle-File": srt_path.name}
             )
             
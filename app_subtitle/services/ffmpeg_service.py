@@ -6,12 +6,15 @@ from pathlib import Path
 from typing import Optional
 import subprocess
 
+from vidp_common.tracing import traced
+
 logger = logging.getLogger(__name__)
 
 class FFmpegService:
     """Service for video and audio processing using FFmpeg."""
     
     @staticmethod
+    @traced("ffmpeg.extract_audio")
     def extract_audio(video_path: Path) -> Path:
         """
         Extract audio track from video file.
@@ -53,6 +56,7 @@ class FFmpegService:
             raise ValueError("Failed to extract audio from video")
     
     @staticmethod
+    @traced("ffmpeg.embed_subtitles")
     def embed_subtitles(video_path: Path, srt_path: Path, output_dir: Path) -> Path:
         """
         Embed subtitles into video while preserving audio synchronization.
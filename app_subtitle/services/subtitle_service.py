@@ -7,6 +7,7 @@ from typing import Optional, Dict, Any
 from config.settings import Settings
 from utils.timestamp_utils import format_srt_timestamp
 from utils.language_utils import normalize_language_code
+from vidp_common.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
@@ -24,7 +25,8 @@ class SubtitleService:
         
         if self.current_model_name != model_name:
             logger.info(f"Loading Whisper model: {model_name}")
-            self.models[model_name] = whisper.load_model(model_name)
+            with tracer.start_as_current_span("whisper.load_model", attributes={"model": model_name}):
+                self.models[model_name] = whisper.load_model(model_name)
             self.current_model_name = model_name
             logger.info(f"Whisper model '{model_name}' loaded successfully")
     
@@ -72,7 +74,11 @@ class SubtitleService:
                 logger.info("Using automatic language detection")
             
             # Transcribe audio
-            result = model.transcribe(str(audio_path), **transcribe_options)
+            with tracer.start_as_current_span(
+                "whisper.transcribe", attributes={"model": model_name, "language": normalized_language or "auto"}
+            ) as span:
+                result = model.transcribe(str(audio_path), **transcribe_options)
+                span.set_attribute("segments", len(result.get("segments", [])))
             
             # Get full text transcription
             full_text = result.get("text", "")
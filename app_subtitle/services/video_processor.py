@@ -8,6 +8,7 @@ from config.settings import Settings
 from services.subtitle_service import SubtitleService
 from services.ffmpeg_service import FFmpegService
 from utils.file_utils import cleanup_file, get_file_size_mb
+from vidp_common.tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +35,7 @@ class VideoProcessor:
                 if file_path and file_path.exists():
                     cleanup_file(file_path)
     
+    @traced("process_video")
     def process_video(
         self,
         video_path: Path,
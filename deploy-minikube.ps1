@@ -128,17 +128,18 @@ function Build-Images {
 
   Use-MinikubeDocker
 
+  # Les microservices sont construits depuis la racine du dépôt (code partagé vidp_common)
   Write-Info "Construction de vidp/langscale..."
-  & docker build -t "vidp/langscale:latest" (Join-Path $PROJECT_DIR "app_langscale") | Out-Host
+  & docker build -t "vidp/langscale:latest" -f (Join-Path $PROJECT_DIR "app_langscale/Dockerfile") $PROJECT_DIR | Out-Host
 
   Write-Info "Construction de vidp/downscale..."
-  & docker build -t "vidp/downscale:latest" (Join-Path $PROJECT_DIR "app_downscale") | Out-Host
+  & docker build -t "vidp/downscale:latest" -f (Join-Path $PROJECT_DIR "app_downscale/Dockerfile") $PROJECT_DIR | Out-Host
 
   Write-Info "Construction de vidp/subtitle..."
-  & docker build -t "vidp/subtitle:latest" (Join-Path $PROJECT_DIR "app_subtitle") | Out-Host
+  & docker build -t "vidp/subtitle:latest" -f (Join-Path $PROJECT_DIR "app_subtitle/Dockerfile") $PROJECT_DIR | Out-Host
 
   Write-Info "Construction de vidp/animal-detect..."
-  & docker build -t "vidp/animal-detect:latest" (Join-Path $PROJECT_DIR "app_animal_detect") | Out-Host
+  & docker build -t "vidp/animal-detect:latest" -f (Join-Path $PROJECT_DIR "app_animal_detect/Dockerfile") $PROJECT_DIR | Out-Host
 
   Write-Info "Construction de vidp/main-app..."
   & docker build -t "vidp/main-app:latest" (Join-Path $PROJECT_DIR "vidp-main-app/vidp-fastapi-service") | Out-Host
@@ -301,10 +302,10 @@ function Rebuild-Service([string]$svc) {
   Use-MinikubeDocker
 
   switch ($svc) {
-    "langscale"     { Write-Info "Rebuild de vidp/langscale...";     & docker build -t "vidp/langscale:latest"     (Join-Path $PROJECT_DIR "app_langscale") | Out-Host }
-    "downscale"     { Write-Info "Rebuild de vidp/downscale...";     & docker build -t "vidp/downscale:latest"     (Join-Path $PROJECT_DIR "app_downscale") | Out-Host }
-    "subtitle"      { Write-Info "Rebuild de vidp/subtitle...";      & docker build -t "vidp/subtitle:latest"      (Join-Path $PROJECT_DIR "app_subtitle") | Out-Host }
-    "animal-detect" { Write-Info "Rebuild de vidp/animal-detect..."; & docker build -t "vidp/animal-detect:latest" (Join-Path $PROJECT_DIR "app_animal_detect") | Out-Host }
+    "langscale"     { Write-Info "Rebuild de vidp/langscale...";     & docker build -t "vidp/langscale:latest"     -f (Join-Path $PROJECT_DIR "app_langscale/Dockerfile") $PROJECT_DIR | Out-Host }
+    "downscale"     { Write-Info "Rebuild de vidp/downscale...";     & docker build -t "vidp/downscale:latest"     -f (Join-Path $PROJECT_DIR "app_downscale/Dockerfile") $PROJECT_DIR | Out-Host }
+    "subtitle"      { Write-Info "Rebuild de vidp/subtitle...";      & docker build -t "vidp/subtitle:latest"      -f (Join-Path $PROJECT_DIR "app_subtitle/Dockerfile") $PROJECT_DIR | Out-Host }
+    "animal-detect" { Write-Info "Rebuild de vidp/animal-detect..."; & docker build -t "vidp/animal-detect:latest" -f (Join-Path $PROJECT_DIR "app_animal_detect/Dockerfile") $PROJECT_DIR | Out-Host }
     "main-app"      { Write-Info "Rebuild de vidp/main-app...";      & docker build -t "vidp/main-app:latest"      (Join-Path $PROJECT_DIR "vidp-main-app/vidp-fastapi-service") | Out-Host }
     "frontend"      { Write-Info "Rebuild de vidp/frontend...";      & docker build -t "vidp/frontend:latest"      (Join-Path $PROJECT_DIR "vidp-main-app/vidp-nextjs-web") | Out-Host }
     default         { Write-Err "Service inconnu: $svc"; return }
@@ -107,21 +107,22 @@ build_images() {
     print_info "Configuration de Docker pour Minikube..."
     eval $(minikube docker-env)
     
+    # Les microservices sont construits depuis la racine du dépôt (code partagé vidp_common)
     # Build app_langscale
     print_info "Construction de vidp/langscale..."
-    docker build -t vidp/langscale:latest "${PROJECT_DIR}/app_langscale"
+    docker build -t vidp/langscale:latest -f "${PROJECT_DIR}/app_langscale/Dockerfile" "${PROJECT_DIR}"
     
     # Build app_downscale
     print_info "Construction de vidp/downscale..."
-    docker build -t vidp/downscale:latest "${PROJECT_DIR}/app_downscale"
+    docker build -t vidp/downscale:latest -f "${PROJECT_DIR}/app_downscale/Dockerfile" "${PROJECT_DIR}"
     
     # Build app_subtitle
     print_info "Construction de vidp/subtitle..."
-    docker build -t vidp/subtitle:latest "${PROJECT_DIR}/app_subtitle"
+    docker build -t vidp/subtitle:latest -f "${PROJECT_DIR}/app_subtitle/Dockerfile" "${PROJECT_DIR}"
     
     # Build app_animal_detect
     print_info "Construction de vidp/animal-detect..."
-    docker build -t vidp/animal-detect:latest "${PROJECT_DIR}/app_animal_detect"
+    docker build -t vidp/animal-detect:latest -f "${PROJECT_DIR}/app_animal_detect/Dockerfile" "${PROJECT_DIR}"
     
     # Build main-app
     print_info "Construction de vidp/main-app..."
@@ -319,19 +320,19 @@ rebuild_service() {
     case "$service" in
         langscale)
             print_info "Rebuild de vidp/langscale..."
-            docker build -t vidp/langscale:latest "${PROJECT_DIR}/app_langscale"
+            docker build -t vidp/langscale:latest -f "${PROJECT_DIR}/app_langscale/Dockerfile" "${PROJECT_DIR}"
             ;;
         downscale)
             print_info "Rebuild de vidp/downscale..."
-            docker build -t vidp/downscale:latest "${PROJECT_DIR}/app_downscale"
+            docker build -t vidp/downscale:latest -f "${PROJECT_DIR}/app_downscale/Dockerfile" "${PROJECT_DIR}"
             ;;
         subtitle)
             print_info "Rebuild de vidp/subtitle..."
-            docker build -t vidp/subtitle:latest "${PROJECT_DIR}/app_subtitle"
+            docker build -t vidp/subtitle:latest -f "${PROJECT_DIR}/app_subtitle/Dockerfile" "${PROJECT_DIR}"
             ;;
         animal-detect)
             print_info "Rebuild de vidp/animal-detect..."
-            docker build -t vidp/animal-detect:latest "${PROJECT_DIR}/app_animal_detect"
+            docker build -t vidp/animal-detect:latest -f "${PROJECT_DIR}/app_animal_detect/Dockerfile" "${PROJECT_DIR}"
             ;;
         main-app)
             print_info "Rebuild de vidp/main-app..."
@@ -1,11 +1,16 @@
 """
 Endpoints pour l'orchestration des traitements vidéo (détection de langue, compression, sous-titres, détection d'animaux).
 """
+import asyncio
+import json
+import time
 import uuid
 from datetime import datetime
-from typing import Optional
-from fastapi import APIRouter, HTTPException, status, BackgroundTasks, UploadFile, File, Form
-from fastapi.responses import JSONResponse
+from typing import Awaitable, Callable, Dict, List, Optional
+from fastapi import APIRouter, HTTPException, status, BackgroundTasks, UploadFile, File, Form, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from opentelemetry.trace import Status, StatusCode
 from pathlib import Path
 import shutil
 
@@ -24,6 +29,7 @@ from app.models.video_model import (
     VideoStatus,
     ProcessingStage,
     ProcessingStageResult,
+    ProcessingPriority,
     GlobalProcessingRequest,
     GlobalProcessingResult
 )
@@ -32,14 +38,29 @@ from app.services.downscale_client import compression_client
 from app.services.subtitle_client import subtitle_client
 from app.services.animal_detection_client import animal_detection_client
 from app.services.aggregation_client import aggregation_client
+from app.services.pipeline_executor import PipelineStage, StageGraphExecutor
+from app.services.pipeline_worker import pipeline_worker_pool
+from app.services.batch_scheduler import BatchItem, batch_scheduler
+from app.services.priority import processing_priority
+from app.services.metrics import observe_stage
+from app.services.tracing import tracer
+from app.services.stage_result_cache import stage_result_cache
+from app.services.service_health import service_health_monitor
+from app.services.global_result_cache import global_result_cache, compute_etag
+from app.services.pipeline_events import PipelineEvent, pipeline_event_bus
+from app.services.shared_storage import transfer_stats
+from app.services.http_client_pool import get_concurrency_stats
 from app.db.mongodb_connector import mongodb_connector
 from app.core.config import settings
 from app.utils.language_utils import normalize_language_code
-from app.utils.video_utils import check_video_has_audio, create_empty_srt_content
+from app.utils.video_utils import get_media_info, remember_media_info, create_empty_srt_content
 
 # Création du router pour les endpoints de traitement
 router = APIRouter(prefix="/processing", tags=["processing"])
 
+# Intervalle (s) des commentaires keep-alive envoyés sur les flux SSE inactifs
+SSE_HEARTBEAT_SECONDS = 15.0
+
 
 @router.post(
     "/language-detection",
@@ -51,7 +72,8 @@ router = APIRouter(prefix="/processing", tags=["processing"])
 async def start_language_detection_with_upload(
     video_file: UploadFile = File(...),
     async_processing: str = Form("false"),
-    duration: int = Form(30)
+    duration: int = Form(30),
+    priority: ProcessingPriority = Form(ProcessingPriority.NORMAL)
 ):
     """
     Lance la détection de langue avec upload direct du fichier vidéo.
@@ -60,6 +82,7 @@ async def start_language_detection_with_upload(
         video_file: Fichier vidéo à analyser
         async_processing: Mode de traitement ("true" ou "false")
         duration: Durée d'extraction audio en secondes
+        priority: Classe de priorité du traitement (high, normal, low)
         
     Returns:
         ProcessingJobResponse: Informations sur le job lancé
@@ -78,7 +101,7 @@ async def start_language_detection_with_upload(
             shutil.copyfileobj(video_file.file, buffer)
         
         # Vérifier que le service est accessible
-        service_healthy = await language_detection_client.check_service_health()
+        service_healthy = service_health_monitor.is_available("language_detection")
         if not service_healthy:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -86,11 +109,12 @@ async def start_language_detection_with_upload(
             )
         
         # Lancer la détection
-        result = await language_detection_client.detect_language_from_local_file(
-            video_path=str(temp_file_path),
-            duration=duration,
-            test_all_languages=True
-        )
+        with processing_priority(priority):
+            result = await language_detection_client.detect_language_from_local_file(
+                video_path=str(temp_file_path),
+                duration=duration,
+                test_all_languages=True
+            )
         
         # Nettoyer le fichier temporaire
         try:
@@ -165,7 +189,8 @@ async def start_language_detection_with_upload(
 async def start_compression_with_upload(
     video_file: UploadFile = File(...),
     target_resolution: str = Form("720p"),
-    crf: int = Form(23)
+    crf: int = Form(23),
+    priority: ProcessingPriority = Form(ProcessingPriority.NORMAL)
 ):
     """
     Lance la compression vidéo avec upload direct.
@@ -183,7 +208,7 @@ async def start_compression_with_upload(
             shutil.copyfileobj(video_file.file, buffer)
         
         # Vérifier le service
-        service_healthy = await compression_client.check_service_health()
+        service_healthy = service_health_monitor.is_available("compression")
         if not service_healthy:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -191,11 +216,12 @@ async def start_compression_with_upload(
             )
         
         # Lancer la compression
-        result = await compression_client.compress_video(
-            video_path=str(temp_file_path),
-            resolution=target_resolution,
-            crf_value=crf
-        )
+        with processing_priority(priority):
+            result = await compression_client.compress_video(
+                video_path=str(temp_file_path),
+                resolution=target_resolution,
+                crf_value=crf
+            )
         
         # Nettoyer
         try:
@@ -264,7 +290,8 @@ async def start_compression_with_upload(
 async def start_subtitle_generation_with_upload(
     video_file: UploadFile = File(...),
     model_size: str = Form("tiny"),
-    language: str = Form("auto")
+    language: str = Form("auto"),
+    priority: ProcessingPriority = Form(ProcessingPriority.NORMAL)
 ):
     """
     Lance la génération de sous-titres avec upload direct.
@@ -291,7 +318,7 @@ async def start_subtitle_generation_with_upload(
             shutil.copyfileobj(video_file.file, buffer)
         
         # Vérifier le service
-        service_healthy = await subtitle_client.check_service_health()
+        service_healthy = service_health_monitor.is_available("subtitle_generation")
         if not service_healthy:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -299,11 +326,12 @@ async def start_subtitle_generation_with_upload(
             )
         
         # Lancer la génération
-        result = await subtitle_client.generate_subtitles(
-            video_path=str(temp_file_path),
-            model_name=model_size,
-            language=normalized_language  # Utiliser la langue normalisée
-        )
+        with processing_priority(priority):
+            result = await subtitle_client.generate_subtitles(
+                video_path=str(temp_file_path),
+                model_name=model_size,
+                language=normalized_language  # Utiliser la langue normalisée
+            )
         
         # Nettoyer
         try:
@@ -379,7 +407,7 @@ async def start_language_detection(request: LanguageDetectionRequest):
     Lance la détection de langue pour une vidéo.
     
     Args:
-        request: Requête contenant video_id et paramètres de détection
+        request: Requête contenant video_id, paramètres de détection et priorité
         
     Returns:
         ProcessingJobResponse: Informations sur le job lancé
@@ -404,7 +432,7 @@ async def start_language_detection(request: LanguageDetectionRequest):
             )
         
         # Vérifier que le service de détection est accessible
-        service_healthy = await language_detection_client.check_service_health()
+        service_healthy = service_health_monitor.is_available("language_detection")
         if not service_healthy:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -412,11 +440,12 @@ async def start_language_detection(request: LanguageDetectionRequest):
             )
         
         # Lancer la détection de langue (mode synchrone)
-        result = await language_detection_client.detect_language_from_local_file(
-            video_path=video_metadata.file_path,
-            duration=request.duration,
-            test_all_languages=request.test_all_languages
-        )
+        with processing_priority(request.priority):
+            result = await language_detection_client.detect_language_from_local_file(
+                video_path=video_metadata.file_path,
+                duration=request.duration,
+                test_all_languages=request.test_all_languages
+            )
         
         # Vérifier le résultat
         if result.get("status") == "failed":
@@ -548,7 +577,7 @@ async def get_supported_languages():
     """
     try:
         # Vérifier que le service est accessible
-        service_healthy = await language_detection_client.check_service_health()
+        service_healthy = service_health_monitor.is_available("language_detection")
         if not service_healthy:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -584,36 +613,85 @@ async def processing_services_health():
     """
     Vérifie l'état de santé des services de traitement.
     
+    L'état est celui maintenu en mémoire par le moniteur de santé (sondes
+    périodiques en arrière-plan et disjoncteurs), sans appel réseau.
+    
     Returns:
         Dict: État de santé des services
     """
-    langscale_healthy = await language_detection_client.check_service_health()
-    compression_healthy = await compression_client.check_service_health()
-    subtitle_healthy = await subtitle_client.check_service_health()
-    animal_detection_healthy = await animal_detection_client.check_service_health()
-    
-    all_healthy = langscale_healthy and compression_healthy and subtitle_healthy and animal_detection_healthy
+    services = service_health_monitor.get_status()
+    all_healthy = all(service["status"] != "down" for service in services.values())
     
     return {
         "status": "healthy" if all_healthy else "degraded",
-        "services": {
-            "language_detection": {
-                "url": settings.langscale_service_url,
-                "status": "up" if langscale_healthy else "down"
-            },
-            "compression": {
-                "url": settings.downscale_service_url,
-                "status": "up" if compression_healthy else "down"
-            },
-            "subtitle_generation": {
-                "url": settings.subtitle_service_url,
-                "status": "up" if subtitle_healthy else "down"
-            },
-            "animal_detection": {
-                "url": settings.animal_detection_service_url,
-                "status": "up" if animal_detection_healthy else "down"
-            }
-        }
+        "services": services
+    }
+
+
+@router.get(
+    "/concurrency",
+    summary="Occupation des microservices",
+    description="Traitements en cours, file d'attente et temps d'attente du limiteur de concurrence de chaque microservice."
+)
+async def get_service_concurrency():
+    """
+    Retourne l'état des limiteurs de concurrence des microservices.
+    
+    Returns:
+        Dict: Par service, traitements en cours, profondeur de file, refus (429) et temps d'attente
+    """
+    return get_concurrency_stats()
+
+
+@router.get(
+    "/cache/stats",
+    summary="Statistiques du cache des résultats d'étapes",
+    description="Compteurs de hits/misses du cache des résultats d'étapes (par étape)."
+)
+async def get_stage_cache_stats():
+    """
+    Retourne les statistiques du cache des résultats d'étapes.
+    
+    Returns:
+        Dict: Compteurs de hits/misses et configuration du cache
+    """
+    return stage_result_cache.get_stats()
+
+
+@router.delete(
+    "/cache",
+    summary="Invalider le cache des résultats d'étapes",
+    description="Supprime les résultats d'étapes en cache (tous, ou filtrés par contenu et/ou étape)."
+)
+async def invalidate_stage_cache(
+    content_hash: Optional[str] = None,
+    stage: Optional[ProcessingStage] = None
+):
+    """
+    Invalide des entrées du cache des résultats d'étapes.
+    
+    Args:
+        content_hash: Empreinte SHA-256 d'une vidéo (optionnel)
+        stage: Étape à invalider (optionnel)
+        
+    Returns:
+        Dict: Nombre d'entrées supprimées
+    """
+    if not mongodb_connector.client:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="MongoDB n'est pas disponible"
+        )
+    
+    deleted = await stage_result_cache.invalidate(
+        content_hash=content_hash,
+        stage=stage.value if stage else None
+    )
+    return {
+        "message": f"{deleted} résultat(s) supprimé(s) du cache",
+        "deleted": deleted,
+        "content_hash": content_hash,
+        "stage": stage.value if stage else None
     }
 
 
@@ -650,7 +728,7 @@ async def start_compression(request: CompressionRequest):
             )
         
         # Vérifier que le service est accessible
-        service_healthy = await compression_client.check_service_health()
+        service_healthy = service_health_monitor.is_available("compression")
         if not service_healthy:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -658,12 +736,13 @@ async def start_compression(request: CompressionRequest):
             )
         
         # Lancer la compression
-        result = await compression_client.compress_video(
-            video_path=video_metadata.file_path,
-            resolution=request.resolution,
-            crf_value=request.crf_value,
-            custom_filename=request.custom_filename
-        )
+        with processing_priority(request.priority):
+            result = await compression_client.compress_video(
+                video_path=video_metadata.file_path,
+                resolution=request.resolution,
+                crf_value=request.crf_value,
+                custom_filename=request.custom_filename
+            )
         
         # Vérifier le résultat
         if result.get("status") == "failed":
@@ -806,7 +885,7 @@ async def start_subtitle_generation(request: SubtitleRequest):
             )
         
         # Vérifier que le service est accessible
-        service_healthy = await subtitle_client.check_service_health()
+        service_healthy = service_health_monitor.is_available("subtitle_generation")
         if not service_healthy:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -814,11 +893,12 @@ async def start_subtitle_generation(request: SubtitleRequest):
             )
         
         # Lancer la génération de sous-titres
-        result = await subtitle_client.generate_subtitles(
-            video_path=video_metadata.file_path,
-            model_name=request.model_name,
-            language=normalized_language  # Utiliser la langue normalisée
-        )
+        with processing_priority(request.priority):
+            result = await subtitle_client.generate_subtitles(
+                video_path=video_metadata.file_path,
+                model_name=request.model_name,
+                language=normalized_language  # Utiliser la langue normalisée
+            )
         
         # Vérifier le résultat
         if result.get("status") == "failed":
@@ -923,127 +1003,273 @@ async def get_subtitle_result(video_id: str):
 
 
 # ============================================================
-# ENDPOINT DE TRAITEMENT GLOBAL
+# PIPELINE DE TRAITEMENT GLOBAL
 # ============================================================
 
-@router.post(
-    "/process-video",
-    response_model=GlobalProcessingResult,
-    status_code=status.HTTP_201_CREATED,
-    summary="Traitement global d'une vidéo",
-    description="Lance le traitement complet OBLIGATOIRE d'une vidéo : détection de langue, compression, génération de sous-titres et détection d'animaux. Si une étape échoue, le pipeline s'arrête."
-)
-async def process_video_global(
-    video_file: UploadFile = File(...),
-    language_detection_duration: int = Form(30),
-    target_resolution: str = Form("720p"),
-    crf: int = Form(23),
-    subtitle_model: str = Form("tiny"),
-    subtitle_language: str = Form("auto"),
-    animal_confidence_threshold: float = Form(0.5)
-):
+async def run_global_pipeline(
+    video_id: str,
+    video_path: str,
+    original_filename: str,
+    params: GlobalProcessingRequest,
+    result: GlobalProcessingResult,
+    content_hash: Optional[str] = None,
+    completed_results: Optional[Dict[str, dict]] = None
+) -> GlobalProcessingResult:
     """
-    Traitement global OBLIGATOIRE d'une vidéo uploadée.
+    Exécute le pipeline de traitement global pour une vidéo déjà stockée.
     
-    Ce endpoint orchestre les 4 étapes de traitement (TOUTES OBLIGATOIRES) :
-    1. Détection de langue
-    2. Compression vidéo
-    3. Génération de sous-titres
-    4. Détection d'animaux (YOLO)
+    Les étapes sont exécutées comme un graphe de dépendances : les étapes indépendantes
+    tournent en parallèle, puis l'agrégation combine leurs résultats.
     
-    IMPORTANT: Si une étape échoue, le pipeline s'arrête immédiatement (échec global).
+    IMPORTANT: Si une étape échoue, le pipeline s'arrête immédiatement (échec global)
+    et les étapes encore en cours sont annulées.
+    
+    Lors d'une reprise, les étapes de completed_results ne sont pas relancées : leur
+    résultat sauvegardé est réutilisé (et sert d'entrée aux étapes suivantes).
     
     Args:
-        video_file: Fichier vidéo à traiter
-        language_detection_duration: Durée d'extraction audio en secondes
-        target_resolution: Résolution cible (240p, 360p, 480p, 720p, 1080p)
-        crf: CRF pour la compression (18-28)
-        subtitle_model: Modèle Whisper (tiny, base, small, medium, large)
-        subtitle_language: Langue pour les sous-titres (auto = détection automatique)
-        animal_confidence_threshold: Seuil de confiance pour la détection d'animaux (0.1-1.0)
+        video_id: Identifiant de la vidéo
+        video_path: Chemin permanent de la vidéo à traiter
+        original_filename: Nom original du fichier uploadé
+        params: Paramètres des différentes étapes
+        result: Résultat global, mis à jour au fil de l'exécution
+        content_hash: Empreinte SHA-256 de la vidéo (clé du cache des résultats d'étapes)
+        completed_results: Résultats des étapes terminées lors d'une exécution précédente (reprise)
         
     Returns:
         GlobalProcessingResult: Résultat complet du traitement
     """
-    video_id = str(uuid.uuid4())
-    start_time = datetime.now()
+    start_time = result.started_at
+    video_path_for_processing = video_path
     
-    # Préparer la réponse
-    result = GlobalProcessingResult(
-        video_id=video_id,
-        overall_status=ProcessingStatus.PROCESSING,
-        started_at=start_time,
-        message="Traitement en cours..."
-    )
+    language_detection_duration = params.language_detection_duration
+    target_resolution = params.target_resolution
+    crf = params.crf
+    subtitle_model = params.subtitle_model
+    subtitle_language = params.subtitle_language
+    animal_confidence_threshold = params.animal_confidence_threshold
+    
+    stages_completed = []
+    stages_failed = []
+    stages_running = []
+    completed_results = completed_results or {}
     
     # ============================================================
-    # SAUVEGARDER LA VIDÉO DE MANIÈRE PERMANENTE (comme upload normal)
+    # ANALYSE DE LA VIDÉO (FFPROBE) ET DÉTECTION DE LA PISTE AUDIO
     # ============================================================
-    from app.services.file_storage import FileStorageService
+    # Un seul appel ffprobe (asynchrone, mis en cache par contenu) ; la présence
+    # d'une piste audio adapte le pipeline
+    media_info = await get_media_info(video_path_for_processing, content_hash)
+    has_audio = media_info.has_audio if media_info else False
+    print(f"🔊 Piste audio détectée: {has_audio}")
     
-    try:
-        # Utiliser le service de stockage pour sauvegarder de manière permanente
-        unique_filename, permanent_file_path, file_size = await FileStorageService.save_video_file(video_file)
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erreur lors de la sauvegarde du fichier: {str(e)}"
-        )
+    def pipeline_progress() -> float:
+        """Pourcentage d'étapes terminées."""
+        return round(100 * len(stages_completed) / len(ProcessingStage), 1)
+    
+    pipeline_event_bus.publish(video_id, "pipeline_started", {
+        "has_audio": has_audio,
+        "duration": media_info.duration if media_info else None,
+        "resumed_stages": list(completed_results)
+    })
     
     # ============================================================
-    # SAUVEGARDER LA VIDÉO EN MONGODB AVEC STATUT "PROCESSING"
+    # REPRISE : RÉUTILISATION DES ÉTAPES DÉJÀ TERMINÉES
     # ============================================================
-    stages_completed = []
-    stages_failed = []
+    for stage in ProcessingStage:
+        stage_data = completed_results.get(stage.value)
+        if stage_data is None:
+            continue
+        restored_at = datetime.now()
+        setattr(result, stage.value, ProcessingStageResult(
+            stage=stage,
+            status=ProcessingStatus.COMPLETED,
+            started_at=restored_at,
+            completed_at=restored_at,
+            duration=0.0,
+            result=stage_data,
+            retries=stage_data.get("retries", 0),
+            resumed=True
+        ))
+        result.success_count += 1
+        stages_completed.append(stage.value)
+        if stage == ProcessingStage.AGGREGATION:
+            result.final_streaming_url = stage_data.get("streaming_url")
+        pipeline_event_bus.publish(video_id, "stage_completed", {
+            "stage": stage.value,
+            "duration": 0.0,
+            "cached": False,
+            "resumed": True,
+            "retries": 0,
+            "progress_percent": pipeline_progress()
+        })
+    if completed_results:
+        print(f"⏩ Reprise du pipeline {video_id}: étapes déjà terminées {list(completed_results)}")
     
+    # Début effectif du traitement (après l'attente éventuelle dans la file),
+    # enregistré avec les informations média dans la même requête
     try:
-        from app.models.video_model import VideoMetadata
-        video_metadata = VideoMetadata(
-            video_id=video_id,
-            original_filename=video_file.filename,
-            file_path=permanent_file_path,  # Chemin permanent
-            file_size=file_size,
-            content_type=video_file.content_type or "video/mp4",
-            status=VideoStatus.PROCESSING,
-            upload_time=start_time,
-            processing_start_time=start_time,
-            current_stage="initializing",
-            stages_completed=[],
-            stages_failed=[]
+        extra_fields = {"media_info": media_info.model_dump()} if media_info else {}
+        await mongodb_connector.update_processing_stage(
+            video_id, "initializing", list(stages_completed), [], stages_running=[], **extra_fields
         )
-        await mongodb_connector.save_video_metadata(video_metadata)
     except Exception as e:
-        print(f"Erreur sauvegarde MongoDB (video metadata): {e}")
-    
-    # Utiliser le chemin permanent pour le traitement
-    video_path_for_processing = permanent_file_path
+        print(f"Erreur update stage: {e}")
     
     # ============================================================
-    # DÉTECTION DE LA PISTE AUDIO
+    # HELPERS COMMUNS AUX ÉTAPES
     # ============================================================
-    # Vérifie si la vidéo a une piste audio pour adapter le pipeline
-    has_audio = check_video_has_audio(video_path_for_processing)
-    print(f"🔊 Piste audio détectée: {has_audio}")
+    # Les étapes indépendantes s'exécutent en parallèle : current_stage reflète
+    # la dernière étape lancée, stages_running la liste complète des étapes en cours.
+    async def publish_stage_progress(current_stage: str):
+        """Met à jour la progression du pipeline dans MongoDB."""
+        try:
+            await mongodb_connector.update_processing_stage(
+                video_id,
+                current_stage,
+                list(stages_completed),
+                list(stages_failed),
+                stages_running=list(stages_running)
+            )
+        except Exception as e:
+            print(f"Erreur update stage: {e}")
     
-    # Helper function pour échec global
-    async def handle_pipeline_failure(stage_name: str, error_msg: str, stage_result: ProcessingStageResult):
-        """Gère l'échec d'une étape et arrête le pipeline"""
+    async def start_stage(stage: ProcessingStage) -> ProcessingStageResult:
+        """Démarre une étape : enregistre son horodatage et la publie comme étape en cours."""
+        stage_result = ProcessingStageResult(
+            stage=stage,
+            status=ProcessingStatus.PROCESSING,
+            started_at=datetime.now()
+        )
+        setattr(result, stage.value, stage_result)
+        stages_running.append(stage.value)
+        pipeline_event_bus.publish(video_id, "stage_started", {
+            "stage": stage.value,
+            "stages_running": list(stages_running),
+            "progress_percent": pipeline_progress()
+        })
+        await publish_stage_progress(stage.value)
+        return stage_result
+    
+    async def complete_stage(
+        stage_result: ProcessingStageResult,
+        stage_result_data: dict,
+        cache_params: Optional[dict] = None,
+        transfer: Optional[dict] = None
+    ) -> bool:
+        """
+        Marque une étape comme réussie et sauvegarde son résultat dans MongoDB.
+        
+        Si cache_params est fourni, le résultat est aussi mis en cache pour les
+        prochaines vidéos de même contenu traitées avec les mêmes paramètres.
+        transfer décrit l'envoi de la vidéo au microservice (mode, octets envoyés) ;
+        il est ajouté au résultat de l'étape mais pas au cache.
+        """
+        stage_name = stage_result.stage.value
+        stage_result.status = ProcessingStatus.COMPLETED
+        stage_result.result = stage_result_data
+        if transfer:
+            stage_result.result = {**stage_result_data, "transfer": transfer}
+            result.bytes_transferred += transfer.get("bytes_sent", 0)
+        if stage_result.retries:
+            stage_result.result = {**stage_result.result, "retries": stage_result.retries}
+        result.success_count += 1
+        observe_stage(stage_result)
+        stages_completed.append(stage_name)
+        if stage_name in stages_running:
+            stages_running.remove(stage_name)
+        pipeline_event_bus.publish(video_id, "stage_completed", {
+            "stage": stage_name,
+            "duration": stage_result.duration,
+            "cached": stage_result.cached,
+            "retries": stage_result.retries,
+            "progress_percent": pipeline_progress()
+        })
+        
+        try:
+            await mongodb_connector.save_processing_result(
+                video_id=video_id,
+                processing_type=stage_name,
+                result=stage_result.result
+            )
+        except Exception as e:
+            print(f"Erreur sauvegarde MongoDB ({stage_name}): {e}")
+        
+        if cache_params is not None and not stage_result.cached:
+            await stage_result_cache.put(content_hash, stage_name, cache_params, stage_result_data, video_id)
+        
+        await publish_stage_progress(stages_running[-1] if stages_running else stage_name)
+        return True
+    
+    async def complete_from_cache(stage_result: ProcessingStageResult, cache_params: dict) -> bool:
+        """
+        Termine l'étape avec un résultat en cache (même contenu, mêmes paramètres).
+        
+        Returns:
+            True si un résultat a été trouvé (l'appel au microservice est évité)
+        """
+        cached = await stage_result_cache.get(content_hash, stage_result.stage.value, cache_params)
+        if cached is None:
+            return False
+        finish_stage_timing(stage_result)
+        stage_result.cached = True
+        return await complete_stage(stage_result, cached)
+    
+    def fail_stage(error_msg: str, stage_result: ProcessingStageResult) -> bool:
+        """Enregistre l'échec d'une étape (l'exécuteur arrête ensuite le pipeline)."""
+        stage_name = stage_result.stage.value
         stages_failed.append(stage_name)
+        if stage_name in stages_running:
+            stages_running.remove(stage_name)
         stage_result.status = ProcessingStatus.FAILED
         stage_result.error_message = error_msg
         stage_result.completed_at = datetime.now()
         if stage_result.started_at:
-            stage_result.duration = (datetime.now() - stage_result.started_at).total_seconds()
+            stage_result.duration = (stage_result.completed_at - stage_result.started_at).total_seconds()
         result.failure_count += 1
+        observe_stage(stage_result)
+        pipeline_event_bus.publish(video_id, "stage_failed", {
+            "stage": stage_name,
+            "duration": stage_result.duration,
+            "retries": stage_result.retries,
+            "error": error_msg
+        })
+        return False
+    
+    def finish_stage_timing(stage_result: ProcessingStageResult, service_result: Optional[dict] = None):
+        """
+        Renseigne la date de fin et la durée d'une étape, et le nombre de nouvelles
+        tentatives de l'appel au microservice (service_result["attempts"]).
+        """
+        stage_result.completed_at = datetime.now()
+        stage_result.duration = (stage_result.completed_at - stage_result.started_at).total_seconds()
+        if service_result:
+            stage_result.retries = max(0, service_result.get("attempts", 1) - 1)
+    
+    # Helper function pour échec global
+    async def handle_pipeline_failure(stage_name: str, error_msg: str):
+        """Gère l'échec d'une étape et arrête le pipeline"""
+        # Les étapes sœurs interrompues par le fail-fast sont marquées comme annulées
+        for stage in ProcessingStage:
+            stage_result = getattr(result, stage.value)
+            if stage_result and stage_result.status == ProcessingStatus.PROCESSING:
+                stage_result.status = ProcessingStatus.CANCELLED
+                stage_result.error_message = f"Étape annulée suite à l'échec de l'étape '{stage_name}'"
+                finish_stage_timing(stage_result)
+                observe_stage(stage_result)
+                pipeline_event_bus.publish(video_id, "stage_cancelled", {
+                    "stage": stage.value,
+                    "duration": stage_result.duration
+                })
+        stages_running.clear()
         
         # Mettre à jour MongoDB avec l'échec
         try:
             await mongodb_connector.update_processing_stage(
-                video_id, "failed", stages_completed, stages_failed
+                video_id, "failed", stages_completed, stages_failed, stages_running=[],
+                status="failed", processing_end_time=datetime.now(),
+                bytes_transferred=result.bytes_transferred
             )
-            await mongodb_connector.update_video_status(video_id, "failed")
         except Exception as e:
             print(f"Erreur update MongoDB (failure): {e}")
         
@@ -1052,38 +1278,51 @@ async def process_video_global(
         result.completed_at=datetime.now()
         result.total_duration = (datetime.now() - start_time).total_seconds()
         result.message = f"❌ Pipeline arrêté : échec de l'étape '{stage_name}' - {error_msg}"
+        pipeline_event_bus.publish(video_id, "pipeline_failed", {
+            "failed_stage": stage_name,
+            "error": error_msg,
+            "total_duration": result.total_duration,
+            "bytes_transferred": result.bytes_transferred,
+            "progress_percent": pipeline_progress()
+        })
         
         return result
     
     # ============================================================
     # ÉTAPE 1: DÉTECTION DE LANGUE (SAUTÉE SI PAS D'AUDIO)
     # ============================================================
-    if has_audio:
-        # Mettre à jour l'étape actuelle
-        try:
-            await mongodb_connector.update_processing_stage(
-                video_id, "language_detection", stages_completed, stages_failed
+    async def run_language_detection() -> bool:
+        if not has_audio:
+            # Pas d'audio : marquer l'étape comme sautée
+            print("⏭️ Étape 1 (détection de langue) sautée : vidéo sans piste audio")
+            result.language_detection = ProcessingStageResult(
+                stage=ProcessingStage.LANGUAGE_DETECTION,
+                status=ProcessingStatus.COMPLETED,
+                started_at=datetime.now(),
+                completed_at=datetime.now(),
+                duration=0.0,
+                result={
+                    "skipped": True,
+                    "reason": "no_audio_track",
+                    "detected_language": None,
+                    "language_name": "Non applicable (pas d'audio)",
+                    "confidence": 0.0
+                }
             )
-        except Exception as e:
-            print(f"Erreur update stage: {e}")
-        
-        stage_start = datetime.now()
-        stage_result = ProcessingStageResult(
-            stage=ProcessingStage.LANGUAGE_DETECTION,
-            status=ProcessingStatus.PROCESSING,
-            started_at=stage_start
-        )
+            result.success_count += 1
+            stages_completed.append("language_detection")
+            return True
         
+        stage_result = await start_stage(ProcessingStage.LANGUAGE_DETECTION)
+        cache_params = {"duration": language_detection_duration, "test_all_languages": True}
         try:
-            # Vérifier le service
-            service_healthy = await language_detection_client.check_service_health()
+            if await complete_from_cache(stage_result, cache_params):
+                return True
+            
+            # Vérifier le service (état en mémoire, sans appel réseau)
+            service_healthy = service_health_monitor.is_available("language_detection")
             if not service_healthy:
-                result.language_detection = stage_result
-                return await handle_pipeline_failure(
-                    "language_detection", 
-                    "Service de détection de langue indisponible",
-                    stage_result
-                )
+                return fail_stage("Service de détection de langue indisponible", stage_result)
             
             # Lancer la détection
             lang_result = await language_detection_client.detect_language_from_local_file(
@@ -1091,179 +1330,97 @@ async def process_video_global(
                 duration=language_detection_duration,
                 test_all_languages=True
             )
-            
-            stage_end = datetime.now()
-            stage_result.completed_at = stage_end
-            stage_result.duration = (stage_end - stage_start).total_seconds()
+            finish_stage_timing(stage_result, lang_result)
             
             if lang_result.get("status") == "failed":
-                result.language_detection = stage_result
-                return await handle_pipeline_failure(
-                    "language_detection",
+                return fail_stage(
                     lang_result.get("error", "Erreur inconnue lors de la détection de langue"),
                     stage_result
                 )
             
             # Succès
-            stage_result.status = ProcessingStatus.COMPLETED
-            stage_result.result = {
+            return await complete_stage(stage_result, {
                 "detected_language": lang_result.get("detected_language"),
                 "language_name": lang_result.get("language_name"),
                 "confidence": lang_result.get("confidence")
-            }
-            result.success_count += 1
-            stages_completed.append("language_detection")
-            
-            # Sauvegarder dans MongoDB
-            try:
-                await mongodb_connector.save_processing_result(
-                    video_id=video_id,
-                    processing_type=ProcessingType.LANGUAGE_DETECTION.value,
-                    result=stage_result.result
-                )
-            except Exception as e:
-                print(f"Erreur sauvegarde MongoDB (language): {e}")
+            }, cache_params, lang_result.get("transfer"))
         
         except Exception as e:
-            result.language_detection = stage_result
-            return await handle_pipeline_failure(
-                "language_detection",
-                str(e),
-                stage_result
-            )
-        
-        result.language_detection = stage_result
-    else:
-        # Pas d'audio : marquer l'étape comme sautée
-        print("⏭️ Étape 1 (détection de langue) sautée : vidéo sans piste audio")
-        stage_result = ProcessingStageResult(
-            stage=ProcessingStage.LANGUAGE_DETECTION,
-            status=ProcessingStatus.COMPLETED,
-            started_at=datetime.now(),
-            completed_at=datetime.now(),
-            duration=0.0,
-            result={
-                "skipped": True,
-                "reason": "no_audio_track",
-                "detected_language": None,
-                "language_name": "Non applicable (pas d'audio)",
-                "confidence": 0.0
-            }
-        )
-        result.language_detection = stage_result
-        result.success_count += 1
-        stages_completed.append("language_detection")
+            return fail_stage(str(e), stage_result)
     
     # ============================================================
     # ÉTAPE 2: COMPRESSION VIDÉO (OBLIGATOIRE)
     # ============================================================
-    # Mettre à jour l'étape actuelle
-    try:
-        await mongodb_connector.update_processing_stage(
-            video_id, "compression", stages_completed, stages_failed
-        )
-    except Exception as e:
-        print(f"Erreur update stage: {e}")
-    
-    stage_start = datetime.now()
-    stage_result = ProcessingStageResult(
-        stage=ProcessingStage.COMPRESSION,
-        status=ProcessingStatus.PROCESSING,
-        started_at=stage_start
-    )
-    
-    try:
-        # Vérifier le service
-        service_healthy = await compression_client.check_service_health()
-        if not service_healthy:
-            result.compression = stage_result
-            return await handle_pipeline_failure(
-                "compression",
-                "Service de compression indisponible",
-                stage_result
-            )
-        
-        # Lancer la compression
-        comp_result = await compression_client.compress_video(
-            video_path=video_path_for_processing,
-            resolution=target_resolution,
-            crf_value=crf
-        )
-        
-        stage_end = datetime.now()
-        stage_result.completed_at = stage_end
-        stage_result.duration = (stage_end - stage_start).total_seconds()
-        
-        if comp_result.get("status") == "failed":
-            result.compression = stage_result
-            return await handle_pipeline_failure(
-                "compression",
-                comp_result.get("error", "Erreur inconnue lors de la compression"),
-                stage_result
-            )
-        
-        # Succès
-        stage_result.status = ProcessingStatus.COMPLETED
-        stage_result.result = {
-            "job_id": comp_result.get("job_id"),
-            "resolution": target_resolution,
-            "output_path": comp_result.get("output_path"),
-            "metadata": comp_result.get("metadata", {})
-        }
-        result.success_count += 1
-        stages_completed.append("compression")
-        
-        # Sauvegarder dans MongoDB
+    async def run_compression() -> bool:
+        stage_result = await start_stage(ProcessingStage.COMPRESSION)
+        cache_params = {"resolution": target_resolution, "crf": crf}
         try:
-            await mongodb_connector.save_processing_result(
-                video_id=video_id,
-                processing_type=ProcessingType.COMPRESSION.value,
-                result=stage_result.result
+            if await complete_from_cache(stage_result, cache_params):
+                return True
+            
+            # Vérifier le service (état en mémoire, sans appel réseau)
+            service_healthy = service_health_monitor.is_available("compression")
+            if not service_healthy:
+                return fail_stage("Service de compression indisponible", stage_result)
+            
+            # Lancer la compression
+            comp_result = await compression_client.compress_video(
+                video_path=video_path_for_processing,
+                resolution=target_resolution,
+                crf_value=crf
             )
+            finish_stage_timing(stage_result, comp_result)
+            
+            if comp_result.get("status") == "failed":
+                return fail_stage(
+                    comp_result.get("error", "Erreur inconnue lors de la compression"),
+                    stage_result
+                )
+            
+            # Succès
+            return await complete_stage(stage_result, {
+                "job_id": comp_result.get("job_id"),
+                "resolution": target_resolution,
+                "output_path": comp_result.get("output_path"),
+                "metadata": comp_result.get("metadata", {})
+            }, cache_params, comp_result.get("transfer"))
+        
         except Exception as e:
-            print(f"Erreur sauvegarde MongoDB (compression): {e}")
-    
-    except Exception as e:
-        result.compression = stage_result
-        return await handle_pipeline_failure(
-            "compression",
-            str(e),
-            stage_result
-        )
-    
-    result.compression = stage_result
+            return fail_stage(str(e), stage_result)
     
     # ============================================================
     # ÉTAPE 3: GÉNÉRATION DE SOUS-TITRES (SAUTÉE SI PAS D'AUDIO)
     # ============================================================
-    if has_audio:
-        # Mettre à jour l'étape actuelle
-        try:
-            await mongodb_connector.update_processing_stage(
-                video_id, "subtitle_generation", stages_completed, stages_failed
+    async def run_subtitle_generation() -> bool:
+        if not has_audio:
+            # Pas d'audio : marquer l'étape comme sautée avec un SRT vide
+            print("⏭️ Étape 3 (génération de sous-titres) sautée : vidéo sans piste audio")
+            result.subtitle_generation = ProcessingStageResult(
+                stage=ProcessingStage.SUBTITLE_GENERATION,
+                status=ProcessingStatus.COMPLETED,
+                started_at=datetime.now(),
+                completed_at=datetime.now(),
+                duration=0.0,
+                result={
+                    "skipped": True,
+                    "reason": "no_audio_track",
+                    "model_name": None,
+                    "language": None,
+                    "subtitle_text": "",
+                    "subtitle_text_preview": "(Pas de sous-titres - vidéo sans audio)",
+                    "text_length": 0,
+                    "srt_url": None,  # Pas de SRT disponible
+                    "srt_content": create_empty_srt_content()  # Contenu SRT vide pour l'agrégation
+                }
             )
-        except Exception as e:
-            print(f"Erreur update stage: {e}")
-        
-        stage_start = datetime.now()
-        stage_result = ProcessingStageResult(
-            stage=ProcessingStage.SUBTITLE_GENERATION,
-            status=ProcessingStatus.PROCESSING,
-            started_at=stage_start
-        )
+            result.success_count += 1
+            stages_completed.append("subtitle_generation")
+            return True
         
+        stage_result = await start_stage(ProcessingStage.SUBTITLE_GENERATION)
         try:
-            # Vérifier le service
-            service_healthy = await subtitle_client.check_service_health()
-            if not service_healthy:
-                result.subtitle_generation = stage_result
-                return await handle_pipeline_failure(
-                    "subtitle_generation",
-                    "Service de sous-titres indisponible",
-                    stage_result
-                )
-            
             # Utiliser la langue détectée si disponible
+            # (en mode "auto", cette étape dépend de la détection de langue dans le graphe)
             lang_to_use = subtitle_language
             if subtitle_language == "auto" and result.language_detection and result.language_detection.result:
                 detected = result.language_detection.result.get("detected_language")
@@ -1275,12 +1432,17 @@ async def process_video_global(
             try:
                 lang_to_use = normalize_language_code(lang_to_use)
             except ValueError as e:
-                result.subtitle_generation = stage_result
-                return await handle_pipeline_failure(
-                    "subtitle_generation",
-                    f"Langue invalide : {str(e)}",
-                    stage_result
-                )
+                return fail_stage(f"Langue invalide : {str(e)}", stage_result)
+            
+            # La clé de cache utilise la langue effective (après détection et normalisation)
+            cache_params = {"model_name": subtitle_model, "language": lang_to_use or "auto"}
+            if await complete_from_cache(stage_result, cache_params):
+                return True
+            
+            # Vérifier le service (état en mémoire, sans appel réseau)
+            service_healthy = service_health_monitor.is_available("subtitle_generation")
+            if not service_healthy:
+                return fail_stage("Service de sous-titres indisponible", stage_result)
             
             # Lancer la génération
             sub_result = await subtitle_client.generate_subtitles(
@@ -1288,344 +1450,998 @@ async def process_video_global(
                 model_name=subtitle_model,
                 language=lang_to_use
             )
-            
-            stage_end = datetime.now()
-            stage_result.completed_at = stage_end
-            stage_result.duration = (stage_end - stage_start).total_seconds()
+            finish_stage_timing(stage_result, sub_result)
             
             if sub_result.get("status") == "failed":
-                result.subtitle_generation = stage_result
-                return await handle_pipeline_failure(
-                    "subtitle_generation",
+                return fail_stage(
                     sub_result.get("error", "Erreur inconnue lors de la génération des sous-titres"),
                     stage_result
                 )
             
             # Succès
-            stage_result.status = ProcessingStatus.COMPLETED
-            
             # Extraire le texte complet depuis la clé "full_text"
             subtitle_text_full = sub_result.get("full_text", "")
             subtitle_text_preview = subtitle_text_full[:500] + "..." if len(subtitle_text_full) > 500 else subtitle_text_full
             
-            stage_result.result = {
+            # Le fichier SRT du service est éphémère (emptyDir) : son contenu est conservé
+            # avec le résultat. Sans contenu, l'URL seule ne doit pas être mise en cache.
+            srt_content = await subtitle_client.fetch_srt_content(sub_result.get("srt_url"))
+            
+            # Sauvegarder dans MongoDB (avec texte complet)
+            return await complete_stage(stage_result, {
                 "model_name": subtitle_model,
                 "language": lang_to_use,
                 "subtitle_text": subtitle_text_full,  # Texte complet
                 "subtitle_text_preview": subtitle_text_preview,  # Preview pour l'API
                 "text_length": len(subtitle_text_full),  # Longueur du texte
                 "srt_url": sub_result.get("srt_url"),  # URL de téléchargement du fichier SRT
-            }
-            result.success_count += 1
-            stages_completed.append("subtitle_generation")
+                "srt_content": srt_content,  # Contenu SRT transmis à l'agrégation
+            }, cache_params if srt_content is not None else None, sub_result.get("transfer"))
+        
+        except Exception as e:
+            return fail_stage(str(e), stage_result)
+    
+    # ============================================================
+    # ÉTAPE 4: DÉTECTION D'ANIMAUX (OBLIGATOIRE)
+    # ============================================================
+    async def run_animal_detection() -> bool:
+        stage_result = await start_stage(ProcessingStage.ANIMAL_DETECTION)
+        cache_params = {"confidence_threshold": animal_confidence_threshold, "save_video": True}
+        try:
+            if await complete_from_cache(stage_result, cache_params):
+                return True
             
-            # Sauvegarder dans MongoDB (avec texte complet)
-            try:
-                await mongodb_connector.save_processing_result(
-                    video_id=video_id,
-                    processing_type=ProcessingType.SUBTITLE_GENERATION.value,
-                    result=stage_result.result
+            # Vérifier le service (état en mémoire, sans appel réseau)
+            service_healthy = service_health_monitor.is_available("animal_detection")
+            if not service_healthy:
+                return fail_stage("Service de détection d'animaux indisponible", stage_result)
+            
+            # Lancer la détection d'animaux
+            animal_result = await animal_detection_client.detect_animals_in_video(
+                video_path=video_path_for_processing,
+                confidence_threshold=animal_confidence_threshold,
+                save_video=True
+            )
+            finish_stage_timing(stage_result, animal_result)
+            
+            if animal_result.get("status") == "failed":
+                return fail_stage(
+                    animal_result.get("error", "Erreur inconnue lors de la détection d'animaux"),
+                    stage_result
                 )
-            except Exception as e:
-                print(f"Erreur sauvegarde MongoDB (subtitle): {e}")
+            
+            # Succès
+            detection_summary = animal_result.get("detection_summary", {})
+            return await complete_stage(stage_result, {
+                "video_info": animal_result.get("video_info", {}),
+                "detection_summary": detection_summary,
+                "total_detections": detection_summary.get("total_detections", 0),
+                "animals_detected": detection_summary.get("animals_detected", {}),
+                "output_video": animal_result.get("output_video")
+            }, cache_params, animal_result.get("transfer"))
         
         except Exception as e:
-            result.subtitle_generation = stage_result
-            return await handle_pipeline_failure(
-                "subtitle_generation",
-                str(e),
-                stage_result
-            )
+            return fail_stage(str(e), stage_result)
+    
+    # ============================================================
+    # ÉTAPE 5: AGRÉGATION VIDÉO (AVEC OU SANS SOUS-TITRES)
+    # ============================================================
+    # Envoie la vidéo compressée et les sous-titres au service d'agrégation
+    # pour produire une vidéo finale avec sous-titres incrustés (si audio disponible)
+    # ou sans sous-titres (si pas d'audio)
+    async def run_aggregation() -> bool:
+        stage_result = await start_stage(ProcessingStage.AGGREGATION)
+        last_upload_percent = -1
+        
+        def publish_upload_progress(bytes_sent: int, bytes_total: int):
+            """Progression de l'upload vers le service d'agrégation (par pas de 5 %)."""
+            nonlocal last_upload_percent
+            percent = int(100 * bytes_sent / max(1, bytes_total))
+            if percent // 5 > last_upload_percent // 5 or bytes_sent == bytes_total:
+                last_upload_percent = percent
+                pipeline_event_bus.publish(video_id, "stage_progress", {
+                    "stage": ProcessingStage.AGGREGATION.value,
+                    "step": "upload",
+                    "percent": percent,
+                    "bytes_sent": bytes_sent,
+                    "bytes_total": bytes_total
+                })
         
-        result.subtitle_generation = stage_result
-    else:
-        # Pas d'audio : marquer l'étape comme sautée avec un SRT vide
-        print("⏭️ Étape 3 (génération de sous-titres) sautée : vidéo sans piste audio")
-        stage_result = ProcessingStageResult(
-            stage=ProcessingStage.SUBTITLE_GENERATION,
-            status=ProcessingStatus.COMPLETED,
-            started_at=datetime.now(),
-            completed_at=datetime.now(),
-            duration=0.0,
-            result={
-                "skipped": True,
-                "reason": "no_audio_track",
-                "model_name": None,
-                "language": None,
-                "subtitle_text": "",
-                "subtitle_text_preview": "(Pas de sous-titres - vidéo sans audio)",
-                "text_length": 0,
-                "srt_url": None,  # Pas de SRT disponible
-                "srt_content": create_empty_srt_content()  # Contenu SRT vide pour l'agrégation
-            }
-        )
-        result.subtitle_generation = stage_result
-        result.success_count += 1
-        stages_completed.append("subtitle_generation")
+        try:
+            # Vérifier le service (état en mémoire, sans appel réseau)
+            service_healthy = service_health_monitor.is_available("aggregation")
+            if not service_healthy:
+                return fail_stage("Service d'agrégation indisponible", stage_result)
+            
+            # Récupérer l'URL SRT ou le contenu SRT depuis l'étape de génération de sous-titres
+            srt_url = None
+            srt_content = None
+            video_has_subtitles = has_audio  # Si pas d'audio, pas de vrais sous-titres
+            
+            if result.subtitle_generation and result.subtitle_generation.result:
+                srt_url = result.subtitle_generation.result.get("srt_url")
+                srt_content = result.subtitle_generation.result.get("srt_content")
+            
+            # Récupérer le chemin de la vidéo compressée depuis l'étape de compression
+            compressed_video_path = video_path_for_processing  # Par défaut, utiliser la vidéo originale
+            if result.compression and result.compression.result:
+                output_path = result.compression.result.get("output_path")
+                if output_path and Path(output_path).exists():
+                    compressed_video_path = output_path
+            
+            # Récupérer la langue détectée
+            detected_language = None
+            if result.language_detection and result.language_detection.result:
+                detected_language = result.language_detection.result.get("detected_language")
+            
+            # Récupérer les animaux détectés
+            animals_detected = {}
+            if result.animal_detection and result.animal_detection.result:
+                detection_summary = result.animal_detection.result.get("detection_summary", {})
+                animals_detected = detection_summary.get("animals_detected", {})
+            
+            # Lancer l'agrégation selon le mode (contenu SRT direct, ou URL SRT à défaut)
+            if srt_content is None and srt_url:
+                # Contenu non récupéré lors de la génération : télécharger le SRT depuis l'URL
+                print(f"🎬 Agrégation avec sous-titres depuis URL: {srt_url}")
+                print(f"   Nom original: {original_filename}")
+                print(f"   Langue détectée: {detected_language}")
+                print(f"   Animaux détectés: {animals_detected}")
+                agg_result = await aggregation_client.process_video_with_subtitles(
+                    video_path=compressed_video_path,
+                    srt_url=srt_url,
+                    resolution=target_resolution,
+                    crf_value=crf,
+                    source_video_id=video_id,  # Pass the source video ID for cross-database reference
+                    original_filename=original_filename,  # Envoyer le nom original de la vidéo
+                    detected_language=detected_language,  # Envoyer la langue détectée
+                    animals_detected=animals_detected,  # Envoyer les animaux détectés
+                    on_progress=publish_upload_progress
+                )
+            else:
+                if video_has_subtitles:
+                    print("🎬 Agrégation avec sous-titres (contenu SRT)")
+                    print(f"   Langue détectée: {detected_language}")
+                else:
+                    # Mode sans audio : utiliser un SRT vide
+                    print("🎬 Agrégation sans sous-titres (vidéo sans piste audio)")
+                print(f"   Nom original: {original_filename}")
+                print(f"   Animaux détectés: {animals_detected}")
+                # Utiliser le contenu SRT (vide ou créé s'il n'y en a pas)
+                agg_result = await aggregation_client.process_video_with_srt_content(
+                    video_path=compressed_video_path,
+                    srt_content=srt_content if srt_content else create_empty_srt_content(),
+                    resolution=target_resolution,
+                    crf_value=crf,
+                    source_video_id=video_id,  # Pass the source video ID for cross-database reference
+                    original_filename=original_filename,  # Envoyer le nom original de la vidéo
+                    detected_language=detected_language,  # Envoyer la langue détectée
+                    animals_detected=animals_detected,  # Envoyer les animaux détectés
+                    on_progress=publish_upload_progress
+                )
+            finish_stage_timing(stage_result, agg_result)
+            
+            if agg_result.get("status") == "failed":
+                return fail_stage(
+                    agg_result.get("error", "Erreur inconnue lors de l'agrégation"),
+                    stage_result
+                )
+            
+            # Stocker l'URL de streaming finale
+            result.final_streaming_url = agg_result.get("streaming_url")
+            
+            # Succès
+            return await complete_stage(stage_result, {
+                "job_id": agg_result.get("job_id"),
+                "aggregated_video_id": agg_result.get("video_id"),
+                "streaming_url": agg_result.get("streaming_url"),
+                "metadata": agg_result.get("metadata", {}),
+                "message": agg_result.get("message"),
+                "upload": agg_result.get("upload"),
+                "has_subtitles": video_has_subtitles,  # Indique si la vidéo a des sous-titres incrustés
+                "no_audio": not has_audio  # Indique si la vidéo n'avait pas de piste audio
+            }, transfer=(
+                transfer_stats("multipart", agg_result["upload"]["bytes_sent"])
+                if agg_result.get("upload") else None
+            ))
+        
+        except Exception as e:
+            return fail_stage(str(e), stage_result)
     
     # ============================================================
-    # ÉTAPE 4: DÉTECTION D'ANIMAUX (OBLIGATOIRE)
+    # EXÉCUTION DU GRAPHE D'ÉTAPES
+    # ============================================================
+    # Les 4 étapes d'analyse sont indépendantes et lancées en parallèle ; seule la
+    # génération de sous-titres en mode "auto" attend la langue détectée.
+    # L'agrégation attend toutes les autres étapes.
+    # Les étapes reprises d'une exécution précédente restent dans le graphe (pour les
+    # dépendances) mais se terminent immédiatement.
+    subtitle_dependencies = (
+        (ProcessingStage.LANGUAGE_DETECTION.value,)
+        if has_audio and subtitle_language == "auto"
+        else ()
+    )
+    
+    async def already_completed() -> bool:
+        return True
+    
+    def stage_runner(stage: ProcessingStage, run: Callable[[], Awaitable[bool]]) -> Callable[[], Awaitable[bool]]:
+        if stage.value in completed_results:
+            return already_completed
+        
+        async def traced_run() -> bool:
+            # Span de l'étape : parent des appels au microservice (un span client par tentative)
+            with tracer.start_as_current_span(f"stage {stage.value}", attributes={"stage": stage.value}) as span:
+                succeeded = await run()
+                stage_result = getattr(result, stage.value)
+                if stage_result is not None:
+                    span.set_attribute("cached", stage_result.cached)
+                    span.set_attribute("retries", stage_result.retries)
+                    if not succeeded:
+                        span.set_status(Status(StatusCode.ERROR, stage_result.error_message or "échec de l'étape"))
+                return succeeded
+        return traced_run
+    
+    executor = StageGraphExecutor([
+        PipelineStage(
+            ProcessingStage.LANGUAGE_DETECTION.value,
+            stage_runner(ProcessingStage.LANGUAGE_DETECTION, run_language_detection)
+        ),
+        PipelineStage(ProcessingStage.COMPRESSION.value, stage_runner(ProcessingStage.COMPRESSION, run_compression)),
+        PipelineStage(
+            ProcessingStage.SUBTITLE_GENERATION.value,
+            stage_runner(ProcessingStage.SUBTITLE_GENERATION, run_subtitle_generation),
+            depends_on=subtitle_dependencies
+        ),
+        PipelineStage(
+            ProcessingStage.ANIMAL_DETECTION.value,
+            stage_runner(ProcessingStage.ANIMAL_DETECTION, run_animal_detection)
+        ),
+        PipelineStage(
+            ProcessingStage.AGGREGATION.value,
+            stage_runner(ProcessingStage.AGGREGATION, run_aggregation),
+            depends_on=(
+                ProcessingStage.LANGUAGE_DETECTION.value,
+                ProcessingStage.COMPRESSION.value,
+                ProcessingStage.SUBTITLE_GENERATION.value,
+                ProcessingStage.ANIMAL_DETECTION.value,
+            )
+        ),
+    ])
+    failed_stage = await executor.run()
+    
+    if failed_stage:
+        failed_stage_result = getattr(result, failed_stage)
+        error_msg = executor.errors.get(failed_stage)
+        if failed_stage_result and failed_stage_result.error_message:
+            error_msg = failed_stage_result.error_message
+        elif failed_stage_result:
+            # Exception non capturée dans l'étape : l'enregistrer comme échec
+            fail_stage(error_msg or "Erreur inconnue", failed_stage_result)
+        return await handle_pipeline_failure(failed_stage, error_msg or "Erreur inconnue")
+    
+    # ============================================================
+    # FINALISATION - SUCCÈS COMPLET
+    # ============================================================
+    
+    # Note: On ne supprime PAS le fichier vidéo car il est stocké de manière permanente
+    # pour permettre le streaming ultérieur
+    
+    # Calculer la durée totale
+    end_time = datetime.now()
+    result.completed_at = end_time
+    result.total_duration = (end_time - start_time).total_seconds()
+    
+    # Toutes les 5 étapes ont réussi (sinon on aurait déjà retourné avec un échec)
+    result.overall_status = ProcessingStatus.COMPLETED
+    result.message = f"✅ Pipeline complet réussi ! (5/5 étapes en {result.total_duration:.1f}s)"
+    if completed_results:
+        result.message += f" - reprise : {len(completed_results)} étape(s) réutilisée(s)"
+    pipeline_event_bus.publish(video_id, "pipeline_completed", {
+        "total_duration": result.total_duration,
+        "final_streaming_url": result.final_streaming_url,
+        "bytes_transferred": result.bytes_transferred,
+        "progress_percent": 100.0
+    })
+    
+    # ============================================================
+    # METTRE À JOUR L'ÉTAPE ET LE STATUT FINAUX DANS MONGODB (UNE SEULE REQUÊTE)
     # ============================================================
-    # Mettre à jour l'étape actuelle
     try:
         await mongodb_connector.update_processing_stage(
-            video_id, "animal_detection", stages_completed, stages_failed
+            video_id, "completed", stages_completed, stages_failed, stages_running=[],
+            status="completed", processing_end_time=end_time,
+            bytes_transferred=result.bytes_transferred
         )
     except Exception as e:
-        print(f"Erreur update stage: {e}")
+        print(f"Erreur mise à jour statut MongoDB: {e}")
+    
+    return result
+
+
+# ============================================================
+# ENDPOINT DE TRAITEMENT GLOBAL
+# ============================================================
+
+@router.post(
+    "/process-video",
+    response_model=GlobalProcessingResult,
+    status_code=status.HTTP_201_CREATED,
+    summary="Traitement global d'une vidéo",
+    description="Lance le traitement complet OBLIGATOIRE d'une vidéo : détection de langue, compression, génération de sous-titres et détection d'animaux. Si une étape échoue, le pipeline s'arrête. En mode asynchrone (async_mode=true), répond immédiatement 202 avec le video_id à interroger via GET /process-video/{video_id}.",
+    responses={202: {"description": "Traitement accepté et mis en file d'attente (async_mode=true)"}}
+)
+async def process_video_global(
+    video_file: UploadFile = File(...),
+    language_detection_duration: int = Form(30),
+    target_resolution: str = Form("720p"),
+    crf: int = Form(23),
+    subtitle_model: str = Form("tiny"),
+    subtitle_language: str = Form("auto"),
+    animal_confidence_threshold: float = Form(0.5),
+    async_mode: bool = Form(False),
+    priority: ProcessingPriority = Form(ProcessingPriority.NORMAL)
+):
+    """
+    Traitement global OBLIGATOIRE d'une vidéo uploadée.
+    
+    Ce endpoint orchestre les 4 étapes de traitement (TOUTES OBLIGATOIRES) :
+    1. Détection de langue
+    2. Compression vidéo
+    3. Génération de sous-titres
+    4. Détection d'animaux (YOLO)
+    
+    Le pipeline est admis dans le pool de pipelines (concurrence bornée). En mode
+    synchrone, la requête attend la fin du traitement ; en mode asynchrone, elle
+    retourne 202 Accepted dès que la vidéo est sauvegardée.
+    
+    IMPORTANT: Si une étape échoue, le pipeline s'arrête immédiatement (échec global).
     
-    stage_start = datetime.now()
-    stage_result = ProcessingStageResult(
-        stage=ProcessingStage.ANIMAL_DETECTION,
-        status=ProcessingStatus.PROCESSING,
-        started_at=stage_start
+    Args:
+        video_file: Fichier vidéo à traiter
+        language_detection_duration: Durée d'extraction audio en secondes
+        target_resolution: Résolution cible (240p, 360p, 480p, 720p, 1080p)
+        crf: CRF pour la compression (18-28)
+        subtitle_model: Modèle Whisper (tiny, base, small, medium, large)
+        subtitle_language: Langue pour les sous-titres (auto = détection automatique)
+        animal_confidence_threshold: Seuil de confiance pour la détection d'animaux (0.1-1.0)
+        async_mode: Retourner immédiatement (202) au lieu d'attendre la fin du pipeline
+        priority: Classe de priorité du traitement (high, normal, low)
+        
+    Returns:
+        GlobalProcessingResult: Résultat complet du traitement (ou état initial en mode asynchrone)
+    """
+    # Refuser tôt si la file d'attente est pleine (avant de recevoir tout le fichier)
+    if pipeline_worker_pool.is_full():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Trop de traitements en attente, réessayez plus tard",
+            headers={"Retry-After": "30"}
+        )
+    
+    video_id = str(uuid.uuid4())
+    start_time = datetime.now()
+    
+    params = GlobalProcessingRequest(
+        language_detection_duration=language_detection_duration,
+        target_resolution=target_resolution,
+        crf=crf,
+        subtitle_model=subtitle_model,
+        subtitle_language=subtitle_language,
+        animal_confidence_threshold=animal_confidence_threshold,
+        priority=priority
     )
     
+    # ============================================================
+    # SAUVEGARDER LA VIDÉO DE MANIÈRE PERMANENTE (comme upload normal)
+    # ============================================================
+    from app.services.file_storage import FileStorageService
+    
     try:
-        # Vérifier le service
-        service_healthy = await animal_detection_client.check_service_health()
-        if not service_healthy:
-            result.animal_detection = stage_result
-            return await handle_pipeline_failure(
-                "animal_detection",
-                "Service de détection d'animaux indisponible",
-                stage_result
-            )
-        
-        # Lancer la détection d'animaux
-        animal_result = await animal_detection_client.detect_animals_in_video(
-            video_path=video_path_for_processing,
-            confidence_threshold=animal_confidence_threshold,
-            save_video=True
+        # Utiliser le service de stockage pour sauvegarder de manière permanente
+        unique_filename, permanent_file_path, file_size, content_hash = await FileStorageService.save_video_file(video_file)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur lors de la sauvegarde du fichier: {str(e)}"
         )
+    
+    return await start_global_processing(
+        video_id=video_id,
+        start_time=start_time,
+        video_path=permanent_file_path,
+        original_filename=video_file.filename,
+        content_type=video_file.content_type or "video/mp4",
+        file_size=file_size,
+        content_hash=content_hash,
+        params=params,
+        async_mode=async_mode
+    )
+
+
+async def start_global_processing(
+    video_id: str,
+    start_time: datetime,
+    video_path: str,
+    original_filename: str,
+    content_type: str,
+    file_size: int,
+    content_hash: str,
+    params: GlobalProcessingRequest,
+    async_mode: bool
+):
+    """
+    Enregistre une vidéo déjà stockée avec le statut "processing" et l'admet dans
+    le pool de pipelines.
+    
+    Utilisé par POST /process-video et par la finalisation des uploads par morceaux.
+    
+    Args:
+        video_id: Identifiant de la nouvelle vidéo
+        start_time: Date de réception de la vidéo
+        video_path: Chemin permanent de la vidéo
+        original_filename: Nom original du fichier
+        content_type: Type MIME du fichier
+        file_size: Taille du fichier en octets
+        content_hash: Empreinte SHA-256 du contenu
+        params: Paramètres des étapes du pipeline
+        async_mode: Retourner immédiatement (202) au lieu d'attendre la fin du pipeline
         
-        stage_end = datetime.now()
-        stage_result.completed_at = stage_end
-        stage_result.duration = (stage_end - stage_start).total_seconds()
-        
-        if animal_result.get("status") == "failed":
-            result.animal_detection = stage_result
-            return await handle_pipeline_failure(
-                "animal_detection",
-                animal_result.get("error", "Erreur inconnue lors de la détection d'animaux"),
-                stage_result
-            )
-        
-        # Succès
-        stage_result.status = ProcessingStatus.COMPLETED
-        detection_summary = animal_result.get("detection_summary", {})
-        stage_result.result = {
-            "video_info": animal_result.get("video_info", {}),
-            "detection_summary": detection_summary,
-            "total_detections": detection_summary.get("total_detections", 0),
-            "animals_detected": detection_summary.get("animals_detected", {}),
-            "output_video": animal_result.get("output_video")
-        }
-        result.success_count += 1
-        stages_completed.append("animal_detection")
+    Returns:
+        GlobalProcessingResult (ou réponse 202 en mode asynchrone)
+    """
+    # Préparer la réponse
+    result = GlobalProcessingResult(
+        video_id=video_id,
+        overall_status=ProcessingStatus.PENDING,
+        started_at=start_time,
+        message="Traitement en file d'attente..."
+    )
+    
+    await register_processing_video(
+        video_id, start_time, video_path, original_filename, content_type, file_size, content_hash, params
+    )
+    
+    return await admit_pipeline(
+        video_id,
+        result,
+        lambda: run_global_pipeline(
+            video_id=video_id,
+            video_path=video_path,
+            original_filename=original_filename,
+            params=params,
+            result=result,
+            content_hash=content_hash
+        ),
+        async_mode,
+        priority=params.priority
+    )
+
+
+async def register_processing_video(
+    video_id: str,
+    start_time: datetime,
+    video_path: str,
+    original_filename: str,
+    content_type: str,
+    file_size: int,
+    content_hash: str,
+    params: GlobalProcessingRequest,
+    batch_id: Optional[str] = None
+):
+    """Sauvegarde dans MongoDB une vidéo stockée, avec le statut "processing" (en file d'attente)."""
+    try:
+        from app.models.video_model import VideoMetadata
+        # Contenu déjà uploadé : la vidéo partage le fichier existant
+        original_video = await mongodb_connector.find_video_by_content_hash(content_hash)
+        if original_video and original_video.media_info:
+            # Réutiliser l'analyse ffprobe de la vidéo d'origine
+            remember_media_info(content_hash, original_video.media_info)
+        video_metadata = VideoMetadata(
+            video_id=video_id,
+            original_filename=original_filename,
+            file_path=video_path,  # Chemin permanent
+            file_size=file_size,
+            content_type=content_type,
+            status=VideoStatus.PROCESSING,
+            upload_time=start_time,
+            processing_start_time=start_time,
+            content_hash=content_hash,
+            duplicate_of=original_video.video_id if original_video else None,
+            current_stage="queued",
+            stages_completed=[],
+            stages_failed=[],
+            stages_running=[],
+            processing_params=params.model_dump(mode="json"),
+            batch_id=batch_id
+        )
+        await mongodb_connector.save_video_metadata(video_metadata)
+    except Exception as e:
+        print(f"Erreur sauvegarde MongoDB (video metadata): {e}")
+
+
+async def admit_pipeline(
+    video_id: str,
+    result: GlobalProcessingResult,
+    run: Callable[[], Awaitable[GlobalProcessingResult]],
+    async_mode: bool,
+    stages_completed: Optional[list] = None,
+    priority: ProcessingPriority = ProcessingPriority.NORMAL
+):
+    """
+    Admet un pipeline dans le pool de pipelines.
+    
+    Args:
+        video_id: Identifiant de la vidéo
+        result: Résultat partagé, mis à jour par le pipeline
+        run: Coroutine exécutant le pipeline
+        async_mode: Retourner immédiatement (202) au lieu d'attendre la fin du pipeline
+        stages_completed: Étapes déjà terminées (reprise d'un pipeline)
+        priority: Classe de priorité du pipeline
         
-        # Sauvegarder dans MongoDB
+    Returns:
+        GlobalProcessingResult (ou réponse 202 en mode asynchrone)
+    """
+    stages_completed = stages_completed or []
+    try:
+        pipeline_future = await pipeline_worker_pool.submit(video_id, run, result, priority)
+    except HTTPException as e:
+        if e.status_code != status.HTTP_503_SERVICE_UNAVAILABLE:
+            # Pipeline déjà admis entre-temps (lot) : son état ne doit pas être modifié
+            raise
+        # File pleine entre-temps : la vidéo reste stockée mais n'est pas traitée
+        pipeline_event_bus.publish(video_id, "pipeline_failed", {
+            "error": "Trop de traitements en attente"
+        })
         try:
-            await mongodb_connector.save_processing_result(
-                video_id=video_id,
-                processing_type=ProcessingType.ANIMAL_DETECTION.value,
-                result=stage_result.result
+            await mongodb_connector.update_processing_stage(
+                video_id, "failed", stages_completed, [], stages_running=[], status="failed"
             )
         except Exception as e:
-            print(f"Erreur sauvegarde MongoDB (animal_detection): {e}")
+            print(f"Erreur update MongoDB (queue full): {e}")
+        raise
     
-    except Exception as e:
-        result.animal_detection = stage_result
-        return await handle_pipeline_failure(
-            "animal_detection",
-            str(e),
-            stage_result
+    pipeline_event_bus.publish(video_id, "pipeline_queued", {
+        "progress_percent": round(100 * len(stages_completed) / len(ProcessingStage), 1)
+    })
+    
+    if async_mode:
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=jsonable_encoder(result),
+            headers={"Location": f"/api/v1/processing/process-video/{video_id}"}
+        )
+    
+    return await pipeline_future
+
+
+@router.post(
+    "/{video_id}/resume",
+    response_model=GlobalProcessingResult,
+    summary="Reprendre un pipeline échoué ou interrompu",
+    description="Relance le pipeline d'une vidéo en échec (ou interrompu par un redémarrage) en réutilisant les résultats des étapes déjà terminées : seules les étapes manquantes sont exécutées, avec les paramètres du traitement initial. En mode asynchrone (async_mode=true), répond immédiatement 202.",
+    responses={
+        202: {"description": "Reprise acceptée et mise en file d'attente (async_mode=true)"},
+        404: {"description": "Vidéo ou fichier vidéo introuvable"},
+        409: {"description": "Pipeline en cours, en attente dans un lot ou déjà terminé"}
+    }
+)
+async def resume_global_processing(video_id: str, async_mode: bool = False):
+    """
+    Reprend le pipeline d'une vidéo à partir des étapes déjà terminées.
+    
+    Les étapes listées dans stages_completed dont le résultat est enregistré dans
+    processing_results sont réutilisées telles quelles ; les autres (étape en échec,
+    étapes annulées ou jamais lancées) sont exécutées. Une vidéo encore marquée
+    "processing" mais inconnue du pool de ce pod a été interrompue (redémarrage)
+    et peut aussi être reprise, sauf si elle attend son admission dans un lot.
+    
+    Args:
+        video_id: Identifiant de la vidéo
+        async_mode: Retourner immédiatement (202) au lieu d'attendre la fin du pipeline
+        
+    Returns:
+        GlobalProcessingResult: Résultat complet du traitement (ou état initial en mode asynchrone)
+    """
+    if pipeline_worker_pool.is_full():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Trop de traitements en attente, réessayez plus tard",
+            headers={"Retry-After": "30"}
+        )
+    if pipeline_worker_pool.is_active(video_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Le pipeline de la vidéo {video_id} est déjà en cours"
+        )
+    if not mongodb_connector.client:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="MongoDB n'est pas disponible"
         )
     
-    result.animal_detection = stage_result
+    video_metadata, stage_results_by_type = await mongodb_connector.get_video_with_processing_results(
+        video_id, [stage.value for stage in ProcessingStage]
+    )
+    if not video_metadata:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Vidéo {video_id} non trouvée"
+        )
+    if video_metadata.status == VideoStatus.COMPLETED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Le pipeline de la vidéo {video_id} est déjà terminé"
+        )
+    if video_metadata.status not in (VideoStatus.FAILED, VideoStatus.PROCESSING):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Aucun pipeline à reprendre pour la vidéo {video_id} (statut: {video_metadata.status.value})"
+        )
+    if video_metadata.batch_id and batch_scheduler.is_waiting(video_metadata.batch_id, video_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"La vidéo {video_id} attend son admission dans le lot {video_metadata.batch_id}"
+        )
+    if not Path(video_metadata.file_path).exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Fichier vidéo introuvable pour la vidéo {video_id}"
+        )
     
-    # ============================================================
-    # ÉTAPE 5: AGRÉGATION VIDÉO (AVEC OU SANS SOUS-TITRES)
-    # ============================================================
-    # Envoie la vidéo compressée et les sous-titres au service d'agrégation
-    # pour produire une vidéo finale avec sous-titres incrustés (si audio disponible)
-    # ou sans sous-titres (si pas d'audio)
+    # Étapes réutilisables : terminées lors de l'exécution précédente, avec un résultat sauvegardé
+    stages_completed = video_metadata.stages_completed or []
+    completed_results = {
+        stage.value: stage_results_by_type[stage.value]
+        for stage in ProcessingStage
+        if stage.value in stages_completed and stage.value in stage_results_by_type
+    }
+    # Paramètres du traitement initial (valeurs par défaut pour les vidéos plus anciennes)
+    params = GlobalProcessingRequest(**(video_metadata.processing_params or {}))
+    
+    start_time = datetime.now()
+    result = GlobalProcessingResult(
+        video_id=video_id,
+        overall_status=ProcessingStatus.PENDING,
+        started_at=start_time,
+        message="Reprise du traitement en file d'attente...",
+        bytes_transferred=video_metadata.bytes_transferred or 0
+    )
     
-    # Mettre à jour l'étape actuelle
     try:
         await mongodb_connector.update_processing_stage(
-            video_id, "aggregation", stages_completed, stages_failed
+            video_id, "queued", list(completed_results), [], stages_running=[],
+            status="processing", processing_start_time=start_time, processing_end_time=None,
+            batch_id=None
         )
     except Exception as e:
-        print(f"Erreur update stage: {e}")
+        print(f"Erreur update MongoDB (resume): {e}")
     
-    stage_start = datetime.now()
-    stage_result = ProcessingStageResult(
-        stage=ProcessingStage.AGGREGATION,
-        status=ProcessingStatus.PROCESSING,
-        started_at=stage_start
+    print(f"⏩ Reprise demandée pour {video_id}: {len(completed_results)} étape(s) réutilisable(s)")
+    return await admit_pipeline(
+        video_id,
+        result,
+        lambda: run_global_pipeline(
+            video_id=video_id,
+            video_path=video_metadata.file_path,
+            original_filename=video_metadata.original_filename,
+            params=params,
+            result=result,
+            content_hash=video_metadata.content_hash,
+            completed_results=completed_results
+        ),
+        async_mode,
+        stages_completed=list(completed_results),
+        priority=params.priority
     )
+
+
+# ============================================================
+# TRAITEMENT PAR LOTS
+# ============================================================
+
+@router.post(
+    "/batch",
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Traitement global d'un lot de vidéos",
+    description="Lance le pipeline complet sur un lot de vidéos (fichiers uploadés et/ou video_id déjà stockés) avec des paramètres communs. Les vidéos sont admises progressivement dans le pool de pipelines, à tour de rôle entre les lots actifs ; l'avancement et le débit du lot sont consultables via GET /processing/batch/{batch_id}.",
+    responses={
+        404: {"description": "video_id inconnu ou fichier vidéo introuvable"},
+        409: {"description": "Vidéo déjà en cours de traitement"}
+    }
+)
+async def process_video_batch(
+    video_files: List[UploadFile] = File(default=[]),
+    video_ids: List[str] = Form(default=[]),
+    language_detection_duration: int = Form(30),
+    target_resolution: str = Form("720p"),
+    crf: int = Form(23),
+    subtitle_model: str = Form("tiny"),
+    subtitle_language: str = Form("auto"),
+    animal_confidence_threshold: float = Form(0.5),
+    priority: ProcessingPriority = Form(ProcessingPriority.LOW)
+):
+    """
+    Crée un lot de traitements globaux.
     
-    try:
-        # Vérifier le service
-        service_healthy = await aggregation_client.check_service_health()
-        if not service_healthy:
-            result.aggregation = stage_result
-            return await handle_pipeline_failure(
-                "aggregation",
-                "Service d'agrégation indisponible",
-                stage_result
-            )
-        
-        # Récupérer l'URL SRT ou le contenu SRT depuis l'étape de génération de sous-titres
-        srt_url = None
-        srt_content = None
-        video_has_subtitles = has_audio  # Si pas d'audio, pas de vrais sous-titres
-        
-        if result.subtitle_generation and result.subtitle_generation.result:
-            srt_url = result.subtitle_generation.result.get("srt_url")
-            srt_content = result.subtitle_generation.result.get("srt_content")
-        
-        # Récupérer le chemin de la vidéo compressée depuis l'étape de compression
-        compressed_video_path = video_path_for_processing  # Par défaut, utiliser la vidéo originale
-        if result.compression and result.compression.result:
-            output_path = result.compression.result.get("output_path")
-            if output_path and Path(output_path).exists():
-                compressed_video_path = output_path
-        
-        # Récupérer la langue détectée
-        detected_language = None
-        if result.language_detection and result.language_detection.result:
-            detected_language = result.language_detection.result.get("detected_language")
-        
-        # Récupérer les animaux détectés
-        animals_detected = {}
-        if result.animal_detection and result.animal_detection.result:
-            detection_summary = result.animal_detection.result.get("detection_summary", {})
-            animals_detected = detection_summary.get("animals_detected", {})
-        
-        # Récupérer le nom original de la vidéo depuis MongoDB
-        original_filename = video_file.filename if 'video_file' in locals() else None
-        if not original_filename and video_metadata:
-            original_filename = video_metadata.original_filename
-        
-        # Lancer l'agrégation selon le mode (avec URL SRT ou contenu SRT direct)
-        if srt_url:
-            # Mode normal : télécharger le SRT depuis l'URL
-            print(f"🎬 Agrégation avec sous-titres depuis URL: {srt_url}")
-            print(f"   Nom original: {original_filename}")
-            print(f"   Langue détectée: {detected_language}")
-            print(f"   Animaux détectés: {animals_detected}")
-            agg_result = await aggregation_client.process_video_with_subtitles(
-                video_path=compressed_video_path,
-                srt_url=srt_url,
-                resolution=target_resolution,
-                crf_value=crf,
-                source_video_id=video_id,  # Pass the source video ID for cross-database reference
-                original_filename=original_filename,  # Envoyer le nom original de la vidéo
-                detected_language=detected_language,  # Envoyer la langue détectée
-                animals_detected=animals_detected  # Envoyer les animaux détectés
+    Les fichiers uploadés sont sauvegardés et enregistrés immédiatement ; les vidéos
+    déjà stockées sont remises en file d'attente avec les paramètres du lot (les
+    résultats de leur exécution précédente sont supprimés). Chaque vidéo porte le
+    batch_id du lot, qui refuse sa reprise tant qu'elle attend d'être admise. Le
+    planificateur admet ensuite au plus BATCH_MAX_IN_FLIGHT vidéos du lot à la fois
+    dans le pool de pipelines.
+    
+    Args:
+        video_files: Fichiers vidéo à traiter
+        video_ids: Vidéos déjà stockées à (re)traiter (champ répété ou liste séparée par des virgules)
+        language_detection_duration: Durée d'extraction audio en secondes
+        target_resolution: Résolution cible (240p, 360p, 480p, 720p, 1080p)
+        crf: CRF pour la compression (18-28)
+        subtitle_model: Modèle Whisper (tiny, base, small, medium, large)
+        subtitle_language: Langue pour les sous-titres (auto = détection automatique)
+        animal_confidence_threshold: Seuil de confiance pour la détection d'animaux (0.1-1.0)
+        priority: Classe de priorité des pipelines du lot (basse par défaut)
+        
+    Returns:
+        État initial du lot (202 Accepted)
+    """
+    requested_ids = list(dict.fromkeys(
+        video_id.strip()
+        for field in video_ids
+        for video_id in field.split(",")
+        if video_id.strip()
+    ))
+    total = len(video_files) + len(requested_ids)
+    if total == 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Le lot est vide : fournir des fichiers (video_files) et/ou des video_ids"
+        )
+    if total > settings.batch_max_videos:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Lot trop volumineux ({total} vidéos, maximum {settings.batch_max_videos})"
+        )
+    
+    # Vérifier les vidéos déjà stockées avant de sauvegarder les fichiers uploadés
+    stored_videos = []
+    if requested_ids:
+        if not mongodb_connector.client:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="MongoDB n'est pas disponible"
             )
-        else:
-            # Mode sans audio : utiliser un SRT vide
-            print("🎬 Agrégation sans sous-titres (vidéo sans piste audio)")
-            print(f"   Nom original: {original_filename}")
-            print(f"   Animaux détectés: {animals_detected}")
-            # Utiliser le contenu SRT vide ou en créer un
-            empty_srt = srt_content if srt_content else create_empty_srt_content()
-            agg_result = await aggregation_client.process_video_with_srt_content(
-                video_path=compressed_video_path,
-                srt_content=empty_srt,
-                resolution=target_resolution,
-                crf_value=crf,
-                source_video_id=video_id,  # Pass the source video ID for cross-database reference
-                original_filename=original_filename,  # Envoyer le nom original de la vidéo
-                detected_language=detected_language,  # Envoyer la langue détectée
-                animals_detected=animals_detected  # Envoyer les animaux détectés
+        metadata_by_id = await mongodb_connector.get_videos_metadata(requested_ids)
+        missing = [
+            video_id for video_id in requested_ids
+            if video_id not in metadata_by_id or not Path(metadata_by_id[video_id].file_path).exists()
+        ]
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Vidéos introuvables: {', '.join(missing)}"
             )
-        
-        stage_end = datetime.now()
-        stage_result.completed_at = stage_end
-        stage_result.duration = (stage_end - stage_start).total_seconds()
-        
-        if agg_result.get("status") == "failed":
-            result.aggregation = stage_result
-            return await handle_pipeline_failure(
-                "aggregation",
-                agg_result.get("error", "Erreur inconnue lors de l'agrégation"),
-                stage_result
+        busy = [
+            video_id for video_id in requested_ids
+            if metadata_by_id[video_id].status == VideoStatus.PROCESSING or pipeline_worker_pool.is_active(video_id)
+        ]
+        if busy:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Vidéos déjà en cours de traitement: {', '.join(busy)}"
             )
-        
-        # Succès
-        stage_result.status = ProcessingStatus.COMPLETED
-        stage_result.result = {
-            "job_id": agg_result.get("job_id"),
-            "aggregated_video_id": agg_result.get("video_id"),
-            "streaming_url": agg_result.get("streaming_url"),
-            "metadata": agg_result.get("metadata", {}),
-            "message": agg_result.get("message"),
-            "has_subtitles": video_has_subtitles,  # Indique si la vidéo a des sous-titres incrustés
-            "no_audio": not has_audio  # Indique si la vidéo n'avait pas de piste audio
-        }
-        result.success_count += 1
-        stages_completed.append("aggregation")
-        
-        # Stocker l'URL de streaming finale
-        result.final_streaming_url = agg_result.get("streaming_url")
-        
-        # Sauvegarder dans MongoDB
+        stored_videos = [metadata_by_id[video_id] for video_id in requested_ids]
+    
+    params = GlobalProcessingRequest(
+        language_detection_duration=language_detection_duration,
+        target_resolution=target_resolution,
+        crf=crf,
+        subtitle_model=subtitle_model,
+        subtitle_language=subtitle_language,
+        animal_confidence_threshold=animal_confidence_threshold,
+        priority=priority
+    )
+    # Sauvegarder tous les fichiers avant d'enregistrer le lot : un fichier refusé
+    # n'enregistre aucune vidéo du lot
+    from app.services.file_storage import FileStorageService
+    
+    saved_uploads = []
+    for video_file in video_files:
         try:
-            await mongodb_connector.save_processing_result(
-                video_id=video_id,
-                processing_type=ProcessingType.AGGREGATION.value,
-                result=stage_result.result
+            _, permanent_file_path, file_size, content_hash = await FileStorageService.save_video_file(video_file)
+        except HTTPException as e:
+            raise HTTPException(
+                status_code=e.status_code,
+                detail=f"{video_file.filename}: {e.detail}"
+            )
+        saved_uploads.append((video_file, permanent_file_path, file_size, content_hash))
+    
+    start_time = datetime.now()
+    batch_id = str(uuid.uuid4())
+    items: List[BatchItem] = []
+    
+    for metadata in stored_videos:
+        try:
+            # Nouvelle exécution complète : les résultats de la précédente ne sont plus valables
+            await mongodb_connector.delete_processing_results(metadata.video_id)
+            await mongodb_connector.update_processing_stage(
+                metadata.video_id, "queued", [], [], stages_running=[],
+                status="processing", processing_start_time=start_time, processing_end_time=None,
+                processing_params=params.model_dump(mode="json"), bytes_transferred=0,
+                batch_id=batch_id
             )
         except Exception as e:
-            print(f"Erreur sauvegarde MongoDB (aggregation): {e}")
+            print(f"Erreur update MongoDB (batch): {e}")
+        items.append(BatchItem(
+            metadata.video_id, metadata.file_path, metadata.original_filename,
+            metadata.file_size, metadata.content_hash
+        ))
     
-    except Exception as e:
-        result.aggregation = stage_result
-        return await handle_pipeline_failure(
-            "aggregation",
-            str(e),
-            stage_result
+    for video_file, permanent_file_path, file_size, content_hash in saved_uploads:
+        video_id = str(uuid.uuid4())
+        await register_processing_video(
+            video_id, start_time, permanent_file_path, video_file.filename,
+            video_file.content_type or "video/mp4", file_size, content_hash, params, batch_id
         )
+        items.append(BatchItem(video_id, permanent_file_path, video_file.filename, file_size, content_hash))
     
-    result.aggregation = stage_result
+    async def start_batch_item(item: BatchItem) -> asyncio.Future:
+        """Admet le pipeline d'une vidéo du lot dans le pool (503 si la file est pleine)."""
+        result = GlobalProcessingResult(
+            video_id=item.video_id,
+            overall_status=ProcessingStatus.PENDING,
+            started_at=datetime.now(),
+            message="Traitement en file d'attente..."
+        )
+        pipeline_future = await pipeline_worker_pool.submit(
+            item.video_id,
+            lambda: run_global_pipeline(
+                video_id=item.video_id,
+                video_path=item.video_path,
+                original_filename=item.original_filename,
+                params=params,
+                result=result,
+                content_hash=item.content_hash
+            ),
+            result,
+            params.priority
+        )
+        pipeline_event_bus.publish(item.video_id, "pipeline_queued", {"progress_percent": 0.0})
+        return pipeline_future
     
-    # ============================================================
-    # FINALISATION - SUCCÈS COMPLET
-    # ============================================================
+    batch = batch_scheduler.submit(items, params.model_dump(mode="json"), start_batch_item, batch_id)
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=jsonable_encoder(batch.get_status()),
+        headers={"Location": f"/api/v1/processing/batch/{batch.batch_id}"}
+    )
+
+
+@router.get(
+    "/batch/{batch_id}",
+    summary="Avancement d'un lot",
+    description="Retourne l'état de chaque vidéo du lot, la progression et le débit (vidéos/min, octets/s, durée moyenne d'un pipeline, temps restant estimé)."
+)
+async def get_batch_status(batch_id: str, include_items: bool = True):
+    """
+    Retourne l'avancement d'un lot de traitements.
     
-    # Marquer comme terminé avec succès
-    try:
-        await mongodb_connector.update_processing_stage(
-            video_id, "completed", stages_completed, stages_failed
+    Args:
+        batch_id: Identifiant du lot
+        include_items: Inclure l'état de chaque vidéo
+        
+    Returns:
+        Progression et débit du lot
+    """
+    batch = batch_scheduler.get(batch_id)
+    if not batch:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Lot {batch_id} non trouvé"
         )
-    except Exception as e:
-        print(f"Erreur update stage final: {e}")
+    return batch.get_status(include_items=include_items)
+
+
+def format_sse(event: PipelineEvent) -> str:
+    """Sérialise un événement de pipeline au format Server-Sent Events."""
+    data = json.dumps(jsonable_encoder(event.to_dict()), ensure_ascii=False)
+    return f"id: {event.id}\nevent: {event.event}\ndata: {data}\n\n"
+
+
+@router.get(
+    "/{video_id}/events",
+    summary="Suivre un traitement en temps réel (SSE)",
+    description=(
+        "Flux Server-Sent Events des transitions du pipeline d'une vidéo : démarrage et fin de chaque "
+        "étape avec sa durée, progression (%) et fin du pipeline. Le flux se ferme après "
+        "pipeline_completed ou pipeline_failed. Supporte la reprise via l'en-tête Last-Event-ID."
+    ),
+    responses={200: {"content": {"text/event-stream": {}}}}
+)
+async def stream_processing_events(video_id: str, request: Request):
+    """
+    Diffuse les événements d'avancement du pipeline d'une vidéo.
     
-    # Note: On ne supprime PAS le fichier vidéo car il est stocké de manière permanente
-    # pour permettre le streaming ultérieur
+    Les événements déjà publiés pour la dernière exécution (ou ceux après
+    Last-Event-ID) sont envoyés d'abord, puis les suivants au fil de l'eau. Pour
+    une vidéo dont le pipeline n'est pas connu de ce pod, un unique événement "snapshot" décrit son état dans MongoDB.
     
-    # Calculer la durée totale
-    end_time = datetime.now()
-    result.completed_at = end_time
-    result.total_duration = (end_time - start_time).total_seconds()
+    Args:
+        video_id: Identifiant de la vidéo
+        request: Requête HTTP (en-tête Last-Event-ID, détection de la déconnexion)
+        
+    Returns:
+        StreamingResponse: Flux text/event-stream
+    """
+    last_event_id = None
+    if request.headers.get("last-event-id", "").isdigit():
+        last_event_id = int(request.headers["last-event-id"])
     
-    # Toutes les 5 étapes ont réussi (sinon on aurait déjà retourné avec un échec)
-    result.overall_status = ProcessingStatus.COMPLETED
-    result.message = f"✅ Pipeline complet réussi ! (5/5 étapes en {result.total_duration:.1f}s)"
+    snapshot = None
+    if not pipeline_event_bus.has_events(video_id) and pipeline_worker_pool.get_result(video_id) is None:
+        # Pipeline inconnu de ce pod : état actuel depuis MongoDB
+        video_metadata = None
+        if mongodb_connector.client:
+            video_metadata = await mongodb_connector.get_video_metadata(video_id)
+        if not video_metadata:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Aucun traitement suivi pour la vidéo {video_id}"
+            )
+        snapshot = PipelineEvent(0, video_id, "snapshot", {
+            "status": video_metadata.status.value,
+            "current_stage": video_metadata.current_stage,
+            "stages_completed": video_metadata.stages_completed or [],
+            "stages_failed": video_metadata.stages_failed or [],
+            "stages_running": video_metadata.stages_running or []
+        })
     
-    # ============================================================
-    # METTRE À JOUR LE STATUT FINAL DANS MONGODB
-    # ============================================================
-    try:
-        await mongodb_connector.update_video_status(video_id, "completed")
-    except Exception as e:
-        print(f"Erreur mise à jour statut MongoDB: {e}")
+    async def event_stream():
+        if snapshot is not None:
+            yield format_sse(snapshot)
+            return
+        
+        queue, backlog = pipeline_event_bus.subscribe(video_id, last_event_id)
+        try:
+            for event in backlog:
+                yield format_sse(event)
+                if event.is_terminal:
+                    return
+            if pipeline_event_bus.is_finished(video_id):
+                return
+            
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(event)
+                if event.is_terminal:
+                    return
+        finally:
+            pipeline_event_bus.unsubscribe(video_id, queue)
     
-    return result
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def etag_response(request: Request, result: GlobalProcessingResult, etag: str) -> Response:
+    """Réponse JSON avec ETag, ou 304 Not Modified si le client a déjà cette version."""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        client_etags = {tag.strip() for tag in if_none_match.split(",")}
+        if etag in client_etags or "*" in client_etags:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return JSONResponse(content=jsonable_encoder(result), headers=headers)
 
 
 @router.get(
@@ -1634,108 +2450,125 @@ async def process_video_global(
     summary="Récupérer le résultat du traitement global",
     description="Récupère tous les résultats de traitement pour une vidéo."
 )
-async def get_global_processing_result(video_id: str):
+async def get_global_processing_result(video_id: str, request: Request):
     """
     Récupère le résultat complet du traitement global pour une vidéo.
     
+    Un pipeline en cours d'exécution dans ce pod (mode asynchrone) est servi depuis
+    la mémoire ; sinon l'état est reconstruit depuis MongoDB (une seule requête)
+    et gardé quelques secondes en cache. La réponse porte un ETag : si l'en-tête
+    If-None-Match du client correspond, la réponse est un 304 sans corps.
+    
     Args:
         video_id: Identifiant de la vidéo
+        request: Requête HTTP (en-tête If-None-Match)
         
     Returns:
         GlobalProcessingResult: Résultat complet avec toutes les étapes
     """
     try:
+        # Pipeline connu du pool de ce pod (en file, en cours ou récemment terminé)
+        live_result = pipeline_worker_pool.get_result(video_id)
+        if live_result:
+            return etag_response(request, live_result, compute_etag(live_result))
+        
+        # Résultat assemblé récemment (invalidé à chaque écriture de la vidéo)
+        cached = global_result_cache.get(video_id)
+        if cached:
+            return etag_response(request, *cached)
+        
         if not mongodb_connector.client:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail="MongoDB n'est pas disponible"
             )
         
-        # Récupérer tous les résultats
-        lang_result = await mongodb_connector.get_processing_result(
-            video_id=video_id,
-            processing_type="language_detection"
+        # Métadonnées + résultats de toutes les étapes en une seule requête
+        read_started_at = time.monotonic()
+        video_metadata, stage_results_by_type = await mongodb_connector.get_video_with_processing_results(
+            video_id, [stage.value for stage in ProcessingStage]
         )
-        
-        comp_result = await mongodb_connector.get_processing_result(
-            video_id=video_id,
-            processing_type="compression"
-        )
-        
-        sub_result = await mongodb_connector.get_processing_result(
-            video_id=video_id,
-            processing_type="subtitle_generation"
-        )
-        
-        animal_result = await mongodb_connector.get_processing_result(
-            video_id=video_id,
-            processing_type="animal_detection"
-        )
-        
-        agg_result = await mongodb_connector.get_processing_result(
-            video_id=video_id,
-            processing_type="aggregation"
-        )
-        
-        # Vérifier qu'au moins un résultat existe
-        if not any([lang_result, comp_result, sub_result, animal_result, agg_result]):
+        lang_result = stage_results_by_type.get("language_detection")
+        comp_result = stage_results_by_type.get("compression")
+        sub_result = stage_results_by_type.get("subtitle_generation")
+        animal_result = stage_results_by_type.get("animal_detection")
+        agg_result = stage_results_by_type.get("aggregation")
+        
+        # Vérifier qu'au moins un résultat existe (ou que le traitement a été admis)
+        if not video_metadata and not any([lang_result, comp_result, sub_result, animal_result, agg_result]):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Aucun résultat de traitement pour la vidéo {video_id}"
             )
         
+        # Statut global déduit des métadonnées (traitement asynchrone éventuellement en cours)
+        overall_status = ProcessingStatus.COMPLETED
+        message = "Résultats récupérés depuis la base de données"
+        started_at = datetime.now()  # Placeholder
+        if video_metadata:
+            started_at = video_metadata.processing_start_time or video_metadata.upload_time
+            if video_metadata.status == VideoStatus.FAILED:
+                overall_status = ProcessingStatus.FAILED
+                message = "Le traitement a échoué"
+            elif video_metadata.status == VideoStatus.PROCESSING:
+                if video_metadata.current_stage == "queued":
+                    overall_status = ProcessingStatus.PENDING
+                    message = "Traitement en file d'attente..."
+                else:
+                    overall_status = ProcessingStatus.PROCESSING
+                    message = "Traitement en cours..."
+            elif video_metadata.status == VideoStatus.UPLOADED:
+                overall_status = ProcessingStatus.PENDING
+                message = "Vidéo en attente de traitement"
+        
         # Construire la réponse
         result = GlobalProcessingResult(
             video_id=video_id,
-            overall_status=ProcessingStatus.COMPLETED,
-            started_at=datetime.now(),  # Placeholder
-            message="Résultats récupérés depuis la base de données"
+            overall_status=overall_status,
+            started_at=started_at,
+            message=message
         )
         
         # Ajouter les résultats disponibles
-        if lang_result:
-            result.language_detection = ProcessingStageResult(
-                stage=ProcessingStage.LANGUAGE_DETECTION,
-                status=ProcessingStatus.COMPLETED,
-                result=lang_result
-            )
-            result.success_count += 1
-        
-        if comp_result:
-            result.compression = ProcessingStageResult(
-                stage=ProcessingStage.COMPRESSION,
-                status=ProcessingStatus.COMPLETED,
-                result=comp_result
-            )
-            result.success_count += 1
-        
-        if sub_result:
-            result.subtitle_generation = ProcessingStageResult(
-                stage=ProcessingStage.SUBTITLE_GENERATION,
-                status=ProcessingStatus.COMPLETED,
-                result=sub_result
-            )
-            result.success_count += 1
-        
-        if animal_result:
-            result.animal_detection = ProcessingStageResult(
-                stage=ProcessingStage.ANIMAL_DETECTION,
-                status=ProcessingStatus.COMPLETED,
-                result=animal_result
-            )
-            result.success_count += 1
+        stage_results = {
+            ProcessingStage.LANGUAGE_DETECTION: lang_result,
+            ProcessingStage.COMPRESSION: comp_result,
+            ProcessingStage.SUBTITLE_GENERATION: sub_result,
+            ProcessingStage.ANIMAL_DETECTION: animal_result,
+            ProcessingStage.AGGREGATION: agg_result,
+        }
+        stages_failed = (video_metadata.stages_failed or []) if video_metadata else []
+        stages_running = (video_metadata.stages_running or []) if video_metadata else []
+        
+        for stage, stage_data in stage_results.items():
+            if stage_data:
+                setattr(result, stage.value, ProcessingStageResult(
+                    stage=stage,
+                    status=ProcessingStatus.COMPLETED,
+                    result=stage_data,
+                    retries=stage_data.get("retries", 0)
+                ))
+                result.success_count += 1
+            elif stage.value in stages_failed:
+                setattr(result, stage.value, ProcessingStageResult(
+                    stage=stage,
+                    status=ProcessingStatus.FAILED
+                ))
+                result.failure_count += 1
+            elif stage.value in stages_running and overall_status == ProcessingStatus.PROCESSING:
+                setattr(result, stage.value, ProcessingStageResult(
+                    stage=stage,
+                    status=ProcessingStatus.PROCESSING
+                ))
         
         if agg_result:
-            result.aggregation = ProcessingStageResult(
-                stage=ProcessingStage.AGGREGATION,
-                status=ProcessingStatus.COMPLETED,
-                result=agg_result
-            )
-            result.success_count += 1
             # Extraire l'URL de streaming finale
             result.final_streaming_url = agg_result.get("streaming_url")
+        if video_metadata and video_metadata.bytes_transferred:
+            result.bytes_transferred = video_metadata.bytes_transferred
         
-        return result
+        etag = global_result_cache.put(video_id, result, read_started_at)
+        return etag_response(request, result, etag)
         
     except HTTPException:
         raise
@@ -1760,7 +2593,8 @@ async def get_global_processing_result(video_id: str):
 async def start_animal_detection_with_upload(
     video_file: UploadFile = File(...),
     confidence_threshold: float = Form(0.5),
-    save_video: bool = Form(True)
+    save_video: bool = Form(True),
+    priority: ProcessingPriority = Form(ProcessingPriority.NORMAL)
 ):
     """
     Lance la détection d'animaux avec upload direct du fichier vidéo.
@@ -1769,6 +2603,7 @@ async def start_animal_detection_with_upload(
         video_file: Fichier vidéo à analyser
         confidence_threshold: Seuil de confiance minimum (0.1-1.0)
         save_video: Sauvegarder la vidéo avec annotations
+        priority: Classe de priorité du traitement (high, normal, low)
         
     Returns:
         ProcessingJobResponse: Informations sur le job lancé
@@ -1787,7 +2622,7 @@ async def start_animal_detection_with_upload(
             shutil.copyfileobj(video_file.file, buffer)
         
         # Vérifier que le service est accessible
-        service_healthy = await animal_detection_client.check_service_health()
+        service_healthy = service_health_monitor.is_available("animal_detection")
         if not service_healthy:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -1795,11 +2630,12 @@ async def start_animal_detection_with_upload(
             )
         
         # Lancer la détection
-        result = await animal_detection_client.detect_animals_in_video(
-            video_path=str(temp_file_path),
-            confidence_threshold=confidence_threshold,
-            save_video=save_video
-        )
+        with processing_priority(priority):
+            result = await animal_detection_client.detect_animals_in_video(
+                video_path=str(temp_file_path),
+                confidence_threshold=confidence_threshold,
+                save_video=save_video
+            )
         
         # Nettoyer le fichier temporaire
         try:
@@ -1885,7 +2721,7 @@ async def get_detectable_classes():
     """
     try:
         # Vérifier que le service est accessible
-        service_healthy = await animal_detection_client.check_service_health()
+        service_healthy = service_health_monitor.is_available("animal_detection")
         if not service_healthy:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -1924,13 +2760,17 @@ async def check_animal_detection_health():
         Dict: État du service
     """
     try:
-        is_healthy = await animal_detection_client.check_service_health()
+        # État maintenu en mémoire par le moniteur de santé
+        service_state = service_health_monitor.get_status()["animal_detection"]
+        is_healthy = service_state["status"] != "down" and service_health_monitor.is_available("animal_detection")
         
         return {
             "service": "animal_detection",
             "status": "healthy" if is_healthy else "unhealthy",
             "url": settings.animal_detection_service_url,
-            "message": "Service opérationnel" if is_healthy else "Service indisponible"
+            "message": "Service opérationnel" if is_healthy else "Service indisponible",
+            "last_checked": service_state["last_checked"],
+            "circuit_breaker": service_state["circuit_breaker"]
         }
     except Exception as e:
         return {
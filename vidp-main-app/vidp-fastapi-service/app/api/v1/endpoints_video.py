@@ -1,17 +1,36 @@
 """
 Endpoints pour la gestion des vidéos - Upload et statut.
 """
+import base64
+import binascii
+import json
 import uuid
 from datetime import datetime
-from typing import List
+from typing import List, Optional, Tuple
 from pathlib import Path
-from fastapi import APIRouter, File, UploadFile, HTTPException, status
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import APIRouter, File, UploadFile, HTTPException, Header, Query, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 
-from app.models.video_model import VideoUploadResponse, VideoStatus, VideoMetadata, ErrorResponse
+from app.models.video_model import (
+    VideoUploadResponse,
+    VideoStatus,
+    VideoMetadata,
+    VideoSummary,
+    ErrorResponse,
+    UploadSessionCreateRequest,
+    UploadSessionStatus,
+    UploadCompleteRequest
+)
 from app.services.file_storage import FileStorageService
+from app.services.upload_sessions import upload_session_manager
+from app.services.pipeline_worker import pipeline_worker_pool
+from app.services.storage_lifecycle import storage_lifecycle_manager
+from app.services.storage_accounting import storage_accounting
+from app.api.v1.endpoints_processing import start_global_processing
 from app.db.mongodb_connector import mongodb_connector
 from app.core.config import settings
+from app.utils.video_utils import get_media_info, remember_media_info
 
 # Création du router pour les endpoints vidéo
 router = APIRouter(prefix="/videos", tags=["videos"])
@@ -42,38 +61,12 @@ async def upload_video(file: UploadFile = File(..., description="Fichier vidéo
         video_id = str(uuid.uuid4())
         
         # Sauvegarde du fichier via le service de stockage
-        unique_filename, full_path, file_size = await FileStorageService.save_video_file(file)
+        unique_filename, full_path, file_size, content_hash = await FileStorageService.save_video_file(file)
         
-        # Création des métadonnées
-        upload_time = datetime.now()
-        metadata = VideoMetadata(
-            video_id=video_id,
-            original_filename=file.filename,
-            file_path=full_path,
-            file_size=file_size,
-            content_type=file.content_type,
-            status=VideoStatus.UPLOADED,
-            upload_time=upload_time
+        return await register_uploaded_video(
+            video_id, file.filename, file.content_type, full_path, file_size, content_hash
         )
         
-        # Sauvegarde dans MongoDB (si disponible)
-        if mongodb_connector.client:
-            await mongodb_connector.save_video_metadata(metadata)
-        
-        # Création de la réponse
-        response = VideoUploadResponse(
-            video_id=video_id,
-            filename=file.filename,
-            file_path=full_path,
-            file_size=file_size,
-            content_type=file.content_type,
-            status=VideoStatus.UPLOADED,
-            upload_time=upload_time,
-            message=f"Vidéo '{file.filename}' uploadée avec succès"
-        )
-        
-        return response
-        
     except HTTPException:
         # Re-lever les HTTPException du service de stockage
         raise
@@ -85,6 +78,276 @@ async def upload_video(file: UploadFile = File(..., description="Fichier vidéo
         )
 
 
+async def register_uploaded_video(
+    video_id: str,
+    filename: str,
+    content_type: str,
+    full_path: str,
+    file_size: int,
+    content_hash: str
+) -> VideoUploadResponse:
+    """
+    Enregistre les métadonnées d'une vidéo stockée (upload direct ou par morceaux).
+    
+    Args:
+        video_id: Identifiant de la nouvelle vidéo
+        filename: Nom original du fichier
+        content_type: Type MIME du fichier
+        full_path: Chemin du fichier stocké
+        file_size: Taille du fichier en octets
+        content_hash: Empreinte SHA-256 du contenu
+        
+    Returns:
+        VideoUploadResponse: Informations sur la vidéo uploadée
+    """
+    # Contenu déjà uploadé : lier la nouvelle vidéo au fichier existant
+    duplicate_of = None
+    if mongodb_connector.client:
+        original_video = await mongodb_connector.find_video_by_content_hash(content_hash)
+        if original_video:
+            duplicate_of = original_video.video_id
+            if original_video.media_info:
+                remember_media_info(content_hash, original_video.media_info)
+    
+    # Analyse technique de la vidéo (un seul ffprobe par contenu, réutilisé par le pipeline)
+    media_info = await get_media_info(full_path, content_hash)
+    
+    # Création des métadonnées
+    upload_time = datetime.now()
+    metadata = VideoMetadata(
+        video_id=video_id,
+        original_filename=filename,
+        file_path=full_path,
+        file_size=file_size,
+        content_type=content_type,
+        status=VideoStatus.UPLOADED,
+        upload_time=upload_time,
+        content_hash=content_hash,
+        duplicate_of=duplicate_of,
+        media_info=media_info
+    )
+    
+    # Sauvegarde dans MongoDB (si disponible)
+    if mongodb_connector.client:
+        await mongodb_connector.save_video_metadata(metadata)
+    
+    # Création de la réponse
+    response = VideoUploadResponse(
+        video_id=video_id,
+        filename=filename,
+        file_path=full_path,
+        file_size=file_size,
+        content_type=content_type,
+        status=VideoStatus.UPLOADED,
+        upload_time=upload_time,
+        message=(
+            f"Vidéo '{filename}' déjà présente (contenu identique à {duplicate_of}), fichier existant réutilisé"
+            if duplicate_of else
+            f"Vidéo '{filename}' uploadée avec succès"
+        ),
+        content_hash=content_hash,
+        duplicate_of=duplicate_of
+    )
+    
+    return response
+
+
+@router.post(
+    "/uploads",
+    response_model=UploadSessionStatus,
+    status_code=status.HTTP_201_CREATED,
+    summary="Créer une session d'upload par morceaux",
+    description=(
+        "Crée une session d'upload reprenable pour une vidéo volumineuse. Les morceaux sont "
+        "ensuite envoyés par PUT /uploads/{upload_id}/chunks/{index}, puis la session est "
+        "finalisée par POST /uploads/{upload_id}/complete."
+    )
+)
+async def create_upload_session(request: UploadSessionCreateRequest, response: Response):
+    """
+    Endpoint de création d'une session d'upload reprenable.
+    
+    Args:
+        request: Nom, taille totale, type MIME et empreinte attendue du fichier
+        
+    Returns:
+        UploadSessionStatus: Session créée (taille et nombre de morceaux)
+    """
+    session = upload_session_manager.create(
+        filename=request.filename,
+        content_type=request.content_type,
+        file_size=request.file_size,
+        chunk_size=request.chunk_size,
+        expected_sha256=request.sha256
+    )
+    response.headers["Location"] = f"/api/v1/videos/uploads/{session.upload_id}"
+    return session.to_status()
+
+
+@router.get(
+    "/uploads/{upload_id}",
+    response_model=UploadSessionStatus,
+    summary="État d'une session d'upload",
+    description="Retourne les octets déjà reçus et le prochain morceau attendu, pour reprendre un upload interrompu."
+)
+async def get_upload_session(upload_id: str):
+    """
+    Endpoint d'état d'une session d'upload.
+    
+    Args:
+        upload_id: Identifiant de la session
+        
+    Returns:
+        UploadSessionStatus: État de la session (ou vidéo créée si elle est finalisée)
+    """
+    finalized = upload_session_manager.get_finalized(upload_id)
+    if finalized:
+        return finalized
+    session = await upload_session_manager.get(upload_id)
+    return session.to_status()
+
+
+@router.put(
+    "/uploads/{upload_id}/chunks/{index}",
+    response_model=UploadSessionStatus,
+    summary="Envoyer un morceau",
+    description=(
+        "Envoie le morceau n°index (à partir de 0) dans le corps brut de la requête. Les morceaux "
+        "sont acceptés dans l'ordre ; un morceau déjà reçu est ignoré. L'empreinte SHA-256 du "
+        "morceau peut être fournie dans l'en-tête X-Chunk-SHA256."
+    )
+)
+async def upload_chunk(
+    upload_id: str,
+    index: int,
+    request: Request,
+    offset: Optional[int] = Query(None, ge=0, description="Offset du morceau dans le fichier (vérifié s'il est fourni)"),
+    x_chunk_sha256: Optional[str] = Header(None, description="Empreinte SHA-256 du morceau")
+):
+    """
+    Endpoint d'envoi d'un morceau de vidéo.
+    
+    Le corps est écrit en flux dans le fichier partiel, sans être chargé en mémoire.
+    
+    Args:
+        upload_id: Identifiant de la session
+        index: Numéro du morceau
+        offset: Offset attendu du morceau (index * chunk_size)
+        x_chunk_sha256: Empreinte SHA-256 du morceau
+        
+    Returns:
+        UploadSessionStatus: État de la session après le morceau
+        
+    Raises:
+        HTTPException: 409 si le morceau n'est pas le prochain attendu (le détail indique
+            l'offset de reprise), 400 si sa taille, son offset ou son empreinte est incorrect
+    """
+    session = await upload_session_manager.get(upload_id)
+    if index < 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Numéro de morceau invalide"
+        )
+    if offset is not None and offset != index * session.chunk_size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Offset {offset} incohérent avec le morceau {index} (attendu: {index * session.chunk_size})"
+        )
+    
+    await upload_session_manager.write_chunk(session, index, request.stream(), x_chunk_sha256)
+    return session.to_status()
+
+
+@router.post(
+    "/uploads/{upload_id}/complete",
+    status_code=status.HTTP_201_CREATED,
+    summary="Finaliser une session d'upload",
+    description=(
+        "Assemble la vidéo une fois tous les morceaux reçus (vérification de l'empreinte, "
+        "déduplication) et l'enregistre. Avec process=true, le traitement global est lancé "
+        "(202 + Location en mode asynchrone)."
+    ),
+    responses={202: {"description": "Vidéo assemblée et traitement mis en file d'attente (process=true)"}}
+)
+async def complete_upload_session(upload_id: str, request: Optional[UploadCompleteRequest] = None):
+    """
+    Endpoint de finalisation d'une session d'upload.
+    
+    Args:
+        upload_id: Identifiant de la session
+        request: Lancement optionnel du pipeline global et ses paramètres
+        
+    Returns:
+        VideoUploadResponse, ou GlobalProcessingResult si le traitement est lancé
+        
+    Raises:
+        HTTPException: 409 si des morceaux manquent ou si la session est déjà finalisée,
+            503 si le pipeline est demandé alors que la file est pleine
+    """
+    request = request or UploadCompleteRequest()
+    
+    finalized = upload_session_manager.get_finalized(upload_id)
+    if finalized:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Session d'upload déjà finalisée (vidéo {finalized['video_id']})"
+        )
+    session = await upload_session_manager.get(upload_id)
+    
+    # Refuser avant l'assemblage : la session reste intacte et la finalisation peut être rejouée
+    if request.process and pipeline_worker_pool.is_full():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Trop de traitements en attente, réessayez plus tard",
+            headers={"Retry-After": "30"}
+        )
+    
+    start_time = datetime.now()
+    unique_filename, full_path, file_size, content_hash = await upload_session_manager.finalize(session)
+    video_id = str(uuid.uuid4())
+    upload_session_manager.mark_finalized(session, video_id)
+    print(f"📦 Session d'upload {upload_id} finalisée : vidéo {video_id} ({unique_filename})")
+    
+    if request.process:
+        return await start_global_processing(
+            video_id=video_id,
+            start_time=start_time,
+            video_path=full_path,
+            original_filename=session.filename,
+            content_type=session.content_type,
+            file_size=file_size,
+            content_hash=content_hash,
+            params=request.params,
+            async_mode=request.async_mode
+        )
+    
+    return await register_uploaded_video(
+        video_id, session.filename, session.content_type, full_path, file_size, content_hash
+    )
+
+
+@router.delete(
+    "/uploads/{upload_id}",
+    summary="Abandonner une session d'upload",
+    description="Supprime la session et les morceaux déjà reçus."
+)
+async def abort_upload_session(upload_id: str):
+    """
+    Endpoint d'abandon d'une session d'upload.
+    
+    Args:
+        upload_id: Identifiant de la session
+        
+    Returns:
+        Dict: Message de confirmation
+    """
+    await upload_session_manager.abort(upload_id)
+    return {
+        "message": f"Session d'upload {upload_id} abandonnée",
+        "upload_id": upload_id
+    }
+
+
 @router.get(
     "/health",
     summary="Vérification de l'état du service",
@@ -107,46 +370,95 @@ async def health_check():
 @router.get(
     "/stats",
     summary="Statistiques du stockage",
-    description="Retourne des statistiques sur l'utilisation du stockage local."
+    description=(
+        "Retourne des statistiques sur l'utilisation du stockage local (fichiers, octets, vidéos "
+        "par statut), tenues à jour à chaque écriture et réconciliées périodiquement."
+    )
 )
 async def get_storage_stats():
     """
     Endpoint pour obtenir des statistiques sur le stockage.
     
+    Les compteurs sont maintenus en mémoire : la réponse ne parcourt pas le dossier
+    de stockage et n'interroge pas MongoDB.
+    
     Returns:
         Dict: Statistiques du stockage
     """
-    try:
-        from pathlib import Path
-        from app.core.config import settings
-        
-        storage_path = Path(settings.local_video_path)
-        
-        if not storage_path.exists():
-            return {
-                "total_files": 0,
-                "total_size_bytes": 0,
-                "total_size_mb": 0,
-                "storage_path": str(storage_path)
-            }
-        
-        # Compter les fichiers et calculer la taille totale
-        video_files = list(storage_path.glob("*"))
-        total_files = len(video_files)
-        total_size = sum(f.stat().st_size for f in video_files if f.is_file())
-        
-        return {
-            "total_files": total_files,
-            "total_size_bytes": total_size,
-            "total_size_mb": round(total_size / (1024 * 1024), 2),
-            "storage_path": str(storage_path)
-        }
+    return storage_accounting.get_stats()
+
+
+@router.get(
+    "/storage/lifecycle",
+    summary="Cycle de vie du stockage",
+    description=(
+        "Politiques de suppression des vidéos originales (quota, ancienneté), résultat de la "
+        "dernière passe et dernières suppressions enregistrées."
+    )
+)
+async def get_storage_lifecycle(limit: int = Query(50, ge=1, le=500, description="Nombre de suppressions retournées")):
+    """
+    Endpoint d'état du cycle de vie du stockage.
+    
+    Args:
+        limit: Nombre maximal de suppressions retournées
         
-    except Exception as e:
+    Returns:
+        Dict: Statistiques du gestionnaire et dernières suppressions
+    """
+    return {
+        **storage_lifecycle_manager.get_stats(),
+        "recent_evictions": await mongodb_connector.list_storage_evictions(limit)
+    }
+
+
+@router.post(
+    "/storage/lifecycle/run",
+    summary="Lancer une passe du cycle de vie du stockage",
+    description="Applique immédiatement les politiques de quota et d'ancienneté aux vidéos originales."
+)
+async def run_storage_lifecycle():
+    """
+    Endpoint de lancement manuel d'une passe de nettoyage.
+    
+    Returns:
+        Dict: Résumé de la passe
+    """
+    return await storage_lifecycle_manager.run_once()
+
+
+@router.get(
+    "/export",
+    summary="Exporter les métadonnées des vidéos",
+    description="Exporte les métadonnées complètes de toutes les vidéos au format NDJSON (une vidéo par ligne), en flux."
+)
+async def export_videos(
+    status_filter: Optional[VideoStatus] = Query(None, alias="status", description="Filtrer par statut")
+):
+    """
+    Endpoint d'export en masse des métadonnées vidéo.
+    
+    Les documents sont lus par lots depuis MongoDB et envoyés au fur et à mesure,
+    sans construire la liste complète en mémoire.
+    
+    Raises:
+        HTTPException: Si MongoDB n'est pas disponible
+    """
+    if not mongodb_connector.client:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erreur lors de la récupération des statistiques: {str(e)}"
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="MongoDB n'est pas disponible"
         )
+    
+    async def ndjson_lines():
+        async for doc in mongodb_connector.iter_all_videos(status=status_filter.value if status_filter else None):
+            yield json.dumps(jsonable_encoder(doc), ensure_ascii=False) + "\n"
+    
+    return StreamingResponse(
+        ndjson_lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="videos.ndjson"'}
+    )
 
 
 @router.get(
@@ -185,21 +497,60 @@ async def get_video_metadata(video_id: str):
     return metadata
 
 
+# Taille de page utilisée quand un curseur est fourni sans limite
+DEFAULT_LIST_PAGE_SIZE = 100
+
+
+def encode_list_cursor(video: VideoSummary) -> str:
+    """Curseur opaque pointant après une vidéo de la liste."""
+    raw = f"{video.upload_time.isoformat()}|{video.video_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_list_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Décode un curseur de liste en (upload_time, video_id)."""
+    try:
+        upload_time, video_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", 1)
+        return datetime.fromisoformat(upload_time), video_id
+    except (ValueError, binascii.Error, UnicodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Curseur de pagination invalide"
+        )
+
+
 @router.get(
     "/",
-    response_model=List[VideoMetadata],
-    summary="Liste toutes les vidéos",
-    description="Récupère la liste de toutes les vidéos avec leurs métadonnées depuis MongoDB."
+    response_model=List[VideoSummary],
+    summary="Liste les vidéos",
+    description=(
+        "Récupère les vidéos depuis MongoDB, des plus récentes aux plus anciennes. "
+        "Sans limit ni cursor, toutes les vidéos sont retournées. La pagination est activée "
+        "par limit ou cursor : le curseur de la page suivante est alors renvoyé dans l'en-tête X-Next-Cursor."
+    )
 )
-async def list_all_videos():
+async def list_all_videos(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Nombre maximal de vidéos par page (active la pagination)"),
+    cursor: Optional[str] = Query(None, description="Curseur renvoyé par la page précédente (X-Next-Cursor)"),
+    status_filter: Optional[VideoStatus] = Query(None, alias="status", description="Filtrer par statut")
+):
     """
-    Endpoint pour lister toutes les vidéos.
+    Endpoint pour lister les vidéos, en une fois ou par pages.
+    
+    La pagination est optionnelle : sans limit ni cursor, toutes les vidéos sont
+    retournées (comportement historique, utilisé par l'interface web).
+    
+    Args:
+        limit: Nombre maximal de vidéos retournées (None = toutes, ou DEFAULT_LIST_PAGE_SIZE avec un curseur)
+        cursor: Curseur de la page précédente
+        status_filter: Statut des vidéos à retourner
     
     Returns:
-        List[VideoMetadata]: Liste des métadonnées de toutes les vidéos
+        List[VideoSummary]: Métadonnées allégées des vidéos (de la page)
         
     Raises:
-        HTTPException: Si MongoDB n'est pas disponible
+        HTTPException: Si MongoDB n'est pas disponible ou si le curseur est invalide
     """
     if not mongodb_connector.client:
         raise HTTPException(
@@ -207,7 +558,23 @@ async def list_all_videos():
             detail="MongoDB n'est pas disponible"
         )
     
-    videos = await mongodb_connector.list_all_videos()
+    status_value = status_filter.value if status_filter else None
+    if limit is None and cursor is None:
+        videos = await mongodb_connector.list_all_videos(status=status_value)
+        print(f"Nombre de vidéos récupéré : {len(videos)}")
+        return videos
+    
+    limit = limit or DEFAULT_LIST_PAGE_SIZE
+    after = decode_list_cursor(cursor) if cursor else None
+    # Un élément de plus que demandé pour savoir s'il existe une page suivante
+    videos = await mongodb_connector.list_all_videos(
+        limit=limit + 1,
+        after=after,
+        status=status_value
+    )
+    if len(videos) > limit:
+        videos = videos[:limit]
+        response.headers["X-Next-Cursor"] = encode_list_cursor(videos[-1])
     # Log du nombre de vidéos récupéré dans le terminal
     print(f"Nombre de vidéos récupéré : {len(videos)}")
     return videos
@@ -269,7 +636,8 @@ async def stream_video(video_id: str):
         FileResponse: Fichier vidéo
         
     Raises:
-        HTTPException: Si la vidéo n'est pas trouvée
+        HTTPException: 404 si la vidéo n'est pas trouvée, 410 si son fichier original
+            a été supprimé par le cycle de vie du stockage
     """
     # Récupérer les métadonnées pour obtenir le chemin du fichier
     if mongodb_connector.client:
@@ -277,11 +645,21 @@ async def stream_video(video_id: str):
         if metadata:
             file_path = Path(metadata.file_path)
             if file_path.exists():
+                FileStorageService.touch_file(str(file_path))
                 return FileResponse(
                     path=str(file_path),
                     media_type=metadata.content_type,
                     filename=metadata.original_filename
                 )
+            if metadata.original_evicted_at:
+                raise HTTPException(
+                    status_code=status.HTTP_410_GONE,
+                    detail=(
+                        f"Fichier original de la vidéo {video_id} supprimé le "
+                        f"{metadata.original_evicted_at.isoformat()} (cycle de vie du stockage) : "
+                        f"utiliser la vidéo finale du pipeline"
+                    )
+                )
     
     # Fallback: chercher directement dans le dossier de stockage
     video_path = Path(settings.local_video_path) / f"{video_id}.mp4"
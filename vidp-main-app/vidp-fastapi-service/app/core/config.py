@@ -23,6 +23,29 @@ class Settings(BaseSettings):
     local_storage_root: str = Field(default="./local_storage", env="LOCAL_STORAGE_ROOT")
     local_video_path: str = Field(default="./local_storage/videos", env="LOCAL_VIDEO_PATH")
     
+    # Uploads reprenables par morceaux : taille de morceau par défaut et durée de vie (s)
+    # d'une session d'upload inactive
+    upload_session_chunk_size: int = Field(default=8 * 1024 * 1024, env="UPLOAD_SESSION_CHUNK_SIZE")
+    upload_session_ttl: int = Field(default=86400, env="UPLOAD_SESSION_TTL")
+    
+    # Stockage partagé avec les microservices (volume ReadWriteMany) : les vidéos leur sont
+    # transmises par chemin relatif à LOCAL_STORAGE_ROOT au lieu d'être uploadées
+    shared_storage_enabled: bool = Field(default=False, env="SHARED_STORAGE_ENABLED")
+    
+    # Cycle de vie du stockage : suppression des vidéos originales dont l'agrégation est
+    # terminée, inutilisées depuis STORAGE_RETENTION_SECONDS (0 : jamais par ancienneté),
+    # ou les moins récemment utilisées tant que le stockage dépasse STORAGE_QUOTA_BYTES
+    # (0 : pas de quota). Passe toutes les STORAGE_LIFECYCLE_INTERVAL secondes.
+    # Désactivé par défaut : une fois supprimé, l'original n'est plus servi par /videos/stream (410).
+    storage_lifecycle_enabled: bool = Field(default=False, env="STORAGE_LIFECYCLE_ENABLED")
+    storage_lifecycle_interval: float = Field(default=600.0, env="STORAGE_LIFECYCLE_INTERVAL")
+    storage_quota_bytes: int = Field(default=0, env="STORAGE_QUOTA_BYTES")
+    storage_retention_seconds: int = Field(default=7 * 86400, env="STORAGE_RETENTION_SECONDS")
+    
+    # Statistiques du stockage (GET /videos/stats) : compteurs incrémentaux, recalculés par
+    # un parcours du dossier et une agrégation MongoDB toutes les N secondes
+    storage_stats_reconcile_interval: float = Field(default=3600.0, env="STORAGE_STATS_RECONCILE_INTERVAL")
+    
     # Configuration MongoDB (pour usage futur)
     mongodb_url: str = Field(default="mongodb://localhost:27017", env="MONGODB_URL")
     mongodb_database: str = Field(default="vidp_db", env="MONGODB_DATABASE")
@@ -38,6 +61,66 @@ class Settings(BaseSettings):
     aggregation_service_url: str = Field(default="http://load-balancer-aggregation-1561173798.us-east-1.elb.amazonaws.com", env="AGGREGATION_SERVICE_URL")
     # Timeout augmenté à 1 heure 30 minutes pour les traitements longs (vidéos volumineuses)
     microservices_timeout: int = Field(default=18000, env="MICROSERVICES_TIMEOUT")
+    
+    # Pools de connexions HTTP vers les microservices (un client partagé par service)
+    http_max_connections: int = Field(default=20, env="HTTP_MAX_CONNECTIONS")
+    http_max_keepalive_connections: int = Field(default=10, env="HTTP_MAX_KEEPALIVE_CONNECTIONS")
+    http_keepalive_expiry: float = Field(default=60.0, env="HTTP_KEEPALIVE_EXPIRY")
+    http2_enabled: bool = Field(default=True, env="HTTP2_ENABLED")
+    
+    # Traitements envoyés simultanément à chaque microservice (0 = pas de limite), file
+    # d'attente bornée au-delà (429 + Retry-After quand elle est pleine) et attente maximale (s).
+    # La borne et l'attente maximale ne s'appliquent qu'aux appels directs, pas aux pipelines
+    language_detection_max_concurrency: int = Field(default=4, env="LANGUAGE_DETECTION_MAX_CONCURRENCY")
+    compression_max_concurrency: int = Field(default=2, env="COMPRESSION_MAX_CONCURRENCY")
+    subtitle_max_concurrency: int = Field(default=2, env="SUBTITLE_MAX_CONCURRENCY")
+    animal_detection_max_concurrency: int = Field(default=2, env="ANIMAL_DETECTION_MAX_CONCURRENCY")
+    aggregation_max_concurrency: int = Field(default=4, env="AGGREGATION_MAX_CONCURRENCY")
+    service_queue_size: int = Field(default=20, env="SERVICE_QUEUE_SIZE")
+    service_queue_timeout: float = Field(default=900.0, env="SERVICE_QUEUE_TIMEOUT")
+    
+    # Nouvelles tentatives des appels de traitement en cas d'erreur transitoire : nombre
+    # maximal de tentatives, délai exponentiel avec gigue (s) et budget (proportion des appels)
+    service_retry_max_attempts: int = Field(default=3, env="SERVICE_RETRY_MAX_ATTEMPTS")
+    service_retry_base_delay: float = Field(default=2.0, env="SERVICE_RETRY_BASE_DELAY")
+    service_retry_max_delay: float = Field(default=30.0, env="SERVICE_RETRY_MAX_DELAY")
+    service_retry_budget_ratio: float = Field(default=0.2, env="SERVICE_RETRY_BUDGET_RATIO")
+    
+    # Configuration du pool de pipelines (nombre de traitements globaux simultanés et file d'attente)
+    pipeline_max_concurrency: int = Field(default=2, env="PIPELINE_MAX_CONCURRENCY")
+    pipeline_queue_size: int = Field(default=50, env="PIPELINE_QUEUE_SIZE")
+    
+    # Traitement par lots (POST /processing/batch) : taille max. d'un lot et vidéos admises par lot à la fois
+    batch_max_videos: int = Field(default=500, env="BATCH_MAX_VIDEOS")
+    batch_max_in_flight: int = Field(default=2, env="BATCH_MAX_IN_FLIGHT")
+    
+    # Priorités : une demande en attente gagne une classe de priorité toutes les N secondes (0 = pas de vieillissement)
+    priority_aging_seconds: float = Field(default=60.0, env="PRIORITY_AGING_SECONDS")
+    
+    # Cache des résultats d'étapes (même contenu + mêmes paramètres => pas d'appel au microservice)
+    stage_cache_enabled: bool = Field(default=True, env="STAGE_CACHE_ENABLED")
+    stage_cache_ttl_seconds: int = Field(default=86400, env="STAGE_CACHE_TTL_SECONDS")
+    
+    # Surveillance de la santé des microservices et disjoncteurs (circuit breakers)
+    health_check_interval: float = Field(default=15.0, env="HEALTH_CHECK_INTERVAL")
+    circuit_breaker_failure_threshold: int = Field(default=5, env="CIRCUIT_BREAKER_FAILURE_THRESHOLD")
+    circuit_breaker_recovery_timeout: float = Field(default=30.0, env="CIRCUIT_BREAKER_RECOVERY_TIMEOUT")
+    
+    # Durée de vie (s) des résultats globaux assemblés, mis en cache pour les requêtes de suivi
+    global_result_cache_ttl: float = Field(default=2.0, env="GLOBAL_RESULT_CACHE_TTL")
+    
+    # Métriques Prometheus exposées sur GET /metrics (scrape local, sans service externe)
+    metrics_enabled: bool = Field(default=True, env="METRICS_ENABLED")
+    
+    # Traçage distribué : export des spans ("none", "file" ou "otlp"), fichier JSON lines
+    # et endpoint OTLP/HTTP (par exemple un OpenTelemetry Collector local)
+    tracing_service_name: str = Field(default="main-app", env="TRACING_SERVICE_NAME")
+    tracing_exporter: str = Field(default="none", env="TRACING_EXPORTER")
+    tracing_file: str = Field(default="./local_storage/traces/spans.jsonl", env="TRACING_FILE")
+    tracing_otlp_endpoint: str = Field(default="http://localhost:4318/v1/traces", env="TRACING_OTLP_ENDPOINT")
+    
+    # Endpoints de diagnostic (GET /debug/startup : temps de démarrage et d'import des modules)
+    debug_endpoints_enabled: bool = Field(default=False, env="DEBUG_ENDPOINTS_ENABLED")
 
     class Config:
         env_file = ".env"
@@ -2,12 +2,25 @@
 Connecteur MongoDB pour la gestion des métadonnées vidéo.
 Module préparé pour l'intégration future avec MongoDB.
 """
-from typing import Optional, List
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
 from pymongo.errors import ConnectionFailure
 
 from app.core.config import settings
-from app.models.video_model import VideoMetadata
+from app.models.video_model import VideoMetadata, VideoSummary
+from app.services.metrics import MongoCommandMetrics
+
+
+# Tri des listes de vidéos (des plus récentes aux plus anciennes), départagé par video_id
+VIDEO_LIST_SORT = [("upload_time", DESCENDING), ("video_id", DESCENDING)]
+
+# Champs lus pour les listes de vidéos
+VIDEO_SUMMARY_PROJECTION = {"_id": 0, **{field: 1 for field in VideoSummary.model_fields}}
+
+# Document des compteurs de stockage (collection storage_stats)
+STORAGE_STATS_ID = "local_storage"
 
 
 class MongoDBConnector:
@@ -22,6 +35,47 @@ class MongoDBConnector:
         self.client: Optional[AsyncIOMotorClient] = None
         self.database = None
         self.collection = None
+        # Fonctions appelées (avec le video_id) après chaque écriture de l'état d'une vidéo
+        self._write_listeners: List[Callable[[str], None]] = []
+        # Fonctions appelées (ancien statut, nouveau statut, taille) à chaque changement de statut
+        self._status_listeners: List[Callable[[Optional[str], str, int], None]] = []
+    
+    def add_write_listener(self, listener: Callable[[str], None]):
+        """
+        Enregistre une fonction appelée après chaque écriture concernant une vidéo
+        (métadonnées, statut, étape, résultat de traitement).
+        
+        Args:
+            listener: Fonction synchrone recevant le video_id modifié
+        """
+        self._write_listeners.append(listener)
+    
+    def _notify_write(self, video_id: str):
+        for listener in self._write_listeners:
+            try:
+                listener(video_id)
+            except Exception as e:
+                print(f"Erreur dans un listener d'écriture MongoDB: {e}")
+    
+    def add_status_listener(self, listener: Callable[[Optional[str], str, int], None]):
+        """
+        Enregistre une fonction appelée à chaque création de vidéo et changement de statut.
+        
+        Args:
+            listener: Fonction synchrone recevant l'ancien statut (None à la création),
+                le nouveau statut et la taille du fichier de la vidéo
+        """
+        self._status_listeners.append(listener)
+    
+    def _notify_status(self, previous: Optional[dict], new_status: str):
+        """Signale un changement de statut, d'après le document avant mise à jour."""
+        if previous is None or previous.get("status") == new_status:
+            return
+        for listener in self._status_listeners:
+            try:
+                listener(previous.get("status"), new_status, previous.get("file_size") or 0)
+            except Exception as e:
+                print(f"Erreur dans un listener de statut MongoDB: {e}")
     
     async def connect(self) -> bool:
         """
@@ -31,15 +85,53 @@ class MongoDBConnector:
             bool: True si la connexion est réussie, False sinon
         """
         try:
-            self.client = AsyncIOMotorClient(settings.mongodb_url)
+            # Durée de chaque commande relevée pour les métriques Prometheus
+            self.client = AsyncIOMotorClient(settings.mongodb_url, event_listeners=[MongoCommandMetrics()])
             # Test de la connexion
             await self.client.admin.command('ping')
             self.database = self.client[settings.mongodb_database]
             self.collection = self.database.video_metadata
+            await self._create_indexes()
             return True
         except ConnectionFailure:
             return False
     
+    async def _create_indexes(self):
+        """
+        Crée les index nécessaires (opération idempotente).
+        
+        Chaque index est créé indépendamment : l'échec de l'un (ex: doublons
+        existants empêchant un index unique) n'empêche pas la création des autres.
+        """
+        processing_collection = self.database.processing_results
+        indexes = [
+            # Recherche d'une vidéo par son identifiant
+            (self.collection, [("video_id", ASCENDING)], {"unique": True}),
+            # Liste des vidéos triée par date d'upload (pagination par clé), filtrée ou non par statut
+            (self.collection, VIDEO_LIST_SORT, {}),
+            (self.collection, [("status", ASCENDING)] + VIDEO_LIST_SORT, {}),
+            # Index empreinte de contenu -> vidéo (déduplication des uploads)
+            (self.collection, [("content_hash", ASCENDING)], {"sparse": True}),
+            # Vidéos partageant un fichier stocké (gestion du cycle de vie du stockage)
+            (self.collection, [("file_path", ASCENDING)], {}),
+            # Résultats de traitement d'une vidéo (les entrées du cache n'ont pas de video_id)
+            (
+                processing_collection,
+                [("video_id", ASCENDING), ("processing_type", ASCENDING)],
+                {"unique": True, "partialFilterExpression": {"video_id": {"$exists": True}}}
+            ),
+            # Cache des résultats d'étapes : clé unique + expiration automatique (TTL)
+            (processing_collection, [("cache_key", ASCENDING)], {"unique": True, "sparse": True}),
+            (processing_collection, [("expires_at", ASCENDING)], {"expireAfterSeconds": 0, "sparse": True}),
+            # Journal des fichiers originaux supprimés, des plus récents aux plus anciens
+            (self.database.storage_evictions, [("evicted_at", DESCENDING)], {}),
+        ]
+        for collection, keys, options in indexes:
+            try:
+                await collection.create_index(keys, **options)
+            except Exception as e:
+                print(f"Erreur lors de la création de l'index {keys} sur {collection.name}: {e}")
+    
     async def disconnect(self):
         """Ferme la connexion à MongoDB."""
         if self.client:
@@ -62,6 +154,8 @@ class MongoDBConnector:
             # Convertir en dict et gérer les dates
             metadata_dict = metadata.model_dump()
             await self.collection.insert_one(metadata_dict)
+            self._notify_write(metadata.video_id)
+            self._notify_status({"status": None, "file_size": metadata.file_size}, metadata.status.value)
             print(f"save_video_metadata: Métadonnées pour video_id {metadata.video_id} sauvegardées avec succès.")
             return True
         except Exception as e:
@@ -92,6 +186,51 @@ class MongoDBConnector:
             print(f"Erreur lors de la récupération des métadonnées: {e}")
             return None
     
+    async def get_videos_metadata(self, video_ids: List[str]) -> Dict[str, VideoMetadata]:
+        """
+        Récupère les métadonnées de plusieurs vidéos en une seule requête.
+        
+        Args:
+            video_ids: Identifiants des vidéos
+            
+        Returns:
+            Métadonnées indexées par video_id (les vidéos inconnues sont absentes)
+        """
+        if self.collection is None or not video_ids:
+            return {}
+        try:
+            cursor = self.collection.find({"video_id": {"$in": video_ids}}, {"_id": 0})
+            docs = await cursor.to_list(length=len(video_ids))
+            return {doc["video_id"]: VideoMetadata(**doc) for doc in docs}
+        except Exception as e:
+            print(f"Erreur lors de la récupération des métadonnées: {e}")
+            return {}
+    
+    async def find_video_by_content_hash(self, content_hash: str) -> Optional[VideoMetadata]:
+        """
+        Récupère la première vidéo uploadée ayant un contenu donné.
+        
+        Args:
+            content_hash: Empreinte SHA-256 du contenu
+            
+        Returns:
+            VideoMetadata de la vidéo d'origine ou None si aucun contenu identique
+        """
+        if self.collection is None:
+            return None
+        try:
+            doc = await self.collection.find_one(
+                {"content_hash": content_hash},
+                sort=[("upload_time", 1)]
+            )
+            if doc:
+                doc.pop('_id', None)
+                return VideoMetadata(**doc)
+            return None
+        except Exception as e:
+            print(f"Erreur lors de la recherche par empreinte: {e}")
+            return None
+    
     async def update_video_status(self, video_id: str, new_status: str) -> bool:
         """
         Met à jour le statut d'une vidéo.
@@ -107,11 +246,16 @@ class MongoDBConnector:
             print(f"update_video_status: Échec car self.collection est None pour video_id {video_id}.")
             return False
         try:
-            result = await self.collection.update_one(
+            # Document avant mise à jour : ancien statut pour les compteurs de stockage
+            previous = await self.collection.find_one_and_update(
                 {"video_id": video_id},
-                {"$set": {"status": new_status}}
+                {"$set": {"status": new_status}},
+                projection={"_id": 0, "status": 1, "file_size": 1},
+                return_document=ReturnDocument.BEFORE
             )
-            return result.modified_count > 0
+            self._notify_write(video_id)
+            self._notify_status(previous, new_status)
+            return previous is not None and previous.get("status") != new_status
         except Exception:
             return False
     
@@ -120,16 +264,26 @@ class MongoDBConnector:
         video_id: str, 
         current_stage: str,
         stages_completed: list = None,
-        stages_failed: list = None
+        stages_failed: list = None,
+        stages_running: list = None,
+        status: Optional[str] = None,
+        **extra_fields
     ) -> bool:
         """
         Met à jour l'étape de traitement actuelle d'une vidéo.
         
+        Le statut de la vidéo et d'autres champs peuvent être mis à jour dans la
+        même requête, au lieu d'enchaîner update_processing_stage et
+        update_video_status.
+        
         Args:
             video_id: Identifiant de la vidéo
             current_stage: Étape actuelle (language_detection, compression, subtitle_generation)
             stages_completed: Liste des étapes terminées avec succès
             stages_failed: Liste des étapes échouées
+            stages_running: Liste des étapes en cours d'exécution
+            status: Nouveau statut de la vidéo (optionnel)
+            **extra_fields: Autres champs de VideoMetadata à mettre à jour
             
         Returns:
             bool: True si la mise à jour est réussie
@@ -143,38 +297,104 @@ class MongoDBConnector:
                 update_data["stages_completed"] = stages_completed
             if stages_failed is not None:
                 update_data["stages_failed"] = stages_failed
+            if stages_running is not None:
+                update_data["stages_running"] = stages_running
+            if status is not None:
+                update_data["status"] = status
+            update_data.update(extra_fields)
             
-            result = await self.collection.update_one(
+            if status is None:
+                result = await self.collection.update_one(
+                    {"video_id": video_id},
+                    {"$set": update_data}
+                )
+                self._notify_write(video_id)
+                return result.modified_count > 0
+            
+            # Changement de statut : document avant mise à jour pour les compteurs de stockage
+            previous = await self.collection.find_one_and_update(
                 {"video_id": video_id},
-                {"$set": update_data}
+                {"$set": update_data},
+                projection={"_id": 0, "status": 1, "file_size": 1},
+                return_document=ReturnDocument.BEFORE
             )
-            return result.modified_count > 0
+            self._notify_write(video_id)
+            self._notify_status(previous, status)
+            return previous is not None
         except Exception as e:
             print(f"Erreur lors de la mise à jour de l'étape: {e}")
             return False
     
-    async def list_all_videos(self) -> List[VideoMetadata]:
+    async def list_all_videos(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[datetime, str]] = None,
+        status: Optional[str] = None
+    ) -> List[VideoSummary]:
         """
-        Liste toutes les vidéos en base.
+        Liste les vidéos en base, des plus récentes aux plus anciennes.
+        
+        Pagination par clé (keyset) sur (upload_time, video_id) : la page suivante
+        commence après le dernier élément de la page précédente, sans `skip`. Seuls
+        les champs nécessaires aux listes sont lus (projection).
         
+        Args:
+            limit: Nombre maximal de vidéos (None = toutes)
+            after: (upload_time, video_id) du dernier élément de la page précédente
+            status: Ne retourner que les vidéos de ce statut
+            
         Returns:
-            List[VideoMetadata]: Liste des métadonnées
+            List[VideoSummary]: Liste des métadonnées allégées
         """
         if self.collection is None:
             print("list_all_videos: Échec car self.collection est None. La connexion DB a probablement échoué au démarrage.")
             return []
         try:
-            cursor = self.collection.find({}).sort("upload_time", -1)  # Tri par date décroissante
-            videos = []
-            async for doc in cursor:
-                # Supprimer le champ _id de MongoDB
-                doc.pop('_id', None)
-                videos.append(VideoMetadata(**doc))
-            return videos
+            cursor = self.collection.find(
+                self._build_list_query(after, status),
+                VIDEO_SUMMARY_PROJECTION
+            ).sort(VIDEO_LIST_SORT)  # Tri par date décroissante
+            if limit:
+                cursor = cursor.limit(limit)
+            
+            return [VideoSummary(**doc) async for doc in cursor]
         except Exception as e:
             print(f"Erreur lors de la liste des vidéos: {e}")
             return []
     
+    async def iter_all_videos(self, status: Optional[str] = None, batch_size: int = 500):
+        """
+        Parcourt toutes les métadonnées vidéo par lots, sans les charger en mémoire.
+        
+        Args:
+            status: Ne retourner que les vidéos de ce statut
+            batch_size: Nombre de documents lus par aller-retour MongoDB
+            
+        Yields:
+            dict: Document de métadonnées (sans _id)
+        """
+        if self.collection is None:
+            return
+        cursor = self.collection.find(
+            self._build_list_query(None, status),
+            {"_id": 0}
+        ).sort(VIDEO_LIST_SORT).batch_size(batch_size)
+        async for doc in cursor:
+            yield doc
+    
+    @staticmethod
+    def _build_list_query(after: Optional[Tuple[datetime, str]], status: Optional[str]) -> dict:
+        query = {}
+        if status:
+            query["status"] = status
+        if after:
+            upload_time, video_id = after
+            query["$or"] = [
+                {"upload_time": {"$lt": upload_time}},
+                {"upload_time": upload_time, "video_id": {"$lt": video_id}}
+            ]
+        return query
+    
     async def save_processing_result(
         self, 
         video_id: str, 
@@ -209,6 +429,7 @@ class MongoDBConnector:
                 }},
                 upsert=True
             )
+            self._notify_write(video_id)
             return True
         except Exception as e:
             print(f"Erreur lors de la sauvegarde du résultat de traitement: {e}")
@@ -247,6 +468,69 @@ class MongoDBConnector:
             print(f"Erreur lors de la récupération du résultat de traitement: {e}")
             return None
     
+    async def get_video_with_processing_results(
+        self,
+        video_id: str,
+        processing_types: List[str]
+    ) -> Tuple[Optional[VideoMetadata], Dict[str, dict]]:
+        """
+        Récupère les métadonnées d'une vidéo et ses résultats de traitement en une requête.
+        
+        Utilise un pipeline d'agrégation ($lookup) sur video_metadata ; si la vidéo
+        n'a pas de métadonnées (résultats d'endpoints unitaires), une seule requête
+        $in est faite sur processing_results.
+        
+        Args:
+            video_id: Identifiant de la vidéo
+            processing_types: Types de traitement à récupérer
+            
+        Returns:
+            Tuple (VideoMetadata ou None, résultats indexés par type de traitement)
+        """
+        if self.database is None:
+            return None, {}
+        try:
+            pipeline = [
+                {"$match": {"video_id": video_id}},
+                {"$limit": 1},
+                {"$lookup": {
+                    "from": "processing_results",
+                    "let": {"video_id": "$video_id"},
+                    "pipeline": [
+                        {"$match": {
+                            "$expr": {"$eq": ["$video_id", "$$video_id"]},
+                            "processing_type": {"$in": processing_types}
+                        }},
+                        {"$project": {"_id": 0, "processing_type": 1, "result": 1}}
+                    ],
+                    "as": "processing_results"
+                }},
+                {"$project": {"_id": 0}}
+            ]
+            docs = await self.database.video_metadata.aggregate(pipeline).to_list(length=1)
+            
+            if docs:
+                doc = docs[0]
+                result_docs = doc.pop("processing_results", [])
+                metadata = VideoMetadata(**doc)
+            else:
+                metadata = None
+                cursor = self.database.processing_results.find(
+                    {"video_id": video_id, "processing_type": {"$in": processing_types}},
+                    {"_id": 0, "processing_type": 1, "result": 1}
+                )
+                result_docs = await cursor.to_list(length=len(processing_types))
+            
+            results = {
+                doc["processing_type"]: doc.get("result")
+                for doc in result_docs
+                if doc.get("result")
+            }
+            return metadata, results
+        except Exception as e:
+            print(f"Erreur lors de la récupération des résultats de la vidéo: {e}")
+            return None, {}
+    
     async def list_all_processing_results(self, video_id: str) -> List[dict]:
         """
         Liste tous les résultats de traitement pour une vidéo.
@@ -272,6 +556,260 @@ class MongoDBConnector:
         except Exception as e:
             print(f"Erreur lors de la liste des résultats de traitement: {e}")
             return []
+    
+    async def delete_processing_results(self, video_id: str) -> int:
+        """
+        Supprime les résultats de traitement d'une vidéo (nouvelle exécution complète).
+        
+        Les entrées du cache d'étapes (sans champ video_id) ne sont pas concernées.
+        
+        Args:
+            video_id: Identifiant de la vidéo
+            
+        Returns:
+            int: Nombre de résultats supprimés
+        """
+        try:
+            if self.database is None:
+                return 0
+            
+            result = await self.database.processing_results.delete_many({"video_id": video_id})
+            self._notify_write(video_id)
+            return result.deleted_count
+        except Exception as e:
+            print(f"Erreur lors de la suppression des résultats de traitement: {e}")
+            return 0
+
+    
+    async def get_cached_stage_result(self, cache_key: str) -> Optional[dict]:
+        """
+        Récupère un résultat d'étape mis en cache (s'il n'a pas expiré).
+        
+        Args:
+            cache_key: Clé du cache (empreinte du contenu, étape et paramètres)
+            
+        Returns:
+            dict du résultat ou None si absent ou expiré
+        """
+        try:
+            if self.database is None:
+                return None
+            
+            doc = await self.database.processing_results.find_one({
+                "cache_key": cache_key,
+                "expires_at": {"$gt": datetime.now()}
+            })
+            
+            if doc:
+                return doc.get("result")
+            return None
+        except Exception as e:
+            print(f"Erreur lors de la lecture du cache d'étape: {e}")
+            return None
+    
+    async def save_cached_stage_result(
+        self,
+        cache_key: str,
+        content_hash: str,
+        stage: str,
+        params: dict,
+        result: dict,
+        source_video_id: str,
+        expires_at: datetime
+    ) -> bool:
+        """
+        Enregistre (ou remplace) un résultat d'étape dans le cache.
+        
+        Les entrées de cache sont stockées dans processing_results sans champ
+        video_id, elles n'apparaissent donc pas dans les résultats d'une vidéo.
+        
+        Returns:
+            bool: True si la sauvegarde est réussie
+        """
+        try:
+            if self.database is None:
+                return False
+            
+            await self.database.processing_results.update_one(
+                {"cache_key": cache_key},
+                {"$set": {
+                    "cache_key": cache_key,
+                    "content_hash": content_hash,
+                    "processing_type": stage,
+                    "params": params,
+                    "result": result,
+                    "source_video_id": source_video_id,
+                    "created_at": datetime.now(),
+                    "expires_at": expires_at
+                }},
+                upsert=True
+            )
+            return True
+        except Exception as e:
+            print(f"Erreur lors de la sauvegarde du cache d'étape: {e}")
+            return False
+    
+    async def delete_cached_stage_results(
+        self,
+        content_hash: Optional[str] = None,
+        stage: Optional[str] = None
+    ) -> int:
+        """
+        Invalide des entrées du cache d'étapes.
+        
+        Args:
+            content_hash: Limiter à un contenu (toutes les vidéos identiques)
+            stage: Limiter à une étape
+            
+        Returns:
+            int: Nombre d'entrées supprimées
+        """
+        try:
+            if self.database is None:
+                return 0
+            
+            query = {"cache_key": {"$exists": True}}
+            if content_hash:
+                query["content_hash"] = content_hash
+            if stage:
+                query["processing_type"] = stage
+            
+            result = await self.database.processing_results.delete_many(query)
+            return result.deleted_count
+        except Exception as e:
+            print(f"Erreur lors de l'invalidation du cache d'étape: {e}")
+            return 0
+
+    
+    async def get_blob_references(self, file_paths: List[str], content_hashes: List[str]) -> List[dict]:
+        """
+        Récupère les vidéos qui référencent des fichiers stockés.
+        
+        Un fichier adressé par contenu est partagé par toutes les vidéos de même
+        empreinte ; les anciens fichiers (nommés par UUID) sont retrouvés par chemin.
+        
+        Args:
+            file_paths: Chemins des fichiers stockés
+            content_hashes: Empreintes des fichiers adressés par contenu
+            
+        Returns:
+            List[dict]: Documents réduits (video_id, file_path, content_hash, statut,
+                étapes terminées, dates d'upload et de fin de traitement)
+            
+        Raises:
+            Exception: En cas d'erreur MongoDB (l'appelant ne doit rien supprimer)
+        """
+        if self.collection is None or not (file_paths or content_hashes):
+            return []
+        cursor = self.collection.find(
+            {"$or": [{"file_path": {"$in": file_paths}}, {"content_hash": {"$in": content_hashes}}]},
+            {
+                "_id": 0, "video_id": 1, "file_path": 1, "content_hash": 1, "status": 1,
+                "stages_completed": 1, "upload_time": 1, "processing_end_time": 1
+            }
+        )
+        return await cursor.to_list(length=None)
+    
+    async def record_storage_eviction(self, eviction: dict) -> bool:
+        """
+        Enregistre la suppression d'un fichier original et la signale sur ses vidéos.
+        
+        Args:
+            eviction: Fichier supprimé (file_path, content_hash, size, reason,
+                video_ids, evicted_at)
+            
+        Returns:
+            bool: True si l'enregistrement est réussi
+        """
+        if self.database is None:
+            return False
+        try:
+            await self.database.storage_evictions.insert_one(dict(eviction))
+            if eviction["video_ids"]:
+                await self.collection.update_many(
+                    {"video_id": {"$in": eviction["video_ids"]}},
+                    {"$set": {"original_evicted_at": eviction["evicted_at"]}}
+                )
+                for video_id in eviction["video_ids"]:
+                    self._notify_write(video_id)
+            return True
+        except Exception as e:
+            print(f"Erreur lors de l'enregistrement de l'éviction de {eviction.get('file_path')}: {e}")
+            return False
+    
+    async def list_storage_evictions(self, limit: int = 50) -> List[dict]:
+        """
+        Récupère les dernières suppressions de fichiers originaux.
+        
+        Args:
+            limit: Nombre maximal d'entrées
+            
+        Returns:
+            List[dict]: Évictions, des plus récentes aux plus anciennes
+        """
+        if self.database is None:
+            return []
+        try:
+            cursor = self.database.storage_evictions.find({}, {"_id": 0}).sort("evicted_at", DESCENDING).limit(limit)
+            return await cursor.to_list(length=limit)
+        except Exception as e:
+            print(f"Erreur lors de la lecture des évictions: {e}")
+            return []
+
+    
+    async def get_storage_stats_snapshot(self) -> Optional[dict]:
+        """
+        Récupère le dernier état enregistré des compteurs de stockage.
+        
+        Returns:
+            Dict des compteurs (files, bytes, by_status, dates) ou None
+        """
+        if self.database is None:
+            return None
+        try:
+            return await self.database.storage_stats.find_one({"_id": STORAGE_STATS_ID}, {"_id": 0})
+        except Exception as e:
+            print(f"Erreur lors de la lecture des compteurs de stockage: {e}")
+            return None
+    
+    async def save_storage_stats_snapshot(self, snapshot: dict) -> bool:
+        """
+        Enregistre l'état des compteurs de stockage.
+        
+        Args:
+            snapshot: Compteurs (files, bytes, by_status, dates)
+            
+        Returns:
+            bool: True si l'enregistrement est réussi
+        """
+        if self.database is None:
+            return False
+        try:
+            await self.database.storage_stats.replace_one({"_id": STORAGE_STATS_ID}, snapshot, upsert=True)
+            return True
+        except Exception as e:
+            print(f"Erreur lors de l'enregistrement des compteurs de stockage: {e}")
+            return False
+    
+    async def count_videos_by_status(self) -> Dict[str, dict]:
+        """
+        Compte les vidéos et la taille de leurs fichiers par statut (agrégation MongoDB).
+        
+        Returns:
+            Dict: {statut: {"videos": nombre, "bytes": taille totale}}
+            
+        Raises:
+            Exception: En cas d'erreur MongoDB
+        """
+        if self.collection is None:
+            return {}
+        cursor = self.collection.aggregate([
+            {"$group": {"_id": "$status", "videos": {"$sum": 1}, "bytes": {"$sum": "$file_size"}}}
+        ])
+        return {
+            doc["_id"]: {"videos": doc["videos"], "bytes": doc["bytes"]}
+            async for doc in cursor if doc["_id"]
+        }
 
 
 # Instance globale du connecteur (à utiliser quand MongoDB sera configuré)
@@ -3,7 +3,7 @@ Modèles Pydantic pour les données vidéo.
 """
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -31,6 +31,14 @@ class ProcessingStatus(str, Enum):
     COMPLETED = "completed"
     FAILED = "failed"
     PARTIAL = "partial"  # Certaines étapes ont réussi, d'autres ont échoué
+    CANCELLED = "cancelled"  # Étape annulée suite à l'échec d'une autre étape
+
+
+class ProcessingPriority(str, Enum):
+    """Classes de priorité des traitements (ordre des files d'attente)."""
+    HIGH = "high"  # Uploads interactifs (frontend)
+    NORMAL = "normal"
+    LOW = "low"  # Lots et retraitements massifs
 
 
 class ProcessingStage(str, Enum):
@@ -52,6 +60,30 @@ class VideoUploadResponse(BaseModel):
     status: VideoStatus = Field(default=VideoStatus.UPLOADED, description="Statut de la vidéo")
     upload_time: datetime = Field(default_factory=datetime.now, description="Horodatage de l'upload")
     message: str = Field(default="Vidéo uploadée avec succès", description="Message de statut")
+    content_hash: Optional[str] = Field(None, description="Empreinte SHA-256 du contenu")
+    duplicate_of: Optional[str] = Field(None, description="ID de la vidéo déjà uploadée avec le même contenu")
+
+
+class MediaStreamInfo(BaseModel):
+    """Description d'un flux (stream) d'un fichier vidéo."""
+    index: int
+    codec_type: Optional[str] = None  # video, audio, subtitle, data
+    codec_name: Optional[str] = None
+    duration: Optional[float] = None
+
+
+class MediaInfo(BaseModel):
+    """Informations techniques d'une vidéo, obtenues par un unique appel à ffprobe."""
+    duration: Optional[float] = Field(None, description="Durée en secondes")
+    format_name: Optional[str] = None
+    bit_rate: Optional[int] = None
+    has_audio: bool = Field(default=False, description="Présence d'une piste audio valide")
+    width: Optional[int] = None
+    height: Optional[int] = None
+    fps: Optional[float] = None
+    video_codec: Optional[str] = None
+    audio_codec: Optional[str] = None
+    streams: List[MediaStreamInfo] = Field(default_factory=list)
 
 
 class VideoMetadata(BaseModel):
@@ -66,10 +98,20 @@ class VideoMetadata(BaseModel):
     processing_start_time: Optional[datetime] = None
     processing_end_time: Optional[datetime] = None
     error_message: Optional[str] = None
+    # Déduplication par contenu
+    content_hash: Optional[str] = None  # Empreinte SHA-256 du fichier stocké
+    duplicate_of: Optional[str] = None  # Vidéo déjà uploadée partageant le même fichier
+    # Informations techniques (ffprobe)
+    media_info: Optional[MediaInfo] = None
     # Progression du traitement
     current_stage: Optional[str] = None  # Étape actuelle (language_detection, compression, subtitle_generation)
     stages_completed: Optional[list] = None  # Étapes terminées
     stages_failed: Optional[list] = None  # Étapes échouées
+    stages_running: Optional[list] = None  # Étapes en cours (exécutées en parallèle)
+    bytes_transferred: Optional[int] = None  # Octets de vidéo envoyés aux microservices par le pipeline
+    processing_params: Optional[dict] = None  # Paramètres du pipeline (GlobalProcessingRequest), réutilisés à la reprise
+    batch_id: Optional[str] = None  # Lot ayant mis la vidéo en file d'attente (la reprise est refusée tant qu'elle y attend)
+    original_evicted_at: Optional[datetime] = None  # Fichier original supprimé par le cycle de vie du stockage
     
     class Config:
         json_encoders = {
@@ -77,6 +119,25 @@ class VideoMetadata(BaseModel):
         }
 
 
+class VideoSummary(BaseModel):
+    """Métadonnées allégées d'une vidéo pour les listes (sans les champs volumineux)."""
+    video_id: str
+    original_filename: str
+    file_path: str
+    file_size: int
+    content_type: str
+    status: VideoStatus
+    upload_time: datetime
+    processing_start_time: Optional[datetime] = None
+    processing_end_time: Optional[datetime] = None
+    error_message: Optional[str] = None
+    duplicate_of: Optional[str] = None
+    current_stage: Optional[str] = None
+    stages_completed: Optional[list] = None
+    stages_failed: Optional[list] = None
+    stages_running: Optional[list] = None
+
+
 class VideoStatusResponse(BaseModel):
     """Réponse pour le statut d'une vidéo."""
     video_id: str
@@ -98,6 +159,7 @@ class LanguageDetectionRequest(BaseModel):
     video_id: str = Field(..., description="ID de la vidéo à analyser")
     duration: int = Field(default=30, ge=5, le=60, description="Durée d'extraction audio en secondes")
     test_all_languages: bool = Field(default=True, description="Tester toutes les langues disponibles")
+    priority: ProcessingPriority = Field(default=ProcessingPriority.NORMAL, description="Classe de priorité du traitement (high, normal, low)")
 
 
 class LanguageDetectionResult(BaseModel):
@@ -133,6 +195,7 @@ class CompressionRequest(BaseModel):
     resolution: str = Field(default="360p", description="Résolution cible (240p, 360p, 480p, 720p, 1080p)")
     crf_value: int = Field(default=28, ge=18, le=30, description="Valeur CRF (18-30)")
     custom_filename: Optional[str] = Field(None, description="Nom de fichier personnalisé")
+    priority: ProcessingPriority = Field(default=ProcessingPriority.NORMAL, description="Classe de priorité du traitement (high, normal, low)")
 
 
 class CompressionResult(BaseModel):
@@ -156,6 +219,7 @@ class SubtitleRequest(BaseModel):
     video_id: str = Field(..., description="ID de la vidéo à sous-titrer")
     model_name: str = Field(default="base", description="Modèle Whisper (tiny, base, small, medium, large)")
     language: Optional[str] = Field(None, description="Code langue ISO (ex: fr, en)")
+    priority: ProcessingPriority = Field(default=ProcessingPriority.NORMAL, description="Classe de priorité du traitement (high, normal, low)")
 
 
 class SubtitleResult(BaseModel):
@@ -183,6 +247,9 @@ class ProcessingStageResult(BaseModel):
     duration: Optional[float] = None
     error_message: Optional[str] = None
     result: Optional[dict] = None
+    cached: bool = False  # Résultat servi depuis le cache (aucun appel au microservice)
+    retries: int = 0  # Nouvelles tentatives après des erreurs transitoires du microservice
+    resumed: bool = False  # Résultat repris d'une exécution précédente du pipeline (étape non relancée)
 
 
 class GlobalProcessingRequest(BaseModel):
@@ -204,6 +271,9 @@ class GlobalProcessingRequest(BaseModel):
     # Paramètres de détection d'animaux
     enable_animal_detection: bool = Field(default=True, description="Activer la détection d'animaux")
     animal_confidence_threshold: float = Field(default=0.5, description="Seuil de confiance (0.1-1.0)")
+    
+    # Classe de priorité du pipeline (ordre des files d'attente)
+    priority: ProcessingPriority = Field(default=ProcessingPriority.NORMAL, description="Priorité (high, normal, low)")
 
 
 class GlobalProcessingResult(BaseModel):
@@ -229,6 +299,43 @@ class GlobalProcessingResult(BaseModel):
     
     # URL de streaming de la vidéo finale (après agrégation)
     final_streaming_url: Optional[str] = None
+    
+    # Octets de vidéo envoyés aux microservices (0 pour une référence de chemin ou un résultat en cache)
+    bytes_transferred: int = 0
+    
+    # Identifiant de la trace distribuée du pipeline (spans exportés selon TRACING_EXPORTER)
+    trace_id: Optional[str] = None
+
+
+class UploadSessionCreateRequest(BaseModel):
+    """Requête de création d'une session d'upload reprenable."""
+    filename: str = Field(..., description="Nom original du fichier")
+    file_size: int = Field(..., gt=0, description="Taille totale du fichier en octets")
+    content_type: str = Field(default="video/mp4", description="Type MIME du fichier")
+    chunk_size: Optional[int] = Field(None, description="Taille des morceaux en octets (défaut serveur si absent)")
+    sha256: Optional[str] = Field(None, description="Empreinte SHA-256 attendue du fichier complet")
+
+
+class UploadSessionStatus(BaseModel):
+    """État d'une session d'upload reprenable."""
+    upload_id: str
+    filename: str
+    content_type: str
+    file_size: int
+    chunk_size: int
+    total_chunks: int
+    received_bytes: int = Field(..., description="Octets reçus (offset de reprise)")
+    next_chunk: int = Field(..., description="Index du prochain morceau attendu")
+    status: str = Field(..., description="uploading, complete ou finalized")
+    expires_at: datetime
+    video_id: Optional[str] = Field(None, description="Vidéo créée par la finalisation")
+
+
+class UploadCompleteRequest(BaseModel):
+    """Finalisation d'une session d'upload, avec lancement optionnel du pipeline global."""
+    process: bool = Field(default=False, description="Lancer le traitement global après l'assemblage")
+    async_mode: bool = Field(default=True, description="Répondre 202 dès l'admission du pipeline")
+    params: GlobalProcessingRequest = Field(default_factory=GlobalProcessingRequest, description="Paramètres du pipeline")
 
 
 class AnimalDetectionRequest(BaseModel):
@@ -5,11 +5,15 @@ Ce service combine la vidéo compressée avec les sous-titres générés pour pr
 une vidéo finale avec sous-titres incrustés (burned-in).
 """
 import httpx
-import io
-from typing import Dict, Any, Optional
+import json
+from typing import Callable, Dict, Any, Optional
 from pathlib import Path
 
 from app.core.config import settings
+from app.services.http_client_pool import ServiceHttpClient
+from app.services.concurrency_limiter import concurrency_limited
+from app.services.retry_policy import is_retryable_error, retry_transient
+from app.services.multipart_stream import StreamingMultipartBody
 
 
 class AggregationClient:
@@ -33,6 +37,12 @@ class AggregationClient:
             write=600.0,  # Upload de vidéo peut prendre du temps
             pool=30.0
         )
+        # Client HTTP partagé (pool de connexions keep-alive), géré par les hooks de main.py
+        self.http = ServiceHttpClient("aggregation", self.video_timeout, settings.aggregation_max_concurrency)
+        # Uploads vidéo en cours (progression), par nom de fichier
+        self.active_uploads: Dict[str, StreamingMultipartBody] = {}
+        self.total_bytes_uploaded = 0
+        self.uploads_completed = 0
     
     async def check_service_health(self) -> bool:
         """
@@ -42,13 +52,15 @@ class AggregationClient:
             True si le service répond, False sinon
         """
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(f"{self.base_url}/api/health")
-                return response.status_code == 200
+            client = self.http.client
+            response = await client.get(f"{self.base_url}/api/health", timeout=10.0)
+            return response.status_code == 200
         except Exception as e:
             print(f"❌ Service d'agrégation inaccessible: {e}")
             return False
     
+    @retry_transient
+    @concurrency_limited
     async def process_video_with_subtitles(
         self,
         video_path: str,
@@ -58,7 +70,8 @@ class AggregationClient:
         source_video_id: Optional[str] = None,
         detected_language: Optional[str] = None,
         animals_detected: Optional[dict] = None,
-        original_filename: Optional[str] = None
+        original_filename: Optional[str] = None,
+        on_progress: Optional[Callable[[int, int], None]] = None
     ) -> Dict[str, Any]:
         """
         Envoie une vidéo compressée et le fichier SRT au service d'agrégation pour incrustation des sous-titres.
@@ -69,6 +82,7 @@ class AggregationClient:
             resolution: Résolution cible (360p, 480p, 720p, 1080p)
             crf_value: Valeur CRF pour la qualité vidéo (0-51)
             source_video_id: ID de la vidéo source dans vidp-fastapi-service (pour référence croisée)
+            on_progress: Appelé avec (octets envoyés, octets totaux) pendant l'upload de la vidéo
             
         Returns:
             Dict contenant:
@@ -89,112 +103,90 @@ class AggregationClient:
                 "detail": f"Le fichier {video_path} n'existe pas"
             }
         
-        async with httpx.AsyncClient(timeout=self.video_timeout) as client:
+        client = self.http.client
+        try:
+            # Étape 1: Télécharger le fichier SRT depuis l'URL
+            print(f"📥 Téléchargement du fichier SRT depuis: {srt_url}")
             try:
-                # Étape 1: Télécharger le fichier SRT depuis l'URL
-                print(f"📥 Téléchargement du fichier SRT depuis: {srt_url}")
-                try:
-                    srt_response = await client.get(srt_url, timeout=30.0)
-                    srt_response.raise_for_status()
-                    srt_content = srt_response.content
-                    print(f"   ✅ Fichier SRT téléchargé ({len(srt_content)} bytes)")
-                except httpx.HTTPError as e:
-                    return {
-                        "status": "failed",
-                        "error": "Impossible de télécharger le fichier SRT",
-                        "detail": f"Erreur lors du téléchargement depuis {srt_url}: {e}"
-                    }
-                
-                # Étape 2: Préparer les fichiers pour l'upload
-                # Utiliser BytesIO pour le fichier SRT
-                srt_file_obj = io.BytesIO(srt_content)
-                
-                with open(video_file_path, 'rb') as video_file:
-                    # Lire tout le contenu vidéo pour éviter les problèmes de curseur
-                    video_content = video_file.read()
-                
-                video_file_obj = io.BytesIO(video_content)
-                
-                files = {
-                    'video': (video_file_path.name, video_file_obj, 'video/mp4'),
-                    'srt_file': ('subtitles.srt', srt_file_obj, 'text/plain')
-                }
-                data = {
-                    'resolution': resolution,
-                    'crf_value': str(crf_value)
-                }
-
-                if original_filename:
-                    data['original_filename'] = original_filename
-
-                if detected_language:
-                    data['detected_language'] = detected_language
-                
-                if animals_detected:
-                    import json
-                    data['animals_detected'] = json.dumps(animals_detected)
-                
-                # Add source_video_id if provided (for cross-database reference)
-                if source_video_id:
-                    data['source_video_id'] = source_video_id
-                
-                print(f"📤 Envoi de la vidéo et du SRT au service d'agrégation...")
-                print(f"   Vidéo: {video_file_path.name} ({len(video_content)} bytes)")
-                print(f"   SRT: subtitles.srt ({len(srt_content)} bytes)")
-                print(f"   Résolution: {resolution}")
-                if source_video_id:
-                    print(f"   Source Video ID: {source_video_id}")
-                
-                # Envoyer au service d'agrégation
-                response = await client.post(
-                    endpoint,
-                    files=files,
-                    data=data
-                )
-                response.raise_for_status()
-                
-                response_data = response.json()
-                
-                return {
-                    "status": "completed",
-                    "job_id": response_data.get("job_id"),
-                    "video_id": response_data.get("video_id"),
-                    "streaming_url": response_data.get("streaming_url"),
-                    "metadata": response_data.get("metadata", {}),
-                    "message": response_data.get("message", "Agrégation terminée")
-                }
-                
-            except httpx.TimeoutException as e:
-                return {
-                    "status": "failed",
-                    "error": "Timeout lors de l'agrégation vidéo",
-                    "detail": f"Le service n'a pas répondu dans le délai imparti: {e}"
-                }
-            except httpx.HTTPStatusError as e:
-                error_detail = str(e)
-                try:
-                    error_data = e.response.json()
-                    error_detail = error_data.get("detail", str(e))
-                except:
-                    pass
-                return {
-                    "status": "failed",
-                    "error": f"Erreur HTTP {e.response.status_code}",
-                    "detail": error_detail
-                }
+                srt_response = await client.get(srt_url, timeout=30.0)
+                srt_response.raise_for_status()
+                srt_content = srt_response.content
+                print(f"   ✅ Fichier SRT téléchargé ({len(srt_content)} bytes)")
             except httpx.HTTPError as e:
                 return {
                     "status": "failed",
-                    "error": "Erreur de communication avec le service d'agrégation",
-                    "detail": str(e)
-                }
-            except Exception as e:
-                return {
-                    "status": "failed",
-                    "error": "Erreur inattendue lors de l'agrégation",
-                    "detail": str(e)
+                    "retryable": is_retryable_error(e),
+                    "error": "Impossible de télécharger le fichier SRT",
+                    "detail": f"Erreur lors du téléchargement depuis {srt_url}: {e}"
                 }
+            
+            # Étape 2: Préparer le formulaire (la vidéo est lue en streaming depuis le disque)
+            data = self._build_form_data(
+                resolution, crf_value, source_video_id,
+                detected_language, animals_detected, original_filename
+            )
+            
+            print(f"📤 Envoi de la vidéo et du SRT au service d'agrégation...")
+            print(f"   Vidéo: {video_file_path.name} ({video_file_path.stat().st_size} bytes)")
+            print(f"   SRT: subtitles.srt ({len(srt_content)} bytes)")
+            print(f"   Résolution: {resolution}")
+            if source_video_id:
+                print(f"   Source Video ID: {source_video_id}")
+            
+            # Envoyer au service d'agrégation
+            response, upload_stats = await self._post_video_and_srt(
+                endpoint, video_file_path, srt_content, data, on_progress
+            )
+            response.raise_for_status()
+            
+            response_data = response.json()
+            
+            return {
+                "status": "completed",
+                "job_id": response_data.get("job_id"),
+                "video_id": response_data.get("video_id"),
+                "streaming_url": response_data.get("streaming_url"),
+                "metadata": response_data.get("metadata", {}),
+                "message": response_data.get("message", "Agrégation terminée"),
+                "upload": upload_stats
+            }
+            
+        except httpx.TimeoutException as e:
+            return {
+                "status": "failed",
+                "retryable": is_retryable_error(e),
+                "error": "Timeout lors de l'agrégation vidéo",
+                "detail": f"Le service n'a pas répondu dans le délai imparti: {e}"
+            }
+        except httpx.HTTPStatusError as e:
+            error_detail = str(e)
+            try:
+                error_data = e.response.json()
+                error_detail = error_data.get("detail", str(e))
+            except:
+                pass
+            return {
+                "status": "failed",
+                "retryable": is_retryable_error(e),
+                "error": f"Erreur HTTP {e.response.status_code}",
+                "detail": error_detail
+            }
+        except httpx.HTTPError as e:
+            return {
+                "status": "failed",
+                "retryable": is_retryable_error(e),
+                "error": "Erreur de communication avec le service d'agrégation",
+                "detail": str(e)
+            }
+        except Exception as e:
+            return {
+                "status": "failed",
+                "error": "Erreur inattendue lors de l'agrégation",
+                "detail": str(e)
+            }
     
+    @retry_transient
+    @concurrency_limited
     async def process_video_with_srt_content(
         self,
         video_path: str,
@@ -204,7 +196,8 @@ class AggregationClient:
         source_video_id: Optional[str] = None,
         detected_language: Optional[str] = None,      # ⭐ NOUVEAU
         animals_detected: Optional[dict] = None,
-        original_filename: Optional[str] = None
+        original_filename: Optional[str] = None,
+        on_progress: Optional[Callable[[int, int], None]] = None
     ) -> Dict[str, Any]:
         """
         Envoie une vidéo avec un contenu SRT direct (sans téléchargement depuis URL).
@@ -217,6 +210,7 @@ class AggregationClient:
             resolution: Résolution cible (360p, 480p, 720p, 1080p)
             crf_value: Valeur CRF pour la qualité vidéo (0-51)
             source_video_id: ID de la vidéo source dans vidp-fastapi-service (pour référence croisée)
+            on_progress: Appelé avec (octets envoyés, octets totaux) pendant l'upload de la vidéo
             
         Returns:
             Dict contenant le résultat de l'agrégation
@@ -232,96 +226,155 @@ class AggregationClient:
                 "detail": f"Le fichier {video_path} n'existe pas"
             }
         
-        async with httpx.AsyncClient(timeout=self.video_timeout) as client:
+        client = self.http.client
+        try:
+            # Préparer le fichier SRT depuis le contenu direct
+            srt_bytes = srt_content.encode('utf-8')
+            data = self._build_form_data(
+                resolution, crf_value, source_video_id,
+                detected_language, animals_detected, original_filename
+            )
+            
+            print(f"📤 Envoi de la vidéo avec SRT direct au service d'agrégation...")
+            print(f"   Vidéo: {video_file_path.name} ({video_file_path.stat().st_size} bytes)")
+            print(f"   SRT: contenu direct ({len(srt_bytes)} bytes)")
+            print(f"   Résolution: {resolution}")
+            if source_video_id:
+                print(f"   Source Video ID: {source_video_id}")
+            
+            response, upload_stats = await self._post_video_and_srt(
+                endpoint, video_file_path, srt_bytes, data, on_progress
+            )
+            response.raise_for_status()
+            
+            response_data = response.json()
+            
+            return {
+                "status": "completed",
+                "job_id": response_data.get("job_id"),
+                "video_id": response_data.get("video_id"),
+                "streaming_url": response_data.get("streaming_url"),
+                "metadata": response_data.get("metadata", {}),
+                "message": response_data.get("message", "Agrégation terminée (sans sous-titres)"),
+                "upload": upload_stats
+            }
+            
+        except httpx.TimeoutException as e:
+            return {
+                "status": "failed",
+                "retryable": is_retryable_error(e),
+                "error": "Timeout lors de l'agrégation vidéo",
+                "detail": f"Le service n'a pas répondu dans le délai imparti: {e}"
+            }
+        except httpx.HTTPStatusError as e:
+            error_detail = str(e)
             try:
-                # Préparer le fichier SRT depuis le contenu direct
-                srt_bytes = srt_content.encode('utf-8')
-                srt_file_obj = io.BytesIO(srt_bytes)
-                
-                with open(video_file_path, 'rb') as video_file:
-                    video_content = video_file.read()
-                
-                video_file_obj = io.BytesIO(video_content)
-                
-                files = {
-                    'video': (video_file_path.name, video_file_obj, 'video/mp4'),
-                    'srt_file': ('subtitles.srt', srt_file_obj, 'text/plain')
-                }
-                data = {
-                    'resolution': resolution,
-                    'crf_value': str(crf_value)
-                }
-
-                if original_filename:
-                    data['original_filename'] = original_filename
+                error_data = e.response.json()
+                error_detail = error_data.get("detail", str(e))
+            except:
+                pass
+            return {
+                "status": "failed",
+                "retryable": is_retryable_error(e),
+                "error": f"Erreur HTTP {e.response.status_code}",
+                "detail": error_detail
+            }
+        except httpx.HTTPError as e:
+            return {
+                "status": "failed",
+                "retryable": is_retryable_error(e),
+                "error": "Erreur de communication avec le service d'agrégation",
+                "detail": str(e)
+            }
+        except Exception as e:
+            return {
+                "status": "failed",
+                "error": "Erreur inattendue lors de l'agrégation",
+                "detail": str(e)
+            }
+    
+    def _build_form_data(
+        self,
+        resolution: str,
+        crf_value: int,
+        source_video_id: Optional[str],
+        detected_language: Optional[str],
+        animals_detected: Optional[dict],
+        original_filename: Optional[str]
+    ) -> Dict[str, str]:
+        """Construit les champs texte du formulaire envoyé au service d'agrégation."""
+        data = {
+            'resolution': resolution,
+            'crf_value': str(crf_value)
+        }
 
+        if original_filename:
+            data['original_filename'] = original_filename
 
-                if detected_language:
-                    data['detected_language'] = detected_language
-                
-                if animals_detected:
-                    import json
-                    data['animals_detected'] = json.dumps(animals_detected)
-                
-                # Add source_video_id if provided (for cross-database reference)
-                if source_video_id:
-                    data['source_video_id'] = source_video_id
-                
-                print(f"📤 Envoi de la vidéo avec SRT direct au service d'agrégation...")
-                print(f"   Vidéo: {video_file_path.name} ({len(video_content)} bytes)")
-                print(f"   SRT: contenu direct ({len(srt_bytes)} bytes)")
-                print(f"   Résolution: {resolution}")
-                if source_video_id:
-                    print(f"   Source Video ID: {source_video_id}")
-                
-                response = await client.post(
-                    endpoint,
-                    files=files,
-                    data=data
-                )
-                response.raise_for_status()
-                
-                response_data = response.json()
-                
-                return {
-                    "status": "completed",
-                    "job_id": response_data.get("job_id"),
-                    "video_id": response_data.get("video_id"),
-                    "streaming_url": response_data.get("streaming_url"),
-                    "metadata": response_data.get("metadata", {}),
-                    "message": response_data.get("message", "Agrégation terminée (sans sous-titres)")
-                }
-                
-            except httpx.TimeoutException as e:
-                return {
-                    "status": "failed",
-                    "error": "Timeout lors de l'agrégation vidéo",
-                    "detail": f"Le service n'a pas répondu dans le délai imparti: {e}"
-                }
-            except httpx.HTTPStatusError as e:
-                error_detail = str(e)
-                try:
-                    error_data = e.response.json()
-                    error_detail = error_data.get("detail", str(e))
-                except:
-                    pass
-                return {
-                    "status": "failed",
-                    "error": f"Erreur HTTP {e.response.status_code}",
-                    "detail": error_detail
-                }
-            except httpx.HTTPError as e:
-                return {
-                    "status": "failed",
-                    "error": "Erreur de communication avec le service d'agrégation",
-                    "detail": str(e)
-                }
-            except Exception as e:
-                return {
-                    "status": "failed",
-                    "error": "Erreur inattendue lors de l'agrégation",
-                    "detail": str(e)
+        if detected_language:
+            data['detected_language'] = detected_language
+        
+        if animals_detected:
+            data['animals_detected'] = json.dumps(animals_detected)
+        
+        # Add source_video_id if provided (for cross-database reference)
+        if source_video_id:
+            data['source_video_id'] = source_video_id
+        
+        return data
+    
+    async def _post_video_and_srt(
+        self,
+        endpoint: str,
+        video_file_path: Path,
+        srt_bytes: bytes,
+        data: Dict[str, str],
+        on_progress: Optional[Callable[[int, int], None]] = None
+    ) -> tuple:
+        """
+        Envoie la vidéo (lue par blocs depuis le disque) et le SRT en multipart.
+        
+        Returns:
+            Tuple (réponse httpx, statistiques de l'upload)
+        """
+        body = StreamingMultipartBody(data, on_progress)
+        body.add_file('video', str(video_file_path), 'video/mp4')
+        body.add_bytes('srt_file', 'subtitles.srt', srt_bytes, 'text/plain')
+        
+        upload_key = video_file_path.name
+        self.active_uploads[upload_key] = body
+        try:
+            response = await self.http.client.post(
+                endpoint,
+                content=body,
+                headers=body.headers
+            )
+        finally:
+            self.active_uploads.pop(upload_key, None)
+            self.total_bytes_uploaded += body.bytes_sent
+        
+        upload_stats = body.get_upload_stats()
+        if body.finished_at is not None:
+            self.uploads_completed += 1
+            print(
+                f"   📤 Upload terminé: {upload_stats['bytes_sent']} bytes "
+                f"en {upload_stats['duration_seconds']}s ({upload_stats['throughput_mb_per_second']} MB/s)"
+            )
+        return response, upload_stats
+    
+    def get_upload_stats(self) -> dict:
+        """Progression des uploads vidéo en cours et compteurs cumulés."""
+        return {
+            "uploads_completed": self.uploads_completed,
+            "total_bytes_uploaded": self.total_bytes_uploaded,
+            "active_uploads": {
+                name: {
+                    **body.get_upload_stats(),
+                    "progress_percent": round(100 * body.bytes_sent / max(1, body.content_length), 1)
                 }
+                for name, body in self.active_uploads.items()
+            }
+        }
     
     async def get_video_status(self, video_id: str) -> Dict[str, Any]:
         """
@@ -335,31 +388,31 @@ class AggregationClient:
         """
         endpoint = f"{self.base_url}/api/videos/{video_id}"
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.get(endpoint)
-                response.raise_for_status()
-                
-                return {
-                    "status": "success",
-                    "data": response.json()
-                }
-                
-            except httpx.HTTPStatusError as e:
-                if e.response.status_code == 404:
-                    return {
-                        "status": "not_found",
-                        "error": f"Vidéo {video_id} non trouvée"
-                    }
-                return {
-                    "status": "failed",
-                    "error": f"Erreur HTTP {e.response.status_code}"
-                }
-            except Exception as e:
+        client = self.http.client
+        try:
+            response = await client.get(endpoint, timeout=30.0)
+            response.raise_for_status()
+            
+            return {
+                "status": "success",
+                "data": response.json()
+            }
+            
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
                 return {
-                    "status": "failed",
-                    "error": str(e)
+                    "status": "not_found",
+                    "error": f"Vidéo {video_id} non trouvée"
                 }
+            return {
+                "status": "failed",
+                "error": f"Erreur HTTP {e.response.status_code}"
+            }
+        except Exception as e:
+            return {
+                "status": "failed",
+                "error": str(e)
+            }
     
     async def get_streaming_url(self, video_id: str) -> Optional[str]:
         """
@@ -392,31 +445,31 @@ class AggregationClient:
         """
         endpoint = f"{self.base_url}/api/videos/by-source/{source_video_id}"
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.get(endpoint)
-                response.raise_for_status()
-                
-                return {
-                    "status": "success",
-                    "data": response.json()
-                }
-                
-            except httpx.HTTPStatusError as e:
-                if e.response.status_code == 404:
-                    return {
-                        "status": "not_found",
-                        "error": f"Aucune vidéo agrégée trouvée pour source_video_id: {source_video_id}"
-                    }
-                return {
-                    "status": "failed",
-                    "error": f"Erreur HTTP {e.response.status_code}"
-                }
-            except Exception as e:
+        client = self.http.client
+        try:
+            response = await client.get(endpoint, timeout=30.0)
+            response.raise_for_status()
+            
+            return {
+                "status": "success",
+                "data": response.json()
+            }
+            
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
                 return {
-                    "status": "failed",
-                    "error": str(e)
+                    "status": "not_found",
+                    "error": f"Aucune vidéo agrégée trouvée pour source_video_id: {source_video_id}"
                 }
+            return {
+                "status": "failed",
+                "error": f"Erreur HTTP {e.response.status_code}"
+            }
+        except Exception as e:
+            return {
+                "status": "failed",
+                "error": str(e)
+            }
 
 
 # Instance globale du client
@@ -6,6 +6,10 @@ from typing import Dict, Any, Optional
 from pathlib import Path
 
 from app.core.config import settings
+from app.services.http_client_pool import ServiceHttpClient
+from app.services.concurrency_limiter import concurrency_limited
+from app.services.retry_policy import is_retryable_error, retry_transient
+from app.services.shared_storage import post_path_reference, shared_path_reference, transfer_stats
 
 
 class AnimalDetectionClient:
@@ -27,7 +31,11 @@ class AnimalDetectionClient:
             write=300.0,
             pool=30.0
         )
+        # Client HTTP partagé (pool de connexions keep-alive), géré par les hooks de main.py
+        self.http = ServiceHttpClient("animal_detection", self.video_timeout, settings.animal_detection_max_concurrency)
     
+    @retry_transient
+    @concurrency_limited
     async def detect_animals_in_video(
         self,
         video_path: str,
@@ -38,6 +46,8 @@ class AnimalDetectionClient:
         Détecte les animaux dans une vidéo en uploadant le fichier.
         
         IMPORTANT: Upload du fichier via HTTP pour compatibilité Kubernetes.
+        Si le stockage est partagé avec le service (SHARED_STORAGE_ENABLED), seul le
+        chemin relatif de la vidéo est envoyé (/detect/local) ; l'upload reste le repli.
         
         Args:
             video_path: Chemin du fichier vidéo local
@@ -59,49 +69,70 @@ class AnimalDetectionClient:
             }
         
         # Utiliser le timeout spécifique pour les traitements vidéo longs
-        async with httpx.AsyncClient(timeout=self.video_timeout) as client:
-            try:
-                # Préparer le fichier pour l'upload
-                with open(video_file_path, 'rb') as video_file:
-                    files = {
-                        'file': (video_file_path.name, video_file, 'video/mp4')
-                    }
-                    params = {
-                        'confidence_threshold': confidence_threshold,
-                        'save_video': str(save_video).lower()
-                    }
-                    
-                    # Upload et détection
-                    response = await client.post(
-                        endpoint,
-                        files=files,
-                        params=params
-                    )
-                    response.raise_for_status()
-                    
+        client = self.http.client
+        try:
+            params = {
+                'confidence_threshold': confidence_threshold,
+                'save_video': str(save_video).lower()
+            }
+            
+            # Volume partagé : le service lit la vidéo directement, sans upload
+            reference = shared_path_reference(video_file_path)
+            if reference:
+                response = await post_path_reference(
+                    client,
+                    "animal_detection",
+                    f"{self.base_url}/detect/local",
+                    params={**params, 'video_path': reference}
+                )
+                if response is not None:
                     result = response.json()
                     result["status"] = "completed"
+                    result["transfer"] = transfer_stats("shared_path", 0, reference)
                     return result
-                
-            except httpx.TimeoutException as e:
-                return {
-                    "status": "failed",
-                    "error": "Timeout lors de la détection d'animaux",
-                    "detail": str(e)
-                }
-            except httpx.HTTPError as e:
-                return {
-                    "status": "failed",
-                    "error": "Erreur de communication avec le service de détection d'animaux",
-                    "detail": str(e)
-                }
-            except Exception as e:
-                return {
-                    "status": "failed",
-                    "error": "Erreur lors de l'upload du fichier",
-                    "detail": str(e)
+            
+            # Préparer le fichier pour l'upload
+            with open(video_file_path, 'rb') as video_file:
+                files = {
+                    'file': (video_file_path.name, video_file, 'video/mp4')
                 }
+                
+                # Upload et détection
+                response = await client.post(
+                    endpoint,
+                    files=files,
+                    params=params
+                )
+                response.raise_for_status()
+                
+                result = response.json()
+                result["status"] = "completed"
+                result["transfer"] = transfer_stats("multipart", video_file_path.stat().st_size)
+                return result
+            
+        except httpx.TimeoutException as e:
+            return {
+                "status": "failed",
+                "retryable": is_retryable_error(e),
+                "error": "Timeout lors de la détection d'animaux",
+                "detail": str(e)
+            }
+        except httpx.HTTPError as e:
+            return {
+                "status": "failed",
+                "retryable": is_retryable_error(e),
+                "error": "Erreur de communication avec le service de détection d'animaux",
+                "detail": str(e)
+            }
+        except Exception as e:
+            return {
+                "status": "failed",
+                "error": "Erreur lors de l'upload du fichier",
+                "detail": str(e)
+            }
     
+    @retry_transient
+    @concurrency_limited
     async def detect_animals_in_frame(
         self,
         image_path: str,
@@ -128,46 +159,49 @@ class AnimalDetectionClient:
                 "detail": f"Le fichier {image_path} n'existe pas"
             }
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                # Préparer le fichier pour l'upload
-                with open(image_file_path, 'rb') as image_file:
-                    files = {
-                        'file': (image_file_path.name, image_file, 'image/jpeg')
-                    }
-                    params = {
-                        'confidence_threshold': confidence_threshold
-                    }
-                    
-                    response = await client.post(
-                        endpoint,
-                        files=files,
-                        params=params
-                    )
-                    response.raise_for_status()
-                    
-                    result = response.json()
-                    result["status"] = "completed"
-                    return result
-                
-            except httpx.TimeoutException as e:
-                return {
-                    "status": "failed",
-                    "error": "Timeout lors de la détection d'animaux",
-                    "detail": str(e)
-                }
-            except httpx.HTTPError as e:
-                return {
-                    "status": "failed",
-                    "error": "Erreur de communication avec le service de détection d'animaux",
-                    "detail": str(e)
+        client = self.http.client
+        try:
+            # Préparer le fichier pour l'upload
+            with open(image_file_path, 'rb') as image_file:
+                files = {
+                    'file': (image_file_path.name, image_file, 'image/jpeg')
                 }
-            except Exception as e:
-                return {
-                    "status": "failed",
-                    "error": "Erreur lors de la détection",
-                    "detail": str(e)
+                params = {
+                    'confidence_threshold': confidence_threshold
                 }
+                
+                response = await client.post(
+                    endpoint,
+                    files=files,
+                    params=params,
+                    timeout=self.timeout
+                )
+                response.raise_for_status()
+                
+                result = response.json()
+                result["status"] = "completed"
+                return result
+            
+        except httpx.TimeoutException as e:
+            return {
+                "status": "failed",
+                "retryable": is_retryable_error(e),
+                "error": "Timeout lors de la détection d'animaux",
+                "detail": str(e)
+            }
+        except httpx.HTTPError as e:
+            return {
+                "status": "failed",
+                "retryable": is_retryable_error(e),
+                "error": "Erreur de communication avec le service de détection d'animaux",
+                "detail": str(e)
+            }
+        except Exception as e:
+            return {
+                "status": "failed",
+                "error": "Erreur lors de la détection",
+                "detail": str(e)
+            }
     
     async def get_detectable_animals(self) -> Dict[str, Any]:
         """
@@ -178,17 +212,17 @@ class AnimalDetectionClient:
         """
         endpoint = f"{self.base_url}/animals"
         
-        async with httpx.AsyncClient(timeout=30) as client:
-            try:
-                response = await client.get(endpoint)
-                response.raise_for_status()
-                return response.json()
-            except Exception as e:
-                return {
-                    "status": "failed",
-                    "error": "Erreur lors de la récupération des classes",
-                    "detail": str(e)
-                }
+        client = self.http.client
+        try:
+            response = await client.get(endpoint, timeout=30)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            return {
+                "status": "failed",
+                "error": "Erreur lors de la récupération des classes",
+                "detail": str(e)
+            }
     
     async def download_annotated_video(
         self,
@@ -207,18 +241,18 @@ class AnimalDetectionClient:
         """
         endpoint = f"{self.base_url}/output/{filename}"
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                response = await client.get(endpoint)
-                response.raise_for_status()
-                
-                with open(output_path, 'wb') as f:
-                    f.write(response.content)
-                
-                return True
-            except Exception as e:
-                print(f"Erreur téléchargement vidéo annotée: {e}")
-                return False
+        client = self.http.client
+        try:
+            response = await client.get(endpoint, timeout=self.timeout)
+            response.raise_for_status()
+            
+            with open(output_path, 'wb') as f:
+                f.write(response.content)
+            
+            return True
+        except Exception as e:
+            print(f"Erreur téléchargement vidéo annotée: {e}")
+            return False
     
     async def check_service_health(self) -> bool:
         """
@@ -229,15 +263,15 @@ class AnimalDetectionClient:
         """
         endpoint = f"{self.base_url}/health"
         
-        async with httpx.AsyncClient(timeout=10) as client:
-            try:
-                response = await client.get(endpoint)
-                response.raise_for_status()
-                health_data = response.json()
-                return health_data.get("status") == "healthy"
-            except Exception as e:
-                print(f"Erreur health check animal detection: {e}")
-                return False
+        client = self.http.client
+        try:
+            response = await client.get(endpoint, timeout=10)
+            response.raise_for_status()
+            health_data = response.json()
+            return health_data.get("status") == "healthy"
+        except Exception as e:
+            print(f"Erreur health check animal detection: {e}")
+            return False
 
 
 # Instance globale du client
@@ -0,0 +1,328 @@
+"""
+Traitement par lots : planification équitable des pipelines de plusieurs vidéos.
+
+Un lot (POST /processing/batch) regroupe des dizaines ou centaines de vidéos
+traitées avec les mêmes paramètres. Plutôt que de remplir la file du pool de
+pipelines d'un coup, le planificateur n'admet qu'un petit nombre de vidéos par
+lot à la fois (BATCH_MAX_IN_FLIGHT) et alterne entre les lots actifs
+(round-robin) : un gros lot ne bloque ni les autres lots ni les requêtes
+/process-video individuelles. Les pipelines admis tournent en parallèle et leurs
+étapes s'entrelacent sur les microservices, dans la limite du limiteur de
+concurrence de chaque service.
+
+Les lots sont conservés en mémoire (un seul pod), comme le pool de pipelines.
+"""
+import asyncio
+import time
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from fastapi import HTTPException, status
+from opentelemetry import context as otel_context
+
+from app.core.config import settings
+from app.models.video_model import GlobalProcessingResult, ProcessingStatus
+from app.services.tracing import tracer
+
+# Nombre de lots terminés conservés en mémoire
+FINISHED_BATCHES_RETENTION = 50
+
+# Délai (s) avant de réessayer une admission refusée par le pool (file pleine)
+POOL_FULL_RETRY_SECONDS = 5.0
+
+
+class BatchItem:
+    """Vidéo d'un lot."""
+
+    def __init__(
+        self,
+        video_id: str,
+        video_path: str,
+        original_filename: str,
+        file_size: int,
+        content_hash: Optional[str] = None
+    ):
+        self.video_id = video_id
+        self.video_path = video_path
+        self.original_filename = original_filename
+        self.file_size = file_size
+        self.content_hash = content_hash
+        self.status = ProcessingStatus.PENDING
+        self.admitted_at: Optional[datetime] = None
+        self.completed_at: Optional[datetime] = None
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+        self.final_streaming_url: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "video_id": self.video_id,
+            "original_filename": self.original_filename,
+            "file_size": self.file_size,
+            "status": self.status.value,
+            "admitted_at": self.admitted_at,
+            "completed_at": self.completed_at,
+            "duration": self.duration,
+            "error": self.error,
+            "final_streaming_url": self.final_streaming_url
+        }
+
+
+class ProcessingBatch:
+    """
+    Lot de vidéos traitées avec les mêmes paramètres.
+
+    start_item admet le pipeline d'une vidéo dans le pool et retourne la future
+    de son résultat (HTTPException 503 si la file du pool est pleine).
+    """
+
+    def __init__(
+        self,
+        batch_id: str,
+        items: List[BatchItem],
+        params: dict,
+        start_item: Callable[[BatchItem], Awaitable[asyncio.Future]],
+        max_in_flight: int
+    ):
+        self.batch_id = batch_id
+        self.items = items
+        self.params = params
+        self.start_item = start_item
+        self.max_in_flight = max(1, max_in_flight)
+        self.pending: Deque[BatchItem] = deque(items)
+        self.in_flight = 0
+        self.created_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+        self._started_monotonic: Optional[float] = None
+        self._finished_monotonic: Optional[float] = None
+        # Trace de la requête de création : les pipelines du lot y sont rattachés
+        self.trace_context = otel_context.get_current()
+
+    @property
+    def done(self) -> bool:
+        return not self.pending and self.in_flight == 0
+
+    def can_admit(self) -> bool:
+        return bool(self.pending) and self.in_flight < self.max_in_flight
+
+    def get_status(self, include_items: bool = True) -> dict:
+        """Progression et débit du lot."""
+        counts = {state.value: 0 for state in (
+            ProcessingStatus.PENDING, ProcessingStatus.PROCESSING,
+            ProcessingStatus.COMPLETED, ProcessingStatus.FAILED, ProcessingStatus.CANCELLED
+        )}
+        for item in self.items:
+            counts[item.status.value] = counts.get(item.status.value, 0) + 1
+        finished = [
+            item for item in self.items
+            if item.status in (ProcessingStatus.COMPLETED, ProcessingStatus.FAILED, ProcessingStatus.CANCELLED)
+        ]
+        completed = [item for item in finished if item.status == ProcessingStatus.COMPLETED]
+
+        elapsed = 0.0
+        if self._started_monotonic is not None:
+            elapsed = (self._finished_monotonic or time.monotonic()) - self._started_monotonic
+        durations = [item.duration for item in completed if item.duration is not None]
+        remaining = len(self.items) - len(finished)
+        rate = len(finished) / elapsed if elapsed > 0 else 0.0
+
+        batch_status = {
+            "batch_id": self.batch_id,
+            "status": (
+                ProcessingStatus.COMPLETED.value if self.done
+                else ProcessingStatus.PROCESSING.value if self._started_monotonic is not None
+                else ProcessingStatus.PENDING.value
+            ),
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "total": len(self.items),
+            "counts": counts,
+            "progress_percent": round(100 * len(finished) / len(self.items), 1) if self.items else 100.0,
+            "max_in_flight": self.max_in_flight,
+            "params": self.params,
+            "throughput": {
+                "elapsed_seconds": round(elapsed, 1),
+                "videos_per_minute": round(rate * 60, 2),
+                "bytes_per_second": round(sum(item.file_size for item in completed) / elapsed) if elapsed > 0 else 0,
+                "avg_pipeline_seconds": round(sum(durations) / len(durations), 1) if durations else None,
+                "eta_seconds": round(remaining / rate) if rate > 0 and remaining else None
+            }
+        }
+        if include_items:
+            batch_status["items"] = [item.to_dict() for item in self.items]
+        return batch_status
+
+
+class BatchScheduler:
+    """
+    Admet les vidéos des lots dans le pool de pipelines, à tour de rôle entre les
+    lots actifs et dans la limite de max_in_flight vidéos admises par lot.
+    """
+
+    def __init__(self, max_in_flight_per_batch: int):
+        self.max_in_flight_per_batch = max(1, max_in_flight_per_batch)
+        self._batches: "OrderedDict[str, ProcessingBatch]" = OrderedDict()
+        self._round_robin: Deque[str] = deque()
+        self._tasks: Set[asyncio.Task] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def submit(
+        self,
+        items: List[BatchItem],
+        params: dict,
+        start_item: Callable[[BatchItem], Awaitable[asyncio.Future]],
+        batch_id: Optional[str] = None
+    ) -> ProcessingBatch:
+        """Crée un lot (identifiant généré si absent) et le confie au planificateur."""
+        batch = ProcessingBatch(
+            batch_id or str(uuid.uuid4()), items, params, start_item, self.max_in_flight_per_batch
+        )
+        self._batches[batch.batch_id] = batch
+        self._round_robin.append(batch.batch_id)
+        self._trim_finished()
+
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.create_task(self._dispatch_loop(), name="batch-scheduler")
+        self._wakeup.set()
+        print(f"📦 Lot {batch.batch_id} créé ({len(items)} vidéos, {batch.max_in_flight} en parallèle max.)")
+        return batch
+
+    def get(self, batch_id: str) -> Optional[ProcessingBatch]:
+        return self._batches.get(batch_id)
+
+    def is_waiting(self, batch_id: str, video_id: str) -> bool:
+        """Indique si la vidéo attend encore son admission dans ce lot (connu de ce pod)."""
+        batch = self._batches.get(batch_id)
+        return batch is not None and any(item.video_id == video_id for item in batch.pending)
+
+    def get_stats(self) -> dict:
+        active = [self._batches[batch_id] for batch_id in self._round_robin]
+        return {
+            "max_in_flight_per_batch": self.max_in_flight_per_batch,
+            "active_batches": len(active),
+            "videos_pending": sum(len(batch.pending) for batch in active),
+            "videos_in_flight": sum(batch.in_flight for batch in active),
+            "batches_tracked": len(self._batches)
+        }
+
+    async def stop(self):
+        """Arrête le planificateur (les pipelines déjà admis sont gérés par le pool)."""
+        tasks = list(self._tasks)
+        if self._dispatcher:
+            tasks.append(self._dispatcher)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._dispatcher = None
+
+    def _trim_finished(self):
+        finished = [batch_id for batch_id, batch in self._batches.items() if batch.done]
+        for batch_id in finished[:max(0, len(finished) - FINISHED_BATCHES_RETENTION)]:
+            del self._batches[batch_id]
+
+    async def _dispatch_loop(self):
+        """Boucle d'admission : réveillée à chaque nouveau lot et à chaque vidéo terminée."""
+        while True:
+            self._wakeup.clear()
+            pool_full = await self._admit_ready()
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(),
+                    timeout=POOL_FULL_RETRY_SECONDS if pool_full else None
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def _admit_ready(self) -> bool:
+        """
+        Admet une vidéo par lot et par tour, tant que des lots ont de la place.
+
+        Returns:
+            True si le pool a refusé une admission (file pleine)
+        """
+        idle_turns = 0
+        while self._round_robin and idle_turns < len(self._round_robin):
+            batch = self._batches[self._round_robin[0]]
+            self._round_robin.rotate(-1)
+            if not batch.can_admit():
+                idle_turns += 1
+                continue
+            idle_turns = 0
+
+            item = batch.pending.popleft()
+            try:
+                with tracer.start_as_current_span(
+                    "batch.admit", context=batch.trace_context,
+                    attributes={"batch_id": batch.batch_id, "video_id": item.video_id}
+                ):
+                    future = await batch.start_item(item)
+            except HTTPException as e:
+                if e.status_code == status.HTTP_503_SERVICE_UNAVAILABLE:
+                    # File du pool pleine : la vidéo garde sa place en tête du lot
+                    batch.pending.appendleft(item)
+                    return True
+                self._finish_item(batch, item, ProcessingStatus.FAILED, error=str(e.detail))
+                continue
+            except Exception as e:
+                self._finish_item(batch, item, ProcessingStatus.FAILED, error=str(e))
+                continue
+
+            if batch._started_monotonic is None:
+                batch._started_monotonic = time.monotonic()
+            batch.in_flight += 1
+            item.status = ProcessingStatus.PROCESSING
+            item.admitted_at = datetime.now()
+            task = asyncio.create_task(self._track(batch, item, future), name=f"batch-item:{item.video_id}")
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return False
+
+    async def _track(self, batch: ProcessingBatch, item: BatchItem, future: asyncio.Future):
+        """Attend la fin du pipeline d'une vidéo admise et libère sa place dans le lot."""
+        batch_status, error = ProcessingStatus.FAILED, None
+        result: Optional[GlobalProcessingResult] = None
+        try:
+            result = await future
+            batch_status = result.overall_status
+            if batch_status != ProcessingStatus.COMPLETED:
+                error = result.message
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                raise
+            batch_status, error = ProcessingStatus.CANCELLED, "Pipeline annulé"
+        except Exception as e:
+            error = str(e)
+        finally:
+            batch.in_flight -= 1
+            if result is not None:
+                item.duration = result.total_duration
+                item.final_streaming_url = result.final_streaming_url
+            self._finish_item(batch, item, batch_status, error)
+            if self._wakeup:
+                self._wakeup.set()
+
+    def _finish_item(self, batch: ProcessingBatch, item: BatchItem, item_status: ProcessingStatus, error: Optional[str] = None):
+        item.status = item_status
+        item.error = error
+        item.completed_at = datetime.now()
+        if batch.done and batch.finished_at is None:
+            batch.finished_at = datetime.now()
+            batch._finished_monotonic = time.monotonic()
+            if batch.batch_id in self._round_robin:
+                self._round_robin.remove(batch.batch_id)
+            summary = batch.get_status(include_items=False)
+            print(
+                f"📦 Lot {batch.batch_id} terminé : {summary['counts']['completed']}/{summary['total']} réussies "
+                f"en {summary['throughput']['elapsed_seconds']}s "
+                f"({summary['throughput']['videos_per_minute']} vidéos/min)"
+            )
+
+
+# Instance globale du planificateur de lots
+batch_scheduler = BatchScheduler(max_in_flight_per_batch=settings.batch_max_in_flight)
@@ -0,0 +1,247 @@
+"""
+Limitation du nombre de traitements envoyés simultanément à chaque microservice.
+
+Chaque microservice (compression, Whisper, YOLO...) ne traite efficacement qu'un
+petit nombre de vidéos à la fois. Les appels de traitement d'un client occupent
+une place du limiteur de son service ; au-delà de la limite, ils attendent dans
+une file bornée, avec un délai d'attente maximal. La file est servie par priorité
+(voir app.services.priority), avec vieillissement, puis par ordre d'arrivée.
+Quand la file est pleine ou que l'attente dépasse ce délai, l'appel est refusé
+avec une erreur 429 et un en-tête Retry-After estimé d'après la durée moyenne
+des traitements.
+
+Ce refus ne concerne que les appels directs (endpoints d'une étape isolée). Les
+appels d'un pipeline admis par le pool de workers, qui borne déjà le nombre de
+pipelines en cours, attendent leur place sans délai maximal ni borne de file
+(voir pipeline_backpressure) : une file chargée ralentit le pipeline au lieu de
+le faire échouer.
+
+Seuls les appels de traitement sont limités (méthodes décorées par
+@concurrency_limited) ; les sondes de santé et les lectures légères (statut,
+téléchargement de résultats) passent sans attendre.
+"""
+import asyncio
+import contextvars
+import functools
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import List, Optional
+
+from fastapi import HTTPException, status
+
+from app.models.video_model import ProcessingPriority
+from app.services.priority import PriorityLatencyStats, current_priority, effective_rank
+
+# Retry-After (s) annoncé tant qu'aucune durée de traitement n'a été mesurée
+DEFAULT_RETRY_AFTER = 30
+
+# Borne du Retry-After annoncé (s)
+MAX_RETRY_AFTER = 600
+
+# Poids de la dernière mesure dans la durée moyenne d'occupation (moyenne mobile exponentielle)
+HOLD_TIME_SMOOTHING = 0.2
+
+# Appels émis par un pipeline admis : attente sans délai maximal ni borne de file
+unbounded_wait: contextvars.ContextVar[bool] = contextvars.ContextVar("unbounded_wait", default=False)
+
+
+@contextmanager
+def pipeline_backpressure():
+    """Contexte des appels d'un pipeline : ils attendent leur place au lieu d'être refusés."""
+    token = unbounded_wait.set(True)
+    try:
+        yield
+    finally:
+        unbounded_wait.reset(token)
+
+
+class ServiceOverloadedError(HTTPException):
+    """Appel refusé : trop de traitements en cours et en attente pour ce service."""
+
+    def __init__(self, service_name: str, retry_after: int, reason: str):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Service '{service_name}' saturé ({reason}), réessayez plus tard",
+            headers={"Retry-After": str(retry_after)}
+        )
+        self.service_name = service_name
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    """Appel en attente d'une place du limiteur."""
+
+    __slots__ = ("future", "priority", "enqueued_at")
+
+    def __init__(self, future: asyncio.Future, priority: ProcessingPriority):
+        self.future = future
+        self.priority = priority
+        self.enqueued_at = time.monotonic()
+
+
+class ServiceConcurrencyLimiter:
+    """
+    Sémaphore à priorités avec file d'attente bornée pour un microservice.
+
+    Une place libérée est transmise directement à l'appel en attente de meilleure
+    priorité effective (le plus ancien à priorité égale), ce qui évite qu'un nouvel
+    appel passe devant la file.
+    """
+
+    def __init__(self, service_name: str, max_concurrency: int, max_queue: int, max_wait: float):
+        self.service_name = service_name
+        self.max_concurrency = max_concurrency  # 0 = pas de limite
+        self.max_queue = max(0, max_queue)
+        self.max_wait = max_wait  # 0 = attente illimitée
+        self._in_flight = 0
+        self._waiters: List[_Waiter] = []
+        self._avg_hold_seconds: Optional[float] = None
+        self.acquired = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.waited = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.max_queue_depth = 0
+        self.wait_by_priority = PriorityLatencyStats()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def is_full(self) -> bool:
+        """Indique si un nouvel appel serait refusé immédiatement."""
+        if self.max_concurrency <= 0 or self._in_flight < self.max_concurrency:
+            return False
+        return len(self._waiters) >= self.max_queue
+
+    def retry_after(self) -> int:
+        """Délai (s) estimé avant qu'une place se libère pour un nouvel appel."""
+        if self._avg_hold_seconds is None or self.max_concurrency <= 0:
+            return DEFAULT_RETRY_AFTER
+        estimate = self._avg_hold_seconds * (len(self._waiters) + 1) / self.max_concurrency
+        return int(min(MAX_RETRY_AFTER, max(1, round(estimate))))
+
+    async def acquire(self, priority: Optional[ProcessingPriority] = None) -> float:
+        """
+        Réserve une place, en attendant dans la file si nécessaire.
+
+        Args:
+            priority: Priorité de l'appel (par défaut, celle du traitement en cours)
+
+        Returns:
+            Durée d'attente (s)
+
+        Raises:
+            ServiceOverloadedError: File pleine ou attente trop longue (hors pipeline)
+        """
+        priority = priority or current_priority.get()
+        unbounded = unbounded_wait.get()
+        if self.max_concurrency <= 0 or (self._in_flight < self.max_concurrency and not self._waiters):
+            self._in_flight += 1
+            self.acquired += 1
+            self.wait_by_priority.record(priority, 0.0)
+            return 0.0
+
+        if not unbounded and len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise ServiceOverloadedError(self.service_name, self.retry_after(), "file d'attente pleine")
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = _Waiter(future, priority)
+        self._waiters.append(waiter)
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(future, timeout=None if unbounded else (self.max_wait or None))
+        except BaseException as e:
+            if future.done() and not future.cancelled():
+                # Place transmise au moment de l'abandon : la rendre
+                self.release()
+            else:
+                future.cancel()
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            if isinstance(e, asyncio.TimeoutError):
+                self.timed_out += 1
+                raise ServiceOverloadedError(
+                    self.service_name, self.retry_after(), f"attente supérieure à {self.max_wait:g}s"
+                )
+            raise
+
+        waited = time.monotonic() - started
+        self.acquired += 1
+        self.waited += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        self.wait_by_priority.record(priority, waited)
+        return waited
+
+    def release(self):
+        """Libère une place (transmise à l'appel en attente de meilleure priorité effective)."""
+        now = time.monotonic()
+        while self._waiters:
+            # min() retourne le premier minimum : à rang égal, le plus ancien
+            waiter = min(self._waiters, key=lambda w: effective_rank(w.priority, now - w.enqueued_at))
+            self._waiters.remove(waiter)
+            if not waiter.future.done():
+                waiter.future.set_result(None)
+                return
+        self._in_flight -= 1
+
+    def _record_hold(self, seconds: float):
+        if self._avg_hold_seconds is None:
+            self._avg_hold_seconds = seconds
+        else:
+            self._avg_hold_seconds += HOLD_TIME_SMOOTHING * (seconds - self._avg_hold_seconds)
+
+    @asynccontextmanager
+    async def slot(self):
+        """Contexte occupant une place du limiteur pendant un traitement."""
+        await self.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._record_hold(time.monotonic() - started)
+            self.release()
+
+    def get_stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "max_wait_seconds": self.max_wait,
+            "in_flight": self._in_flight,
+            "queue_depth": len(self._waiters),
+            "max_queue_depth": self.max_queue_depth,
+            "acquired": self.acquired,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_wait_seconds": round(self.wait_seconds_total / self.waited, 3) if self.waited else 0.0,
+            "max_wait_seconds_observed": round(self.wait_seconds_max, 3),
+            "avg_processing_seconds": round(self._avg_hold_seconds, 3) if self._avg_hold_seconds is not None else None,
+            "retry_after": self.retry_after(),
+            "queue_depth_by_priority": {
+                priority.value: sum(1 for waiter in self._waiters if waiter.priority == priority)
+                for priority in ProcessingPriority
+            },
+            "wait_by_priority": self.wait_by_priority.get_stats()
+        }
+
+
+def concurrency_limited(method):
+    """
+    Décorateur des méthodes de traitement d'un client de microservice : l'appel
+    occupe une place du limiteur du service (self.http.limiter) pendant toute sa durée.
+    """
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        async with self.http.limiter.slot():
+            return await method(self, *args, **kwargs)
+    return wrapper
@@ -6,6 +6,10 @@ from typing import Dict, Any, Optional
 from pathlib import Path
 
 from app.core.config import settings
+from app.services.http_client_pool import ServiceHttpClient
+from app.services.concurrency_limiter import concurrency_limited
+from app.services.retry_policy import is_retryable_error, retry_transient
+from app.services.shared_storage import post_path_reference, shared_path_reference, transfer_stats
 
 
 class CompressionClient:
@@ -23,7 +27,11 @@ class CompressionClient:
             write=300.0,
             pool=30.0
         )
+        # Client HTTP partagé (pool de connexions keep-alive), géré par les hooks de main.py
+        self.http = ServiceHttpClient("compression", self.video_timeout, settings.compression_max_concurrency)
     
+    @retry_transient
+    @concurrency_limited
     async def compress_video(
         self,
         video_path: str,
@@ -35,6 +43,8 @@ class CompressionClient:
         Compresse une vidéo en uploadant le fichier au service.
         
         IMPORTANT: Upload du fichier via HTTP pour compatibilité Kubernetes.
+        Si le stockage est partagé avec le service (SHARED_STORAGE_ENABLED), seul le
+        chemin relatif de la vidéo est envoyé (/api/compress/local) ; l'upload reste le repli.
         
         Args:
             video_path: Chemin du fichier vidéo local
@@ -56,48 +66,73 @@ class CompressionClient:
                 "detail": f"Le fichier {video_path} n'existe pas"
             }
         
-        async with httpx.AsyncClient(timeout=self.video_timeout) as client:
-            try:
-                # Préparer le fichier pour l'upload
-                with open(video_file_path, 'rb') as video_file:
-                    files = {
-                        'file': (video_file_path.name, video_file, 'video/mp4')
-                    }
-                    data = {
-                        'resolution': resolution,
-                        'crf_value': str(crf_value)
-                    }
-                    
-                    if custom_filename:
-                        data['custom_filename'] = custom_filename
-                    
-                    # Upload et compression
-                    response = await client.post(
-                        endpoint,
-                        files=files,
-                        data=data
-                    )
-                    response.raise_for_status()
-                    return response.json()
-                
-            except httpx.TimeoutException as e:
-                return {
-                    "status": "failed",
-                    "error": "Timeout lors de la compression",
-                    "detail": str(e)
+        client = self.http.client
+        try:
+            # Volume partagé : le service lit la vidéo directement, sans upload
+            reference = shared_path_reference(video_file_path)
+            if reference:
+                payload = {
+                    'local_path': reference,
+                    'resolution': resolution,
+                    'crf_value': crf_value
                 }
-            except httpx.HTTPError as e:
-                return {
-                    "status": "failed",
-                    "error": "Erreur de communication avec le service de compression",
-                    "detail": str(e)
+                if custom_filename:
+                    payload['custom_filename'] = custom_filename
+                response = await post_path_reference(
+                    client,
+                    "compression",
+                    f"{self.base_url}/api/compress/local",
+                    params={'async_mode': 'false'},
+                    json=payload
+                )
+                if response is not None:
+                    return {**response.json(), "transfer": transfer_stats("shared_path", 0, reference)}
+            
+            # Préparer le fichier pour l'upload
+            with open(video_file_path, 'rb') as video_file:
+                files = {
+                    'file': (video_file_path.name, video_file, 'video/mp4')
+                }
+                data = {
+                    'resolution': resolution,
+                    'crf_value': str(crf_value)
                 }
-            except Exception as e:
+                
+                if custom_filename:
+                    data['custom_filename'] = custom_filename
+                
+                # Upload et compression
+                response = await client.post(
+                    endpoint,
+                    files=files,
+                    data=data
+                )
+                response.raise_for_status()
                 return {
-                    "status": "failed",
-                    "error": "Erreur lors de l'upload du fichier",
-                    "detail": str(e)
+                    **response.json(),
+                    "transfer": transfer_stats("multipart", video_file_path.stat().st_size)
                 }
+            
+        except httpx.TimeoutException as e:
+            return {
+                "status": "failed",
+                "retryable": is_retryable_error(e),
+                "error": "Timeout lors de la compression",
+                "detail": str(e)
+            }
+        except httpx.HTTPError as e:
+            return {
+                "status": "failed",
+                "retryable": is_retryable_error(e),
+                "error": "Erreur de communication avec le service de compression",
+                "detail": str(e)
+            }
+        except Exception as e:
+            return {
+                "status": "failed",
+                "error": "Erreur lors de l'upload du fichier",
+                "detail": str(e)
+            }
     
     async def get_compression_status(self, job_id: str) -> Dict[str, Any]:
         """
@@ -111,18 +146,18 @@ class CompressionClient:
         """
         endpoint = f"{self.base_url}/api/status/{job_id}"
         
-        async with httpx.AsyncClient(timeout=30) as client:
-            try:
-                response = await client.get(endpoint)
-                response.raise_for_status()
-                return response.json()
-                
-            except httpx.HTTPError as e:
-                return {
-                    "status": "failed",
-                    "error": "Erreur lors de la récupération du statut",
-                    "detail": str(e)
-                }
+        client = self.http.client
+        try:
+            response = await client.get(endpoint, timeout=30)
+            response.raise_for_status()
+            return response.json()
+            
+        except httpx.HTTPError as e:
+            return {
+                "status": "failed",
+                "error": "Erreur lors de la récupération du statut",
+                "detail": str(e)
+            }
     
     async def download_compressed_video(self, job_id: str, output_path: str) -> bool:
         """
@@ -137,20 +172,20 @@ class CompressionClient:
         """
         endpoint = f"{self.base_url}/api/download/{job_id}"
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                response = await client.get(endpoint)
-                response.raise_for_status()
-                
-                # Sauvegarder le fichier
-                with open(output_path, 'wb') as f:
-                    f.write(response.content)
-                
-                return True
-                
-            except Exception as e:
-                print(f"Erreur lors du téléchargement: {e}")
-                return False
+        client = self.http.client
+        try:
+            response = await client.get(endpoint, timeout=self.timeout)
+            response.raise_for_status()
+            
+            # Sauvegarder le fichier
+            with open(output_path, 'wb') as f:
+                f.write(response.content)
+            
+            return True
+            
+        except Exception as e:
+            print(f"Erreur lors du téléchargement: {e}")
+            return False
     
     async def cleanup_compression_job(self, job_id: str) -> Dict[str, Any]:
         """
@@ -164,17 +199,17 @@ class CompressionClient:
         """
         endpoint = f"{self.base_url}/api/cleanup/{job_id}"
         
-        async with httpx.AsyncClient(timeout=30) as client:
-            try:
-                response = await client.delete(endpoint)
-                response.raise_for_status()
-                return response.json()
-                
-            except httpx.HTTPError as e:
-                return {
-                    "error": "Erreur lors du nettoyage",
-                    "detail": str(e)
-                }
+        client = self.http.client
+        try:
+            response = await client.delete(endpoint, timeout=30)
+            response.raise_for_status()
+            return response.json()
+            
+        except httpx.HTTPError as e:
+            return {
+                "error": "Erreur lors du nettoyage",
+                "detail": str(e)
+            }
     
     async def check_service_health(self) -> bool:
         """
@@ -184,9 +219,9 @@ class CompressionClient:
             bool: True si le service est accessible
         """
         try:
-            async with httpx.AsyncClient(timeout=5) as client:
-                response = await client.get(f"{self.base_url}/")
-                return response.status_code == 200
+            client = self.http.client
+            response = await client.get(f"{self.base_url}/", timeout=5)
+            return response.status_code == 200
         except:
             return False
 
@@ -3,12 +3,31 @@ Service de gestion du stockage local des fichiers vidéo.
 """
 import os
 import uuid
+import hashlib
 import aiofiles
 from pathlib import Path
 from fastapi import UploadFile, HTTPException
-from typing import Tuple
+from typing import Optional, Tuple
 
 from app.core.config import settings
+from app.services.storage_accounting import storage_accounting
+
+# Taille maximale d'une vidéo uploadée (500 MB)
+MAX_VIDEO_FILE_SIZE = 500 * 1024 * 1024
+
+# Taille des blocs lus/écrits lors de la sauvegarde en streaming (1 MB)
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Types MIME acceptés pour les vidéos
+ALLOWED_VIDEO_TYPES = {
+    "video/mp4",
+    "video/avi",
+    "video/mov",
+    "video/wmv",
+    "video/flv",
+    "video/webm",
+    "video/mkv"
+}
 
 
 class FileStorageService:
@@ -29,6 +48,43 @@ class FileStorageService:
         unique_id = str(uuid.uuid4())
         return f"{unique_id}{file_extension}"
     
+    @staticmethod
+    def _content_addressed_filename(content_hash: str, original_filename: str) -> str:
+        """
+        Nom de stockage dérivé du contenu : empreinte SHA-256 + extension d'origine.
+        
+        Deux uploads identiques partagent ainsi le même fichier sur le disque.
+        
+        Args:
+            content_hash: Empreinte SHA-256 du contenu
+            original_filename: Nom original du fichier
+            
+        Returns:
+            Nom de fichier adressé par contenu
+        """
+        file_extension = Path(original_filename).suffix.lower()
+        return f"{content_hash}{file_extension}"
+    
+    @staticmethod
+    def find_blob_by_hash(content_hash: str, original_filename: str) -> Optional[Path]:
+        """
+        Recherche le fichier déjà stocké pour une empreinte et une extension données.
+        
+        Le nom adressé par contenu est connu : un seul stat, sans lister le dossier
+        de stockage (coûteux sur un volume réseau).
+        
+        Args:
+            content_hash: Empreinte SHA-256 du contenu
+            original_filename: Nom original du fichier (pour l'extension)
+            
+        Returns:
+            Chemin du fichier existant ou None
+        """
+        candidate = Path(settings.local_video_path) / FileStorageService._content_addressed_filename(
+            content_hash, original_filename
+        )
+        return candidate if candidate.is_file() else None
+    
     @staticmethod
     def _validate_video_file(file: UploadFile) -> None:
         """
@@ -40,23 +96,12 @@ class FileStorageService:
         Raises:
             HTTPException: Si le fichier n'est pas valide
         """
-        # Types MIME acceptés pour les vidéos
-        allowed_video_types = {
-            "video/mp4",
-            "video/avi", 
-            "video/mov",
-            "video/wmv",
-            "video/flv",
-            "video/webm",
-            "video/mkv"
-        }
-        
         # Vérifier le type MIME
-        if file.content_type not in allowed_video_types:
+        if file.content_type not in ALLOWED_VIDEO_TYPES:
             raise HTTPException(
                 status_code=400,
                 detail=f"Type de fichier non supporté: {file.content_type}. "
-                       f"Types acceptés: {', '.join(allowed_video_types)}"
+                       f"Types acceptés: {', '.join(ALLOWED_VIDEO_TYPES)}"
             )
         
         # Vérifier que le fichier n'est pas vide
@@ -67,7 +112,7 @@ class FileStorageService:
             )
         
         # Limite de taille (500 MB par défaut)
-        max_size = 500 * 1024 * 1024  # 500 MB en octets
+        max_size = MAX_VIDEO_FILE_SIZE
         if file.size and file.size > max_size:
             raise HTTPException(
                 status_code=413,
@@ -75,51 +120,143 @@ class FileStorageService:
             )
     
     @staticmethod
-    async def save_video_file(file: UploadFile) -> Tuple[str, str, int]:
+    async def _stream_to_file(file: UploadFile, destination: Path) -> Tuple[int, str]:
         """
-        Sauvegarde un fichier vidéo sur le disque local.
+        Copie le contenu uploadé vers un fichier par blocs, à mémoire constante.
+        
+        La taille et l'empreinte SHA-256 sont calculées au fil de l'écriture, et la
+        limite de taille est vérifiée à chaque bloc pour rejeter au plus tôt un
+        fichier trop volumineux (y compris si le client n'a pas annoncé sa taille).
+        
+        Args:
+            file: Fichier uploadé via FastAPI
+            destination: Chemin du fichier à écrire
+            
+        Returns:
+            Tuple contenant la taille en octets et l'empreinte SHA-256 (hexadécimale)
+            
+        Raises:
+            HTTPException: 413 si le fichier dépasse la taille maximale
+        """
+        sha256 = hashlib.sha256()
+        bytes_written = 0
+        
+        async with aiofiles.open(destination, 'wb') as f:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                
+                bytes_written += len(chunk)
+                if bytes_written > MAX_VIDEO_FILE_SIZE:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Fichier trop volumineux. Taille maximale: {MAX_VIDEO_FILE_SIZE // (1024*1024)} MB"
+                    )
+                
+                sha256.update(chunk)
+                await f.write(chunk)
+        
+        return bytes_written, sha256.hexdigest()
+    
+    @staticmethod
+    def store_completed_file(temp_path: Path, content_hash: str, original_filename: str) -> Tuple[str, str]:
+        """
+        Range un fichier temporaire complet sous son nom adressé par contenu.
+        
+        Le fichier est publié atomiquement sous son empreinte SHA-256, sans écraser
+        un fichier existant. Si un fichier de même contenu existe déjà (y compris
+        publié entre-temps par un upload concurrent), le fichier temporaire est
+        supprimé et le fichier existant est réutilisé : il n'est compté qu'une fois
+        dans la comptabilité du stockage.
+        
+        Args:
+            temp_path: Fichier temporaire complet (dans le dossier de stockage)
+            content_hash: Empreinte SHA-256 du contenu
+            original_filename: Nom original du fichier (pour l'extension)
+            
+        Returns:
+            Tuple (nom du fichier stocké, chemin complet)
+        """
+        stored_filename = FileStorageService._content_addressed_filename(content_hash, original_filename)
+        full_path = Path(settings.local_video_path) / stored_filename
+        
+        # Contenu déjà stocké : réutiliser le fichier existant
+        created = False
+        if FileStorageService.find_blob_by_hash(content_hash, original_filename) is None:
+            try:
+                # Le lien physique échoue si la cible existe : deux uploads concurrents
+                # du même contenu ne publient (et ne comptent) le fichier qu'une fois
+                os.link(temp_path, full_path)
+                created = True
+            except FileExistsError:
+                pass
+            except OSError:
+                # Système de fichiers sans liens physiques : renommage atomique
+                created = not full_path.exists()
+                os.replace(temp_path, full_path)
+        Path(temp_path).unlink(missing_ok=True)
+        
+        if created:
+            storage_accounting.record_file_added(full_path.stat().st_size)
+        else:
+            print(f"♻️  Contenu déjà stocké ({content_hash[:12]}...), réutilisation de {stored_filename}")
+            # Fichier de nouveau utilisé : protégé du cycle de vie du stockage
+            FileStorageService.touch_file(str(full_path))
+        return stored_filename, str(full_path)
+    
+    @staticmethod
+    async def save_video_file(file: UploadFile) -> Tuple[str, str, int, str]:
+        """
+        Sauvegarde un fichier vidéo sur le disque local, adressé par son contenu.
+        
+        Le fichier est écrit en streaming dans un fichier temporaire du dossier de
+        stockage, puis renommé atomiquement sous son empreinte SHA-256 : un upload
+        interrompu ne laisse jamais de vidéo partielle sous son nom définitif. Si un
+        fichier de même contenu existe déjà, le fichier temporaire est supprimé et
+        le fichier existant est réutilisé (aucun octet dupliqué).
         
         Args:
             file: Fichier uploadé via FastAPI
             
         Returns:
             Tuple contenant:
-            - unique_filename: Nom unique généré pour le fichier
+            - stored_filename: Nom du fichier stocké (empreinte + extension)
             - full_path: Chemin complet vers le fichier sauvegardé
             - file_size: Taille du fichier en octets
+            - content_hash: Empreinte SHA-256 du contenu
             
         Raises:
             HTTPException: En cas d'erreur de validation ou de sauvegarde
         """
+        temp_path = None
         try:
             # Validation du fichier
             FileStorageService._validate_video_file(file)
             
-            # Génération d'un nom de fichier unique
-            unique_filename = FileStorageService._generate_unique_filename(file.filename)
-            
-            # Construction du chemin complet
+            # Construction du chemin du fichier temporaire
             storage_path = Path(settings.local_video_path)
-            full_path = storage_path / unique_filename
+            temp_filename = FileStorageService._generate_unique_filename(file.filename)
+            temp_path = storage_path / f".{temp_filename}.part"
             
             # S'assurer que le dossier existe
             storage_path.mkdir(parents=True, exist_ok=True)
             
-            # Sauvegarde asynchrone du fichier
-            async with aiofiles.open(full_path, 'wb') as f:
-                content = await file.read()
-                await f.write(content)
+            # Sauvegarde asynchrone en streaming vers le fichier temporaire
+            file_size, content_hash = await FileStorageService._stream_to_file(file, temp_path)
             
-            # Vérification que le fichier a bien été créé
-            if not full_path.exists():
+            if file_size == 0:
                 raise HTTPException(
-                    status_code=500,
-                    detail="Erreur lors de la sauvegarde du fichier"
+                    status_code=400,
+                    detail="Le fichier est vide"
                 )
             
-            file_size = full_path.stat().st_size
+            stored_filename, full_path = FileStorageService.store_completed_file(
+                temp_path, content_hash, file.filename
+            )
+            temp_path = None
             
-            return unique_filename, str(full_path), file_size
+            return stored_filename, full_path, file_size, content_hash
             
         except HTTPException:
             # Re-lever les HTTPException telles quelles
@@ -130,12 +267,22 @@ class FileStorageService:
                 status_code=500,
                 detail=f"Erreur interne lors de la sauvegarde: {str(e)}"
             )
+        finally:
+            # Supprimer le fichier temporaire (échec ou contenu dédupliqué)
+            if temp_path is not None:
+                try:
+                    temp_path.unlink(missing_ok=True)
+                except OSError:
+                    pass
     
     @staticmethod
     def delete_video_file(file_path: str) -> bool:
         """
         Supprime un fichier vidéo du stockage local.
         
+        Les fichiers étant adressés par contenu, un même fichier peut être partagé
+        par plusieurs vidéos : vérifier qu'il n'est plus référencé avant de l'appeler.
+        
         Args:
             file_path: Chemin vers le fichier à supprimer
             
@@ -145,12 +292,28 @@ class FileStorageService:
         try:
             path = Path(file_path)
             if path.exists() and path.is_file():
+                size = path.stat().st_size
                 path.unlink()
+                storage_accounting.record_file_removed(size)
                 return True
             return False
         except Exception:
             return False
     
+    @staticmethod
+    def touch_file(file_path: str) -> None:
+        """
+        Marque un fichier comme utilisé (date de modification), pour la politique LRU
+        du cycle de vie du stockage.
+        
+        Args:
+            file_path: Chemin vers le fichier
+        """
+        try:
+            os.utime(file_path)
+        except OSError:
+            pass
+    
     @staticmethod
     def get_file_info(file_path: str) -> dict:
         """
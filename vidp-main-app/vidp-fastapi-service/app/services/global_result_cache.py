@@ -0,0 +1,103 @@
+"""
+Cache en mémoire des résultats globaux assemblés (GET /processing/process-video/{video_id}).
+
+Le frontend interroge ce endpoint en continu pendant un traitement. Le résultat
+assemblé depuis MongoDB est conservé quelques secondes, et invalidé dès qu'une
+écriture concerne la vidéo (étape, statut, résultat) via les listeners du
+connecteur MongoDB. Une empreinte (ETag) est calculée pour chaque résultat afin
+de répondre 304 Not Modified quand le client possède déjà la dernière version.
+"""
+import hashlib
+import json
+import time
+from typing import Dict, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.db.mongodb_connector import mongodb_connector
+from app.models.video_model import GlobalProcessingResult
+
+# Nombre maximal de résultats conservés
+GLOBAL_RESULT_CACHE_SIZE = 1000
+
+# Durée (s) pendant laquelle une invalidation est mémorisée (bien supérieure à une lecture MongoDB)
+INVALIDATION_MEMORY_SECONDS = 60.0
+
+
+def compute_etag(result: GlobalProcessingResult) -> str:
+    """ETag faible dérivé du contenu JSON du résultat."""
+    payload = json.dumps(jsonable_encoder(result), sort_keys=True, default=str)
+    return f'W/"{hashlib.sha1(payload.encode("utf-8")).hexdigest()}"'
+
+
+class GlobalResultCache:
+    """Cache TTL des GlobalProcessingResult, invalidé à chaque écriture MongoDB."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[float, GlobalProcessingResult, str]] = {}
+        # Date de la dernière invalidation par vidéo : évite de mettre en cache un
+        # résultat lu avant une écriture concurrente
+        self._invalidated_at: Dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, video_id: str) -> Optional[Tuple[GlobalProcessingResult, str]]:
+        """Retourne (résultat, ETag) s'il est en cache et non expiré."""
+        entry = self._entries.get(video_id)
+        if entry and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1], entry[2]
+        if entry:
+            del self._entries[video_id]
+        self.misses += 1
+        return None
+
+    def put(self, video_id: str, result: GlobalProcessingResult, read_started_at: float) -> str:
+        """
+        Met en cache un résultat assemblé et retourne son ETag.
+
+        Args:
+            video_id: Identifiant de la vidéo
+            result: Résultat assemblé
+            read_started_at: time.monotonic() relevé avant la lecture MongoDB ; le
+                résultat n'est pas conservé si la vidéo a été modifiée depuis
+        """
+        etag = compute_etag(result)
+        if self.ttl > 0 and self._invalidated_at.get(video_id, 0.0) < read_started_at:
+            if len(self._entries) >= GLOBAL_RESULT_CACHE_SIZE:
+                self._evict()
+            self._entries[video_id] = (time.monotonic() + self.ttl, result, etag)
+        return etag
+
+    def invalidate(self, video_id: str):
+        """Supprime le résultat en cache d'une vidéo (appelé après chaque écriture)."""
+        now = time.monotonic()
+        self._entries.pop(video_id, None)
+        self._invalidated_at[video_id] = now
+        if len(self._invalidated_at) > GLOBAL_RESULT_CACHE_SIZE:
+            self._invalidated_at = {
+                vid: at for vid, at in self._invalidated_at.items()
+                if now - at < INVALIDATION_MEMORY_SECONDS
+            }
+
+    def _evict(self):
+        now = time.monotonic()
+        for video_id in [vid for vid, entry in self._entries.items() if entry[0] <= now]:
+            del self._entries[video_id]
+        while len(self._entries) >= GLOBAL_RESULT_CACHE_SIZE:
+            self._entries.pop(next(iter(self._entries)))
+
+    def get_stats(self) -> dict:
+        return {
+            "ttl_seconds": self.ttl,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+# Instance globale du cache, invalidée par les écritures du connecteur MongoDB
+global_result_cache = GlobalResultCache(ttl=settings.global_result_cache_ttl)
+mongodb_connector.add_write_listener(global_result_cache.invalidate)
@@ -0,0 +1,308 @@
+"""
+Clients HTTP partagés (pool de connexions) pour les appels aux microservices.
+
+Chaque microservice dispose d'un unique httpx.AsyncClient dont le cycle de vie est
+géré par les hooks startup/shutdown de FastAPI. Les connexions TCP (et TLS pour le
+service d'agrégation) sont ainsi réutilisées d'un appel à l'autre (keep-alive).
+
+Chaque client est protégé par un disjoncteur (circuit breaker) placé au niveau du
+transport HTTP : après plusieurs échecs consécutifs (erreur réseau, timeout ou
+réponse 5xx), les appels vers le service sont refusés immédiatement pendant un
+délai de récupération, au lieu d'attendre un timeout à chaque requête.
+
+Chaque client porte aussi le limiteur de concurrence et la politique de nouvelles
+tentatives de son service (voir concurrency_limiter et retry_policy), utilisés par
+les méthodes de traitement des clients. Un transport de mesure, placé autour du
+disjoncteur, alimente les métriques Prometheus des appels (voir metrics), et
+l'instrumentation OpenTelemetry du client propage le contexte de trace aux
+microservices (voir tracing).
+"""
+import contextvars
+import importlib.util
+import time
+from typing import Dict, Optional, Union
+
+import httpx
+
+from app.core.config import settings
+from app.services.concurrency_limiter import ServiceConcurrencyLimiter
+from app.services.metrics import MetricsTransport
+from app.services.tracing import instrument_client
+from app.services.retry_policy import RetryPolicy, current_idempotency_key
+
+
+# Positionné par le moniteur de santé pendant ses sondes : celles-ci ne sont ni
+# bloquées ni comptabilisées par le disjoncteur (le moniteur l'alimente lui-même).
+health_probe_in_progress: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "health_probe_in_progress", default=False
+)
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Appel refusé car le disjoncteur du service est ouvert."""
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur à trois états pour un microservice.
+
+    - closed : les appels passent, les échecs consécutifs sont comptés ;
+    - open : les appels sont refusés jusqu'à l'expiration du délai de récupération ;
+    - half_open : un seul appel d'essai est autorisé ; son succès referme le
+      disjoncteur, son échec le rouvre.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, service_name: str, failure_threshold: int, recovery_timeout: float):
+        self.service_name = service_name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.rejected_calls = 0
+        self._trial_in_progress = False
+
+    def _refresh_state(self):
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.recovery_timeout:
+            self.state = self.HALF_OPEN
+            self._trial_in_progress = False
+
+    def is_available(self) -> bool:
+        """Indique si un appel serait accepté (sans consommer l'appel d'essai)."""
+        self._refresh_state()
+        if self.state == self.HALF_OPEN:
+            return not self._trial_in_progress
+        return self.state == self.CLOSED
+
+    def allow_request(self) -> bool:
+        """Autorise (ou refuse) un appel ; en half_open, réserve l'appel d'essai."""
+        if not self.is_available():
+            self.rejected_calls += 1
+            return False
+        if self.state == self.HALF_OPEN:
+            self._trial_in_progress = True
+        return True
+
+    def release_trial(self):
+        """Libère l'appel d'essai réservé sans conclure (appel annulé)."""
+        self._trial_in_progress = False
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            print(f"✅ Disjoncteur '{self.service_name}' refermé")
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_in_progress = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                print(f"⚠️  Disjoncteur '{self.service_name}' ouvert après {self.consecutive_failures} échec(s)")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._trial_in_progress = False
+
+    def get_state(self) -> dict:
+        self._refresh_state()
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "recovery_timeout": self.recovery_timeout,
+            "rejected_calls": self.rejected_calls
+        }
+
+
+class CircuitBreakerTransport(httpx.AsyncBaseTransport):
+    """Transport httpx qui applique le disjoncteur autour du transport réel."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, breaker: CircuitBreaker):
+        self.transport = transport
+        self.breaker = breaker
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if health_probe_in_progress.get():
+            return await self.transport.handle_async_request(request)
+
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(
+                f"Service '{self.breaker.service_name}' indisponible (disjoncteur ouvert)",
+                request=request
+            )
+        try:
+            response = await self.transport.handle_async_request(request)
+        except httpx.TransportError:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            # Appel annulé ou erreur locale : ne compte pas comme un échec du service
+            self.breaker.release_trial()
+            raise
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+# Registre des clients partagés, par nom de service
+_registry: Dict[str, "ServiceHttpClient"] = {}
+
+
+def _http2_available() -> bool:
+    """HTTP/2 nécessite le paquet optionnel `h2` (httpx[http2])."""
+    return importlib.util.find_spec("h2") is not None
+
+
+class ServiceHttpClient:
+    """
+    Client HTTP mutualisé pour un microservice.
+
+    Le client httpx est créé au démarrage de l'application (ou au premier usage)
+    et fermé à l'arrêt. Le timeout passé ici est le timeout par défaut ; chaque
+    requête peut le surcharger via le paramètre `timeout` de httpx.
+    """
+
+    def __init__(self, service_name: str, timeout: Union[httpx.Timeout, float], max_concurrency: int = 0):
+        self.service_name = service_name
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self.requests_sent = 0
+        self.breaker = CircuitBreaker(
+            service_name,
+            failure_threshold=settings.circuit_breaker_failure_threshold,
+            recovery_timeout=settings.circuit_breaker_recovery_timeout
+        )
+        self.limiter = ServiceConcurrencyLimiter(
+            service_name,
+            max_concurrency=max_concurrency,
+            max_queue=settings.service_queue_size,
+            max_wait=settings.service_queue_timeout
+        )
+        self.retry_policy = RetryPolicy(
+            service_name,
+            max_attempts=settings.service_retry_max_attempts,
+            base_delay=settings.service_retry_base_delay,
+            max_delay=settings.service_retry_max_delay,
+            budget_ratio=settings.service_retry_budget_ratio
+        )
+        _registry[service_name] = self
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Retourne le client partagé (créé à la demande s'il n'existe pas encore)."""
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+        return self._client
+
+    def _create_client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry
+        )
+        transport = httpx.AsyncHTTPTransport(
+            limits=limits,
+            http2=settings.http2_enabled and _http2_available()
+        )
+        return instrument_client(httpx.AsyncClient(
+            timeout=self.timeout,
+            transport=MetricsTransport(
+                CircuitBreakerTransport(transport, self.breaker),
+                self.service_name,
+                skip=health_probe_in_progress.get
+            ),
+            event_hooks={"request": [self._on_request]}
+        ))
+
+    async def _on_request(self, request: httpx.Request):
+        self.requests_sent += 1
+        # Même clé pour toutes les tentatives d'un appel de traitement (voir retry_policy)
+        idempotency_key = current_idempotency_key.get()
+        if idempotency_key and request.method == "POST":
+            request.headers["Idempotency-Key"] = idempotency_key
+
+    async def start(self):
+        """Crée le client partagé."""
+        _ = self.client
+
+    async def close(self):
+        """Ferme le client partagé et ses connexions."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def get_pool_stats(self) -> dict:
+        """
+        Statistiques d'utilisation du pool de connexions.
+
+        Les compteurs de connexions proviennent du pool httpcore sous-jacent.
+        """
+        stats = {
+            "started": self._client is not None and not self._client.is_closed,
+            "max_connections": settings.http_max_connections,
+            "max_keepalive_connections": settings.http_max_keepalive_connections,
+            "requests_sent": self.requests_sent,
+            "connections": 0,
+            "active_connections": 0,
+            "idle_connections": 0,
+            "http2_connections": 0,
+        }
+        if not stats["started"]:
+            return stats
+
+        # Transport httpx sous les transports de traçage, de mesure et du disjoncteur
+        transport = getattr(self._client, "_transport", None)
+        while hasattr(transport, "transport"):
+            transport = transport.transport
+        pool = getattr(transport, "_pool", None)
+        connections = list(getattr(pool, "connections", []) or [])
+        stats["connections"] = len(connections)
+        for connection in connections:
+            try:
+                if connection.is_idle():
+                    stats["idle_connections"] += 1
+                else:
+                    stats["active_connections"] += 1
+                if "HTTP/2" in connection.info():
+                    stats["http2_connections"] += 1
+            except Exception:
+                continue
+        stats["utilisation"] = round(stats["active_connections"] / max(1, settings.http_max_connections), 3)
+        return stats
+
+
+async def start_http_clients():
+    """Crée les clients HTTP partagés de tous les microservices."""
+    for service_client in _registry.values():
+        await service_client.start()
+
+
+async def close_http_clients():
+    """Ferme les clients HTTP partagés de tous les microservices."""
+    for service_client in _registry.values():
+        await service_client.close()
+
+
+def get_http_pool_stats() -> Dict[str, dict]:
+    """Statistiques des pools de connexions, par microservice."""
+    return {name: service_client.get_pool_stats() for name, service_client in _registry.items()}
+
+
+def get_concurrency_stats() -> Dict[str, dict]:
+    """Occupation et file d'attente des limiteurs de concurrence, par microservice."""
+    return {name: service_client.limiter.get_stats() for name, service_client in _registry.items()}
+
+
+def get_circuit_breaker_states() -> Dict[str, dict]:
+    """État des disjoncteurs, par microservice."""
+    return {name: service_client.breaker.get_state() for name, service_client in _registry.items()}
@@ -7,6 +7,10 @@ from typing import Dict, Any, Optional
 from pathlib import Path
 
 from app.core.config import settings
+from app.services.http_client_pool import ServiceHttpClient
+from app.services.concurrency_limiter import concurrency_limited
+from app.services.retry_policy import is_retryable_error, retry_transient
+from app.services.shared_storage import post_path_reference, shared_path_reference, transfer_stats
 from app.models.video_model import ProcessingStatus
 
 
@@ -25,7 +29,11 @@ class LanguageDetectionClient:
             write=300.0,
             pool=30.0
         )
+        # Client HTTP partagé (pool de connexions keep-alive), géré par les hooks de main.py
+        self.http = ServiceHttpClient("language_detection", self.video_timeout, settings.language_detection_max_concurrency)
         
+    @retry_transient
+    @concurrency_limited
     async def detect_language_from_local_file(
         self, 
         video_path: str, 
@@ -38,6 +46,8 @@ class LanguageDetectionClient:
         IMPORTANT: Cette méthode upload le fichier vidéo au service de détection.
         Cela fonctionne en développement local ET en production Kubernetes où les
         services sont sur des machines différentes avec des systèmes de fichiers séparés.
+        Si le stockage est partagé avec le service (SHARED_STORAGE_ENABLED), seul le
+        chemin relatif de la vidéo est envoyé (/api/detect/local) ; l'upload reste le repli.
         
         Args:
             video_path: Chemin du fichier vidéo local à uploader
@@ -61,47 +71,70 @@ class LanguageDetectionClient:
                 "detail": f"Le fichier {video_path} n'existe pas"
             }
         
-        async with httpx.AsyncClient(timeout=self.video_timeout) as client:
-            try:
-                # Préparer le fichier pour l'upload
-                with open(video_file_path, 'rb') as video_file:
-                    files = {
-                        'file': (video_file_path.name, video_file, 'video/mp4')
-                    }
-                    data = {
-                        'duration': str(duration),
-                        'test_all_languages': str(test_all_languages).lower(),
-                        'async_mode': 'false'
+        client = self.http.client
+        try:
+            # Volume partagé : le service lit la vidéo directement, sans upload
+            reference = shared_path_reference(video_file_path)
+            if reference:
+                response = await post_path_reference(
+                    client,
+                    "language_detection",
+                    f"{self.base_url}/api/detect/local",
+                    json={
+                        'video_path': reference,
+                        'duration': duration,
+                        'test_all_languages': test_all_languages
                     }
-                    
-                    # Mode synchrone pour avoir le résultat immédiatement
-                    response = await client.post(
-                        endpoint,
-                        files=files,
-                        data=data
-                    )
-                    response.raise_for_status()
-                    return response.json()
-                
-            except httpx.TimeoutException as e:
-                return {
-                    "status": "failed",
-                    "error": "Timeout lors de la détection de langue",
-                    "detail": str(e)
+                )
+                if response is not None:
+                    return {**response.json(), "transfer": transfer_stats("shared_path", 0, reference)}
+            
+            # Préparer le fichier pour l'upload
+            with open(video_file_path, 'rb') as video_file:
+                files = {
+                    'file': (video_file_path.name, video_file, 'video/mp4')
                 }
-            except httpx.HTTPError as e:
-                return {
-                    "status": "failed",
-                    "error": "Erreur de communication avec le service de détection",
-                    "detail": str(e)
+                data = {
+                    'duration': str(duration),
+                    'test_all_languages': str(test_all_languages).lower(),
+                    'async_mode': 'false'
                 }
-            except Exception as e:
+                
+                # Mode synchrone pour avoir le résultat immédiatement
+                response = await client.post(
+                    endpoint,
+                    files=files,
+                    data=data
+                )
+                response.raise_for_status()
                 return {
-                    "status": "failed",
-                    "error": "Erreur lors de l'upload du fichier",
-                    "detail": str(e)
+                    **response.json(),
+                    "transfer": transfer_stats("multipart", video_file_path.stat().st_size)
                 }
+            
+        except httpx.TimeoutException as e:
+            return {
+                "status": "failed",
+                "retryable": is_retryable_error(e),
+                "error": "Timeout lors de la détection de langue",
+                "detail": str(e)
+            }
+        except httpx.HTTPError as e:
+            return {
+                "status": "failed",
+                "retryable": is_retryable_error(e),
+                "error": "Erreur de communication avec le service de détection",
+                "detail": str(e)
+            }
+        except Exception as e:
+            return {
+                "status": "failed",
+                "error": "Erreur lors de l'upload du fichier",
+                "detail": str(e)
+            }
     
+    @retry_transient
+    @concurrency_limited
     async def detect_language_async(
         self, 
         video_path: str, 
@@ -133,39 +166,41 @@ class LanguageDetectionClient:
                 "detail": f"Le fichier {video_path} n'existe pas"
             }
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                # Préparer le fichier pour l'upload
-                with open(video_file_path, 'rb') as video_file:
-                    files = {
-                        'file': (video_file_path.name, video_file, 'video/mp4')
-                    }
-                    data = {
-                        'duration': str(duration),
-                        'test_all_languages': str(test_all_languages).lower(),
-                        'async_mode': 'true'  # Mode asynchrone
-                    }
-                    
-                    response = await client.post(
-                        endpoint,
-                        files=files,
-                        data=data
-                    )
-                    response.raise_for_status()
-                    return response.json()
-                
-            except httpx.HTTPError as e:
-                return {
-                    "status": "failed",
-                    "error": "Erreur de communication avec le service de détection",
-                    "detail": str(e)
+        client = self.http.client
+        try:
+            # Préparer le fichier pour l'upload
+            with open(video_file_path, 'rb') as video_file:
+                files = {
+                    'file': (video_file_path.name, video_file, 'video/mp4')
                 }
-            except Exception as e:
-                return {
-                    "status": "failed",
-                    "error": "Erreur lors de l'upload du fichier",
-                    "detail": str(e)
+                data = {
+                    'duration': str(duration),
+                    'test_all_languages': str(test_all_languages).lower(),
+                    'async_mode': 'true'  # Mode asynchrone
                 }
+                
+                response = await client.post(
+                    endpoint,
+                    files=files,
+                    data=data,
+                    timeout=self.timeout
+                )
+                response.raise_for_status()
+                return response.json()
+            
+        except httpx.HTTPError as e:
+            return {
+                "status": "failed",
+                "retryable": is_retryable_error(e),
+                "error": "Erreur de communication avec le service de détection",
+                "detail": str(e)
+            }
+        except Exception as e:
+            return {
+                "status": "failed",
+                "error": "Erreur lors de l'upload du fichier",
+                "detail": str(e)
+            }
     
     async def get_job_status(self, job_id: str) -> Dict[str, Any]:
         """
@@ -179,18 +214,18 @@ class LanguageDetectionClient:
         """
         endpoint = f"{self.base_url}/api/status/{job_id}"
         
-        async with httpx.AsyncClient(timeout=30) as client:
-            try:
-                response = await client.get(endpoint)
-                response.raise_for_status()
-                return response.json()
-                
-            except httpx.HTTPError as e:
-                return {
-                    "status": "failed",
-                    "error": "Erreur lors de la récupération du statut",
-                    "detail": str(e)
-                }
+        client = self.http.client
+        try:
+            response = await client.get(endpoint, timeout=30)
+            response.raise_for_status()
+            return response.json()
+            
+        except httpx.HTTPError as e:
+            return {
+                "status": "failed",
+                "error": "Erreur lors de la récupération du statut",
+                "detail": str(e)
+            }
     
     async def get_supported_languages(self) -> Dict[str, Any]:
         """
@@ -201,17 +236,17 @@ class LanguageDetectionClient:
         """
         endpoint = f"{self.base_url}/api/languages"
         
-        async with httpx.AsyncClient(timeout=30) as client:
-            try:
-                response = await client.get(endpoint)
-                response.raise_for_status()
-                return response.json()
-                
-            except httpx.HTTPError as e:
-                return {
-                    "error": "Erreur lors de la récupération des langues",
-                    "detail": str(e)
-                }
+        client = self.http.client
+        try:
+            response = await client.get(endpoint, timeout=30)
+            response.raise_for_status()
+            return response.json()
+            
+        except httpx.HTTPError as e:
+            return {
+                "error": "Erreur lors de la récupération des langues",
+                "detail": str(e)
+            }
     
     async def check_service_health(self) -> bool:
         """
@@ -221,9 +256,9 @@ class LanguageDetectionClient:
             bool: True si le service est accessible
         """
         try:
-            async with httpx.AsyncClient(timeout=5) as client:
-                response = await client.get(f"{self.base_url}/")
-                return response.status_code == 200
+            client = self.http.client
+            response = await client.get(f"{self.base_url}/", timeout=5)
+            return response.status_code == 200
         except:
             return False
 
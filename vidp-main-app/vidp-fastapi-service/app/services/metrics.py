@@ -0,0 +1,297 @@
+"""
+Métriques applicatives exposées au format texte de Prometheus (GET /metrics).
+
+Compteurs, jauges et histogrammes à labels (prometheus_client), tenus en mémoire
+par le pod et lus par le scrape Prometheus :
+
+- requêtes HTTP reçues : latence et nombre par route (gabarit de la route, pas
+  le chemin réel, pour borner la cardinalité) ;
+- étapes du pipeline : durée par étape et par issue, relevée sur les
+  ProcessingStageResult ; durée totale des pipelines ;
+- appels aux microservices : latence, statut, erreurs et octets échangés, par
+  service (mesurés au niveau du transport httpx) ;
+- opérations MongoDB : durée par commande et par collection (écouteur de
+  commandes pymongo) ;
+- jauges d'occupation (pool de pipelines, limiteurs, disjoncteurs), lues au
+  moment du scrape.
+"""
+import threading
+import time
+from typing import Callable, Dict, Iterable, Tuple
+
+import httpx
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from pymongo import monitoring
+
+from app.models.video_model import ProcessingStageResult
+
+# Type MIME du format d'exposition texte de Prometheus
+PROMETHEUS_CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+# Bornes (s) des histogrammes de latence : de quelques millisecondes (MongoDB,
+# sondes) à 30 minutes (compression, transcription Whisper)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+# Registre des métriques de l'application
+metrics_registry = CollectorRegistry()
+
+
+class _ScrapeGauge(Collector):
+    """Jauge dont les valeurs sont fournies au moment du scrape par une fonction."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        collect: Callable[[], Dict[Tuple[str, ...], float]],
+        label_names: Iterable[str] = ()
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.collect_values = collect
+        self.label_names = list(label_names)
+
+    def describe(self):
+        return [GaugeMetricFamily(self.name, self.documentation, labels=self.label_names)]
+
+    def collect(self):
+        family = GaugeMetricFamily(self.name, self.documentation, labels=self.label_names)
+        try:
+            values = self.collect_values()
+        except Exception as e:
+            print(f"Erreur collecte métrique {self.name}: {e}")
+            values = {}
+        for key, value in values.items():
+            family.add_metric([str(label) for label in key], value)
+        yield family
+
+
+def counter(name: str, documentation: str, label_names: Iterable[str] = ()) -> Counter:
+    """Compteur du registre de l'application."""
+    return Counter(name, documentation, label_names, registry=metrics_registry)
+
+
+def histogram(name: str, documentation: str, label_names: Iterable[str] = ()) -> Histogram:
+    """Histogramme de latence (LATENCY_BUCKETS) du registre de l'application."""
+    return Histogram(name, documentation, label_names, buckets=LATENCY_BUCKETS, registry=metrics_registry)
+
+
+def gauge(
+    name: str,
+    documentation: str,
+    collect: Callable[[], Dict[Tuple[str, ...], float]],
+    label_names: Iterable[str] = ()
+):
+    """Jauge lue au moment du scrape : collect retourne {(valeurs des labels...): valeur}."""
+    metrics_registry.register(_ScrapeGauge(name, documentation, collect, label_names))
+
+
+def render_metrics() -> bytes:
+    """Métriques du registre au format d'exposition texte de Prometheus."""
+    return generate_latest(metrics_registry)
+
+
+# ============================================================
+# REQUÊTES HTTP REÇUES
+# ============================================================
+http_requests_total = counter(
+    "vidp_http_requests_total", "Requêtes HTTP reçues, par route et statut", ("method", "route", "status")
+)
+http_request_duration = histogram(
+    "vidp_http_request_duration_seconds", "Durée des requêtes HTTP reçues, par route", ("method", "route")
+)
+
+# ============================================================
+# PIPELINE
+# ============================================================
+stage_duration = histogram(
+    "vidp_pipeline_stage_duration_seconds",
+    "Durée des étapes du pipeline, par étape, issue et source du résultat (service, cache)",
+    ("stage", "outcome", "source")
+)
+stage_retries_total = counter(
+    "vidp_pipeline_stage_retries_total", "Nouvelles tentatives des appels aux microservices, par étape", ("stage",)
+)
+pipeline_duration = histogram(
+    "vidp_pipeline_duration_seconds",
+    "Durée des pipelines (file d'attente comprise), par issue et priorité",
+    ("outcome", "priority")
+)
+
+# ============================================================
+# APPELS AUX MICROSERVICES
+# ============================================================
+service_requests_total = counter(
+    "vidp_service_requests_total", "Requêtes envoyées aux microservices, par statut HTTP (ou \"error\")",
+    ("service", "method", "status")
+)
+service_request_duration = histogram(
+    "vidp_service_request_duration_seconds", "Durée des requêtes aux microservices (jusqu'à la fin de la réponse)",
+    ("service", "method")
+)
+service_errors_total = counter(
+    "vidp_service_errors_total", "Erreurs des appels aux microservices, par type (exception httpx ou http_5xx)",
+    ("service", "error")
+)
+service_sent_bytes_total = counter(
+    "vidp_service_sent_bytes_total", "Octets envoyés aux microservices (corps de taille connue)", ("service",)
+)
+service_received_bytes_total = counter(
+    "vidp_service_received_bytes_total", "Octets reçus des microservices", ("service",)
+)
+
+# ============================================================
+# MONGODB
+# ============================================================
+mongodb_operation_duration = histogram(
+    "vidp_mongodb_operation_duration_seconds", "Durée des commandes MongoDB, par commande, collection et issue",
+    ("command", "collection", "outcome")
+)
+
+
+def observe_stage(stage_result: ProcessingStageResult):
+    """Relève la durée d'une étape terminée (réussie, en échec ou annulée)."""
+    if stage_result.duration is None or stage_result.resumed:
+        return
+    stage_duration.labels(
+        stage=stage_result.stage.value,
+        outcome=stage_result.status.value,
+        source="cache" if stage_result.cached else "service"
+    ).observe(stage_result.duration)
+    if stage_result.retries:
+        stage_retries_total.labels(stage=stage_result.stage.value).inc(stage_result.retries)
+
+
+# ============================================================
+# INSTRUMENTATION
+# ============================================================
+
+class MetricsMiddleware:
+    """Middleware ASGI mesurant les requêtes HTTP reçues, par gabarit de route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.monotonic()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Le routeur ajoute la route trouvée au scope (None si aucune route ne correspond)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            method = scope["method"]
+            http_requests_total.labels(method=method, route=route, status=status_code).inc()
+            http_request_duration.labels(method=method, route=route).observe(time.monotonic() - started)
+
+
+class _CountingStream(httpx.AsyncByteStream):
+    """Corps de réponse qui compte les octets reçus et relève la durée à sa fermeture."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_close: Callable[[int], None]):
+        self._stream = stream
+        self._on_close = on_close
+        self._received = 0
+        self._closed = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            self._received += len(chunk)
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._on_close(self._received)
+
+
+class MetricsTransport(httpx.AsyncBaseTransport):
+    """Transport httpx qui mesure les appels à un microservice (placé autour du disjoncteur)."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, service_name: str, skip: Callable[[], bool]):
+        self.transport = transport
+        self.service_name = service_name
+        self.skip = skip
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.skip():
+            return await self.transport.handle_async_request(request)
+
+        service = self.service_name
+        started = time.monotonic()
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit():
+            service_sent_bytes_total.labels(service=service).inc(int(content_length))
+
+        try:
+            response = await self.transport.handle_async_request(request)
+        except httpx.TransportError as e:
+            service_requests_total.labels(service=service, method=request.method, status="error").inc()
+            service_errors_total.labels(service=service, error=type(e).__name__).inc()
+            service_request_duration.labels(service=service, method=request.method).observe(time.monotonic() - started)
+            raise
+
+        service_requests_total.labels(service=service, method=request.method, status=response.status_code).inc()
+        if response.status_code >= 500:
+            service_errors_total.labels(service=service, error="http_5xx").inc()
+
+        def on_close(received: int):
+            service_received_bytes_total.labels(service=service).inc(received)
+            service_request_duration.labels(service=service, method=request.method).observe(time.monotonic() - started)
+
+        if response.is_closed:
+            # Corps déjà lu par le transport (réponse construite en mémoire)
+            on_close(len(response.content))
+        else:
+            response.stream = _CountingStream(response.stream, on_close)
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Écouteur de commandes pymongo relevant la durée de chaque commande MongoDB."""
+
+    def __init__(self):
+        self._collections: Dict[Tuple[object, int], str] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        collection = event.command.get(event.command_name)
+        with self._lock:
+            self._collections[(event.connection_id, event.request_id)] = (
+                collection if isinstance(collection, str) else ""
+            )
+
+    def _finish(self, event, outcome: str):
+        with self._lock:
+            collection = self._collections.pop((event.connection_id, event.request_id), "")
+        mongodb_operation_duration.labels(
+            command=event.command_name,
+            collection=collection,
+            outcome=outcome
+        ).observe(event.duration_micros / 1_000_000)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        self._finish(event, "success")
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        self._finish(event, "failure")
+
@@ -0,0 +1,152 @@
+"""
+Corps de requête multipart/form-data lu en streaming depuis le disque.
+
+httpx construit normalement le corps multipart à partir d'objets fichiers ; les
+vidéos étaient jusqu'ici chargées entièrement en mémoire (BytesIO) avant l'envoi.
+Ce module produit le même corps multipart par blocs, en lisant les fichiers avec
+aiofiles, de sorte que la mémoire utilisée ne dépend pas de la taille de la vidéo.
+La progression de l'upload (octets envoyés / octets totaux) est suivie au fil de
+l'envoi.
+"""
+import os
+import time
+import uuid
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
+
+import aiofiles
+
+# Taille des blocs lus depuis le disque et envoyés sur le réseau (256 KB)
+STREAM_CHUNK_SIZE = 256 * 1024
+
+
+def _quote(value: str) -> str:
+    """Échappe une valeur placée entre guillemets dans un en-tête Content-Disposition."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\r", "").replace("\n", "")
+
+
+class StreamingMultipartBody:
+    """
+    Corps multipart/form-data itérable de manière asynchrone.
+
+    Les champs texte et les petits contenus (ex: fichier SRT) sont gardés en mémoire,
+    les fichiers sur disque sont lus par blocs à chaque itération. Le corps peut
+    être itéré plusieurs fois (il est reconstruit à chaque passage), ce qui permet
+    de rejouer la requête.
+
+    Attributes:
+        content_length: Taille totale du corps en octets (en-tête Content-Length)
+        content_type: Valeur de l'en-tête Content-Type (avec le boundary)
+        bytes_sent: Octets déjà produits lors de l'itération en cours
+    """
+
+    def __init__(
+        self,
+        data: Optional[Dict[str, str]] = None,
+        on_progress: Optional[Callable[[int, int], None]] = None
+    ):
+        self.boundary = uuid.uuid4().hex
+        self.on_progress = on_progress
+        self.bytes_sent = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        # Chaque partie : (en-têtes encodés, contenu en mémoire ou chemin de fichier)
+        self._parts: List[Tuple[bytes, Union[bytes, str]]] = []
+        for name, value in (data or {}).items():
+            self.add_field(name, value)
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def add_field(self, name: str, value: str):
+        """Ajoute un champ texte."""
+        headers = f'Content-Disposition: form-data; name="{_quote(name)}"\r\n\r\n'
+        self._parts.append((self._part_header(headers), str(value).encode("utf-8")))
+
+    def add_bytes(self, name: str, filename: str, content: bytes, content_type: str):
+        """Ajoute un fichier dont le contenu est déjà en mémoire (petit fichier)."""
+        self._parts.append((self._file_header(name, filename, content_type), content))
+
+    def add_file(self, name: str, file_path: str, content_type: str, filename: Optional[str] = None):
+        """Ajoute un fichier lu en streaming depuis le disque."""
+        filename = filename or os.path.basename(file_path)
+        self._parts.append((self._file_header(name, filename, content_type), str(file_path)))
+
+    def _part_header(self, headers: str) -> bytes:
+        return f"--{self.boundary}\r\n{headers}".encode("utf-8")
+
+    def _file_header(self, name: str, filename: str, content_type: str) -> bytes:
+        return self._part_header(
+            f'Content-Disposition: form-data; name="{_quote(name)}"; filename="{_quote(filename)}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        )
+
+    @property
+    def _closing(self) -> bytes:
+        return f"--{self.boundary}--\r\n".encode("utf-8")
+
+    @property
+    def content_length(self) -> int:
+        total = len(self._closing)
+        for header, content in self._parts:
+            size = len(content) if isinstance(content, bytes) else os.path.getsize(content)
+            total += len(header) + size + 2  # 2 = CRLF de fin de partie
+        return total
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """En-têtes HTTP à envoyer avec le corps."""
+        return {
+            "Content-Type": self.content_type,
+            "Content-Length": str(self.content_length)
+        }
+
+    def _advance(self, size: int, total: int):
+        self.bytes_sent += size
+        if self.on_progress:
+            self.on_progress(self.bytes_sent, total)
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        total = self.content_length
+        self.bytes_sent = 0
+        self.started_at = time.monotonic()
+        self.finished_at = None
+
+        for header, content in self._parts:
+            yield header
+            self._advance(len(header), total)
+
+            if isinstance(content, bytes):
+                yield content
+                self._advance(len(content), total)
+            else:
+                async with aiofiles.open(content, "rb") as f:
+                    while True:
+                        chunk = await f.read(STREAM_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        yield chunk
+                        self._advance(len(chunk), total)
+
+            yield b"\r\n"
+            self._advance(2, total)
+
+        closing = self._closing
+        yield closing
+        self._advance(len(closing), total)
+        self.finished_at = time.monotonic()
+
+    def get_upload_stats(self) -> dict:
+        """Statistiques de l'upload (taille, durée et débit)."""
+        duration = None
+        if self.started_at is not None:
+            duration = (self.finished_at or time.monotonic()) - self.started_at
+        throughput = None
+        if duration:
+            throughput = round(self.bytes_sent / duration / (1024 * 1024), 2)
+        return {
+            "bytes_sent": self.bytes_sent,
+            "total_bytes": self.content_length,
+            "duration_seconds": round(duration, 3) if duration is not None else None,
+            "throughput_mb_per_second": throughput
+        }
@@ -1,12 +1,17 @@
 """
 Service d'orchestration pour l'interaction avec le cluster Kubernetes.
 Module préparé pour l'intégration future avec Kubernetes.
+
+Le client kubernetes (lourd et inutilisé par le workflow principal) n'est importé
+qu'à l'initialisation de l'orchestrateur, pas au démarrage de l'application.
 """
 from typing import Dict, Any, Optional
-from kubernetes import client, config
-from kubernetes.client.rest import ApiException
 
 from app.core.config import settings
+from app.utils.optional_imports import OptionalModule
+
+# Client Kubernetes, importé à la première utilisation
+kubernetes = OptionalModule("kubernetes", feature="orchestration Kubernetes")
 
 
 class KubernetesOrchestrator:
@@ -29,6 +34,12 @@ class KubernetesOrchestrator:
         Returns:
             bool: True si l'initialisation est réussie
         """
+        if not kubernetes.is_available():
+            print("⚠ Client kubernetes non installé - orchestration Kubernetes indisponible")
+            return False
+        config = kubernetes.load().config
+        client = kubernetes.load().client
+        
         try:
             # Tenter de charger la config depuis le cluster (si on run dans un pod)
             config.load_incluster_config()
@@ -43,6 +54,11 @@ class KubernetesOrchestrator:
         self.batch_v1 = client.BatchV1Api()
         return True
     
+    @property
+    def _api_exception(self) -> type:
+        """Exception des appels à l'API Kubernetes (client chargé par initialize_client)."""
+        return kubernetes.load().client.rest.ApiException
+    
     def create_video_processing_job(self, video_id: str, video_path: str) -> Optional[str]:
         """
         Crée un job Kubernetes pour traiter une vidéo.
@@ -113,7 +129,7 @@ class KubernetesOrchestrator:
             
             return response.metadata.name
             
-        except ApiException as e:
+        except self._api_exception as e:
             print(f"Erreur lors de la création du job K8s: {e}")
             return None
         except Exception as e:
@@ -150,7 +166,7 @@ class KubernetesOrchestrator:
             
             return status
             
-        except ApiException:
+        except self._api_exception:
             return None
         except Exception:
             return None
@@ -176,7 +192,7 @@ class KubernetesOrchestrator:
             
             return True
             
-        except ApiException:
+        except self._api_exception:
             return False
         except Exception:
             return False
@@ -213,7 +229,7 @@ class KubernetesOrchestrator:
             
             return job_list
             
-        except ApiException:
+        except self._api_exception:
             return []
         except Exception:
             return []
@@ -0,0 +1,156 @@
+"""
+Bus d'événements en mémoire pour suivre l'avancement des pipelines de traitement.
+
+Le pipeline global publie ses transitions (démarrage/fin de chaque étape, durées,
+progression) ; l'endpoint SSE GET /processing/{video_id}/events les relaie aux
+clients abonnés. Un client suit ainsi un traitement avec une seule connexion au
+lieu d'interroger MongoDB en boucle.
+
+Les derniers événements de chaque vidéo sont conservés pour qu'un client qui se
+connecte (ou se reconnecte avec Last-Event-ID) en cours de traitement reçoive
+d'abord l'historique manqué. L'historique ne couvre que la dernière exécution :
+une nouvelle exécution (reprise, lot) le remet à zéro, les identifiants
+d'événements continuant de croître. Le bus est local au pod, comme le pool de
+pipelines.
+"""
+import asyncio
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+# Événements qui terminent le flux d'une vidéo
+TERMINAL_EVENTS = {"pipeline_completed", "pipeline_failed"}
+
+# Événements qui ouvrent une nouvelle exécution du pipeline d'une vidéo
+RUN_START_EVENTS = {"pipeline_queued", "pipeline_started"}
+
+# Nombre d'événements conservés par vidéo
+EVENT_HISTORY_SIZE = 200
+
+# Nombre de vidéos dont l'historique est conservé
+EVENT_HISTORY_VIDEOS = 500
+
+# Taille de la file de chaque abonné (les plus anciens événements sont abandonnés au-delà)
+SUBSCRIBER_QUEUE_SIZE = 256
+
+
+class PipelineEvent:
+    """Événement d'avancement d'un pipeline."""
+
+    def __init__(self, event_id: int, video_id: str, event: str, data: dict):
+        self.id = event_id
+        self.video_id = video_id
+        self.event = event
+        self.data = data
+        self.timestamp = datetime.now()
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.event in TERMINAL_EVENTS
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "video_id": self.video_id,
+            "event": self.event,
+            "timestamp": self.timestamp.isoformat(),
+            **self.data
+        }
+
+
+class PipelineEventBus:
+    """Publication / abonnement des événements de pipeline, par vidéo."""
+
+    def __init__(self):
+        self._history: "OrderedDict[str, Deque[PipelineEvent]]" = OrderedDict()
+        self._last_ids: Dict[str, int] = {}
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self.events_published = 0
+        self.events_dropped = 0
+
+    def publish(self, video_id: str, event: str, data: Optional[dict] = None) -> PipelineEvent:
+        """
+        Publie un événement pour une vidéo (appel non bloquant).
+
+        Args:
+            video_id: Identifiant de la vidéo
+            event: Type d'événement (stage_started, stage_completed, ...)
+            data: Contenu de l'événement
+        """
+        event_id = self._last_ids.get(video_id, 0) + 1
+        self._last_ids[video_id] = event_id
+        pipeline_event = PipelineEvent(event_id, video_id, event, data or {})
+
+        history = self._history.get(video_id)
+        if history is None:
+            history = self._history[video_id] = deque(maxlen=EVENT_HISTORY_SIZE)
+            while len(self._history) > EVENT_HISTORY_VIDEOS:
+                old_video_id, _ = self._history.popitem(last=False)
+                if old_video_id not in self._subscribers:
+                    self._last_ids.pop(old_video_id, None)
+        elif event in RUN_START_EVENTS and history and history[-1].is_terminal:
+            # Nouvelle exécution : l'historique de la précédente n'est plus rejoué
+            history.clear()
+        history.append(pipeline_event)
+        self.events_published += 1
+
+        for queue in self._subscribers.get(video_id, ()):
+            if queue.full():
+                # Abonné trop lent : abandonner son plus ancien événement
+                queue.get_nowait()
+                self.events_dropped += 1
+            queue.put_nowait(pipeline_event)
+        return pipeline_event
+
+    def subscribe(
+        self,
+        video_id: str,
+        last_event_id: Optional[int] = None
+    ) -> Tuple[asyncio.Queue, List[PipelineEvent]]:
+        """
+        Abonne un client aux événements d'une vidéo.
+
+        Args:
+            video_id: Identifiant de la vidéo
+            last_event_id: Dernier événement déjà reçu par le client (reconnexion)
+
+        Returns:
+            Tuple (file des prochains événements, historique à envoyer d'abord)
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(video_id, set()).add(queue)
+        backlog = [
+            event for event in self._history.get(video_id, ())
+            if last_event_id is None or event.id > last_event_id
+        ]
+        return queue, backlog
+
+    def unsubscribe(self, video_id: str, queue: asyncio.Queue):
+        """Désabonne un client."""
+        subscribers = self._subscribers.get(video_id)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[video_id]
+
+    def is_finished(self, video_id: str) -> bool:
+        """Indique si le dernier événement connu de la vidéo termine son pipeline."""
+        history = self._history.get(video_id)
+        return bool(history) and history[-1].is_terminal
+
+    def has_events(self, video_id: str) -> bool:
+        """Indique si des événements ont été publiés pour cette vidéo dans ce pod."""
+        return video_id in self._history
+
+    def get_stats(self) -> dict:
+        return {
+            "videos_tracked": len(self._history),
+            "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+            "events_published": self.events_published,
+            "events_dropped": self.events_dropped
+        }
+
+
+# Instance globale du bus d'événements
+pipeline_event_bus = PipelineEventBus()
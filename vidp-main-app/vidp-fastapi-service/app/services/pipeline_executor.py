@@ -0,0 +1,148 @@
+"""
+Exécuteur de pipeline sous forme de graphe de dépendances (DAG) entre étapes.
+
+Chaque étape est une coroutine indépendante. Dès que toutes ses dépendances sont
+terminées avec succès, l'étape est lancée avec asyncio, ce qui permet d'exécuter
+en parallèle les appels aux différents microservices. Si une étape obligatoire
+échoue, les étapes sœurs en cours sont annulées (fail-fast).
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+
+class PipelineStage:
+    """
+    Définition d'une étape du pipeline.
+
+    La coroutine `run` doit retourner True en cas de succès et False en cas d'échec
+    (l'échec ayant déjà été enregistré par l'appelant). Une exception non capturée
+    est considérée comme un échec.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[], Awaitable[bool]],
+        depends_on: Iterable[str] = (),
+        mandatory: bool = True
+    ):
+        self.name = name
+        self.run = run
+        self.depends_on = tuple(depends_on)
+        self.mandatory = mandatory
+
+
+class StageGraphExecutor:
+    """
+    Lance les étapes d'un pipeline dès que leurs dépendances sont satisfaites.
+
+    Attributes:
+        completed: Étapes terminées avec succès (dans l'ordre de fin)
+        failed: Étapes en échec (dans l'ordre de fin)
+        cancelled: Étapes annulées suite à l'échec d'une étape obligatoire
+        errors: Messages des exceptions non capturées, par étape
+    """
+
+    def __init__(self, stages: List[PipelineStage]):
+        self._stages: Dict[str, PipelineStage] = {}
+        for stage in stages:
+            if stage.name in self._stages:
+                raise ValueError(f"Étape dupliquée dans le pipeline: {stage.name}")
+            self._stages[stage.name] = stage
+
+        for stage in stages:
+            for dependency in stage.depends_on:
+                if dependency not in self._stages:
+                    raise ValueError(
+                        f"L'étape '{stage.name}' dépend d'une étape inconnue: '{dependency}'"
+                    )
+        self._check_acyclic()
+
+        self.completed: List[str] = []
+        self.failed: List[str] = []
+        self.cancelled: List[str] = []
+        self.errors: Dict[str, str] = {}
+
+    def _check_acyclic(self) -> None:
+        """Vérifie que le graphe des dépendances ne contient pas de cycle."""
+        visiting, visited = set(), set()
+
+        def visit(name: str):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Cycle de dépendances détecté autour de l'étape '{name}'")
+            visiting.add(name)
+            for dependency in self._stages[name].depends_on:
+                visit(dependency)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self._stages:
+            visit(name)
+
+    async def run(self) -> Optional[str]:
+        """
+        Exécute le graphe d'étapes.
+
+        Returns:
+            Nom de la première étape obligatoire en échec, ou None si le pipeline a réussi
+        """
+        pending = dict(self._stages)
+        resolved = set()
+        running: Dict[asyncio.Task, str] = {}
+        first_failure: Optional[str] = None
+
+        try:
+            while pending or running:
+                # Lancer toutes les étapes dont les dépendances sont résolues
+                for name, stage in list(pending.items()):
+                    if all(dependency in resolved for dependency in stage.depends_on):
+                        task = asyncio.create_task(stage.run(), name=f"stage:{name}")
+                        running[task] = name
+                        del pending[name]
+
+                if not running:
+                    # Garde-fou : plus aucune étape ne peut être lancée
+                    self.cancelled.extend(pending)
+                    break
+
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in finished:
+                    name = running.pop(task)
+                    try:
+                        succeeded = bool(task.result())
+                    except asyncio.CancelledError:
+                        succeeded = False
+                        self.errors[name] = "Étape annulée"
+                    except Exception as e:
+                        succeeded = False
+                        self.errors[name] = str(e)
+
+                    if succeeded:
+                        self.completed.append(name)
+                        resolved.add(name)
+                        continue
+
+                    self.failed.append(name)
+                    if self._stages[name].mandatory:
+                        if first_failure is None:
+                            first_failure = name
+                    else:
+                        # Une étape optionnelle en échec ne bloque pas les suivantes
+                        resolved.add(name)
+
+                if first_failure is not None:
+                    self.cancelled.extend(pending)
+                    pending.clear()
+                    break
+        finally:
+            # Fail-fast : annuler les étapes sœurs encore en cours
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+                self.cancelled.extend(running.values())
+
+        return first_failure
@@ -0,0 +1,256 @@
+"""
+Pool de workers en mémoire pour l'exécution des pipelines de traitement global.
+
+Les pipelines admis sont placés dans une file bornée puis exécutés par un nombre
+configurable de workers asyncio. Le nombre de pipelines exécutés simultanément par
+le pod est ainsi limité, que le client attende le résultat (mode synchrone) ou
+qu'il interroge le statut plus tard (mode asynchrone, réponse 202).
+
+La file est servie par priorité (avec vieillissement), puis par ordre d'arrivée ;
+chaque pipeline s'exécute avec sa priorité, reprise par les limiteurs de
+concurrence des microservices, et dans un span "pipeline" rattaché à la trace de
+la requête qui l'a admis.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from fastapi import HTTPException, status
+from opentelemetry import context as otel_context, trace
+from opentelemetry.trace import Status, StatusCode
+
+from app.core.config import settings
+from app.models.video_model import GlobalProcessingResult, ProcessingPriority, ProcessingStatus
+from app.services.concurrency_limiter import pipeline_backpressure
+from app.services.metrics import pipeline_duration
+from app.services.pipeline_events import pipeline_event_bus
+from app.services.priority import PriorityLatencyStats, effective_rank, processing_priority
+from app.services.tracing import current_trace_id, tracer
+
+# Nombre de résultats de pipelines terminés conservés en mémoire
+FINISHED_RESULTS_RETENTION = 200
+
+
+class PipelineJob:
+    """Pipeline admis dans la file d'attente du pool."""
+
+    def __init__(
+        self,
+        video_id: str,
+        run: Callable[[], Awaitable[GlobalProcessingResult]],
+        result: GlobalProcessingResult,
+        priority: ProcessingPriority = ProcessingPriority.NORMAL
+    ):
+        self.video_id = video_id
+        self.run = run
+        self.result = result
+        self.priority = priority
+        self.enqueued_at = datetime.now()
+        self.enqueued_monotonic = time.monotonic()
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        # Contexte de trace de la requête d'admission (les workers s'exécutent hors de son contexte)
+        self.trace_context = otel_context.get_current()
+        result.trace_id = current_trace_id()
+
+
+class PriorityJobQueue:
+    """File bornée de pipelines, servie par priorité effective puis par ordre d'arrivée."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._jobs: List[PipelineJob] = []
+        self._available = asyncio.Semaphore(0)
+
+    def qsize(self) -> int:
+        return len(self._jobs)
+
+    def full(self) -> bool:
+        return len(self._jobs) >= self.maxsize
+
+    def put_nowait(self, job: PipelineJob):
+        if self.full():
+            raise asyncio.QueueFull
+        self._jobs.append(job)
+        self._available.release()
+
+    async def get(self) -> PipelineJob:
+        await self._available.acquire()
+        now = time.monotonic()
+        # min() retourne le premier minimum : à rang égal, le plus ancien
+        job = min(self._jobs, key=lambda j: effective_rank(j.priority, now - j.enqueued_monotonic))
+        self._jobs.remove(job)
+        return job
+
+    def depth_by_priority(self) -> dict:
+        return {
+            priority.value: sum(1 for job in self._jobs if job.priority == priority)
+            for priority in ProcessingPriority
+        }
+
+
+class PipelineWorkerPool:
+    """
+    File bornée + workers asyncio pour les pipelines de traitement.
+
+    La file est en mémoire (un seul pod) ; un autre backend (Redis, broker de messages)
+    peut la remplacer en conservant l'interface submit / get_result.
+    """
+
+    def __init__(self, max_concurrency: int, queue_size: int):
+        self.max_concurrency = max(1, max_concurrency)
+        self.queue_size = max(1, queue_size)
+        self._queue: Optional[PriorityJobQueue] = None
+        self._workers: list = []
+        self._active: Dict[str, PipelineJob] = {}
+        self._finished: "OrderedDict[str, GlobalProcessingResult]" = OrderedDict()
+        self.queue_wait_by_priority = PriorityLatencyStats()
+        self.latency_by_priority = PriorityLatencyStats()
+
+    @property
+    def started(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self):
+        """Démarre les workers (idempotent)."""
+        if self.started:
+            return
+        self._queue = PriorityJobQueue(maxsize=self.queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(index), name=f"pipeline-worker-{index}")
+            for index in range(self.max_concurrency)
+        ]
+        print(f"✓ Pool de pipelines démarré ({self.max_concurrency} workers, file de {self.queue_size})")
+
+    async def stop(self):
+        """Arrête les workers. Les pipelines en cours sont annulés."""
+        for worker in self._workers:
+            worker.cancel()
+        if self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def is_full(self) -> bool:
+        """Indique si la file d'attente ne peut plus accepter de pipeline."""
+        return self._queue is not None and self._queue.full()
+
+    async def submit(
+        self,
+        video_id: str,
+        run: Callable[[], Awaitable[GlobalProcessingResult]],
+        result: GlobalProcessingResult,
+        priority: ProcessingPriority = ProcessingPriority.NORMAL
+    ) -> asyncio.Future:
+        """
+        Admet un pipeline dans la file d'attente.
+
+        Args:
+            video_id: Identifiant de la vidéo traitée
+            run: Coroutine exécutant le pipeline et retournant son résultat
+            result: Résultat partagé, mis à jour par le pipeline pendant son exécution
+            priority: Classe de priorité du pipeline
+
+        Returns:
+            Future résolue avec le GlobalProcessingResult final
+
+        Raises:
+            HTTPException: 409 si un pipeline de la vidéo est déjà admis, 503 si la file d'attente est pleine
+        """
+        await self.start()
+        if self.is_active(video_id):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Le pipeline de la vidéo {video_id} est déjà en cours"
+            )
+
+        job = PipelineJob(video_id, run, result, priority)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Trop de traitements en attente, réessayez plus tard",
+                headers={"Retry-After": "30"}
+            )
+
+        self._active[video_id] = job
+        return job.future
+
+    def is_active(self, video_id: str) -> bool:
+        """Indique si un pipeline de la vidéo est en file d'attente ou en cours dans ce pod."""
+        return video_id in self._active
+
+    def get_result(self, video_id: str) -> Optional[GlobalProcessingResult]:
+        """Retourne le résultat (en cours ou récemment terminé) d'un pipeline connu du pool."""
+        job = self._active.get(video_id)
+        if job:
+            return job.result
+        return self._finished.get(video_id)
+
+    def get_stats(self) -> dict:
+        """Statistiques d'occupation du pool."""
+        running = sum(
+            1 for job in self._active.values()
+            if job.result.overall_status == ProcessingStatus.PROCESSING
+        )
+        return {
+            "max_concurrency": self.max_concurrency,
+            "queue_size": self.queue_size,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": running,
+            "queued_by_priority": self._queue.depth_by_priority() if self._queue else {},
+            "queue_wait_by_priority": self.queue_wait_by_priority.get_stats(),
+            "latency_by_priority": self.latency_by_priority.get_stats()
+        }
+
+    async def _worker(self, index: int):
+        """Boucle d'un worker : exécute les pipelines un par un."""
+        while True:
+            job: PipelineJob = await self._queue.get()
+            self.queue_wait_by_priority.record(job.priority, time.monotonic() - job.enqueued_monotonic)
+            try:
+                job.result.overall_status = ProcessingStatus.PROCESSING
+                job.result.message = "Traitement en cours..."
+                with processing_priority(job.priority), pipeline_backpressure(), tracer.start_as_current_span(
+                    "pipeline", context=job.trace_context,
+                    attributes={"video_id": job.video_id, "priority": job.priority.value}
+                ) as span:
+                    job.result.trace_id = trace.format_trace_id(span.get_span_context().trace_id)
+                    final_result = await job.run()
+                    span.set_attribute("outcome", final_result.overall_status.value)
+                    if final_result.overall_status != ProcessingStatus.COMPLETED:
+                        span.set_status(Status(StatusCode.ERROR, final_result.message))
+                if not job.future.done():
+                    job.future.set_result(final_result)
+            except asyncio.CancelledError:
+                if not job.future.done():
+                    job.future.cancel()
+                raise
+            except Exception as e:
+                print(f"❌ Erreur inattendue dans le pipeline {job.video_id}: {e}")
+                job.result.overall_status = ProcessingStatus.FAILED
+                job.result.completed_at = datetime.now()
+                job.result.message = f"❌ Erreur inattendue du pipeline: {e}"
+                pipeline_event_bus.publish(job.video_id, "pipeline_failed", {"error": str(e)})
+                if not job.future.done():
+                    job.future.set_result(job.result)
+            finally:
+                latency = time.monotonic() - job.enqueued_monotonic
+                self.latency_by_priority.record(job.priority, latency)
+                pipeline_duration.labels(
+                    outcome=job.result.overall_status.value, priority=job.priority.value
+                ).observe(latency)
+                if self._active.get(job.video_id) is job:
+                    del self._active[job.video_id]
+                self._finished[job.video_id] = job.result
+                while len(self._finished) > FINISHED_RESULTS_RETENTION:
+                    self._finished.popitem(last=False)
+
+
+# Instance globale du pool de pipelines
+pipeline_worker_pool = PipelineWorkerPool(
+    max_concurrency=settings.pipeline_max_concurrency,
+    queue_size=settings.pipeline_queue_size
+)
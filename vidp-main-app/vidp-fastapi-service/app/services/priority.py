@@ -0,0 +1,83 @@
+"""
+Classes de priorité des traitements.
+
+Sans priorité, les uploads interactifs du frontend attendent derrière les lots de
+retraitement massifs (files FIFO). Chaque traitement porte une priorité (high,
+normal, low) qui ordonne les files d'attente du pool de pipelines et des limiteurs
+de concurrence des microservices. Pour éviter la famine des priorités basses, une
+demande en attente gagne une classe toutes les PRIORITY_AGING_SECONDS.
+
+La priorité d'un traitement en cours est portée par une variable de contexte,
+héritée par les tâches asyncio des étapes du pipeline.
+"""
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict
+
+from app.core.config import settings
+from app.models.video_model import ProcessingPriority
+
+# Priorité du traitement en cours (lue par les limiteurs de concurrence)
+current_priority: contextvars.ContextVar[ProcessingPriority] = contextvars.ContextVar(
+    "current_priority", default=ProcessingPriority.NORMAL
+)
+
+# Rang de chaque classe (le plus petit est servi en premier)
+PRIORITY_RANK = {
+    ProcessingPriority.HIGH: 0,
+    ProcessingPriority.NORMAL: 1,
+    ProcessingPriority.LOW: 2,
+}
+
+# Nombre de mesures récentes conservées par priorité (percentiles)
+LATENCY_WINDOW = 500
+
+
+@contextmanager
+def processing_priority(priority: ProcessingPriority):
+    """Contexte exécutant les appels aux microservices avec la priorité donnée."""
+    token = current_priority.set(priority)
+    try:
+        yield
+    finally:
+        current_priority.reset(token)
+
+
+def effective_rank(priority: ProcessingPriority, waited_seconds: float) -> float:
+    """Rang d'une demande en attente, amélioré d'une classe par intervalle de vieillissement."""
+    rank = PRIORITY_RANK[priority]
+    if settings.priority_aging_seconds > 0:
+        rank -= waited_seconds / settings.priority_aging_seconds
+    return rank
+
+
+class PriorityLatencyStats:
+    """Latences (s) mesurées par classe de priorité."""
+
+    def __init__(self):
+        self._count: Dict[ProcessingPriority, int] = {priority: 0 for priority in ProcessingPriority}
+        self._total: Dict[ProcessingPriority, float] = {priority: 0.0 for priority in ProcessingPriority}
+        self._max: Dict[ProcessingPriority, float] = {priority: 0.0 for priority in ProcessingPriority}
+        self._recent: Dict[ProcessingPriority, Deque[float]] = {
+            priority: deque(maxlen=LATENCY_WINDOW) for priority in ProcessingPriority
+        }
+
+    def record(self, priority: ProcessingPriority, seconds: float):
+        self._count[priority] += 1
+        self._total[priority] += seconds
+        self._max[priority] = max(self._max[priority], seconds)
+        self._recent[priority].append(seconds)
+
+    def get_stats(self) -> dict:
+        stats = {}
+        for priority in ProcessingPriority:
+            count = self._count[priority]
+            recent = sorted(self._recent[priority])
+            stats[priority.value] = {
+                "count": count,
+                "avg_seconds": round(self._total[priority] / count, 3) if count else 0.0,
+                "p95_seconds": round(recent[int(0.95 * (len(recent) - 1))], 3) if recent else 0.0,
+                "max_seconds": round(self._max[priority], 3)
+            }
+        return stats
@@ -0,0 +1,170 @@
+"""
+Nouvelles tentatives des appels de traitement aux microservices.
+
+Une erreur transitoire (connexion impossible, réponse 429/502/503/504...) ne fait
+plus échouer l'étape, ni donc tout le pipeline : l'appel est relancé après un délai
+exponentiel avec gigue (« full jitter »), dans la limite d'un nombre de tentatives
+et d'un budget de nouvelles tentatives par service. Le budget (proportion des
+appels récents) évite qu'un service en difficulté reçoive une avalanche de
+nouvelles tentatives ; le disjoncteur reste le garde-fou en cas de panne franche.
+
+Toutes les tentatives d'un même appel portent la même clé d'idempotence (en-tête
+Idempotency-Key) : le microservice rejoue le résultat d'une requête déjà traitée,
+ou attend celle encore en cours, au lieu de refaire une compression ou une
+transcription complète.
+
+Une requête envoyée puis restée sans réponse (timeout de lecture ou d'écriture)
+n'est pas relancée : les appels de traitement ont un timeout de plusieurs heures,
+et une nouvelle tentative attendrait la même requête bloquée.
+"""
+import asyncio
+import contextvars
+import functools
+import random
+import time
+import uuid
+from collections import deque
+from typing import Deque, Optional
+
+import httpx
+
+# Clé d'idempotence de l'appel en cours, ajoutée aux requêtes POST par le client HTTP partagé
+current_idempotency_key: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "current_idempotency_key", default=None
+)
+
+# Réponses HTTP considérées comme transitoires
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Erreurs de transport survenues avant l'envoi de la requête (connexion impossible)
+RETRYABLE_TRANSPORT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# Fenêtre (s) sur laquelle est calculé le budget de nouvelles tentatives
+RETRY_BUDGET_WINDOW = 60.0
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """Indique si une erreur httpx est transitoire (l'appel peut être relancé)."""
+    # Import local : http_client_pool importe ce module
+    from app.services.http_client_pool import CircuitOpenError
+
+    if isinstance(error, CircuitOpenError):
+        # Disjoncteur ouvert : le service est considéré en panne, inutile d'insister
+        return False
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, RETRYABLE_TRANSPORT_ERRORS)
+
+
+class RetryPolicy:
+    """Backoff exponentiel avec gigue et budget de nouvelles tentatives, pour un service."""
+
+    def __init__(
+        self,
+        service_name: str,
+        max_attempts: int,
+        base_delay: float,
+        max_delay: float,
+        budget_ratio: float,
+        min_retries_per_window: int = 3
+    ):
+        self.service_name = service_name
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget_ratio = budget_ratio
+        self.min_retries_per_window = min_retries_per_window
+        self._calls: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+        self.calls = 0
+        self.retries = 0
+        self.recovered = 0
+        self.exhausted = 0
+        self.budget_denied = 0
+
+    def _trim(self, now: float):
+        for timestamps in (self._calls, self._retries):
+            while timestamps and now - timestamps[0] > RETRY_BUDGET_WINDOW:
+                timestamps.popleft()
+
+    def record_call(self):
+        now = time.monotonic()
+        self._trim(now)
+        self._calls.append(now)
+        self.calls += 1
+
+    def should_retry(self, attempt: int) -> bool:
+        """
+        Autorise (ou non) une nouvelle tentative après l'échec transitoire n°attempt.
+
+        Le budget autorise, sur la fenêtre glissante, un nombre de nouvelles tentatives
+        égal à budget_ratio fois le nombre d'appels (avec un minimum).
+        """
+        if attempt >= self.max_attempts:
+            self.exhausted += 1
+            return False
+        now = time.monotonic()
+        self._trim(now)
+        budget = self.min_retries_per_window + self.budget_ratio * len(self._calls)
+        if len(self._retries) >= budget:
+            self.budget_denied += 1
+            return False
+        self._retries.append(now)
+        self.retries += 1
+        return True
+
+    def backoff(self, attempt: int) -> float:
+        """Délai avant la tentative suivante (full jitter)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def get_stats(self) -> dict:
+        self._trim(time.monotonic())
+        return {
+            "max_attempts": self.max_attempts,
+            "calls": self.calls,
+            "retries": self.retries,
+            "recovered": self.recovered,
+            "exhausted": self.exhausted,
+            "budget_denied": self.budget_denied,
+            "retries_in_window": len(self._retries),
+            "calls_in_window": len(self._calls)
+        }
+
+
+def retry_transient(method):
+    """
+    Décorateur des méthodes de traitement d'un client de microservice.
+
+    La méthode retourne un dict ; un échec marqué "retryable" est relancé selon la
+    politique du service (self.http.retry_policy). Le nombre de tentatives est
+    ajouté au résultat ("attempts"). Chaque tentative occupe sa propre place du
+    limiteur de concurrence (placer ce décorateur au-dessus de @concurrency_limited).
+    """
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        policy: RetryPolicy = self.http.retry_policy
+        token = current_idempotency_key.set(current_idempotency_key.get() or str(uuid.uuid4()))
+        try:
+            policy.record_call()
+            attempt = 1
+            while True:
+                result = await method(self, *args, **kwargs)
+                failed = isinstance(result, dict) and result.get("status") == "failed"
+                if not (failed and result.get("retryable")) or not policy.should_retry(attempt):
+                    break
+                delay = policy.backoff(attempt)
+                print(
+                    f"🔁 {policy.service_name}: échec transitoire ({result.get('error')}), "
+                    f"tentative {attempt + 1}/{policy.max_attempts} dans {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+                attempt += 1
+
+            if attempt > 1 and not failed:
+                policy.recovered += 1
+            if isinstance(result, dict):
+                result["attempts"] = attempt
+            return result
+        finally:
+            current_idempotency_key.reset(token)
+    return wrapper
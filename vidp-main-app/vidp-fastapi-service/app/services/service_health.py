@@ -0,0 +1,139 @@
+"""
+Surveillance en arrière-plan de la santé des microservices.
+
+Une tâche asyncio sonde périodiquement (et en parallèle) tous les microservices et
+conserve leur état en mémoire. Les endpoints et le pipeline consultent cet état au
+lieu d'appeler check_service_health() avant chaque requête, ce qui supprime un
+aller-retour HTTP du chemin critique. Le résultat des sondes alimente aussi le
+disjoncteur de chaque client : une sonde réussie le referme, une sonde en échec
+compte comme un échec.
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from opentelemetry.instrumentation.utils import suppress_http_instrumentation
+
+from app.core.config import settings
+from app.services.http_client_pool import health_probe_in_progress
+from app.services.langscale_client import language_detection_client
+from app.services.downscale_client import compression_client
+from app.services.subtitle_client import subtitle_client
+from app.services.animal_detection_client import animal_detection_client
+from app.services.aggregation_client import aggregation_client
+
+
+class ServiceHealthState:
+    """Dernier état connu d'un microservice."""
+
+    def __init__(self, name: str, client, url: str):
+        self.name = name
+        self.client = client
+        self.url = url
+        self.healthy: Optional[bool] = None  # None tant qu'aucune sonde n'a abouti
+        self.last_checked: Optional[datetime] = None
+        self.latency_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        if self.healthy is None:
+            status = "unknown"
+        else:
+            status = "up" if self.healthy else "down"
+        return {
+            "url": self.url,
+            "status": status,
+            "last_checked": self.last_checked.isoformat() if self.last_checked else None,
+            "latency_ms": self.latency_ms,
+            "last_error": self.last_error,
+            "circuit_breaker": self.client.http.breaker.get_state(),
+            "concurrency": self.client.http.limiter.get_stats(),
+            "retries": self.client.http.retry_policy.get_stats()
+        }
+
+
+class ServiceHealthMonitor:
+    """Sonde les microservices en tâche de fond et expose leur état en mémoire."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.services: Dict[str, ServiceHealthState] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, name: str, client, url: str):
+        """Ajoute un microservice à surveiller."""
+        self.services[name] = ServiceHealthState(name, client, url)
+
+    async def start(self):
+        """Démarre la boucle de surveillance (idempotent)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="service-health-monitor")
+            print(f"✓ Surveillance des microservices démarrée (toutes les {self.interval}s)")
+
+    async def stop(self):
+        """Arrête la boucle de surveillance."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await self.check_all()
+            await asyncio.sleep(self.interval)
+
+    async def check_all(self):
+        """Sonde tous les microservices en parallèle."""
+        await asyncio.gather(*(self._probe(state) for state in self.services.values()))
+
+    async def _probe(self, state: ServiceHealthState):
+        breaker = state.client.http.breaker
+        token = health_probe_in_progress.set(True)
+        started = time.monotonic()
+        try:
+            # Les sondes de santé ne sont pas tracées
+            with suppress_http_instrumentation():
+                healthy = await state.client.check_service_health()
+            state.last_error = None if healthy else "Sonde de santé en échec"
+        except Exception as e:
+            healthy = False
+            state.last_error = str(e)
+        finally:
+            health_probe_in_progress.reset(token)
+
+        state.latency_ms = round((time.monotonic() - started) * 1000, 1)
+        state.last_checked = datetime.now()
+        if healthy != state.healthy and state.healthy is not None:
+            print(f"{'✅' if healthy else '❌'} Service '{state.name}' {'rétabli' if healthy else 'indisponible'}")
+        state.healthy = healthy
+
+        if healthy:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+
+    def is_available(self, name: str) -> bool:
+        """
+        Indique, sans appel réseau, si un microservice peut être appelé.
+
+        Le disjoncteur fait foi : il est ouvert après des échecs répétés (appels
+        réels ou sondes) et se referme dès qu'une sonde ou un appel d'essai réussit.
+        """
+        state = self.services.get(name)
+        if state is None:
+            return True
+        return state.client.http.breaker.is_available()
+
+    def get_status(self) -> Dict[str, dict]:
+        """État connu de chaque microservice."""
+        return {name: state.to_dict() for name, state in self.services.items()}
+
+
+# Instance globale du moniteur
+service_health_monitor = ServiceHealthMonitor(interval=settings.health_check_interval)
+service_health_monitor.register("language_detection", language_detection_client, settings.langscale_service_url)
+service_health_monitor.register("compression", compression_client, settings.downscale_service_url)
+service_health_monitor.register("subtitle_generation", subtitle_client, settings.subtitle_service_url)
+service_health_monitor.register("animal_detection", animal_detection_client, settings.animal_detection_service_url)
+service_health_monitor.register("aggregation", aggregation_client, settings.aggregation_service_url)
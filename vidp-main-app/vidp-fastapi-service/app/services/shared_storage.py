@@ -0,0 +1,74 @@
+"""
+Transmission des vidéos aux microservices par référence de chemin (volume partagé).
+
+Par défaut, chaque client uploade la vidéo complète en multipart : un pipeline
+envoie ainsi le même fichier 4 à 5 fois. Lorsque le stockage de l'application est
+un volume partagé (ReadWriteMany) monté aussi dans les microservices, le client
+envoie seulement le chemin de la vidéo relatif à la racine du stockage, et le
+microservice la lit directement depuis son propre point de montage
+(SHARED_STORAGE_ROOT).
+
+L'upload multipart reste le mode de repli : mode désactivé, vidéo hors du stockage
+partagé, ou microservice qui ne trouve pas le fichier / n'expose pas l'endpoint.
+"""
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from app.core.config import settings
+
+# Réponses indiquant que le microservice ne peut pas utiliser la référence (=> upload multipart)
+PATH_REFERENCE_FALLBACK_STATUSES = {400, 404, 405, 422}
+
+
+def shared_path_reference(video_path: Path) -> Optional[str]:
+    """
+    Chemin de la vidéo relatif à la racine du stockage partagé.
+
+    Returns:
+        Référence (ex: "videos/<hash>.mp4"), ou None si le mode est désactivé
+        ou si la vidéo n'est pas dans le stockage partagé
+    """
+    if not settings.shared_storage_enabled:
+        return None
+    try:
+        relative_path = Path(video_path).resolve().relative_to(Path(settings.local_storage_root).resolve())
+    except ValueError:
+        return None
+    return relative_path.as_posix()
+
+
+def transfer_stats(mode: str, bytes_sent: int, reference: Optional[str] = None) -> dict:
+    """Description du transfert de la vidéo vers un microservice (ajoutée au résultat)."""
+    stats = {"mode": mode, "bytes_sent": bytes_sent}
+    if reference:
+        stats["reference"] = reference
+    return stats
+
+
+async def post_path_reference(
+    client: httpx.AsyncClient,
+    service_name: str,
+    endpoint: str,
+    **request_kwargs
+) -> Optional[httpx.Response]:
+    """
+    Envoie une requête par référence de chemin.
+
+    Returns:
+        Réponse du microservice, ou None s'il ne peut pas utiliser la référence
+        (l'appelant se replie alors sur l'upload multipart)
+
+    Raises:
+        httpx.HTTPError: Erreur de communication ou réponse d'erreur du traitement
+    """
+    response = await client.post(endpoint, **request_kwargs)
+    if response.status_code in PATH_REFERENCE_FALLBACK_STATUSES:
+        print(
+            f"⚠ {service_name}: référence de chemin refusée (HTTP {response.status_code}), "
+            f"repli sur l'upload multipart"
+        )
+        return None
+    response.raise_for_status()
+    return response
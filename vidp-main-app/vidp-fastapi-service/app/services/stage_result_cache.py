@@ -0,0 +1,121 @@
+"""
+Cache des résultats d'étapes du pipeline de traitement global.
+
+Une étape appliquée au même contenu (empreinte SHA-256 de la vidéo) avec les mêmes
+paramètres produit le même résultat : le résultat est alors servi depuis MongoDB
+(collection processing_results) sans appel HTTP au microservice.
+
+Politique d'invalidation :
+- chaque entrée expire après STAGE_CACHE_TTL_SECONDS (index TTL MongoDB) ;
+- les entrées peuvent être invalidées explicitement par contenu et/ou par étape.
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.db.mongodb_connector import mongodb_connector
+
+
+def normalize_stage_params(params: dict) -> dict:
+    """
+    Normalise les paramètres d'une étape pour construire une clé stable.
+
+    Les chaînes sont mises en minuscules et sans espaces superflus, les flottants
+    arrondis (0.5 et 0.50000001 donnent la même clé), les valeurs None ignorées.
+    """
+    normalized = {}
+    for name, value in params.items():
+        if value is None:
+            continue
+        if isinstance(value, str):
+            value = value.strip().lower()
+        elif isinstance(value, float):
+            value = round(value, 4)
+        normalized[name] = value
+    return normalized
+
+
+def make_cache_key(content_hash: str, stage: str, params: dict) -> str:
+    """Clé de cache : empreinte de (contenu, étape, paramètres normalisés)."""
+    payload = json.dumps(
+        {"content_hash": content_hash, "stage": stage, "params": normalize_stage_params(params)},
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class StageResultCache:
+    """Cache des résultats d'étapes, avec compteurs de hits/misses par étape."""
+
+    def __init__(self):
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return settings.stage_cache_enabled
+
+    async def get(self, content_hash: Optional[str], stage: str, params: dict) -> Optional[dict]:
+        """
+        Recherche le résultat d'une étape déjà exécutée sur le même contenu.
+
+        Returns:
+            Résultat de l'étape ou None (cache désactivé, contenu inconnu ou absent)
+        """
+        if not self.enabled or not content_hash:
+            return None
+
+        cached = await mongodb_connector.get_cached_stage_result(
+            make_cache_key(content_hash, stage, params)
+        )
+        if cached is None:
+            self.misses[stage] = self.misses.get(stage, 0) + 1
+            return None
+
+        self.hits[stage] = self.hits.get(stage, 0) + 1
+        print(f"⚡ Cache hit pour l'étape '{stage}' ({content_hash[:12]}...)")
+        return cached
+
+    async def put(
+        self,
+        content_hash: Optional[str],
+        stage: str,
+        params: dict,
+        result: dict,
+        source_video_id: str
+    ) -> bool:
+        """Enregistre le résultat d'une étape réussie."""
+        if not self.enabled or not content_hash:
+            return False
+
+        return await mongodb_connector.save_cached_stage_result(
+            cache_key=make_cache_key(content_hash, stage, params),
+            content_hash=content_hash,
+            stage=stage,
+            params=normalize_stage_params(params),
+            result=result,
+            source_video_id=source_video_id,
+            expires_at=datetime.now() + timedelta(seconds=settings.stage_cache_ttl_seconds)
+        )
+
+    async def invalidate(self, content_hash: Optional[str] = None, stage: Optional[str] = None) -> int:
+        """Supprime les entrées du cache (toutes, par contenu et/ou par étape)."""
+        return await mongodb_connector.delete_cached_stage_results(content_hash, stage)
+
+    def get_stats(self) -> dict:
+        """Compteurs de hits/misses par étape et taux de hit global."""
+        total_hits = sum(self.hits.values())
+        total_lookups = total_hits + sum(self.misses.values())
+        return {
+            "enabled": self.enabled,
+            "ttl_seconds": settings.stage_cache_ttl_seconds,
+            "hits": dict(self.hits),
+            "misses": dict(self.misses),
+            "hit_rate": round(total_hits / total_lookups, 3) if total_lookups else None
+        }
+
+
+# Instance globale du cache
+stage_result_cache = StageResultCache()
@@ -0,0 +1,196 @@
+"""
+Comptabilité incrémentale du stockage local (GET /videos/stats).
+
+Lister LOCAL_VIDEO_PATH et lire la taille de chaque fichier à chaque appel coûte
+des entrées/sorties proportionnelles au nombre de fichiers, lentes sur un volume
+réseau. Les statistiques sont donc tenues à jour au fil de l'eau :
+
+- nombre et taille des fichiers stockés : FileStorageService signale chaque fichier
+  ajouté (hors contenu dédupliqué) et supprimé ;
+- nombre de vidéos et taille de leurs fichiers par statut : le connecteur MongoDB
+  signale chaque création de vidéo et changement de statut (un fichier partagé par
+  des uploads identiques compte pour chacune de ses vidéos).
+
+Les compteurs sont enregistrés dans MongoDB (collection storage_stats) et rechargés
+au démarrage. Une réconciliation périodique (STORAGE_STATS_RECONCILE_INTERVAL)
+recalcule les valeurs exactes par un parcours du dossier et une agrégation MongoDB,
+et corrige l'écart éventuel (fichiers modifiés hors de l'application, pod arrêté
+avant l'enregistrement des compteurs...).
+
+Les compteurs sont en mémoire et enregistrés par ce pod seul (un seul pod, comme le
+pool de pipelines).
+"""
+import asyncio
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.db.mongodb_connector import mongodb_connector
+
+# Intervalle (s) d'enregistrement des compteurs modifiés dans MongoDB
+STATS_FLUSH_SECONDS = 30.0
+
+
+class StorageAccounting:
+    """Compteurs du stockage local, mis à jour à chaque écriture et réconciliés périodiquement."""
+
+    def __init__(self, reconcile_interval: float):
+        self.reconcile_interval = reconcile_interval
+        self.files = 0
+        self.bytes = 0
+        self.by_status: Dict[str, Dict[str, int]] = {}
+        self.updated_at: Optional[datetime] = None
+        self.reconciled_at: Optional[datetime] = None
+        self.last_drift: Optional[dict] = None
+        self._dirty = False
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def _changed(self):
+        self.updated_at = datetime.now()
+        self._dirty = True
+
+    def record_file_added(self, size: int):
+        """Un fichier a été ajouté au stockage."""
+        self.files += 1
+        self.bytes += size
+        self._changed()
+
+    def record_file_removed(self, size: int):
+        """Un fichier a été supprimé du stockage."""
+        self.files = max(0, self.files - 1)
+        self.bytes = max(0, self.bytes - size)
+        self._changed()
+
+    def record_status_change(self, previous_status: Optional[str], new_status: str, file_size: int):
+        """Une vidéo a été créée (previous_status None) ou a changé de statut."""
+        if previous_status is not None:
+            counters = self.by_status.setdefault(previous_status, {"videos": 0, "bytes": 0})
+            counters["videos"] = max(0, counters["videos"] - 1)
+            counters["bytes"] = max(0, counters["bytes"] - file_size)
+        counters = self.by_status.setdefault(new_status, {"videos": 0, "bytes": 0})
+        counters["videos"] += 1
+        counters["bytes"] += file_size
+        self._changed()
+
+    async def start(self):
+        """Recharge les compteurs enregistrés et démarre la boucle d'enregistrement / réconciliation."""
+        if self._task is not None and not self._task.done():
+            return
+        snapshot = await mongodb_connector.get_storage_stats_snapshot()
+        if snapshot:
+            self.files = snapshot.get("files", 0)
+            self.bytes = snapshot.get("bytes", 0)
+            self.by_status = snapshot.get("by_status", {})
+            self.updated_at = snapshot.get("updated_at")
+            self.reconciled_at = snapshot.get("reconciled_at")
+        self._task = asyncio.create_task(self._run(), name="storage-accounting")
+        print(f"✓ Comptabilité du stockage démarrée (réconciliation toutes les {self.reconcile_interval}s)")
+
+    async def stop(self):
+        """Arrête la boucle et enregistre les derniers compteurs."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        # Première réconciliation au démarrage : le stockage a pu changer pendant l'arrêt
+        next_reconcile = time.monotonic()
+        while True:
+            try:
+                if time.monotonic() >= next_reconcile:
+                    await self.reconcile()
+                    next_reconcile = time.monotonic() + self.reconcile_interval
+                await self.flush()
+            except Exception as e:
+                print(f"❌ Erreur de la comptabilité du stockage: {e}")
+            await asyncio.sleep(STATS_FLUSH_SECONDS)
+
+    async def flush(self):
+        """Enregistre les compteurs dans MongoDB s'ils ont changé."""
+        if not self._dirty or not mongodb_connector.client:
+            return
+        self._dirty = False
+        if not await mongodb_connector.save_storage_stats_snapshot(self._snapshot()):
+            self._dirty = True
+
+    async def reconcile(self) -> dict:
+        """
+        Recalcule les compteurs exacts (parcours du dossier, agrégation MongoDB) et
+        corrige l'écart avec les compteurs incrémentaux.
+
+        Returns:
+            Dict: Écart corrigé (files, bytes, statuts dont le décompte a changé)
+        """
+        async with self._lock:
+            files, total_bytes = await asyncio.to_thread(self._scan)
+            drift = {"files": files - self.files, "bytes": total_bytes - self.bytes, "by_status": {}}
+            self.files, self.bytes = files, total_bytes
+
+            if mongodb_connector.client:
+                by_status = await mongodb_connector.count_videos_by_status()
+                for status in set(by_status) | set(self.by_status):
+                    expected = by_status.get(status, {"videos": 0, "bytes": 0})
+                    current = self.by_status.get(status, {"videos": 0, "bytes": 0})
+                    if expected != current:
+                        drift["by_status"][status] = expected["videos"] - current["videos"]
+                self.by_status = by_status
+
+            self.reconciled_at = datetime.now()
+            self.last_drift = drift
+            self._changed()
+            if drift["files"] or drift["bytes"] or drift["by_status"]:
+                print(
+                    f"🔁 Comptabilité du stockage réconciliée : écart de {drift['files']} fichiers, "
+                    f"{drift['bytes']} octets, statuts {drift['by_status']}"
+                )
+            return drift
+
+    @staticmethod
+    def _scan() -> Tuple[int, int]:
+        """Nombre et taille des fichiers stockés (hors fichiers temporaires d'upload)."""
+        storage_path = Path(settings.local_video_path)
+        files = total_bytes = 0
+        if not storage_path.exists():
+            return files, total_bytes
+        for path in storage_path.iterdir():
+            if path.name.startswith("."):
+                continue
+            try:
+                if path.is_file():
+                    files += 1
+                    total_bytes += path.stat().st_size
+            except OSError:
+                continue
+        return files, total_bytes
+
+    def _snapshot(self) -> dict:
+        return {
+            "files": self.files,
+            "bytes": self.bytes,
+            "by_status": self.by_status,
+            "updated_at": self.updated_at,
+            "reconciled_at": self.reconciled_at
+        }
+
+    def get_stats(self) -> dict:
+        """Statistiques du stockage, sans entrée/sortie disque ni requête MongoDB."""
+        return {
+            "total_files": self.files,
+            "total_size_bytes": self.bytes,
+            "total_size_mb": round(self.bytes / (1024 * 1024), 2),
+            "storage_path": str(Path(settings.local_video_path)),
+            "by_status": self.by_status,
+            "updated_at": self.updated_at,
+            "reconciled_at": self.reconciled_at,
+            "last_drift": self.last_drift
+        }
+
+
+# Instance globale, tenue à jour par les changements de statut enregistrés dans MongoDB
+storage_accounting = StorageAccounting(reconcile_interval=settings.storage_stats_reconcile_interval)
+mongodb_connector.add_status_listener(storage_accounting.record_status_change)
@@ -0,0 +1,271 @@
+"""
+Cycle de vie du stockage local : suppression des vidéos originales devenues inutiles.
+
+Les originaux uploadés restent sinon indéfiniment dans LOCAL_VIDEO_PATH et le volume
+se remplit. Une tâche de fond parcourt périodiquement les fichiers stockés et
+supprime ceux qui ne servent plus :
+
+- un fichier n'est supprimable que si toutes les vidéos qui le référencent (un
+  fichier adressé par contenu est partagé entre vidéos identiques) ont terminé leur
+  pipeline avec l'agrégation : la vidéo finale est alors servie par le service
+  d'agrégation. Les fichiers qui ne sont plus référencés par aucune vidéo sont aussi
+  supprimables ;
+- un fichier dont une vidéo est en file d'attente ou en cours de traitement (pool
+  de pipelines de ce pod, ou statut "processing" dans MongoDB), en attente de
+  traitement ou à reprendre après un échec, est protégé ;
+- âge : un fichier supprimable inutilisé depuis STORAGE_RETENTION_SECONDS est supprimé ;
+- quota : tant que le stockage dépasse STORAGE_QUOTA_BYTES, les fichiers supprimables
+  les moins récemment utilisés (LRU) sont supprimés.
+
+La dernière utilisation d'un fichier est sa date de modification (rafraîchie quand
+un upload identique le réutilise ou qu'il est lu en streaming) ou la fin du dernier
+traitement d'une de ses vidéos. Les fichiers modifiés depuis moins d'une heure ne
+sont jamais supprimés : leur vidéo peut ne pas encore être enregistrée.
+
+Chaque suppression est enregistrée dans MongoDB (collection storage_evictions) et
+datée sur les vidéos concernées (original_evicted_at). Sans MongoDB, les références
+ne peuvent pas être vérifiées et rien n'est supprimé.
+"""
+import asyncio
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.db.mongodb_connector import mongodb_connector
+from app.models.video_model import ProcessingStage, VideoStatus
+from app.services.file_storage import FileStorageService
+from app.services import metrics
+from app.services.pipeline_worker import pipeline_worker_pool
+
+# Délai (s) pendant lequel un fichier récemment écrit ou réutilisé est protégé
+RECENT_FILE_GRACE_SECONDS = 3600
+
+# Nom d'un fichier adressé par contenu : empreinte SHA-256 (+ extension)
+CONTENT_HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+
+storage_evictions_total = metrics.counter(
+    "vidp_storage_evictions_total", "Vidéos originales supprimées du stockage local, par motif", ("reason",)
+)
+storage_evicted_bytes_total = metrics.counter(
+    "vidp_storage_evicted_bytes_total", "Octets libérés par la suppression des vidéos originales, par motif", ("reason",)
+)
+
+
+class StoredBlob:
+    """Fichier du stockage local et vidéos qui le référencent."""
+
+    def __init__(self, path: Path, size: int, modified: float):
+        self.path = path
+        self.size = size
+        self.modified = modified
+        self.content_hash = path.stem if CONTENT_HASH_RE.match(path.stem) else None
+        self.references: List[dict] = []
+
+    @property
+    def last_used(self) -> float:
+        """Horodatage (epoch) de la dernière utilisation connue du fichier."""
+        ended = [
+            ref["processing_end_time"].timestamp() for ref in self.references
+            if isinstance(ref.get("processing_end_time"), datetime)
+        ]
+        return max([self.modified] + ended)
+
+    def protection_reason(self, now: float) -> Optional[str]:
+        """Raison pour laquelle le fichier ne peut pas être supprimé, ou None."""
+        if now - self.modified < RECENT_FILE_GRACE_SECONDS:
+            return "recent"
+        for ref in self.references:
+            if pipeline_worker_pool.is_active(ref["video_id"]) or ref.get("status") == VideoStatus.PROCESSING.value:
+                return "in_flight"
+            if ref.get("status") != VideoStatus.COMPLETED.value:
+                return "not_processed"
+            if ProcessingStage.AGGREGATION.value not in (ref.get("stages_completed") or []):
+                return "not_aggregated"
+        return None
+
+
+class StorageLifecycleManager:
+    """Tâche de fond appliquant les politiques d'âge et de quota aux vidéos originales."""
+
+    def __init__(self, interval: float, quota_bytes: int, retention_seconds: int):
+        self.interval = interval
+        self.quota_bytes = max(0, quota_bytes)
+        self.retention_seconds = max(0, retention_seconds)
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.passes = 0
+        self.evicted_files = 0
+        self.evicted_bytes = 0
+        self.last_pass: Optional[dict] = None
+
+    async def start(self):
+        """Démarre la boucle de nettoyage (idempotent)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="storage-lifecycle")
+            print(
+                f"✓ Cycle de vie du stockage démarré (toutes les {self.interval}s, "
+                f"quota: {self.quota_bytes or 'aucun'}, rétention: {self.retention_seconds or 'illimitée'}s)"
+            )
+
+    async def stop(self):
+        """Arrête la boucle de nettoyage."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                print(f"❌ Erreur du cycle de vie du stockage: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> dict:
+        """
+        Effectue une passe : inventaire, vérification des références et suppressions.
+
+        Returns:
+            Dict: Résumé de la passe (octets stockés, fichiers protégés et supprimés)
+        """
+        async with self._lock:
+            started = time.monotonic()
+            summary = {
+                "started_at": datetime.now(),
+                "total_files": 0,
+                "total_bytes": 0,
+                "protected": {},
+                "evicted_files": 0,
+                "evicted_bytes": 0,
+                "over_quota_bytes": 0,
+                "skipped": None
+            }
+
+            blobs = await asyncio.to_thread(self._scan)
+            summary["total_files"] = len(blobs)
+            summary["total_bytes"] = total_bytes = sum(blob.size for blob in blobs)
+
+            if not mongodb_connector.client:
+                summary["skipped"] = "MongoDB non disponible : références des fichiers invérifiables"
+            elif blobs:
+                try:
+                    await self._load_references(blobs)
+                except Exception as e:
+                    summary["skipped"] = f"Lecture des références impossible: {e}"
+
+            if summary["skipped"] is None:
+                now = time.time()
+                evictable: List[StoredBlob] = []
+                for blob in blobs:
+                    reason = blob.protection_reason(now)
+                    if reason:
+                        summary["protected"][reason] = summary["protected"].get(reason, 0) + 1
+                    else:
+                        evictable.append(blob)
+                # Les moins récemment utilisés d'abord
+                evictable.sort(key=lambda blob: blob.last_used)
+
+                for blob in evictable:
+                    if self.retention_seconds and now - blob.last_used >= self.retention_seconds:
+                        reason = "age"
+                    elif self.quota_bytes and total_bytes > self.quota_bytes:
+                        reason = "quota"
+                    else:
+                        continue
+                    if await self._evict(blob, reason):
+                        total_bytes -= blob.size
+                        summary["evicted_files"] += 1
+                        summary["evicted_bytes"] += blob.size
+
+                if self.quota_bytes and total_bytes > self.quota_bytes:
+                    summary["over_quota_bytes"] = total_bytes - self.quota_bytes
+                    print(
+                        f"⚠️  Stockage au-dessus du quota de {summary['over_quota_bytes']} octets : "
+                        f"fichiers restants protégés ({summary['protected']})"
+                    )
+
+            summary["duration_seconds"] = round(time.monotonic() - started, 3)
+            self.passes += 1
+            self.last_pass = summary
+            if summary["evicted_files"]:
+                print(
+                    f"🧹 Cycle de vie du stockage : {summary['evicted_files']} vidéos originales supprimées "
+                    f"({summary['evicted_bytes']} octets libérés)"
+                )
+            return summary
+
+    @staticmethod
+    def _scan() -> List[StoredBlob]:
+        """Inventaire des fichiers stockés (hors fichiers temporaires d'upload)."""
+        storage_path = Path(settings.local_video_path)
+        blobs = []
+        if not storage_path.exists():
+            return blobs
+        for path in storage_path.iterdir():
+            if path.name.startswith("."):
+                continue
+            try:
+                if path.is_file():
+                    stat = path.stat()
+                    blobs.append(StoredBlob(path, stat.st_size, stat.st_mtime))
+            except OSError:
+                continue
+        return blobs
+
+    @staticmethod
+    async def _load_references(blobs: List[StoredBlob]):
+        """Associe à chaque fichier les vidéos qui le référencent (par chemin ou empreinte)."""
+        by_path: Dict[str, StoredBlob] = {str(blob.path): blob for blob in blobs}
+        by_hash: Dict[str, StoredBlob] = {blob.content_hash: blob for blob in blobs if blob.content_hash}
+        references = await mongodb_connector.get_blob_references(list(by_path), list(by_hash))
+        for ref in references:
+            blob = by_path.get(ref.get("file_path")) or by_hash.get(ref.get("content_hash"))
+            if blob is not None:
+                blob.references.append(ref)
+
+    async def _evict(self, blob: StoredBlob, reason: str) -> bool:
+        """Supprime un fichier, sauf si une de ses vidéos a été admise entre-temps dans le pool."""
+        if any(pipeline_worker_pool.is_active(ref["video_id"]) for ref in blob.references):
+            return False
+        if not await asyncio.to_thread(FileStorageService.delete_video_file, str(blob.path)):
+            return False
+
+        self.evicted_files += 1
+        self.evicted_bytes += blob.size
+        storage_evictions_total.labels(reason=reason).inc()
+        storage_evicted_bytes_total.labels(reason=reason).inc(blob.size)
+        await mongodb_connector.record_storage_eviction({
+            "file_path": str(blob.path),
+            "content_hash": blob.content_hash,
+            "size": blob.size,
+            "reason": reason,
+            "video_ids": [ref["video_id"] for ref in blob.references],
+            "last_used": datetime.fromtimestamp(blob.last_used),
+            "evicted_at": datetime.now()
+        })
+        print(f"🗑️  Vidéo originale supprimée ({reason}) : {blob.path.name}, {blob.size} octets")
+        return True
+
+    def get_stats(self) -> dict:
+        return {
+            "enabled": settings.storage_lifecycle_enabled,
+            "interval_seconds": self.interval,
+            "quota_bytes": self.quota_bytes,
+            "retention_seconds": self.retention_seconds,
+            "passes": self.passes,
+            "evicted_files": self.evicted_files,
+            "evicted_bytes": self.evicted_bytes,
+            "last_pass": self.last_pass
+        }
+
+
+# Instance globale du gestionnaire de cycle de vie
+storage_lifecycle_manager = StorageLifecycleManager(
+    interval=settings.storage_lifecycle_interval,
+    quota_bytes=settings.storage_quota_bytes,
+    retention_seconds=settings.storage_retention_seconds
+)
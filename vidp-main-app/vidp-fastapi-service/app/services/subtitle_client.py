@@ -6,6 +6,10 @@ from typing import Dict, Any, Optional
 from pathlib import Path
 
 from app.core.config import settings
+from app.services.http_client_pool import ServiceHttpClient
+from app.services.concurrency_limiter import concurrency_limited
+from app.services.retry_policy import is_retryable_error, retry_transient
+from app.services.shared_storage import post_path_reference, shared_path_reference, transfer_stats
 
 
 class SubtitleClient:
@@ -23,7 +27,11 @@ class SubtitleClient:
             write=300.0,
             pool=30.0
         )
+        # Client HTTP partagé (pool de connexions keep-alive), géré par les hooks de main.py
+        self.http = ServiceHttpClient("subtitle_generation", self.video_timeout, settings.subtitle_max_concurrency)
     
+    @retry_transient
+    @concurrency_limited
     async def generate_subtitles(
         self,
         video_path: str,
@@ -34,6 +42,9 @@ class SubtitleClient:
         Génère des sous-titres pour une vidéo en uploadant le fichier.
         
         IMPORTANT: Upload du fichier via HTTP pour compatibilité Kubernetes.
+        Si le stockage est partagé avec le service (SHARED_STORAGE_ENABLED), seul le
+        chemin relatif de la vidéo est envoyé (/api/generate-subtitles/local) ;
+        l'upload reste le repli.
         
         Args:
             video_path: Chemin du fichier vidéo local
@@ -54,19 +65,34 @@ class SubtitleClient:
                 "detail": f"Le fichier {video_path} n'existe pas"
             }
         
-        async with httpx.AsyncClient(timeout=self.video_timeout) as client:
-            try:
+        client = self.http.client
+        try:
+            data = {
+                'model_name': model_name
+            }
+            
+            if language:
+                data['language'] = language
+            
+            # Volume partagé : le service lit la vidéo directement, sans upload
+            reference = shared_path_reference(video_file_path)
+            response = None
+            if reference:
+                response = await post_path_reference(
+                    client,
+                    "subtitle_generation",
+                    f"{self.base_url}/api/generate-subtitles/local",
+                    data={**data, 'video_path': reference}
+                )
+            
+            if response is not None:
+                transfer = transfer_stats("shared_path", 0, reference)
+            else:
                 # Préparer le fichier pour l'upload
                 with open(video_file_path, 'rb') as video_file:
                     files = {
                         'video': (video_file_path.name, video_file, 'video/mp4')
                     }
-                    data = {
-                        'model_name': model_name
-                    }
-                    
-                    if language:
-                        data['language'] = language
                     
                     # Upload et génération de sous-titres
                     response = await client.post(
@@ -75,36 +101,40 @@ class SubtitleClient:
                         data=data
                     )
                     response.raise_for_status()
-                    
-                    # La réponse est un JSON contenant full_text et srt_url
-                    response_data = response.json()
-                    
-                    return {
-                        "status": "completed",
-                        "full_text": response_data.get("full_text", ""),
-                        "srt_url": response_data.get("srt_url"),
-                        "model_name": model_name,
-                        "language": language
-                    }
-                
-            except httpx.TimeoutException as e:
-                return {
-                    "status": "failed",
-                    "error": "Timeout lors de la génération de sous-titres",
-                    "detail": str(e)
-                }
-            except httpx.HTTPError as e:
-                return {
-                    "status": "failed",
-                    "error": "Erreur de communication avec le service de sous-titres",
-                    "detail": str(e)
-                }
-            except Exception as e:
-                return {
-                    "status": "failed",
-                    "error": "Erreur lors de l'upload du fichier",
-                    "detail": str(e)
-                }
+                transfer = transfer_stats("multipart", video_file_path.stat().st_size)
+            
+            # La réponse est un JSON contenant full_text et srt_url
+            response_data = response.json()
+            
+            return {
+                "status": "completed",
+                "full_text": response_data.get("full_text", ""),
+                "srt_url": response_data.get("srt_url"),
+                "model_name": model_name,
+                "language": language,
+                "transfer": transfer
+            }
+            
+        except httpx.TimeoutException as e:
+            return {
+                "status": "failed",
+                "retryable": is_retryable_error(e),
+                "error": "Timeout lors de la génération de sous-titres",
+                "detail": str(e)
+            }
+        except httpx.HTTPError as e:
+            return {
+                "status": "failed",
+                "retryable": is_retryable_error(e),
+                "error": "Erreur de communication avec le service de sous-titres",
+                "detail": str(e)
+            }
+        except Exception as e:
+            return {
+                "status": "failed",
+                "error": "Erreur lors de l'upload du fichier",
+                "detail": str(e)
+            }
     
     async def download_subtitle_file(self, filename: str, output_path: str) -> bool:
         """
@@ -119,20 +149,43 @@ class SubtitleClient:
         """
         endpoint = f"{self.base_url}/api/download-subtitles/{filename}"
         
-        async with httpx.AsyncClient(timeout=60) as client:
-            try:
-                response = await client.get(endpoint)
-                response.raise_for_status()
-                
-                # Sauvegarder le fichier
-                with open(output_path, 'wb') as f:
-                    f.write(response.content)
-                
-                return True
-                
-            except Exception as e:
-                print(f"Erreur lors du téléchargement: {e}")
-                return False
+        client = self.http.client
+        try:
+            response = await client.get(endpoint, timeout=60)
+            response.raise_for_status()
+            
+            # Sauvegarder le fichier
+            with open(output_path, 'wb') as f:
+                f.write(response.content)
+            
+            return True
+            
+        except Exception as e:
+            print(f"Erreur lors du téléchargement: {e}")
+            return False
+    
+    async def fetch_srt_content(self, srt_url: Optional[str]) -> Optional[str]:
+        """
+        Récupère le contenu d'un fichier SRT généré par le service.
+        
+        Args:
+            srt_url: URL de téléchargement retournée par generate_subtitles
+            
+        Returns:
+            Contenu du fichier SRT, ou None si l'URL est absente ou le téléchargement échoue
+        """
+        if not srt_url:
+            return None
+        
+        client = self.http.client
+        try:
+            response = await client.get(srt_url, timeout=30)
+            response.raise_for_status()
+            return response.text
+            
+        except httpx.HTTPError as e:
+            print(f"⚠️  Fichier SRT non récupéré ({srt_url}): {e}")
+            return None
     
     async def get_api_info(self) -> Dict[str, Any]:
         """
@@ -143,17 +196,17 @@ class SubtitleClient:
         """
         endpoint = f"{self.base_url}/api/info"
         
-        async with httpx.AsyncClient(timeout=30) as client:
-            try:
-                response = await client.get(endpoint)
-                response.raise_for_status()
-                return response.json()
-                
-            except httpx.HTTPError as e:
-                return {
-                    "error": "Erreur lors de la récupération des informations",
-                    "detail": str(e)
-                }
+        client = self.http.client
+        try:
+            response = await client.get(endpoint, timeout=30)
+            response.raise_for_status()
+            return response.json()
+            
+        except httpx.HTTPError as e:
+            return {
+                "error": "Erreur lors de la récupération des informations",
+                "detail": str(e)
+            }
     
     async def check_service_health(self) -> bool:
         """
@@ -163,9 +216,9 @@ class SubtitleClient:
             bool: True si le service est accessible
         """
         try:
-            async with httpx.AsyncClient(timeout=5) as client:
-                response = await client.get(f"{self.base_url}/api/health")
-                return response.status_code == 200
+            client = self.http.client
+            response = await client.get(f"{self.base_url}/api/health", timeout=5)
+            return response.status_code == 200
         except:
             return False
 
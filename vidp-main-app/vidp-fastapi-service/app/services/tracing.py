@@ -0,0 +1,62 @@
+"""
+Traçage distribué des pipelines avec OpenTelemetry (propagation W3C Trace Context).
+
+Chaque requête reçue ouvre un span serveur (instrumentation FastAPI), chaque
+pipeline un span "pipeline" et chaque étape un span "stage ..." ; chaque appel à un
+microservice ouvre un span client (instrumentation httpx des clients partagés) et
+transmet son contexte dans l'en-tête `traceparent`. Les microservices poursuivent
+la trace avec leurs propres spans (extraction ffmpeg, Google STT, Whisper, encodage
+moviepy, YOLO) : une trace montre où est passé le temps d'un /process-video, upload
+compris.
+
+Les spans terminés sont exportés par lots, selon TRACING_EXPORTER :
+- "none" (défaut) : spans non exportés, le contexte de trace reste propagé ;
+- "file" : un objet JSON par ligne dans TRACING_FILE ;
+- "otlp" : OTLP/HTTP vers TRACING_OTLP_ENDPOINT (OpenTelemetry Collector, Jaeger, Tempo...).
+"""
+from pathlib import Path
+from typing import Optional
+
+import httpx
+from opentelemetry import trace
+from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+from app.core.config import settings
+
+# Traceur des spans de l'application (pipelines, étapes, lots)
+tracer = trace.get_tracer("vidp.main-app")
+
+
+def configure_tracing(app):
+    """Configure l'export des spans et instrumente l'application FastAPI (appelé une fois au démarrage)."""
+    provider = TracerProvider(resource=Resource.create({"service.name": settings.tracing_service_name}))
+    exporter = (settings.tracing_exporter or "none").lower()
+    if exporter == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=settings.tracing_otlp_endpoint)))
+    elif exporter == "file":
+        path = Path(settings.tracing_file)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        provider.add_span_processor(BatchSpanProcessor(ConsoleSpanExporter(
+            service_name=settings.tracing_service_name,
+            out=open(path, "a", encoding="utf-8"),
+            formatter=lambda span: span.to_json(indent=None) + "\n"
+        )))
+    trace.set_tracer_provider(provider)
+    FastAPIInstrumentor.instrument_app(app, tracer_provider=provider)
+
+
+def instrument_client(client: httpx.AsyncClient) -> httpx.AsyncClient:
+    """Span client et en-tête traceparent pour chaque appel d'un client partagé."""
+    HTTPXClientInstrumentor.instrument_client(client)
+    return client
+
+
+def current_trace_id() -> Optional[str]:
+    """Identifiant (hexadécimal) de la trace courante, ou None hors de toute trace."""
+    span_context = trace.get_current_span().get_span_context()
+    return trace.format_trace_id(span_context.trace_id) if span_context.is_valid else None
@@ -0,0 +1,468 @@
+"""
+Sessions d'upload reprenables : une vidéo volumineuse est envoyée en morceaux numérotés.
+
+Protocole :
+1. POST /videos/uploads : création de la session (nom, taille totale, empreinte attendue)
+2. PUT /videos/uploads/{upload_id}/chunks/{index} : envoi de chaque morceau, dans l'ordre,
+   avec son empreinte SHA-256 optionnelle (en-tête X-Chunk-SHA256)
+3. GET /videos/uploads/{upload_id} : offset de reprise après une coupure
+4. POST /videos/uploads/{upload_id}/complete : assemblage, déduplication et lancement
+   optionnel du pipeline
+
+Les morceaux sont écrits directement à leur offset dans un fichier temporaire du
+dossier de stockage, et l'empreinte SHA-256 du fichier complet est calculée au fil
+de l'eau : la finalisation n'a ni à relire ni à recopier la vidéo. L'état de chaque
+session est enregistré sur disque pour reprendre l'upload après un redémarrage.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+import aiofiles
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.services.file_storage import (
+    ALLOWED_VIDEO_TYPES,
+    MAX_VIDEO_FILE_SIZE,
+    UPLOAD_CHUNK_SIZE,
+    FileStorageService
+)
+
+# Bornes de la taille des morceaux demandée par le client
+MIN_UPLOAD_CHUNK_SIZE = 256 * 1024
+MAX_UPLOAD_CHUNK_SIZE = 64 * 1024 * 1024
+
+# Nombre de sessions finalisées dont la vidéo créée est mémorisée (finalisation rejouée)
+FINALIZED_SESSIONS_RETENTION = 500
+
+
+class UploadSession:
+    """Session d'upload en cours : fichier partiel, offset reçu et empreinte incrémentale."""
+
+    def __init__(
+        self,
+        upload_id: str,
+        filename: str,
+        content_type: str,
+        file_size: int,
+        chunk_size: int,
+        expected_sha256: Optional[str],
+        created_at: datetime,
+        received_bytes: int = 0
+    ):
+        self.upload_id = upload_id
+        self.filename = filename
+        self.content_type = content_type
+        self.file_size = file_size
+        self.chunk_size = chunk_size
+        self.expected_sha256 = expected_sha256
+        self.created_at = created_at
+        self.updated_at = created_at
+        self.received_bytes = received_bytes
+        self.sha256 = hashlib.sha256()
+        self.lock = asyncio.Lock()
+
+    @property
+    def part_path(self) -> Path:
+        return Path(settings.local_video_path) / f".upload-{self.upload_id}.part"
+
+    @property
+    def total_chunks(self) -> int:
+        return -(-self.file_size // self.chunk_size)
+
+    @property
+    def next_chunk(self) -> int:
+        return self.received_bytes // self.chunk_size
+
+    @property
+    def is_complete(self) -> bool:
+        return self.received_bytes >= self.file_size
+
+    @property
+    def expires_at(self) -> datetime:
+        return self.updated_at + timedelta(seconds=settings.upload_session_ttl)
+
+    def expected_chunk_length(self, index: int) -> int:
+        """Taille attendue d'un morceau (le dernier peut être plus court)."""
+        return min(self.chunk_size, self.file_size - index * self.chunk_size)
+
+    def to_status(self) -> dict:
+        return {
+            "upload_id": self.upload_id,
+            "filename": self.filename,
+            "content_type": self.content_type,
+            "file_size": self.file_size,
+            "chunk_size": self.chunk_size,
+            "total_chunks": self.total_chunks,
+            "received_bytes": self.received_bytes,
+            "next_chunk": self.next_chunk,
+            "status": "complete" if self.is_complete else "uploading",
+            "expires_at": self.expires_at
+        }
+
+    def to_state(self) -> dict:
+        return {
+            "upload_id": self.upload_id,
+            "filename": self.filename,
+            "content_type": self.content_type,
+            "file_size": self.file_size,
+            "chunk_size": self.chunk_size,
+            "expected_sha256": self.expected_sha256,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+            "received_bytes": self.received_bytes
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "UploadSession":
+        session = cls(
+            upload_id=state["upload_id"],
+            filename=state["filename"],
+            content_type=state["content_type"],
+            file_size=state["file_size"],
+            chunk_size=state["chunk_size"],
+            expected_sha256=state.get("expected_sha256"),
+            created_at=datetime.fromisoformat(state["created_at"]),
+            received_bytes=state.get("received_bytes", 0)
+        )
+        session.updated_at = datetime.fromisoformat(state.get("updated_at", state["created_at"]))
+        return session
+
+
+class UploadSessionManager:
+    """
+    Gestion des sessions d'upload reprenables.
+
+    Les sessions actives sont gardées en mémoire (le calcul d'empreinte incrémental
+    n'est pas sérialisable) ; leur état est aussi écrit dans LOCAL_STORAGE_ROOT/uploads
+    et, après un redémarrage, l'empreinte est recalculée depuis le fichier partiel.
+    """
+
+    def __init__(self):
+        self._sessions: Dict[str, UploadSession] = {}
+        self._finalized: Dict[str, dict] = {}
+        self.chunks_received = 0
+        self.chunks_rejected = 0
+        self.sessions_finalized = 0
+        self.sessions_expired = 0
+
+    @property
+    def state_dir(self) -> Path:
+        return Path(settings.local_storage_root) / "uploads"
+
+    def _state_path(self, upload_id: str) -> Path:
+        return self.state_dir / f"{upload_id}.json"
+
+    def _save_state(self, session: UploadSession):
+        """Écrit l'état de la session (écriture atomique)."""
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        state_path = self._state_path(session.upload_id)
+        temp_path = state_path.with_suffix(".json.tmp")
+        temp_path.write_text(json.dumps(session.to_state()), encoding="utf-8")
+        os.replace(temp_path, state_path)
+
+    def _discard(self, session: UploadSession):
+        """Supprime la session, son état et son fichier partiel."""
+        self._sessions.pop(session.upload_id, None)
+        self._state_path(session.upload_id).unlink(missing_ok=True)
+        session.part_path.unlink(missing_ok=True)
+
+    def create(
+        self,
+        filename: str,
+        content_type: str,
+        file_size: int,
+        chunk_size: Optional[int] = None,
+        expected_sha256: Optional[str] = None
+    ) -> UploadSession:
+        """
+        Crée une session d'upload.
+
+        Raises:
+            HTTPException: 400 si le type ou la taille des morceaux est invalide,
+                413 si le fichier dépasse la taille maximale
+        """
+        if content_type not in ALLOWED_VIDEO_TYPES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Type de fichier non supporté: {content_type}. "
+                       f"Types acceptés: {', '.join(ALLOWED_VIDEO_TYPES)}"
+            )
+        if file_size > MAX_VIDEO_FILE_SIZE:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Fichier trop volumineux. Taille maximale: {MAX_VIDEO_FILE_SIZE // (1024*1024)} MB"
+            )
+        chunk_size = chunk_size or settings.upload_session_chunk_size
+        if not MIN_UPLOAD_CHUNK_SIZE <= chunk_size <= MAX_UPLOAD_CHUNK_SIZE:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Taille de morceau invalide: {chunk_size} "
+                       f"(entre {MIN_UPLOAD_CHUNK_SIZE} et {MAX_UPLOAD_CHUNK_SIZE} octets)"
+            )
+
+        self.purge_expired()
+        session = UploadSession(
+            upload_id=str(uuid.uuid4()),
+            filename=filename,
+            content_type=content_type,
+            file_size=file_size,
+            chunk_size=chunk_size,
+            expected_sha256=expected_sha256.lower() if expected_sha256 else None,
+            created_at=datetime.now()
+        )
+        Path(settings.local_video_path).mkdir(parents=True, exist_ok=True)
+        session.part_path.touch()
+        self._save_state(session)
+        self._sessions[session.upload_id] = session
+        print(f"📦 Session d'upload {session.upload_id} créée ({file_size} octets, {session.total_chunks} morceaux)")
+        return session
+
+    async def get(self, upload_id: str) -> UploadSession:
+        """
+        Retourne une session active, rechargée depuis le disque si nécessaire.
+
+        Raises:
+            HTTPException: 404 si la session est inconnue ou expirée
+        """
+        session = self._sessions.get(upload_id)
+        if session is None:
+            session = await self._load(upload_id)
+        if session is None or session.expires_at <= datetime.now():
+            if session is not None:
+                self._discard(session)
+                self.sessions_expired += 1
+            raise HTTPException(
+                status_code=404,
+                detail=f"Session d'upload {upload_id} non trouvée ou expirée"
+            )
+        return session
+
+    def get_finalized(self, upload_id: str) -> Optional[dict]:
+        """État d'une session déjà finalisée (avec la vidéo créée), ou None."""
+        return self._finalized.get(upload_id)
+
+    async def _load(self, upload_id: str) -> Optional[UploadSession]:
+        """Recharge une session depuis son état disque et recalcule son empreinte."""
+        try:
+            uuid.UUID(upload_id)
+            state = json.loads(self._state_path(upload_id).read_text(encoding="utf-8"))
+            session = UploadSession.from_state(state)
+        except (ValueError, KeyError, OSError):
+            return None
+        if not session.part_path.is_file():
+            self._state_path(upload_id).unlink(missing_ok=True)
+            return None
+
+        # Les octets au-delà du dernier morceau validé sont ignorés
+        await asyncio.to_thread(self._rehash, session)
+        self._sessions[upload_id] = session
+        print(f"📦 Session d'upload {upload_id} rechargée ({session.received_bytes} octets reçus)")
+        return session
+
+    @staticmethod
+    def _rehash(session: UploadSession):
+        with open(session.part_path, "r+b") as f:
+            f.truncate(session.received_bytes)
+            remaining = session.received_bytes
+            while remaining > 0:
+                block = f.read(min(UPLOAD_CHUNK_SIZE, remaining))
+                if not block:
+                    break
+                session.sha256.update(block)
+                remaining -= len(block)
+        session.received_bytes -= remaining
+
+    async def write_chunk(
+        self,
+        session: UploadSession,
+        index: int,
+        body: AsyncIterator[bytes],
+        chunk_sha256: Optional[str] = None
+    ) -> bool:
+        """
+        Écrit un morceau à son offset dans le fichier partiel.
+
+        Les morceaux doivent arriver dans l'ordre (l'empreinte du fichier est calculée
+        au fil de l'eau). Un morceau déjà reçu est ignoré, ce qui rend le renvoi d'un
+        morceau dont la réponse a été perdue sans effet.
+
+        Args:
+            session: Session d'upload
+            index: Numéro du morceau (à partir de 0)
+            body: Contenu du morceau, en flux
+            chunk_sha256: Empreinte SHA-256 attendue du morceau
+
+        Returns:
+            True si le morceau a été écrit, False s'il avait déjà été reçu
+
+        Raises:
+            HTTPException: 409 si le morceau n'est pas le prochain attendu ou si un
+                autre morceau est en cours d'écriture, 400 si sa taille ou son
+                empreinte est incorrecte
+        """
+        if index >= session.total_chunks:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Morceau {index} hors limites (la session compte {session.total_chunks} morceaux)"
+            )
+        if session.lock.locked():
+            raise HTTPException(
+                status_code=409,
+                detail="Un autre morceau de cette session est en cours d'écriture"
+            )
+
+        async with session.lock:
+            if index < session.next_chunk:
+                return False
+            if index > session.next_chunk:
+                self.chunks_rejected += 1
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Morceau {index} reçu hors séquence, morceau attendu: {session.next_chunk} "
+                           f"(offset {session.received_bytes})"
+                )
+
+            offset = session.received_bytes
+            expected_length = session.expected_chunk_length(index)
+            chunk_hash = hashlib.sha256()
+            # L'empreinte du fichier n'est mise à jour qu'une fois le morceau validé
+            file_hash = session.sha256.copy()
+            written = 0
+            try:
+                async with aiofiles.open(session.part_path, "r+b") as f:
+                    await f.seek(offset)
+                    async for block in body:
+                        if not block:
+                            continue
+                        written += len(block)
+                        if written > expected_length:
+                            raise HTTPException(
+                                status_code=400,
+                                detail=f"Morceau {index} trop long (attendu: {expected_length} octets)"
+                            )
+                        chunk_hash.update(block)
+                        file_hash.update(block)
+                        await f.write(block)
+
+                    if written != expected_length:
+                        raise HTTPException(
+                            status_code=400,
+                            detail=f"Morceau {index} incomplet: {written} octets reçus, {expected_length} attendus"
+                        )
+                    if chunk_sha256 and chunk_hash.hexdigest() != chunk_sha256.lower():
+                        raise HTTPException(
+                            status_code=400,
+                            detail=f"Empreinte SHA-256 du morceau {index} incorrecte"
+                        )
+            except BaseException:
+                # Morceau rejeté ou connexion coupée : revenir au dernier offset validé
+                self.chunks_rejected += 1
+                with open(session.part_path, "r+b") as f:
+                    f.truncate(offset)
+                raise
+
+            session.sha256 = file_hash
+            session.received_bytes = offset + written
+            session.updated_at = datetime.now()
+            self._save_state(session)
+            self.chunks_received += 1
+            return True
+
+    async def finalize(self, session: UploadSession) -> Tuple[str, str, int, str]:
+        """
+        Assemble la vidéo : vérification de la taille et de l'empreinte, puis rangement
+        sous son nom adressé par contenu (déduplication comprise).
+
+        Returns:
+            Tuple (nom du fichier stocké, chemin complet, taille, empreinte SHA-256)
+
+        Raises:
+            HTTPException: 409 si des morceaux manquent, 400 si l'empreinte du fichier
+                ne correspond pas à celle annoncée (la session est alors supprimée)
+        """
+        async with session.lock:
+            if not session.is_complete:
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Upload incomplet: {session.received_bytes}/{session.file_size} octets reçus, "
+                           f"morceau attendu: {session.next_chunk}"
+                )
+
+            content_hash = session.sha256.hexdigest()
+            if session.expected_sha256 and content_hash != session.expected_sha256:
+                self._discard(session)
+                raise HTTPException(
+                    status_code=400,
+                    detail="Empreinte SHA-256 du fichier assemblé différente de celle annoncée, upload à recommencer"
+                )
+
+            stored_filename, full_path = FileStorageService.store_completed_file(
+                session.part_path, content_hash, session.filename
+            )
+            self._discard(session)
+            self.sessions_finalized += 1
+            return stored_filename, full_path, session.file_size, content_hash
+
+    def mark_finalized(self, session: UploadSession, video_id: str):
+        """Mémorise la vidéo créée par une session finalisée (finalisation rejouée par le client)."""
+        self._finalized[session.upload_id] = {
+            **session.to_status(),
+            "status": "finalized",
+            "video_id": video_id
+        }
+        while len(self._finalized) > FINALIZED_SESSIONS_RETENTION:
+            self._finalized.pop(next(iter(self._finalized)))
+
+    async def abort(self, upload_id: str):
+        """Abandonne une session et supprime son fichier partiel."""
+        session = await self.get(upload_id)
+        if session.lock.locked():
+            raise HTTPException(
+                status_code=409,
+                detail="Un morceau de cette session est en cours d'écriture"
+            )
+        self._discard(session)
+
+    def purge_expired(self) -> int:
+        """Supprime les sessions expirées (en mémoire et sur disque)."""
+        now = datetime.now()
+        purged = 0
+        for session in list(self._sessions.values()):
+            if session.expires_at <= now and not session.lock.locked():
+                self._discard(session)
+                purged += 1
+        if self.state_dir.is_dir():
+            for state_path in self.state_dir.glob("*.json"):
+                if state_path.stem in self._sessions:
+                    continue
+                try:
+                    session = UploadSession.from_state(json.loads(state_path.read_text(encoding="utf-8")))
+                except (ValueError, KeyError, OSError):
+                    state_path.unlink(missing_ok=True)
+                    continue
+                if session.expires_at <= now:
+                    self._discard(session)
+                    purged += 1
+        self.sessions_expired += purged
+        return purged
+
+    def get_stats(self) -> dict:
+        return {
+            "active_sessions": len(self._sessions),
+            "bytes_pending": sum(s.received_bytes for s in self._sessions.values()),
+            "chunks_received": self.chunks_received,
+            "chunks_rejected": self.chunks_rejected,
+            "sessions_finalized": self.sessions_finalized,
+            "sessions_expired": self.sessions_expired
+        }
+
+
+# Instance globale du gestionnaire de sessions d'upload
+upload_session_manager = UploadSessionManager()
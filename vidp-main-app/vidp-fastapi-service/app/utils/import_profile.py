@@ -0,0 +1,140 @@
+"""
+Mesure du temps d'import de l'application (format de `python -X importtime`).
+
+L'import est mesuré dans un interpréteur neuf (`python -X importtime -c "import main"`) :
+le processus en cours a déjà tous ses modules chargés. Utilisé par l'endpoint de
+diagnostic GET /debug/startup et par le benchmark benchmark_import_time.py.
+"""
+import asyncio
+import re
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional
+
+# Ligne de -X importtime : "import time: <self us> | <cumulé us> | <indentation><module>"
+IMPORTTIME_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)\s*$")
+
+# Racine de l'application (dossier de main.py)
+APP_ROOT = Path(__file__).resolve().parents[2]
+
+
+def importtime_command(module: str = "main") -> List[str]:
+    return [sys.executable, "-X", "importtime", "-c", f"import {module}"]
+
+
+def parse_importtime(output: str) -> List[dict]:
+    """
+    Analyse la sortie de -X importtime.
+
+    Returns:
+        List[dict]: Modules dans l'ordre de fin d'import (module, self_us, cumulative_us, depth)
+    """
+    entries = []
+    for line in output.splitlines():
+        match = IMPORTTIME_LINE_RE.match(line)
+        if match:
+            entries.append({
+                "module": match.group(4),
+                "self_us": int(match.group(1)),
+                "cumulative_us": int(match.group(2)),
+                "depth": len(match.group(3)) // 2
+            })
+    return entries
+
+
+def summarize_importtime(entries: List[dict], module: str = "main", top: int = 25) -> dict:
+    """
+    Résumé d'une mesure : temps total, modules les plus coûteux (cumulé et propre)
+    et temps par paquet de premier niveau.
+    """
+    root = next((entry for entry in reversed(entries) if entry["module"] == module), None)
+    by_package: dict = {}
+    for entry in entries:
+        package = entry["module"].split(".")[0]
+        by_package[package] = by_package.get(package, 0) + entry["self_us"]
+
+    def rows(key: str) -> List[dict]:
+        return [
+            {"module": entry["module"], "self_ms": round(entry["self_us"] / 1000, 1),
+             "cumulative_ms": round(entry["cumulative_us"] / 1000, 1)}
+            for entry in sorted(entries, key=lambda entry: entry[key], reverse=True)[:top]
+        ]
+
+    return {
+        "module": module,
+        "total_ms": round(root["cumulative_us"] / 1000, 1) if root else None,
+        "modules_imported": len(entries),
+        "top_cumulative": rows("cumulative_us"),
+        "top_self": rows("self_us"),
+        "by_package_ms": {
+            package: round(us / 1000, 1)
+            for package, us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+        }
+    }
+
+
+def measure_import_time(module: str = "main", timeout: float = 60.0) -> List[dict]:
+    """
+    Importe un module dans un nouvel interpréteur et retourne la mesure de -X importtime.
+
+    Raises:
+        RuntimeError: Si l'import échoue
+    """
+    completed = subprocess.run(
+        importtime_command(module), cwd=APP_ROOT, capture_output=True, text=True, timeout=timeout
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Import de '{module}' en échec: {completed.stderr.strip().splitlines()[-1:]}")
+    return parse_importtime(completed.stderr)
+
+
+async def measure_import_time_async(module: str = "main", timeout: float = 60.0) -> List[dict]:
+    """Version asynchrone de measure_import_time (sans bloquer la boucle d'événements)."""
+    process = await asyncio.create_subprocess_exec(
+        *importtime_command(module), cwd=APP_ROOT,
+        stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        _, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        raise RuntimeError(f"Import de '{module}' trop long (> {timeout}s)")
+    output = stderr.decode("utf-8", errors="replace")
+    if process.returncode != 0:
+        raise RuntimeError(f"Import de '{module}' en échec: {output.strip().splitlines()[-1:]}")
+    return parse_importtime(output)
+
+
+class StartupProfile:
+    """Durées des phases du démarrage de ce processus (imports, connexions, workers)."""
+
+    def __init__(self):
+        self.phases: List[dict] = []
+        self._import_report: Optional[dict] = None
+        self._import_lock = asyncio.Lock()
+
+    def record(self, phase: str, seconds: float):
+        self.phases.append({"phase": phase, "ms": round(seconds * 1000, 1)})
+
+    @contextmanager
+    def phase(self, name: str):
+        """Mesure la durée d'une phase du démarrage."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    async def get_import_report(self, refresh: bool = False) -> dict:
+        """Mesure de l'import de main (calculée une fois : le code ne change pas pendant la vie du pod)."""
+        async with self._import_lock:
+            if self._import_report is None or refresh:
+                self._import_report = summarize_importtime(await measure_import_time_async("main"))
+            return self._import_report
+
+
+# Instance globale, alimentée par main.py
+startup_profile = StartupProfile()
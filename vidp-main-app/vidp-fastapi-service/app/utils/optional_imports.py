@@ -0,0 +1,86 @@
+"""
+Chargement différé des dépendances lourdes ou optionnelles.
+
+Un module importé au niveau d'un fichier est chargé au démarrage de chaque pod
+(redémarrage, mise à l'échelle par le HPA), même si la fonctionnalité qui l'utilise
+n'est jamais appelée. OptionalModule n'importe le module qu'à sa première
+utilisation, et signale clairement une dépendance non installée.
+"""
+import importlib
+import threading
+import time
+from types import ModuleType
+from typing import Dict, Optional
+
+
+class OptionalDependencyError(ImportError):
+    """Dépendance optionnelle non installée."""
+
+
+class OptionalModule:
+    """
+    Module importé à la première utilisation.
+
+    Exemple :
+        kubernetes = OptionalModule("kubernetes", feature="orchestration Kubernetes")
+        kubernetes.load().client.BatchV1Api()
+    """
+
+    def __init__(self, name: str, feature: str, package: Optional[str] = None):
+        self.name = name
+        self.feature = feature
+        self.package = package or name
+        self.load_seconds: Optional[float] = None
+        self._module: Optional[ModuleType] = None
+        self._lock = threading.Lock()
+        _registry[name] = self
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def is_available(self) -> bool:
+        """Indique si le module peut être importé (l'importe si nécessaire)."""
+        try:
+            self.load()
+            return True
+        except OptionalDependencyError:
+            return False
+
+    def load(self) -> ModuleType:
+        """
+        Importe le module (une seule fois) et le retourne.
+
+        Raises:
+            OptionalDependencyError: Si le module n'est pas installé
+        """
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    started = time.perf_counter()
+                    try:
+                        self._module = importlib.import_module(self.name)
+                    except ImportError as e:
+                        raise OptionalDependencyError(
+                            f"Le module '{self.name}' est requis pour la fonctionnalité {self.feature} "
+                            f"(pip install {self.package}): {e}"
+                        ) from e
+                    self.load_seconds = time.perf_counter() - started
+                    print(f"📦 Module '{self.name}' chargé à la demande ({self.load_seconds * 1000:.0f} ms)")
+        return self._module
+
+
+# Modules optionnels déclarés, par nom
+_registry: Dict[str, OptionalModule] = {}
+
+
+def get_optional_modules_status() -> Dict[str, dict]:
+    """État des modules optionnels : chargés ou non, durée de leur import."""
+    return {
+        name: {
+            "feature": module.feature,
+            "loaded": module.loaded,
+            "load_ms": round(module.load_seconds * 1000, 1) if module.load_seconds is not None else None
+        }
+        for name, module in _registry.items()
+    }
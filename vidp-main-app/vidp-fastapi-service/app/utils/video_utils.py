@@ -1,14 +1,228 @@
 """
 Utilitaires pour l'analyse et le traitement des fichiers vidéo.
 """
+import asyncio
 import subprocess
 import json
 import logging
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+from app.models.video_model import MediaInfo, MediaStreamInfo
+
 logger = logging.getLogger(__name__)
 
+# Délai maximal d'exécution de ffprobe (secondes)
+FFPROBE_TIMEOUT = 30
+
+# Nombre de MediaInfo conservés en mémoire
+MEDIA_INFO_CACHE_SIZE = 500
+
+_media_info_cache: "OrderedDict[str, MediaInfo]" = OrderedDict()
+_media_info_inflight: Dict[str, asyncio.Future] = {}
+
+
+def _is_valid_audio_stream(stream: Dict[str, Any]) -> bool:
+    """
+    Indique si un stream ffprobe est une piste audio exploitable.
+    
+    Un stream audio doit avoir un codec et une durée non nulle ; si la durée
+    n'est pas numérique, un nombre de frames ou une fréquence d'échantillonnage.
+    """
+    codec_name = stream.get('codec_name', '')
+    codec_type = stream.get('codec_type', '')
+    
+    if codec_type != 'audio' or not codec_name:
+        return False
+    
+    # Vérifier que ce n'est pas un codec "vide" ou invalide
+    duration = stream.get('duration', '0')
+    try:
+        return float(duration) > 0
+    except (ValueError, TypeError):
+        pass
+    
+    # Si la durée n'est pas exploitable, on vérifie d'autres indicateurs
+    try:
+        nb_frames = stream.get('nb_frames', '0')
+        if nb_frames and int(nb_frames) > 0:
+            return True
+        
+        # Dernière vérification: si le codec existe et a un sample_rate
+        sample_rate = stream.get('sample_rate', '0')
+        if sample_rate and int(sample_rate) > 0:
+            return True
+    except (ValueError, TypeError):
+        pass
+    
+    return False
+
+
+def _parse_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_frame_rate(value: Optional[str]) -> Optional[float]:
+    """Convertit un débit d'images ffprobe ("30000/1001") en nombre."""
+    if not value:
+        return None
+    try:
+        numerator, _, denominator = value.partition('/')
+        fps = float(numerator) / float(denominator or 1)
+        return round(fps, 3) if fps > 0 else None
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def parse_media_info(probe_data: Dict[str, Any]) -> MediaInfo:
+    """
+    Construit un MediaInfo à partir de la sortie JSON de ffprobe
+    (-show_format -show_streams).
+    """
+    format_data = probe_data.get('format', {})
+    streams = probe_data.get('streams', [])
+    
+    media_info = MediaInfo(
+        duration=_parse_float(format_data.get('duration')),
+        format_name=format_data.get('format_name'),
+        bit_rate=int(format_data['bit_rate']) if str(format_data.get('bit_rate', '')).isdigit() else None,
+        has_audio=any(_is_valid_audio_stream(stream) for stream in streams),
+        streams=[
+            MediaStreamInfo(
+                index=stream.get('index', position),
+                codec_type=stream.get('codec_type'),
+                codec_name=stream.get('codec_name'),
+                duration=_parse_float(stream.get('duration'))
+            )
+            for position, stream in enumerate(streams)
+        ]
+    )
+    
+    video_stream = next((s for s in streams if s.get('codec_type') == 'video'), None)
+    if video_stream:
+        media_info.video_codec = video_stream.get('codec_name')
+        media_info.width = video_stream.get('width')
+        media_info.height = video_stream.get('height')
+        media_info.fps = _parse_frame_rate(video_stream.get('avg_frame_rate')) or \
+            _parse_frame_rate(video_stream.get('r_frame_rate'))
+    
+    audio_stream = next((s for s in streams if _is_valid_audio_stream(s)), None)
+    if audio_stream:
+        media_info.audio_codec = audio_stream.get('codec_name')
+    
+    return media_info
+
+
+async def probe_media_info(video_path: str) -> Optional[MediaInfo]:
+    """
+    Analyse une vidéo avec un unique appel ffprobe, sans bloquer la boucle asyncio.
+    
+    Args:
+        video_path: Chemin vers le fichier vidéo
+        
+    Returns:
+        MediaInfo ou None si le fichier est introuvable ou illisible
+    """
+    if not Path(video_path).exists():
+        logger.warning(f"Fichier vidéo non trouvé: {video_path}")
+        return None
+    
+    try:
+        process = await asyncio.create_subprocess_exec(
+            'ffprobe',
+            '-v', 'quiet',
+            '-print_format', 'json',
+            '-show_format',
+            '-show_streams',
+            str(video_path),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+    except FileNotFoundError:
+        logger.error("ffprobe n'est pas installé")
+        return None
+    
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=FFPROBE_TIMEOUT)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        logger.error(f"Timeout lors de l'analyse de la vidéo: {video_path}")
+        return None
+    
+    if process.returncode != 0:
+        logger.warning(f"ffprobe a retourné une erreur: {stderr.decode(errors='replace')}")
+        return None
+    
+    try:
+        return parse_media_info(json.loads(stdout))
+    except json.JSONDecodeError as e:
+        logger.error(f"Erreur lors du parsing JSON de ffprobe: {e}")
+        return None
+
+
+def _media_info_cache_key(video_path: str, content_hash: Optional[str]) -> str:
+    if content_hash:
+        return content_hash
+    stat = Path(video_path).stat()
+    return f"{Path(video_path).resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+async def get_media_info(video_path: str, content_hash: Optional[str] = None) -> Optional[MediaInfo]:
+    """
+    Retourne le MediaInfo d'une vidéo, en n'exécutant ffprobe qu'une fois par contenu.
+    
+    Le résultat est mis en cache en mémoire (clé : empreinte du contenu, ou chemin +
+    taille + date de modification). Les appels concurrents pour une même vidéo
+    partagent le même appel ffprobe.
+    
+    Args:
+        video_path: Chemin vers le fichier vidéo
+        content_hash: Empreinte SHA-256 du contenu (si connue)
+        
+    Returns:
+        MediaInfo ou None en cas d'erreur
+    """
+    try:
+        key = _media_info_cache_key(video_path, content_hash)
+    except OSError:
+        logger.warning(f"Fichier vidéo non trouvé: {video_path}")
+        return None
+    
+    cached = _media_info_cache.get(key)
+    if cached is not None:
+        _media_info_cache.move_to_end(key)
+        return cached
+    
+    inflight = _media_info_inflight.get(key)
+    if inflight is not None:
+        return await asyncio.shield(inflight)
+    
+    future = asyncio.get_running_loop().create_future()
+    _media_info_inflight[key] = future
+    try:
+        media_info = await probe_media_info(video_path)
+        if media_info is not None:
+            _media_info_cache[key] = media_info
+            while len(_media_info_cache) > MEDIA_INFO_CACHE_SIZE:
+                _media_info_cache.popitem(last=False)
+        future.set_result(media_info)
+        return media_info
+    except BaseException:
+        future.set_result(None)
+        raise
+    finally:
+        _media_info_inflight.pop(key, None)
+
+
+def remember_media_info(content_hash: str, media_info: MediaInfo) -> None:
+    """Ajoute au cache mémoire un MediaInfo déjà connu (ex: relu depuis MongoDB)."""
+    _media_info_cache[content_hash] = media_info
+
 
 def check_video_has_audio(video_path: str) -> bool:
     """
@@ -17,6 +231,9 @@ def check_video_has_audio(video_path: str) -> bool:
     Utilise ffprobe pour analyser les streams de la vidéo et détecter
     la présence d'une piste audio avec un codec valide.
     
+    Version synchrone (bloquante) : depuis du code asynchrone, utiliser
+    get_media_info() qui exécute ffprobe sans bloquer la boucle.
+    
     Args:
         video_path: Chemin vers le fichier vidéo
         
@@ -61,28 +278,9 @@ def check_video_has_audio(video_path: str) -> bool:
         
         # Vérifier que le stream audio a un codec valide
         for stream in streams:
-            codec_name = stream.get('codec_name', '')
-            codec_type = stream.get('codec_type', '')
-            
-            if codec_type == 'audio' and codec_name:
-                # Vérifier que ce n'est pas un codec "vide" ou invalide
-                duration = stream.get('duration', '0')
-                try:
-                    if float(duration) > 0:
-                        logger.info(f"Piste audio trouvée: codec={codec_name}, durée={duration}s")
-                        return True
-                except (ValueError, TypeError):
-                    # Si la durée n'est pas disponible, on vérifie d'autres indicateurs
-                    nb_frames = stream.get('nb_frames', '0')
-                    if nb_frames and int(nb_frames) > 0:
-                        logger.info(f"Piste audio trouvée: codec={codec_name}, frames={nb_frames}")
-                        return True
-                    
-                    # Dernière vérification: si le codec existe et a un sample_rate
-                    sample_rate = stream.get('sample_rate', '0')
-                    if sample_rate and int(sample_rate) > 0:
-                        logger.info(f"Piste audio trouvée: codec={codec_name}, sample_rate={sample_rate}")
-                        return True
+            if _is_valid_audio_stream(stream):
+                logger.info(f"Piste audio trouvée: codec={stream.get('codec_name')}")
+                return True
         
         logger.info(f"Aucune piste audio valide trouvée dans: {video_path}")
         return False
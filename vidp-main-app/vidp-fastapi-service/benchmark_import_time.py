@@ -0,0 +1,88 @@
+"""
+Benchmark du temps d'import de l'application (démarrage à froid d'un pod).
+
+Importe `main` dans plusieurs interpréteurs neufs (python -X importtime), affiche la
+médiane et les modules les plus coûteux, puis échoue (code de sortie 1) en cas de
+régression :
+- un module qui doit être chargé à la demande est importé au démarrage (--forbid) ;
+- la médiane dépasse un budget absolu (--max-ms) ;
+- la médiane dépasse de plus de --tolerance la référence enregistrée (--baseline).
+
+Utilisation (depuis le dossier de main.py) :
+    python3 benchmark_import_time.py
+    python3 benchmark_import_time.py --save-baseline import_time_baseline.json
+    python3 benchmark_import_time.py --baseline import_time_baseline.json --tolerance 0.2
+"""
+import argparse
+import json
+import statistics
+import sys
+from pathlib import Path
+
+from app.utils.import_profile import measure_import_time, summarize_importtime
+
+# Modules lourds chargés à la demande, qui ne doivent pas être importés au démarrage
+DEFERRED_MODULES = ["kubernetes"]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark du temps d'import de l'application")
+    parser.add_argument("--module", default="main", help="Module importé (défaut: main)")
+    parser.add_argument("--runs", type=int, default=5, help="Nombre d'interpréteurs lancés (défaut: 5)")
+    parser.add_argument("--top", type=int, default=15, help="Nombre de modules affichés (défaut: 15)")
+    parser.add_argument("--max-ms", type=float, help="Budget absolu de la médiane (ms)")
+    parser.add_argument("--baseline", type=Path, help="Référence JSON à comparer")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Dépassement toléré de la référence (défaut: 0.2)")
+    parser.add_argument("--save-baseline", type=Path, help="Enregistrer la médiane comme nouvelle référence")
+    parser.add_argument("--forbid", nargs="*", default=DEFERRED_MODULES, help="Modules interdits au démarrage")
+    args = parser.parse_args()
+
+    runs = []
+    for _ in range(max(1, args.runs)):
+        entries = measure_import_time(args.module)
+        runs.append((summarize_importtime(entries, args.module, top=args.top), entries))
+    totals = sorted(summary["total_ms"] for summary, _ in runs)
+    median_ms = statistics.median(totals)
+    # Détail de la mesure la plus proche de la médiane
+    summary, entries = min(runs, key=lambda run: abs(run[0]["total_ms"] - median_ms))
+
+    print(f"Import de '{args.module}' : médiane {median_ms:.1f} ms sur {len(runs)} mesures "
+          f"(min {totals[0]:.1f} ms, max {totals[-1]:.1f} ms), {summary['modules_imported']} modules")
+    print(f"\n{'cumulé (ms)':>12} {'propre (ms)':>12}  module")
+    for row in summary["top_cumulative"]:
+        print(f"{row['cumulative_ms']:>12.1f} {row['self_ms']:>12.1f}  {row['module']}")
+    print("\nTemps propre par paquet (ms) : " + ", ".join(
+        f"{package} {ms}" for package, ms in list(summary["by_package_ms"].items())[:args.top]
+    ))
+
+    failures = []
+    imported = {entry["module"].split(".")[0] for entry in entries}
+    for module in args.forbid:
+        if module in imported:
+            failures.append(f"le module '{module}' est importé au démarrage (il doit être chargé à la demande)")
+    if args.max_ms is not None and median_ms > args.max_ms:
+        failures.append(f"médiane {median_ms:.1f} ms au-dessus du budget de {args.max_ms:.1f} ms")
+    if args.baseline:
+        baseline_ms = json.loads(args.baseline.read_text(encoding="utf-8"))["median_ms"]
+        limit_ms = baseline_ms * (1 + args.tolerance)
+        print(f"\nRéférence : {baseline_ms:.1f} ms (limite {limit_ms:.1f} ms)")
+        if median_ms > limit_ms:
+            failures.append(f"médiane {median_ms:.1f} ms au-dessus de la référence {baseline_ms:.1f} ms "
+                            f"(+{100 * (median_ms / baseline_ms - 1):.0f}%)")
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps({
+            "module": args.module,
+            "median_ms": median_ms,
+            "python": sys.version.split()[0]
+        }, indent=2) + "\n", encoding="utf-8")
+        print(f"\nRéférence enregistrée dans {args.save_baseline}")
+
+    for failure in failures:
+        print(f"❌ Régression : {failure}")
+    if not failures:
+        print("\n✅ Pas de régression du temps d'import")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
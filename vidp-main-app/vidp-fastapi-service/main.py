@@ -2,17 +2,42 @@
 Point d'entrée principal de l'application FastAPI VidP.
 Service backend pour la gestion des uploads vidéo et l'orchestration du traitement.
 """
-import uvicorn
+import time
+
+# Début des imports de l'application (durée rapportée par GET /debug/startup)
+_imports_started = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 from app.core.config import settings
 from app.api.v1.endpoints_video import router as video_router
 from app.api.v1.endpoints_status import router as status_router
 from app.api.v1.endpoints_processing import router as processing_router
 from app.db.mongodb_connector import mongodb_connector
+from app.services.pipeline_worker import pipeline_worker_pool
+from app.services.batch_scheduler import batch_scheduler
+from app.services.http_client_pool import (
+    start_http_clients,
+    close_http_clients,
+    get_http_pool_stats,
+    get_concurrency_stats,
+    get_circuit_breaker_states
+)
+from app.services.aggregation_client import aggregation_client
+from app.services.service_health import service_health_monitor
+from app.services.pipeline_events import pipeline_event_bus
+from app.services.upload_sessions import upload_session_manager
+from app.services.storage_lifecycle import storage_lifecycle_manager
+from app.services.storage_accounting import storage_accounting
+from app.services import metrics as app_metrics
+from app.services.metrics import PROMETHEUS_CONTENT_TYPE, MetricsMiddleware
+from app.services.tracing import configure_tracing
+from app.utils.import_profile import startup_profile
+from app.utils.optional_imports import get_optional_modules_status
 
+startup_profile.record("imports", time.perf_counter() - _imports_started)
 
 # Création de l'application FastAPI
 app = FastAPI(
@@ -30,8 +55,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Retry-After"],
 )
 
+# Mesure des requêtes HTTP reçues (métriques Prometheus, GET /metrics)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
+# Traçage distribué OpenTelemetry : span serveur par requête HTTP (en-tête traceparent)
+configure_tracing(app)
+
 # Inclusion des routers API v1
 app.include_router(video_router, prefix="/api/v1")
 app.include_router(status_router, prefix="/api/v1")
@@ -42,24 +75,45 @@ app.include_router(processing_router, prefix="/api/v1")
 async def startup_event():
     """
     Initialisation au démarrage de l'application.
-    Établit la connexion MongoDB.
+    Établit la connexion MongoDB, crée les clients HTTP partagés des microservices,
+    démarre la surveillance de leur santé, le pool de pipelines, la comptabilité et
+    le cycle de vie du stockage.
     """
-    try:
-        connected = await mongodb_connector.connect()
-        if connected:
-            print("✓ MongoDB connecté avec succès")
-        else:
-            print("⚠ MongoDB non disponible - fonctionnalités de stockage limitées")
-    except Exception as e:
-        print(f"⚠ Erreur de connexion MongoDB: {e}")
+    with startup_profile.phase("mongodb"):
+        try:
+            connected = await mongodb_connector.connect()
+            if connected:
+                print("✓ MongoDB connecté avec succès")
+            else:
+                print("⚠ MongoDB non disponible - fonctionnalités de stockage limitées")
+        except Exception as e:
+            print(f"⚠ Erreur de connexion MongoDB: {e}")
+    
+    with startup_profile.phase("http_clients"):
+        await start_http_clients()
+    with startup_profile.phase("background_tasks"):
+        await service_health_monitor.start()
+        await pipeline_worker_pool.start()
+        await storage_accounting.start()
+        if settings.storage_lifecycle_enabled:
+            await storage_lifecycle_manager.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """
     Nettoyage lors de l'arrêt de l'application.
-    Ferme la connexion MongoDB.
+    Arrête le cycle de vie du stockage, le planificateur de lots, le pool de pipelines
+    et la surveillance des microservices, enregistre les compteurs de stockage, ferme
+    les clients HTTP partagés et la connexion MongoDB.
     """
+    await storage_lifecycle_manager.stop()
+    await batch_scheduler.stop()
+    await pipeline_worker_pool.stop()
+    await service_health_monitor.stop()
+    await storage_accounting.stop()
+    await close_http_clients()
+    
     try:
         await mongodb_connector.disconnect()
         print("✓ MongoDB déconnecté")
@@ -82,15 +136,19 @@ async def root():
         "docs": "/docs",
         "endpoints": {
             "upload_video": "/api/v1/videos/upload",
+            "upload_sessions": "/api/v1/videos/uploads",
             "video_health": "/api/v1/videos/health",
             "storage_stats": "/api/v1/videos/stats",
+            "storage_lifecycle": "/api/v1/videos/storage/lifecycle",
             "api_health": "/api/v1/status/health",
             "language_detection": "/api/v1/processing/language-detection",
             "compression": "/api/v1/processing/compression",
             "subtitles": "/api/v1/processing/subtitles",
             "animal_detection": "/api/v1/processing/animal-detection",
             "animal_detection_classes": "/api/v1/processing/animal-detection/classes",
-            "processing_health": "/api/v1/processing/health"
+            "processing_batch": "/api/v1/processing/batch",
+            "processing_health": "/api/v1/processing/health",
+            "metrics": "/metrics"
         }
     }
 
@@ -109,10 +167,65 @@ async def health_check():
         "message": "VidP FastAPI Service is running",
         "storage_configured": True,
         "mongodb_configured": mongodb_status,
-        "kubernetes_configured": False  # Pour usage futur
+        "kubernetes_configured": False,  # Pour usage futur
+        "pipelines": pipeline_worker_pool.get_stats(),
+        "batches": batch_scheduler.get_stats(),
+        "http_pools": get_http_pool_stats(),
+        "service_concurrency": get_concurrency_stats(),
+        "aggregation_uploads": aggregation_client.get_upload_stats(),
+        "pipeline_events": pipeline_event_bus.get_stats(),
+        "upload_sessions": upload_session_manager.get_stats(),
+        "storage_lifecycle": storage_lifecycle_manager.get_stats()
     }
 
 
+# Jauges d'occupation lues au moment du scrape
+app_metrics.gauge(
+    "vidp_pipelines_queued", "Pipelines en attente dans la file du pool",
+    lambda: {(): pipeline_worker_pool.get_stats()["queued"]}
+)
+app_metrics.gauge(
+    "vidp_pipelines_running", "Pipelines en cours d'exécution",
+    lambda: {(): pipeline_worker_pool.get_stats()["running"]}
+)
+app_metrics.gauge(
+    "vidp_service_in_flight", "Traitements en cours, par microservice",
+    lambda: {(name,): stats["in_flight"] for name, stats in get_concurrency_stats().items()},
+    ("service",)
+)
+app_metrics.gauge(
+    "vidp_service_queue_depth", "Traitements en attente du limiteur de concurrence, par microservice",
+    lambda: {(name,): stats["queue_depth"] for name, stats in get_concurrency_stats().items()},
+    ("service",)
+)
+app_metrics.gauge(
+    "vidp_service_circuit_open", "Disjoncteur ouvert (1) ou non (0), par microservice",
+    lambda: {(name,): int(state["state"] == "open") for name, state in get_circuit_breaker_states().items()},
+    ("service",)
+)
+app_metrics.gauge(
+    "vidp_batches_active", "Lots de vidéos en cours",
+    lambda: {(): batch_scheduler.get_stats()["active_batches"]}
+)
+app_metrics.gauge(
+    "vidp_upload_sessions_active", "Sessions d'upload par morceaux en cours",
+    lambda: {(): upload_session_manager.get_stats()["active_sessions"]}
+)
+
+
+@app.get("/metrics", tags=["health"], include_in_schema=False)
+async def metrics():
+    """
+    Métriques de l'application au format texte de Prometheus.
+    
+    Returns:
+        Response: Métriques (format d'exposition texte de Prometheus)
+    """
+    if not settings.metrics_enabled:
+        return JSONResponse(status_code=404, content={"detail": "Métriques désactivées (METRICS_ENABLED=false)"})
+    return Response(app_metrics.render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 # Gestionnaire d'erreur global
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
@@ -136,7 +249,34 @@ async def global_exception_handler(request, exc):
     )
 
 
+@app.get("/debug/startup", tags=["health"], include_in_schema=False)
+async def debug_startup(refresh: bool = False):
+    """
+    Temps de démarrage de l'application : durée des phases de ce processus et
+    mesure de l'import des modules dans un nouvel interpréteur (python -X importtime).
+    
+    Args:
+        refresh: Refaire la mesure d'import (sinon, première mesure conservée)
+    
+    Returns:
+        Dict: Phases du démarrage, modules les plus coûteux à importer, modules optionnels
+    """
+    if not settings.debug_endpoints_enabled:
+        return JSONResponse(status_code=404, content={"detail": "Endpoints de diagnostic désactivés (DEBUG_ENDPOINTS_ENABLED=false)"})
+    try:
+        import_report = await startup_profile.get_import_report(refresh=refresh)
+    except Exception as e:
+        import_report = {"error": str(e)}
+    return {
+        "phases": startup_profile.phases,
+        "imports": import_report,
+        "optional_modules": get_optional_modules_status()
+    }
+
+
 if __name__ == "__main__":
+    import uvicorn
+    
     # Lancement du serveur de développement
     uvicorn.run(
         "main:app",
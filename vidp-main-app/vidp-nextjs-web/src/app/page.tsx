@@ -213,6 +213,8 @@ function VideoUploader({ onUploadSuccess }: { onUploadSuccess: () => void }) {
     // Paramètres détection d'animaux
     formData.append('enable_animal_detection', String(pipelineOptions.enableAnimalDetection))
     formData.append('animal_confidence_threshold', String(pipelineOptions.animalConfidenceThreshold))
+    // Upload interactif : servi avant les traitements par lots
+    formData.append('priority', 'high')
 
     try {
       const xhr = new XMLHttpRequest()
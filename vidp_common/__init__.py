@@ -0,0 +1,8 @@
+"""
+Code shared by the VidP microservices (app_downscale, app_langscale, app_subtitle,
+app_animal_detect).
+
+The microservice images are built from the repository root so that this package
+is copied next to each service's main.py; when running a service locally, add the
+repository root to PYTHONPATH.
+"""
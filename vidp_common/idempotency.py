@@ -0,0 +1,105 @@
+"""
+Idempotency-Key support for the processing requests of the microservices.
+
+The main app retries a processing call after a transient error (timeout, dropped
+connection, 5xx) and sends the same Idempotency-Key header on every attempt.
+This middleware makes such retries safe:
+
+- if a request with the same key is still running, the retry waits for it;
+- if it already succeeded, its response is replayed without re-processing.
+
+Only successful POST responses that fit in memory are stored, for a limited time.
+Failed attempts are not stored, so the next retry runs the request again.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+# Maximum size of a stored response body (JSON results only, never video files)
+MAX_STORED_BODY_BYTES = 1024 * 1024
+
+
+class _IdempotentEntry:
+    """Request seen with a given key: running, then its stored response."""
+
+    def __init__(self):
+        self.done = asyncio.Event()
+        self.response: Optional[Tuple[int, list, bytes]] = None
+        self.stored_at = 0.0
+
+
+class IdempotencyMiddleware:
+    """ASGI middleware replaying POST responses by Idempotency-Key."""
+
+    def __init__(self, app, ttl_seconds: float = 3600.0, max_entries: int = 256):
+        self.app = app
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], _IdempotentEntry]" = OrderedDict()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        key = dict(scope["headers"]).get(b"idempotency-key")
+        if not key:
+            await self.app(scope, receive, send)
+            return
+
+        entry_key = (scope["path"], key.decode("latin-1"))
+        entry = self._entries.get(entry_key)
+        if entry is not None and entry.response is not None and time.monotonic() - entry.stored_at > self.ttl_seconds:
+            del self._entries[entry_key]
+            entry = None
+
+        if entry is not None:
+            # Same key: wait for the running request, then replay its response
+            await entry.done.wait()
+            if entry.response is not None:
+                await self._replay(entry.response, send)
+                return
+            # The previous attempt failed: run this one
+            await self.app(scope, receive, send)
+            return
+
+        entry = _IdempotentEntry()
+        self._entries[entry_key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        captured = {"status": None, "headers": [], "body": bytearray(), "storable": True}
+
+        async def capture_send(message):
+            if message["type"] == "http.response.start":
+                captured["status"] = message["status"]
+                captured["headers"] = list(message.get("headers", []))
+            elif message["type"] == "http.response.body" and captured["storable"]:
+                captured["body"].extend(message.get("body", b""))
+                if len(captured["body"]) > MAX_STORED_BODY_BYTES:
+                    captured["storable"] = False
+                    captured["body"] = bytearray()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture_send)
+        finally:
+            status = captured["status"]
+            if status is not None and 200 <= status < 300 and captured["storable"]:
+                entry.response = (status, captured["headers"], bytes(captured["body"]))
+                entry.stored_at = time.monotonic()
+            else:
+                self._entries.pop(entry_key, None)
+            entry.done.set()
+
+    @staticmethod
+    async def _replay(response: Tuple[int, list, bytes], send):
+        status, headers, body = response
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": headers + [(b"idempotent-replayed", b"true")]
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,36 @@
+"""
+Paths received from other services that point into the shared storage volume.
+
+The main app passes videos to the microservices by reference into a volume mounted
+by every pod (SHARED_STORAGE_ROOT). Those paths come from the network: they must
+never let a caller read another file of the container.
+"""
+from pathlib import Path
+from typing import Union
+
+from fastapi import HTTPException
+
+
+def resolve_shared_path(video_path: Union[str, Path], shared_root: Path) -> Path:
+    """
+    Resolve a video path received from another service inside the shared storage.
+
+    Relative paths are taken from the shared storage root; absolute paths must
+    already point into it. '..' segments and symlinks are resolved before the
+    check, so the returned path can never leave the volume.
+
+    Args:
+        video_path: Path relative to the shared storage root, or absolute path inside it
+        shared_root: Mount point of the shared storage volume
+
+    Returns:
+        Path: Resolved path inside the shared storage
+
+    Raises:
+        HTTPException: 400 if the path resolves outside the shared storage root
+    """
+    root = Path(shared_root).resolve()
+    resolved = (root / video_path).resolve()
+    if resolved == root or not resolved.is_relative_to(root):
+        raise HTTPException(status_code=400, detail=f"Path outside the shared storage: {video_path}")
+    return resolved
@@ -0,0 +1,76 @@
+"""
+Distributed tracing of the microservices with OpenTelemetry.
+
+The main app sends a W3C `traceparent` header with every call to a service. The
+FastAPI instrumentation continues that trace with a server span per request (a
+request without the header starts a new trace), the httpx instrumentation
+propagates it to outgoing calls, and `tracer` / `traced()` record internal spans
+(download, audio extraction, model inference, encoding...) as their children.
+
+Finished spans are exported in batches, according to TRACING_EXPORTER:
+- "none" (default): spans are not exported, the trace context is still propagated;
+- "file": one JSON object per line in TRACING_FILE;
+- "otlp": OTLP/HTTP to TRACING_OTLP_ENDPOINT (OpenTelemetry Collector, Jaeger, Tempo...).
+"""
+
+import functools
+import inspect
+from pathlib import Path
+
+from opentelemetry import trace
+from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+# Tracer of the internal spans of the services
+tracer = trace.get_tracer("vidp")
+
+
+def traced(name: str):
+    """Decorator running a function (sync or async) inside a span."""
+    def decorator(function):
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                with tracer.start_as_current_span(name):
+                    return await function(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with tracer.start_as_current_span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def setup_tracing(app, service_name: str, exporter: str, file_path: str, otlp_endpoint: str):
+    """
+    Configure the span exporter and instrument the FastAPI app and httpx (called once at startup).
+
+    Args:
+        app: FastAPI application
+        service_name: service.name resource attribute of the spans
+        exporter: "none", "file" or "otlp"
+        file_path: JSON lines file of the "file" exporter
+        otlp_endpoint: OTLP/HTTP traces endpoint of the "otlp" exporter
+    """
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    exporter = (exporter or "none").lower()
+    if exporter == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=otlp_endpoint)))
+    elif exporter == "file":
+        path = Path(file_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        provider.add_span_processor(BatchSpanProcessor(ConsoleSpanExporter(
+            service_name=service_name,
+            out=open(path, "a", encoding="utf-8"),
+            formatter=lambda span: span.to_json(indent=None) + "\n"
+        )))
+    trace.set_tracer_provider(provider)
+
+    FastAPIInstrumentor.instrument_app(app, tracer_provider=provider)
+    HTTPXClientInstrumentor().instrument(tracer_provider=provider)